@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai du démarrage de Nonotags
+Mesure, dans un processus neuf à chaque essai, le coût de construction des
+modules de traitement et le temps jusqu'à l'affichage de la première fenêtre,
+avec les services de support partagés ou recréés par chaque module.
+Avec --imports, affiche le coût des imports du démarrage (python -X importtime).
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Ajouter le répertoire du projet au path
+sys.path.insert(0, str(Path(__file__).parent))
+
+MODES = ("per_module", "shared")
+
+# Sous-systèmes qui ne doivent pas être importés avant la première fenêtre
+DEFERRED_MODULES = (
+    "gi.repository.Gst", "PIL", "requests", "mutagen.mp3", "mutagen.flac", "mutagen.mp4",
+    "core.file_cleaner", "core.metadata_processor", "core.case_corrector",
+    "core.metadata_formatter", "core.file_renamer", "core.tag_synchronizer",
+    "ui.processing_orchestrator", "ui.views.album_edit_window", "ui.views.exceptions_window",
+    "services.audio_player", "services.audio_converter", "services.playlist_manager",
+    "services.cover_search", "services.music_scanner",
+)
+
+
+def _build_pipeline(mode: str) -> dict:
+    """Construit les six modules de traitement et mesure chaque construction"""
+    from support.service_container import get_services
+    from core.file_cleaner import FileCleaner
+    from core.metadata_processor import MetadataProcessor
+    from core.case_corrector import CaseCorrector
+    from core.metadata_formatter import MetadataFormatter
+    from core.file_renamer import FileRenamer
+    from core.tag_synchronizer import TagSynchronizer
+
+    services = get_services()
+    timings = {}
+    for module_class in (FileCleaner, MetadataProcessor, CaseCorrector,
+                         MetadataFormatter, FileRenamer, TagSynchronizer):
+        if mode == "per_module":
+            # Comportement d'origine : chaque module recrée ses propres services
+            services.reset()
+        start = time.perf_counter()
+        module_class()
+        timings[module_class.__name__] = time.perf_counter() - start
+    return timings
+
+
+def _first_window() -> float:
+    """Temps entre la création de l'application et le premier affichage (None sans GTK)"""
+    try:
+        import gi
+        gi.require_version('Gtk', '3.0')
+        from gi.repository import Gtk, GLib
+    except (ImportError, ValueError):
+        return None
+
+    from ui.views.main_window import NonotagsApp
+
+    start = time.perf_counter()
+    app = NonotagsApp()
+    if app.library_catalog.has_albums():
+        app.create_main_window_from_catalog()
+        window = app.main_window
+    else:
+        from ui.startup_window import StartupWindow
+        window = app.startup_window = StartupWindow(app)
+        window.show_all()
+
+    shown = {}
+
+    def on_draw(*args):
+        shown.setdefault('elapsed', time.perf_counter() - start)
+        GLib.idle_add(Gtk.main_quit)
+        return False
+
+    window.connect_after('draw', on_draw)
+    GLib.timeout_add_seconds(30, Gtk.main_quit)
+    Gtk.main()
+    window.destroy()
+    return shown.get('elapsed')
+
+
+def run_child(mode: str):
+    """Un essai : mesures écrites en JSON sur la sortie standard"""
+    process_start = time.perf_counter()
+    from support.service_container import get_services
+
+    pipeline = _build_pipeline(mode)
+    if mode == "per_module":
+        get_services().reset()
+    window = _first_window()
+
+    print(json.dumps({
+        'pipeline': sum(pipeline.values()),
+        'modules': pipeline,
+        'services': get_services().get_timings(),
+        'first_window': window,
+        'total': time.perf_counter() - process_start,
+    }))
+
+
+def run_benchmark(runs: int = 5):
+    """Lance plusieurs essais par mode et affiche les médianes"""
+    results = {mode: [] for mode in MODES}
+    for _ in range(runs):
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode],
+                capture_output=True, text=True, check=True
+            ).stdout
+            results[mode].append(json.loads(output.strip().splitlines()[-1]))
+
+    print("\n" + "=" * 80)
+    print(f"📈 DÉMARRAGE - MÉDIANES SUR {runs} ESSAIS (ms)")
+    print("=" * 80)
+    print(f"{'Mesure':<28}" + "".join(f"{mode:>16}" for mode in MODES))
+
+    def row(label, values):
+        cells = "".join(f"{value * 1000:>16.1f}" if value is not None else f"{'-':>16}"
+                        for value in values)
+        print(f"{label:<28}{cells}")
+
+    def median(mode, key):
+        values = [run[key] for run in results[mode] if run[key] is not None]
+        return statistics.median(values) if values else None
+
+    module_names = results[MODES[0]][0]['modules'].keys()
+    for name in module_names:
+        row(name, [statistics.median(run['modules'][name] for run in results[mode]) for mode in MODES])
+    row("Modules de traitement", [median(mode, 'pipeline') for mode in MODES])
+    row("Première fenêtre", [median(mode, 'first_window') for mode in MODES])
+    row("Total processus", [median(mode, 'total') for mode in MODES])
+
+    if all(median(mode, 'first_window') is None for mode in MODES):
+        print("\n⚠️ GTK indisponible - temps de première fenêtre non mesuré")
+
+
+def import_report(top: int = 25):
+    """Rapport des imports de main.py, façon -X importtime, trié par coût cumulé"""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=str(Path(__file__).parent), capture_output=True, text=True
+    )
+
+    imports = []  # (cumulé µs, propre µs, module)
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        imports.append((int(cumulative_us), int(self_us), name.strip()))
+
+    if process.returncode != 0:
+        print(f"⚠️ Import de main.py interrompu : {process.stderr.strip().splitlines()[-1]}")
+
+    print("\n" + "=" * 80)
+    print(f"📈 IMPORTS DU DÉMARRAGE - TOP {top} (cumulé, ms)")
+    print("=" * 80)
+    for cumulative_us, self_us, name in sorted(imports, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>10.1f} {self_us / 1000:>10.1f}  {name}")
+
+    loaded = {name for _, _, name in imports}
+    eager = [name for name in DEFERRED_MODULES if name in loaded]
+    print(f"\n📦 {len(imports)} modules importés")
+    if eager:
+        print("⚠️ Sous-systèmes importés avant la première fenêtre : " + ", ".join(eager))
+    elif process.returncode == 0:
+        print("✅ Aucun sous-système différé importé au démarrage")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        run_child(sys.argv[2])
+    elif len(sys.argv) > 1 and sys.argv[1] == "--imports":
+        import_report(int(sys.argv[2]) if len(sys.argv) > 2 else 25)
+    else:
+        runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+        print("🚀 Banc d'essai du démarrage Nonotags...")
+        run_benchmark(runs)
+        print("\n✅ Banc d'essai terminé!")
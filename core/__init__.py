@@ -12,33 +12,28 @@ Ce package contient les modules principaux de traitement :
 __version__ = "1.0.0"
 __author__ = "Nonotags"
 
-# Import des modules principaux
-try:
-    from .file_cleaner import FileCleaner
-except ImportError:
-    FileCleaner = None
-
-try:
-    from .metadata_processor import MetadataCleaner, MetadataProcessor
-except ImportError:
-    MetadataCleaner = None
-    MetadataProcessor = None
-
-try:
-    from .case_corrector import CaseCorrector, MetadataCaseCorrector
-except ImportError:
-    CaseCorrector = None
-    MetadataCaseCorrector = None
-
-try:
-    from .metadata_formatter import MetadataFormatter
-except ImportError:
-    MetadataFormatter = None
-
-try:
-    from .file_renamer import FileRenamer
-except ImportError:
-    FileRenamer = None
+# Import des modules principaux, différé au premier accès : importer un
+# sous-module léger (refresh_manager) ne charge pas mutagen et PIL
+_LAZY_EXPORTS = {
+    "FileCleaner": ".file_cleaner",
+    "MetadataCleaner": ".metadata_processor",
+    "MetadataProcessor": ".metadata_processor",
+    "CaseCorrector": ".case_corrector",
+    "MetadataCaseCorrector": ".case_corrector",
+    "MetadataFormatter": ".metadata_formatter",
+    "FileRenamer": ".file_renamer",
+}
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    try:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    except ImportError:
+        value = None
+    globals()[name] = value
+    return value
 
 # Exports publics
 __all__ = [
@@ -13,12 +13,11 @@ from dataclasses import dataclass
 
 # Imports des modules de support
 from support.logger import AppLogger
-from support.config_manager import ConfigManager
-from support.state_manager import StateManager
-from support.validator import Validator, ValidationResult
+from support.service_container import get_services
+from support.validator import ValidationResult
 
 # Import du gestionnaire de base de données
-from database.db_manager import DatabaseManager
+from database.history_writer import get_history_writer
 
 
 class CaseCorrectionRule(Enum):
@@ -68,10 +67,12 @@ class CaseCorrector:
         # Initialisation des modules de support
         from support.logger import get_logger
         self.logger = get_logger().main_logger
-        self.config_manager = ConfigManager()
-        self.state_manager = StateManager()
-        self.validator = Validator()
-        self.db_manager = DatabaseManager()
+        services = get_services()
+        self.config_manager = services.config
+        self.state_manager = services.state
+        self.validator = services.validator
+        self.db_manager = services.lazy('db')
+        self.history_writer = get_history_writer()
         
         # Configuration du module
         self.processing_config = self.config_manager.processing
@@ -587,8 +588,8 @@ class CaseCorrector:
                 for file_results in results.values()
             )
             
-            # Sauvegarde en base
-            self.db_manager.save_import_history(
+            # Sauvegarde en base (écriture groupée en arrière-plan)
+            self.history_writer.record_step(
                 album_path=album_path,
                 operation_type="case_correction",
                 files_processed=len(results),
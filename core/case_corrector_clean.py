@@ -13,12 +13,10 @@ from dataclasses import dataclass
 
 # Imports des modules de support
 from support.logger import AppLogger
-from support.config_manager import ConfigManager
-from support.state_manager import StateManager
-from support.validator import Validator, ValidationResult
+from support.service_container import get_services
+from support.validator import ValidationResult
 
 # Import du gestionnaire de base de données
-from database.db_manager import DatabaseManager
 
 
 class CaseCorrectionRule(Enum):
@@ -64,10 +62,11 @@ class CaseCorrector:
         # Initialisation des modules de support
         from support.logger import get_logger
         self.logger = get_logger().main_logger
-        self.config_manager = ConfigManager()
-        self.state_manager = StateManager()
-        self.validator = Validator()
-        self.db_manager = DatabaseManager()
+        services = get_services()
+        self.config_manager = services.config
+        self.state_manager = services.state
+        self.validator = services.validator
+        self.db_manager = services.lazy('db')
         
         # Configuration du module
         self.processing_config = self.config_manager.processing
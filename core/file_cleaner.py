@@ -29,9 +29,8 @@ from enum import Enum
 
 # Import des modules de support
 from support.logger import AppLogger
-from support.config_manager import ConfigManager
-from support.state_manager import StateManager
-from support.validator import FileValidator, ValidationResult
+from support.service_container import get_services
+from support.validator import ValidationResult
 from support.honest_logger import honest_logger, ProcessingResult
 
 
@@ -82,9 +81,10 @@ class FileCleaner:
         # Intégration modules de support
         from support.logger import get_logger
         self.logger = get_logger().main_logger
-        self.config = ConfigManager()
-        self.state = StateManager()
-        self.validator = FileValidator()
+        services = get_services()
+        self.config = services.config
+        self.state = services.state
+        self.validator = services.file_validator
         
         # Configuration des fichiers indésirables (personnalisable)
         self._unwanted_files = self.config.processing.unwanted_files
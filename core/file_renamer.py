@@ -23,10 +23,9 @@ except ImportError:
 try:
     from support.logger import AppLogger
     from support.honest_logger import HonestLogger
-    from support.config_manager import ConfigManager
-    from support.state_manager import StateManager
-    from support.validator import MetadataValidator, ValidationResult, FileValidator
-    from database.db_manager import DatabaseManager
+    from support.service_container import get_services
+    from support.validator import ValidationResult
+    from database.history_writer import get_history_writer
 except ImportError as e:
     print(f"Erreur d'import des modules de support : {e}")
 
@@ -85,11 +84,13 @@ class FileRenamer:
             from support.logger import get_logger
             self.logger = get_logger().main_logger
             self.honest_logger = HonestLogger("FileRenamer")
-            self.config_manager = ConfigManager()
-            self.state_manager = StateManager()
-            self.file_validator = FileValidator()  # Pour validate_directory
-            self.metadata_validator = MetadataValidator()  # Pour les métadonnées
-            self.db_manager = DatabaseManager()
+            services = get_services()
+            self.config_manager = services.config
+            self.state_manager = services.state
+            self.file_validator = services.file_validator  # Pour validate_directory
+            self.metadata_validator = services.metadata_validator  # Pour les métadonnées
+            self.db_manager = services.lazy('db')
+            self.history_writer = get_history_writer()
             
             # Configuration du module
             self.config = self.config_manager.processing
@@ -854,12 +855,15 @@ class FileRenamer:
             
             # Enregistrement en base
             try:
-                self.db_manager.add_import_history(
-                    folder_path=current_album_path,
-                    import_type="file_renaming",
-                    status="completed" if files_renamed > 0 else "no_changes",
+                self.history_writer.record_step(
+                    album_path=current_album_path,
+                    operation_type="file_renaming",
                     files_processed=len(mp3_files),
-                    processing_time=processing_time
+                    changes_made=files_renamed,
+                    details={
+                        "folder_renamed": folder_renamed,
+                        "processing_time": processing_time
+                    }
                 )
             except Exception as e:
                 self.honest_logger.warning(f"Erreur enregistrement base: {e}")
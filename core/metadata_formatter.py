@@ -14,12 +14,11 @@ from datetime import datetime
 
 # Imports des modules de support
 from support.logger import AppLogger
-from support.config_manager import ConfigManager
-from support.state_manager import StateManager
-from support.validator import MetadataValidator, FileValidator, ValidationResult
+from support.service_container import get_services
+from support.validator import ValidationResult
 
 # Import du gestionnaire de base de données
-from database.db_manager import DatabaseManager
+from database.history_writer import get_history_writer
 
 
 class FormattingRule(Enum):
@@ -72,11 +71,13 @@ class MetadataFormatter:
         # Initialisation des modules de support
         from support.logger import get_logger
         self.logger = get_logger().main_logger
-        self.config_manager = ConfigManager()
-        self.state_manager = StateManager()
-        self.validator = MetadataValidator()
-        self.file_validator = FileValidator()  # ✅ Pour validate_directory
-        self.db_manager = DatabaseManager()
+        services = get_services()
+        self.config_manager = services.config
+        self.state_manager = services.state
+        self.validator = services.metadata_validator
+        self.file_validator = services.file_validator  # ✅ Pour validate_directory
+        self.db_manager = services.lazy('db')
+        self.history_writer = get_history_writer()
         
         # Configuration du module
         self.processing_config = self.config_manager.processing
@@ -603,7 +604,7 @@ class MetadataFormatter:
     def _save_formatting_history(self, result: AlbumFormattingResult) -> None:
         """Sauvegarde l'historique de formatage en base."""
         try:
-            self.db_manager.save_import_history(
+            self.history_writer.record_step(
                 album_path=result.album_path,
                 operation_type="metadata_formatting",
                 files_processed=result.files_processed,
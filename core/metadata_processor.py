@@ -44,12 +44,11 @@ except ImportError:
 
 # Import des modules de support
 from support.logger import AppLogger
-from support.config_manager import ConfigManager
-from support.state_manager import StateManager
-from support.validator import FileValidator, MetadataValidator, ValidationResult
+from support.service_container import get_services
+from support.validator import ValidationResult
 from support.honest_logger import honest_logger, ProcessingResult
 from support.cache import cached_metadata, metadata_cache
-from database.db_manager import DatabaseManager
+from database.history_writer import get_history_writer
 
 
 class CleaningRule(Enum):
@@ -117,11 +116,13 @@ class MetadataCleaner:
         # Intégration modules de support
         from support.logger import get_logger
         self.logger = get_logger().main_logger
-        self.config = ConfigManager()
-        self.state = StateManager()
-        self.validator = FileValidator()  # ✅ Utiliser FileValidator qui a validate_directory()
-        self.metadata_validator = MetadataValidator()  # Pour les validations spécifiques 
-        self.db = DatabaseManager()
+        services = get_services()
+        self.config = services.config
+        self.state = services.state
+        self.validator = services.file_validator  # ✅ Utiliser FileValidator qui a validate_directory()
+        self.metadata_validator = services.metadata_validator  # Pour les validations spécifiques 
+        self.db = services.lazy('db')
+        self.history_writer = get_history_writer()
         
         # Configuration des règles de nettoyage
         self._load_cleaning_rules()
@@ -635,27 +636,31 @@ class MetadataCleaner:
     
     def _save_changes_to_db(self, results: CleaningResults):
         """
-        Sauvegarde les changements dans la base de données (table import_history).
+        Sauvegarde les changements dans la base de données (table metadata_change_history).
+        
+        Les changements sont confiés à l'écrivain d'historique, qui les insère
+        par lots en arrière-plan ; rien n'est enregistré si l'option
+        processing.record_field_history est désactivée.
         
         Args:
             results: Résultats du nettoyage contenant les changements
         """
+        if not self.config.processing.record_field_history:
+            return
+        
         try:
+            album_path = str(Path(results.file_path).parent)
             for change in results.changes:
-                # Préparer les données pour la base
-                change_data = {
-                    'file_path': results.file_path,
-                    'field_name': change.field_name,
-                    'old_value': change.old_value,
-                    'new_value': change.new_value,
-                    'rule_applied': change.rule_applied.value,
-                    'timestamp': change.timestamp,
-                    'module': 'metadata_cleaner'
-                }
-                
-                # Insertion en base (à adapter selon le schéma exact)
-                # Note: Ceci sera adapté quand le schéma final de import_history sera défini
-                self.logger.debug(f"Changement sauvegardé en base : {change_data}")
+                self.history_writer.record_change(
+                    file_path=results.file_path,
+                    field_name=change.field_name,
+                    old_value=change.old_value,
+                    new_value=change.new_value,
+                    rule_applied=change.rule_applied.value,
+                    module='metadata_cleaner',
+                    album_path=album_path,
+                    timestamp=change.timestamp
+                )
                 
         except Exception as e:
             self.logger.error(f"Erreur sauvegarde base de données : {str(e)}")
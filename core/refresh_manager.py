@@ -5,11 +5,15 @@ Assure l'effet miroir entre métadonnées et interface utilisateur
 
 import threading
 from gi.repository import GLib
-from typing import List, Set, Callable, Optional
+from typing import Dict, List, Set, Callable, Optional
 import weakref
 import os
 
 
+# Extensions reconnues comme fichiers de piste (le dossier parent est l'album)
+AUDIO_EXTENSIONS = ('.mp3', '.flac', '.m4a', '.mp4', '.ogg', '.wav')
+
+
 class RefreshManager:
     """
     Gestionnaire centralisé de rafraîchissement d'interface
@@ -36,12 +40,20 @@ class RefreshManager:
         # Registry des composants d'affichage (WeakReferences pour éviter les fuites mémoire)
         self._display_components = weakref.WeakSet()
         
-        # Cache des albums modifiés (pour éviter les rafraîchissements redondants)
+        # Registre chemin d'album -> carte affichée (références faibles)
+        self._cards: Dict[str, weakref.ref] = {}
+        
+        # Albums modifiés en attente (pour éviter les rafraîchissements redondants)
         self._pending_refreshes: Set[str] = set()
+        self._pending_all = False
+        self._pending_lock = threading.Lock()
+        
+        # Écouteurs prévenus de chaque changement (invalidation de caches par album)
+        self._metadata_listeners: List[Callable] = []
         
-        # Timer pour regrouper les notifications
+        # Fenêtre de regroupement : ouverte par la première notification, jamais repoussée
         self._refresh_timer = None
-        self._refresh_delay_ms = 100  # 100ms de délai pour regrouper les notifications
+        self._refresh_delay_ms = 100  # 100ms : une rafale de traitement en lot = un rafraîchissement
     
     @classmethod
     def get_instance(cls):
@@ -70,86 +82,145 @@ class RefreshManager:
         if component in self._display_components:
             self._display_components.discard(component)
     
+    def add_metadata_listener(self, callback: Callable):
+        """
+        Enregistre un écouteur appelé à chaque notification, avant le rafraîchissement
+        
+        Args:
+            callback: Appelé avec la liste des dossiers d'albums modifiés (None = tous)
+        """
+        if callback not in self._metadata_listeners:
+            self._metadata_listeners.append(callback)
+    
+    # === Registre des cartes (chemin d'album -> carte affichée) ===
+    
+    def register_card(self, album_path: str, card):
+        """
+        Associe une carte affichée à son album (appelé par la grille à l'affectation)
+        
+        Args:
+            album_path: Dossier de l'album
+            card: Carte qui l'affiche (référence faible)
+        """
+        if album_path:
+            self._cards[album_path] = weakref.ref(card)
+    
+    def unregister_card(self, album_path: str, card=None):
+        """
+        Retire une carte du registre (carte recyclée ou détruite)
+        
+        Args:
+            album_path: Dossier de l'album
+            card: Si fourni, ne retire l'entrée que si elle désigne encore cette carte
+        """
+        ref = self._cards.get(album_path)
+        if ref is not None and (card is None or ref() is card):
+            del self._cards[album_path]
+    
+    def get_card(self, album_path: str):
+        """Carte affichant actuellement un album, None si l'album n'est pas visible"""
+        ref = self._cards.get(album_path)
+        card = ref() if ref is not None else None
+        if ref is not None and card is None:
+            del self._cards[album_path]
+        return card
+    
+    @staticmethod
+    def _album_folder(path: str) -> str:
+        """Dossier d'album d'un chemin (fichier audio -> dossier parent), sans accès disque"""
+        if os.path.splitext(path)[1].lower() in AUDIO_EXTENSIONS:
+            return os.path.dirname(path)
+        return path.rstrip(os.sep) or path
+    
+    # === Notifications ===
+    
     def notify_metadata_changed(self, album_paths: List[str] = None, immediate: bool = False):
         """
         Notifie que des métadonnées ont changé
         
+        Utilisable depuis n'importe quel thread : les notifications reçues pendant
+        la fenêtre de regroupement sont fusionnées en un seul rafraîchissement.
+        
         Args:
-            album_paths: Liste des chemins d'albums modifiés (None = tout rafraîchir)
-            immediate: Si True, rafraîchit immédiatement sans délai
+            album_paths: Liste des chemins d'albums (ou de fichiers) modifiés (None = tout rafraîchir)
+            immediate: Si True, rafraîchit immédiatement sans délai (thread GTK uniquement)
         """
-        if album_paths:
-            # Normaliser les chemins d'albums
-            normalized_paths = []
-            for path in album_paths:
-                if os.path.isfile(path):
-                    # Si c'est un fichier, prendre le dossier parent
-                    album_path = os.path.dirname(path)
-                else:
-                    album_path = path
-                normalized_paths.append(album_path)
-            
-            self._pending_refreshes.update(normalized_paths)
-        else:
-            # Rafraîchissement global
-            self._pending_refreshes.clear()
+        normalized_paths = [self._album_folder(path) for path in album_paths] if album_paths else None
+        
+        with self._pending_lock:
+            if normalized_paths is None:
+                self._pending_all = True
+            else:
+                self._pending_refreshes.update(normalized_paths)
+        
+        for listener in self._metadata_listeners:
+            try:
+                listener(normalized_paths)
+            except Exception as e:
+                print(f"❌ Erreur écouteur de métadonnées: {e}")
         
         if immediate:
+            with self._pending_lock:
+                timer, self._refresh_timer = self._refresh_timer, None
+            if timer:
+                GLib.source_remove(timer)
             self._execute_refresh()
         else:
             self._schedule_refresh()
     
     def _schedule_refresh(self):
-        """Programme un rafraîchissement avec délai pour regrouper les notifications"""
-        if self._refresh_timer:
-            GLib.source_remove(self._refresh_timer)
-        
-        self._refresh_timer = GLib.timeout_add(self._refresh_delay_ms, self._execute_refresh)
+        """Ouvre une fenêtre de regroupement si aucune n'est en cours (sans la repousser)"""
+        with self._pending_lock:
+            if self._refresh_timer is None:
+                self._refresh_timer = GLib.timeout_add(self._refresh_delay_ms, self._on_refresh_timer)
+    
+    def _on_refresh_timer(self):
+        """Fin de la fenêtre de regroupement"""
+        with self._pending_lock:
+            self._refresh_timer = None
+        self._execute_refresh()
+        return False  # Ne pas répéter le timer
     
     def _execute_refresh(self):
-        """Exécute le rafraîchissement des composants enregistrés"""
+        """Rafraîchit uniquement les cartes des albums modifiés, puis les autres composants"""
+        with self._pending_lock:
+            refresh_all = self._pending_all
+            album_paths = self._pending_refreshes
+            self._pending_all = False
+            self._pending_refreshes = set()
+        
         try:
-            if not self._display_components:
-                print("⚠️ Aucun composant d'affichage enregistré")
-                return False
+            # Cartes concernées : toutes les cartes affichées, ou celles des albums modifiés
+            if refresh_all:
+                cards = [self.get_card(path) for path in list(self._cards)]
+            else:
+                cards = [self.get_card(path) for path in album_paths]
             
-            albums_to_refresh = list(self._pending_refreshes) if self._pending_refreshes else None
+            for card in cards:
+                if card is not None:
+                    card._update_display()
             
-            # Parcourir tous les composants enregistrés
-            refreshed_count = 0
+            albums_to_refresh = None if refresh_all else list(album_paths)
             for component in list(self._display_components):  # Copie pour éviter les modifications concurrentes
-                if self._refresh_component(component, albums_to_refresh):
-                    refreshed_count += 1
-            
-            # Nettoyer les rafraîchissements en attente
-            self._pending_refreshes.clear()
-            self._refresh_timer = None
+                self._refresh_component(component, albums_to_refresh)
             
         except Exception as e:
             print(f"❌ Erreur lors du rafraîchissement: {e}")
-            self._refresh_timer = None
         
-        return False  # Ne pas répéter le timer
+        return False
     
     def _refresh_component(self, component, albums_to_refresh: Optional[List[str]] = None):
         """
-        Rafraîchit un composant spécifique en mettant à jour directement ses cartes
+        Rafraîchit un composant d'affichage enregistré (hors cartes d'album)
         
         Args:
-            component: Composant à rafraîchir (doit être NonotagsApp)
+            component: Composant à rafraîchir
             albums_to_refresh: Liste des albums à rafraîchir (None = tous)
             
         Returns:
-            bool: True si le rafraîchissement a réussi
+            bool: True si le rafraîchissement a été programmé
         """
         try:
-            component_type = type(component).__name__
-            
-            # Traitement spécial pour NonotagsApp
-            if component_type == "NonotagsApp":
-                return self._refresh_nonotags_app_cards(component, albums_to_refresh)
-            
-            # Fallback vers les méthodes existantes pour autres composants
             refresh_method = None
             
             if hasattr(component, '_refresh_albums_display'):
@@ -172,73 +243,17 @@ class RefreshManager:
             print(f"  ❌ Erreur rafraîchissement {type(component).__name__}: {e}")
             return False
     
-    def _refresh_nonotags_app_cards(self, app, albums_to_refresh: Optional[List[str]] = None):
-        """
-        Met à jour directement les cartes dans NonotagsApp sans rescan complet
-        
-        Args:
-            app: Instance de NonotagsApp
-            albums_to_refresh: Liste des dossiers d'albums à rafraîchir
-            
-        Returns:
-            bool: True si le rafraîchissement a réussi
-        """
-        try:
-            if not hasattr(app, 'albums_grid'):
-                return False
-            
-            # Fonction à exécuter dans le thread principal GTK
-            def update_cards():
-                try:
-                    updated_count = 0
-                    
-                    # Parcourir toutes les cartes dans albums_grid
-                    children = app.albums_grid.get_children()
-                    
-                    for child in children:
-                        child_type = type(child).__name__
-                        
-                        # Si c'est un FlowBoxChild, récupérer la vraie carte à l'intérieur
-                        actual_card = child
-                        if child_type == "FlowBoxChild":
-                            # FlowBoxChild contient la vraie carte d'album
-                            actual_card = child.get_child()
-                        
-                        if hasattr(actual_card, '_update_display'):
-                            # Si albums_to_refresh est spécifié, vérifier si cette carte correspond
-                            if albums_to_refresh:
-                                card_path = getattr(actual_card, 'album_path', None)
-                                if card_path and card_path not in albums_to_refresh:
-                                    continue
-                            
-                            # Mettre à jour la carte
-                            actual_card._update_display()
-                            updated_count += 1
-                    
-                    return False  # Ne pas répéter le timer
-                    
-                except Exception as e:
-                    print(f"  ❌ Erreur mise à jour cartes: {e}")
-                    return False
-            
-            # Programmer la mise à jour dans le thread principal
-            GLib.idle_add(update_cards)
-            return True
-            
-        except Exception as e:
-            print(f"  ❌ Erreur _refresh_nonotags_app_cards: {e}")
-            return False
-    
     def force_refresh_all(self):
         """Force un rafraîchissement immédiat de tous les composants"""
-        self._pending_refreshes.clear()
-        self._execute_refresh()
+        self.notify_metadata_changed(None, immediate=True)
     
     def get_status(self):
         """Retourne le statut du gestionnaire pour debug"""
         return {
             "components_count": len(self._display_components),
+            "cards_count": len(self._cards),
             "pending_refreshes": len(self._pending_refreshes),
+            "pending_all": self._pending_all,
             "pending_albums": list(self._pending_refreshes),
             "timer_active": self._refresh_timer is not None
         }
@@ -20,10 +20,10 @@ try:
     from support.logger import get_logger
     from support.state_manager import ApplicationState
     from support.honest_logger import HonestLogger
-    from support.config_manager import ConfigManager
-    from support.state_manager import StateManager
-    from support.validator import MetadataValidator, FileValidator, ValidationResult
-    from database.db_manager import DatabaseManager
+    from support.service_container import get_services
+    from support.validator import ValidationResult
+    from database.history_writer import get_history_writer
+    from database.library_catalog import get_library_catalog
 except ImportError as e:
     print(f"Erreur d'import des modules de support : {e}")
 
@@ -91,11 +91,13 @@ class TagSynchronizer:
             # Initialisation des modules de support
             self.logger = get_logger().main_logger
             self.honest_logger = HonestLogger("TagSynchronizer")
-            self.config_manager = ConfigManager()
-            self.state_manager = StateManager()
-            self.validator = MetadataValidator()
-            self.file_validator = FileValidator()  # ✅ Pour validate_directory
-            self.db_manager = DatabaseManager()
+            services = get_services()
+            self.config_manager = services.config
+            self.state_manager = services.state
+            self.validator = services.metadata_validator
+            self.file_validator = services.file_validator  # ✅ Pour validate_directory
+            self.db_manager = services.lazy('db')
+            self.history_writer = get_history_writer()
             
             # Configuration du module
             self.config = self.config_manager.processing
@@ -341,6 +343,7 @@ class TagSynchronizer:
             # Sauvegarde si des tags ont été mis à jour
             if updated_tags:
                 audio_file.save()
+                self._update_catalog(mp3_path, {tag: metadata[tag] for tag in updated_tags})
                 if skipped_tags:
                     self.honest_logger.info(f"⏭️ [RÈGLE 20] {len(skipped_tags)} tags ignorés : {', '.join(skipped_tags)}")
                 return True
@@ -352,6 +355,20 @@ class TagSynchronizer:
             self.honest_logger.error(f"❌ [RÈGLE 20] Erreur synchronisation tags de '{Path(mp3_path).name}' : {e}")
             return False
     
+    def _update_catalog(self, mp3_path: str, written_tags: Dict[str, str]):
+        """Reporte les tags écrits dans le catalogue de bibliothèque (index de recherche)."""
+        catalog_fields = {
+            'TIT2': 'title', 'TPE1': 'artist', 'TALB': 'album',
+            'TYER': 'year', 'TCON': 'genre', 'TRCK': 'track_number'
+        }
+        fields = {catalog_fields[tag]: value for tag, value in written_tags.items() if tag in catalog_fields}
+        if not fields:
+            return
+        try:
+            get_library_catalog().update_track_tags(mp3_path, fields)
+        except Exception as e:
+            self.honest_logger.warning(f"⚠️ Catalogue non mis à jour pour '{Path(mp3_path).name}' : {e}")
+    
     def synchronize_file(self, mp3_path: str, metadata: Optional[Dict[str, str]] = None) -> SynchronizationResult:
         """
         Synchronise un fichier MP3 (pochette + tags).
@@ -533,11 +550,12 @@ class TagSynchronizer:
             
             # Enregistrement en base
             try:
-                self.db_manager.add_import_history(
-                    folder_path=album_path,
-                    action="synchronize_album",
+                self.history_writer.record_step(
+                    album_path=album_path,
+                    operation_type="tag_synchronization",
+                    files_processed=len(file_results),
+                    changes_made=tags_updated,
                     details={
-                        "files_processed": len(file_results),
                         "covers_associated": covers_associated,
                         "tags_updated": tags_updated,
                         "total_files": len(mp3_files),
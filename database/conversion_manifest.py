@@ -0,0 +1,249 @@
+"""
+Manifeste des conversions audio
+Mémorise le fichier produit pour chaque source convertie avec des réglages
+donnés, afin de ne reconvertir que ce qui a changé, et conserve la file des
+conversions inachevées pour la reprendre au redémarrage.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from support.logger import get_logger
+from support.config_manager import ConfigManager
+from support.service_container import get_services
+from database.db_manager import ConnectionPool
+
+
+def settings_hash(**settings) -> str:
+    """
+    Empreinte des réglages qui déterminent le fichier produit.
+
+    Args:
+        settings: Format, qualité, report des tags, dossier de sortie...
+
+    Returns:
+        Empreinte hexadécimale, indépendante de l'ordre des réglages
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for key in sorted(settings):
+        digest.update(f"{key}\0{settings[key]}\n".encode('utf-8', 'surrogateescape'))
+    return digest.hexdigest()
+
+
+def file_stat(file_path: str) -> Optional[Tuple[int, int]]:
+    """Taille et date de modification (ns) d'un fichier, None s'il est absent."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class ConversionManifest:
+    """Manifeste SQLite des conversions réalisées et de la file en cours."""
+
+    # Colonnes d'une tâche de la file, dans l'ordre des paramètres de add_conversion_job
+    _QUEUE_FIELDS = ('source_path', 'target_format', 'output_dir', 'quality', 'delete_source', 'copy_tags')
+
+    # Sources par requête de lookup_many (limite des paramètres SQLite)
+    _LOOKUP_CHUNK = 500
+
+    def __init__(self, db_path: Optional[str] = None, config: Optional[ConfigManager] = None):
+        """
+        Args:
+            db_path: Chemin de la base du manifeste (par défaut: conversions.db du dossier de config)
+            config: Gestionnaire de configuration (optionnel)
+        """
+        self.logger = get_logger()
+
+        if db_path is None:
+            config_dir = Path(config.config_dir) if config else Path.home() / ".config" / "nonotags"
+            config_dir.mkdir(parents=True, exist_ok=True)
+            db_path = config_dir / "conversions.db"
+
+        self.db_path = str(db_path)
+        self._pool = ConnectionPool(self.db_path)
+        self._initialize_database()
+
+    def _initialize_database(self):
+        """Crée les tables du manifeste."""
+        with self._pool.get() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS conversions (
+                    source_path TEXT NOT NULL,
+                    settings_hash TEXT NOT NULL,
+                    source_size INTEGER NOT NULL,
+                    source_mtime_ns INTEGER NOT NULL,
+                    target_path TEXT NOT NULL,
+                    converted_at REAL NOT NULL,
+                    PRIMARY KEY (source_path, settings_hash)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS conversion_queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source_path TEXT NOT NULL,
+                    target_format TEXT NOT NULL,
+                    output_dir TEXT NOT NULL,
+                    quality TEXT NOT NULL,
+                    delete_source INTEGER NOT NULL DEFAULT 0,
+                    copy_tags INTEGER NOT NULL DEFAULT 1,
+                    added_at REAL NOT NULL
+                )
+            """)
+
+    def _connection(self):
+        """Connexion du thread courant (à utiliser avec `with` pour une transaction)."""
+        return self._pool.get()
+
+    # === Conversions réalisées ===
+
+    def lookup(self, source_path: str, settings: str) -> Optional[Tuple[str, bool]]:
+        """
+        Cible enregistrée pour une source et des réglages.
+
+        La cible est à jour si la source a gardé la taille et la date de
+        modification relevées avant sa conversion et si la cible existe
+        toujours (ses tags peuvent avoir été retouchés depuis).
+
+        Returns:
+            (chemin de la cible, à jour) ou None si jamais convertie
+        """
+        row = self._connection().execute(
+            "SELECT source_size, source_mtime_ns, target_path FROM conversions "
+            "WHERE source_path = ? AND settings_hash = ?",
+            (source_path, settings)
+        ).fetchone()
+        if row is None:
+            return None
+        return self._target_state(source_path, *row)
+
+    def lookup_many(self, sources: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Tuple[str, bool]]:
+        """
+        Cibles enregistrées pour une sélection de fichiers (voir lookup).
+
+        Args:
+            sources: Couples (source, réglages)
+
+        Returns:
+            (chemin de la cible, à jour) par couple (source, réglages) déjà converti
+        """
+        wanted = set(sources)
+        paths = sorted({source_path for source_path, _ in wanted})
+        conn = self._connection()
+        found = {}
+        for start in range(0, len(paths), self._LOOKUP_CHUNK):
+            chunk = paths[start:start + self._LOOKUP_CHUNK]
+            cursor = conn.execute(
+                "SELECT source_path, settings_hash, source_size, source_mtime_ns, target_path "
+                f"FROM conversions WHERE source_path IN ({', '.join('?' * len(chunk))})",
+                chunk
+            )
+            for source_path, settings, size, mtime_ns, target_path in cursor:
+                if (source_path, settings) in wanted:
+                    found[(source_path, settings)] = self._target_state(source_path, size, mtime_ns, target_path)
+        return found
+
+    @staticmethod
+    def _target_state(source_path: str, size: int, mtime_ns: int, target_path: str) -> Tuple[str, bool]:
+        """(cible, à jour) d'une conversion enregistrée"""
+        up_to_date = file_stat(source_path) == (size, mtime_ns) and os.path.exists(target_path)
+        return target_path, up_to_date
+
+    def record_conversion(self, source_path: str, settings: str, source_stat: Tuple[int, int], target_path: str):
+        """Enregistre une conversion réussie (source relevée avant l'encodage)."""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO conversions "
+                "(source_path, settings_hash, source_size, source_mtime_ns, target_path, converted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (source_path, settings, source_stat[0], source_stat[1], target_path, time.time())
+            )
+
+    # === File des conversions inachevées ===
+
+    def enqueue(self, source_path: str, target_format: str, output_dir: str, quality: str,
+                delete_source: bool, copy_tags: bool) -> int:
+        """Ajoute une tâche à la file persistante et retourne son identifiant."""
+        values = (source_path, target_format, output_dir, quality, delete_source, copy_tags)
+        return self.enqueue_many([dict(zip(self._QUEUE_FIELDS, values))])[0]
+
+    def enqueue_many(self, jobs: List[Dict]) -> List[int]:
+        """
+        Ajoute en une transaction les tâches d'une sélection à la file persistante.
+
+        Args:
+            jobs: Paramètres de chaque tâche (clés _QUEUE_FIELDS)
+
+        Returns:
+            Identifiants des tâches, dans l'ordre de jobs
+        """
+        if not jobs:
+            return []
+        now = time.time()
+        rows = [
+            (job['source_path'], job['target_format'], job['output_dir'], job['quality'],
+             int(job['delete_source']), int(job['copy_tags']), now)
+            for job in jobs
+        ]
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO conversion_queue "
+                "(source_path, target_format, output_dir, quality, delete_source, copy_tags, added_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            # Verrou d'écriture tenu jusqu'au commit : identifiants consécutifs
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(last_id - len(rows) + 1, last_id + 1))
+
+    def dequeue(self, queue_id: int):
+        """Retire une tâche terminée, annulée ou supprimée de la file persistante."""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM conversion_queue WHERE id = ?", (queue_id,))
+
+    def pending_jobs(self) -> List[Dict]:
+        """Tâches inachevées, dans l'ordre d'ajout (avec leur identifiant 'queue_id')."""
+        cursor = self._connection().execute(
+            f"SELECT id, {', '.join(self._QUEUE_FIELDS)} FROM conversion_queue ORDER BY id"
+        )
+        jobs = []
+        for row in cursor:
+            job = dict(zip(('queue_id',) + self._QUEUE_FIELDS, row))
+            job['delete_source'] = bool(job['delete_source'])
+            job['copy_tags'] = bool(job['copy_tags'])
+            jobs.append(job)
+        return jobs
+
+    def clear_queue(self):
+        """Vide la file persistante."""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM conversion_queue")
+
+    def close(self):
+        """Ferme la connexion du thread courant."""
+        self._pool.close()
+
+
+# Instance globale
+_conversion_manifest_instance = None
+_conversion_manifest_lock = threading.Lock()
+
+def get_conversion_manifest() -> ConversionManifest:
+    """Retourne le manifeste de conversion global."""
+    global _conversion_manifest_instance
+
+    if _conversion_manifest_instance is None:
+        with _conversion_manifest_lock:
+            if _conversion_manifest_instance is None:
+                _conversion_manifest_instance = ConversionManifest(config=get_services().config)
+
+    return _conversion_manifest_instance
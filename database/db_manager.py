@@ -5,15 +5,65 @@ Gère la base de données SQLite avec les tables étendues.
 
 import sqlite3
 import json
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from support.logger import get_logger
 from support.config_manager import ConfigManager
 
+class ConnectionPool:
+    """
+    Pool de connexions SQLite : une connexion persistante par thread.
+    
+    Les connexions sqlite3 ne peuvent pas être partagées entre threads ;
+    chaque thread garde donc la sienne, ce qui conserve aussi le cache
+    de requêtes préparées d'un appel à l'autre.
+    """
+    
+    def __init__(self, db_path: str, cached_statements: int = 256, timeout: float = 10.0):
+        """
+        Args:
+            db_path: Chemin de la base de données
+            cached_statements: Nombre de requêtes préparées gardées par connexion
+            timeout: Attente maximale sur un verrou d'écriture (secondes)
+        """
+        self.db_path = db_path
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self._local = threading.local()
+    
+    def get(self) -> sqlite3.Connection:
+        """Retourne la connexion du thread courant (créée au premier appel)."""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.timeout,
+                cached_statements=self.cached_statements
+            )
+            # WAL : lectures concurrentes pendant les écritures, fsync allégé
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = conn
+        return conn
+    
+    def close(self):
+        """Ferme la connexion du thread courant."""
+        conn = getattr(self._local, 'connection', None)
+        if conn is not None:
+            conn.close()
+            self._local.connection = None
+
+
 class DatabaseManager:
     """Gestionnaire principal de la base de données SQLite."""
     
+    # Pools et schémas partagés par toutes les instances (clé : chemin de la base)
+    _pools: Dict[str, ConnectionPool] = {}
+    _initialized_paths: set = set()
+    _pools_lock = threading.Lock()
+    
     def __init__(self, db_path: Optional[str] = None, config: Optional[ConfigManager] = None):
         """
         Initialise le gestionnaire de base de données.
@@ -35,17 +85,23 @@ class DatabaseManager:
             db_path = db_dir / "nonotags.db"
         
         self.db_path = str(db_path)
-        self.connection = None
-        
-        # Initialisation de la base
-        self._initialize_database()
         
-        self.logger.info(f"Database initialized: {self.db_path}")
+        # Pool partagé avec les autres instances pointant sur la même base
+        with DatabaseManager._pools_lock:
+            if self.db_path not in DatabaseManager._pools:
+                DatabaseManager._pools[self.db_path] = ConnectionPool(self.db_path)
+            self._pool = DatabaseManager._pools[self.db_path]
+            
+            # Le schéma n'est créé qu'une fois par base et par processus
+            if self.db_path not in DatabaseManager._initialized_paths:
+                self._initialize_database()
+                DatabaseManager._initialized_paths.add(self.db_path)
+                self.logger.info(f"Database initialized: {self.db_path}")
     
     def _initialize_database(self):
         """Initialise la base de données avec toutes les tables."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
                 # Table des exceptions de casse
@@ -79,14 +135,43 @@ class DatabaseManager:
                         status TEXT NOT NULL,
                         error_message TEXT,
                         files_processed INTEGER DEFAULT 0,
-                        rules_applied TEXT
+                        rules_applied TEXT,
+                        operation_type TEXT
                     )
                 """)
+                self._migrate_import_history(cursor)
                 
+                # Table d'historique détaillé des changements de champs
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS metadata_change_history (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        file_path TEXT NOT NULL,
+                        album_path TEXT,
+                        field_name TEXT NOT NULL,
+                        old_value TEXT,
+                        new_value TEXT,
+                        rule_applied TEXT,
+                        module TEXT,
+                        change_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+
                 # Index pour optimiser les requêtes
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_case_exceptions_word ON case_exceptions(word)")
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_app_config_key ON app_config(key)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_import_history_date ON import_history(import_date)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_history_album ON metadata_change_history(album_path)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_history_file ON metadata_change_history(file_path)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_change_history_date ON metadata_change_history(change_date)")
+                
+                # Index couvrant des requêtes par période (remplace l'index simple sur la date)
+                cursor.execute("DROP INDEX IF EXISTS idx_import_history_date")
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_import_history_date_covering
+                    ON import_history(import_date, status, operation_type, files_processed)
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_import_history_album ON import_history(album_path, id)")
+                
+                self._create_history_rollup(cursor)
                 
                 conn.commit()
                 self.logger.info("Database tables initialized successfully")
@@ -95,9 +180,115 @@ class DatabaseManager:
             self.logger.error(f"Failed to initialize database: {e}")
             raise
     
+    def _migrate_import_history(self, cursor: sqlite3.Cursor):
+        """Ajoute la colonne operation_type aux bases créées avant son introduction."""
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(import_history)")]
+        if 'operation_type' in columns:
+            return
+        
+        cursor.execute("ALTER TABLE import_history ADD COLUMN operation_type TEXT")
+        try:
+            cursor.execute("""
+                UPDATE import_history
+                SET operation_type = json_extract(rules_applied, '$.operation_type')
+                WHERE json_valid(rules_applied) AND json_type(rules_applied) = 'object'
+            """)
+        except sqlite3.OperationalError as e:
+            # SQLite sans JSON1 : les anciens enregistrements restent sans type
+            self.logger.warning(f"Could not backfill operation_type: {e}")
+        self.logger.info("import_history migrated: operation_type column added")
+    
+    def _create_history_rollup(self, cursor: sqlite3.Cursor):
+        """
+        Crée la table de cumuls de l'historique (jour × statut × opération).
+        
+        Des triggers la tiennent à jour à chaque insertion, modification ou
+        suppression dans import_history ; les statistiques ne parcourent donc jamais l'historique.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'import_history_rollup'")
+        exists = cursor.fetchone() is not None
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS import_history_rollup (
+                day TEXT NOT NULL,
+                status TEXT NOT NULL,
+                operation_type TEXT NOT NULL DEFAULT '',
+                record_count INTEGER NOT NULL DEFAULT 0,
+                files_processed INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, status, operation_type)
+            ) WITHOUT ROWID
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_import_history_rollup_insert
+            AFTER INSERT ON import_history
+            BEGIN
+                INSERT INTO import_history_rollup (day, status, operation_type, record_count, files_processed)
+                VALUES (DATE(NEW.import_date), NEW.status, COALESCE(NEW.operation_type, ''),
+                        1, COALESCE(NEW.files_processed, 0))
+                ON CONFLICT (day, status, operation_type) DO UPDATE SET
+                    record_count = record_count + 1,
+                    files_processed = files_processed + excluded.files_processed;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_import_history_rollup_delete
+            AFTER DELETE ON import_history
+            BEGIN
+                UPDATE import_history_rollup SET
+                    record_count = record_count - 1,
+                    files_processed = files_processed - COALESCE(OLD.files_processed, 0)
+                WHERE day = DATE(OLD.import_date) AND status = OLD.status
+                  AND operation_type = COALESCE(OLD.operation_type, '');
+                DELETE FROM import_history_rollup
+                WHERE day = DATE(OLD.import_date) AND status = OLD.status
+                  AND operation_type = COALESCE(OLD.operation_type, '') AND record_count <= 0;
+            END
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_import_history_rollup_update
+            AFTER UPDATE OF import_date, status, operation_type, files_processed ON import_history
+            BEGIN
+                UPDATE import_history_rollup SET
+                    record_count = record_count - 1,
+                    files_processed = files_processed - COALESCE(OLD.files_processed, 0)
+                WHERE day = DATE(OLD.import_date) AND status = OLD.status
+                  AND operation_type = COALESCE(OLD.operation_type, '');
+                DELETE FROM import_history_rollup
+                WHERE day = DATE(OLD.import_date) AND status = OLD.status
+                  AND operation_type = COALESCE(OLD.operation_type, '') AND record_count <= 0;
+                INSERT INTO import_history_rollup (day, status, operation_type, record_count, files_processed)
+                VALUES (DATE(NEW.import_date), NEW.status, COALESCE(NEW.operation_type, ''),
+                        1, COALESCE(NEW.files_processed, 0))
+                ON CONFLICT (day, status, operation_type) DO UPDATE SET
+                    record_count = record_count + 1,
+                    files_processed = files_processed + excluded.files_processed;
+            END
+        """)
+        
+        if not exists:
+            # Première création : cumuls calculés une fois sur l'historique existant
+            cursor.execute("""
+                INSERT INTO import_history_rollup (day, status, operation_type, record_count, files_processed)
+                SELECT DATE(import_date), status, COALESCE(operation_type, ''),
+                       COUNT(*), COALESCE(SUM(files_processed), 0)
+                FROM import_history
+                GROUP BY 1, 2, 3
+            """)
+    
     def get_connection(self) -> sqlite3.Connection:
-        """Retourne une connexion à la base de données."""
-        return sqlite3.connect(self.db_path)
+        """
+        Retourne la connexion du thread courant.
+        
+        À utiliser avec `with` : le bloc délimite une transaction
+        (commit ou rollback), la connexion reste ouverte pour les appels suivants.
+        """
+        return self._pool.get()
+    
+    def close(self):
+        """Ferme la connexion du thread courant (elle sera recréée au besoin)."""
+        self._pool.close()
     
     # === Gestion des exceptions de casse ===
     
@@ -346,11 +537,10 @@ class DatabaseManager:
             
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO import_history 
-                    (album_path, status, error_message, files_processed, rules_applied)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (album_path, status, error_message, files_processed, rules_json))
+                cursor.execute(
+                    self._INSERT_IMPORT_HISTORY,
+                    (album_path, status, error_message, files_processed, rules_json, None)
+                )
                 conn.commit()
                 
                 self.logger.info(f"Import record added: {album_path} - {status}")
@@ -381,27 +571,84 @@ class DatabaseManager:
                     LIMIT ?
                 """, (limit,))
                 
-                results = cursor.fetchall()
-                history = []
-                
-                for row in results:
-                    record = {
-                        'id': row[0],
-                        'album_path': row[1],
-                        'import_date': row[2],
-                        'status': row[3],
-                        'error_message': row[4],
-                        'files_processed': row[5],
-                        'rules_applied': json.loads(row[6]) if row[6] else []
-                    }
-                    history.append(record)
-                
-                return history
+                return [self._history_record(row) for row in cursor.fetchall()]
                 
         except Exception as e:
             self.logger.error(f"Failed to get import history: {e}")
             return []
     
+    @staticmethod
+    def _history_record(row: Tuple) -> Dict[str, Any]:
+        """Convertit une ligne import_history en dictionnaire."""
+        return {
+            'id': row[0],
+            'album_path': row[1],
+            'import_date': row[2],
+            'status': row[3],
+            'error_message': row[4],
+            'files_processed': row[5],
+            'rules_applied': json.loads(row[6]) if row[6] else []
+        }
+    
+    def get_import_history_page(self, page_size: int = 100, before_id: Optional[int] = None,
+                                status: Optional[str] = None, album_path: Optional[str] = None,
+                                operation_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Récupère une page de l'historique, du plus récent au plus ancien.
+        
+        Pagination par curseur : la page suivante s'obtient en repassant
+        `next_before_id`, sans OFFSET (coût constant quelle que soit la page).
+        
+        Args:
+            page_size: Nombre d'enregistrements par page
+            before_id: Curseur renvoyé par la page précédente (None : première page)
+            status: Filtre sur le statut (optionnel)
+            album_path: Filtre sur un album (optionnel)
+            operation_type: Filtre sur le type d'opération (optionnel)
+            
+        Returns:
+            {'records': [...], 'next_before_id': curseur ou None si dernière page}
+        """
+        conditions = []
+        params: List[Any] = []
+        if before_id is not None:
+            conditions.append("id < ?")
+            params.append(before_id)
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if album_path:
+            conditions.append("album_path = ?")
+            params.append(album_path)
+        if operation_type:
+            conditions.append("operation_type = ?")
+            params.append(operation_type)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(page_size + 1)
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(f"""
+                    SELECT id, album_path, import_date, status, error_message,
+                           files_processed, rules_applied
+                    FROM import_history
+                    {where}
+                    ORDER BY id DESC
+                    LIMIT ?
+                """, params)
+                rows = cursor.fetchall()
+                
+            records = [self._history_record(row) for row in rows[:page_size]]
+            has_more = len(rows) > page_size
+            return {
+                'records': records,
+                'next_before_id': records[-1]['id'] if has_more and records else None
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Failed to get import history page: {e}")
+            return {'records': [], 'next_before_id': None}
+    
     def save_import_history(self, album_path: str, operation_type: str, files_processed: int = 0, 
                            changes_made: int = 0, details: Optional[Dict[str, Any]] = None, 
                            status: str = "success", error_message: Optional[str] = None) -> bool:
@@ -421,40 +668,133 @@ class DatabaseManager:
             True si sauvegardé avec succès
         """
         try:
-            # Préparer les détails avec les informations d'opération
-            operation_details = {
-                "operation_type": operation_type,
-                "changes_made": changes_made
-            }
-            if details:
-                operation_details.update(details)
-            
+            row = self.build_import_history_row(
+                album_path, operation_type, files_processed,
+                changes_made, details, status, error_message
+            )
+
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO import_history 
-                    (album_path, status, error_message, files_processed, rules_applied)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    album_path,
-                    status,
-                    error_message,
-                    files_processed,
-                    json.dumps(operation_details)
-                ))
-                conn.commit()
-                
+                conn.execute(self._INSERT_IMPORT_HISTORY, row)
+
             self.logger.debug(f"Import history saved: {operation_type} for {album_path}")
             return True
-            
+
         except Exception as e:
             self.logger.error(f"Failed to save import history: {e}")
             return False
+
+    _INSERT_IMPORT_HISTORY = """
+        INSERT INTO import_history
+        (album_path, status, error_message, files_processed, rules_applied, operation_type)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+
+    _INSERT_CHANGE_HISTORY = """
+        INSERT INTO metadata_change_history
+        (file_path, album_path, field_name, old_value, new_value, rule_applied, module, change_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    @staticmethod
+    def build_import_history_row(album_path: str, operation_type: str, files_processed: int = 0,
+                                 changes_made: int = 0, details: Optional[Dict[str, Any]] = None,
+                                 status: str = "success", error_message: Optional[str] = None) -> Tuple:
+        """
+        Construit la ligne import_history d'une étape (détails sérialisés en JSON).
+
+        Returns:
+            Tuple (album_path, status, error_message, files_processed, rules_applied, operation_type)
+        """
+        operation_details = {
+            "operation_type": operation_type,
+            "changes_made": changes_made
+        }
+        if details:
+            operation_details.update(details)
+
+        return (album_path, status, error_message, files_processed,
+                json.dumps(operation_details), operation_type)
+
+    def save_history_batch(self, import_rows: List[Tuple], change_rows: List[Tuple]) -> bool:
+        """
+        Écrit un lot d'historique dans une seule transaction.
+
+        Args:
+            import_rows: Lignes import_history (voir build_import_history_row)
+            change_rows: Lignes metadata_change_history
+                         (file_path, album_path, field_name, old_value, new_value,
+                          rule_applied, module, change_date)
+
+        Returns:
+            True si le lot a été écrit
+        """
+        if not import_rows and not change_rows:
+            return True
+
+        try:
+            with self.get_connection() as conn:
+                if import_rows:
+                    conn.executemany(self._INSERT_IMPORT_HISTORY, import_rows)
+                if change_rows:
+                    conn.executemany(self._INSERT_CHANGE_HISTORY, change_rows)
+
+            self.logger.debug(f"History batch saved: {len(import_rows)} steps, {len(change_rows)} changes")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to save history batch: {e}")
+            return False
+
+    def get_change_history(self, album_path: Optional[str] = None, file_path: Optional[str] = None,
+                           limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Récupère l'historique détaillé des changements de champs.
+
+        Args:
+            album_path: Filtre sur un album (optionnel)
+            file_path: Filtre sur un fichier (optionnel)
+            limit: Nombre maximum d'enregistrements
+
+        Returns:
+            Liste des changements, du plus récent au plus ancien
+        """
+        conditions = []
+        params: List[Any] = []
+        if album_path:
+            conditions.append("album_path = ?")
+            params.append(album_path)
+        if file_path:
+            conditions.append("file_path = ?")
+            params.append(file_path)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(f"""
+                    SELECT file_path, album_path, field_name, old_value, new_value,
+                           rule_applied, module, change_date
+                    FROM metadata_change_history
+                    {where}
+                    ORDER BY id DESC
+                    LIMIT ?
+                """, params)
+
+                columns = ('file_path', 'album_path', 'field_name', 'old_value', 'new_value',
+                           'rule_applied', 'module', 'change_date')
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        except Exception as e:
+            self.logger.error(f"Failed to get change history: {e}")
+            return []
     
     def get_import_statistics(self) -> Dict[str, Any]:
         """
         Récupère des statistiques sur les imports.
         
+        Lit uniquement la table de cumuls import_history_rollup, dont la taille
+        dépend du nombre de jours et non du nombre d'enregistrements.
+        
         Returns:
             Dictionnaire des statistiques
         """
@@ -462,25 +802,36 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Statistiques générales
-                cursor.execute("SELECT COUNT(*) FROM import_history")
-                total_imports = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(*) FROM import_history WHERE status = 'success'")
-                successful_imports = cursor.fetchone()[0]
+                # Statistiques générales par statut
+                cursor.execute("""
+                    SELECT status, SUM(record_count), SUM(files_processed)
+                    FROM import_history_rollup
+                    GROUP BY status
+                """)
+                by_status = {}
+                total_files = 0
+                for status, count, files in cursor.fetchall():
+                    by_status[status] = count
+                    total_files += files or 0
                 
-                cursor.execute("SELECT COUNT(*) FROM import_history WHERE status = 'error'")
-                failed_imports = cursor.fetchone()[0]
+                total_imports = sum(by_status.values())
+                successful_imports = by_status.get('success', 0)
+                failed_imports = by_status.get('error', 0)
                 
-                cursor.execute("SELECT SUM(files_processed) FROM import_history")
-                total_files = cursor.fetchone()[0] or 0
+                # Répartition par type d'opération
+                cursor.execute("""
+                    SELECT operation_type, SUM(record_count)
+                    FROM import_history_rollup
+                    GROUP BY operation_type
+                """)
+                by_operation = {operation or 'import': count for operation, count in cursor.fetchall()}
                 
                 # Statistiques par jour (7 derniers jours)
                 cursor.execute("""
-                    SELECT DATE(import_date) as day, COUNT(*) as count
-                    FROM import_history 
-                    WHERE import_date >= date('now', '-7 days')
-                    GROUP BY DATE(import_date)
+                    SELECT day, SUM(record_count)
+                    FROM import_history_rollup
+                    WHERE day >= date('now', '-7 days')
+                    GROUP BY day
                     ORDER BY day
                 """)
                 daily_stats = {day: count for day, count in cursor.fetchall()}
@@ -491,7 +842,9 @@ class DatabaseManager:
                     'failed_imports': failed_imports,
                     'total_files_processed': total_files,
                     'success_rate': successful_imports / total_imports if total_imports > 0 else 0,
-                    'daily_stats_7days': daily_stats
+                    'daily_stats_7days': daily_stats,
+                    'by_status': by_status,
+                    'by_operation': by_operation
                 }
                 
         except Exception as e:
@@ -502,7 +855,7 @@ class DatabaseManager:
     
     def cleanup_old_records(self, days: int = 30) -> int:
         """
-        Nettoie les anciens enregistrements d'import.
+        Nettoie les anciens enregistrements d'import et de changements de champs.
         
         Args:
             days: Nombre de jours à conserver
@@ -511,15 +864,20 @@ class DatabaseManager:
             Nombre d'enregistrements supprimés
         """
         try:
+            cutoff = f"-{int(days)} days"
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    DELETE FROM import_history 
-                    WHERE import_date < date('now', '-{} days')
-                """.format(days))
-                
+                cursor = conn.execute("""
+                    DELETE FROM import_history
+                    WHERE import_date < date('now', ?)
+                """, (cutoff,))
                 deleted_count = cursor.rowcount
-                conn.commit()
+                
+                # change_date est une date ISO locale : comparaison sur la date seule
+                cursor = conn.execute("""
+                    DELETE FROM metadata_change_history
+                    WHERE change_date < date('now', 'localtime', ?)
+                """, (cutoff,))
+                deleted_count += cursor.rowcount
                 
                 self.logger.info(f"Cleaned up {deleted_count} old import records")
                 return deleted_count
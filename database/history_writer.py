@@ -0,0 +1,195 @@
+"""
+Écriture différée de l'historique des imports
+Collecte les bilans d'étapes et les changements de champs, puis les écrit par lots
+depuis un thread dédié pour ne pas ralentir le pipeline de traitement.
+"""
+
+import atexit
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from support.logger import get_logger
+from support.service_container import get_services
+from database.db_manager import DatabaseManager
+
+
+class HistoryWriter:
+    """
+    Tampon d'historique avec écrivain en arrière-plan.
+
+    Les enregistrements sont mis en file sans accès disque. Le thread
+    d'écriture les regroupe et les insère avec executemany dans une seule
+    transaction, soit tous les `batch_size` enregistrements, soit sur
+    demande explicite (flush, typiquement en fin d'album), soit après
+    `flush_interval` secondes d'inactivité. Après close(), un nouvel
+    enregistrement redémarre un écrivain avec sa propre file.
+    """
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None,
+                 batch_size: int = 500, flush_interval: float = 2.0):
+        """
+        Args:
+            db_manager: Gestionnaire de base (par défaut: base principale du conteneur de services)
+            batch_size: Nombre d'enregistrements déclenchant une écriture
+            flush_interval: Délai d'inactivité avant écriture des enregistrements en attente
+        """
+        self.logger = get_logger()
+        # Base principale partagée, ouverte à la première écriture
+        self.db_manager = db_manager or get_services().lazy('db')
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # File et thread de l'écrivain courant, remplacés ensemble sous _thread_lock
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    # === API publique (appelée depuis les threads de traitement) ===
+
+    def record_step(self, album_path: str, operation_type: str, files_processed: int = 0,
+                    changes_made: int = 0, details: Optional[Dict[str, Any]] = None,
+                    status: str = "success", error_message: Optional[str] = None) -> None:
+        """
+        Enregistre le bilan d'une étape du pipeline pour un album.
+
+        Mêmes paramètres que DatabaseManager.save_import_history.
+        """
+        row = DatabaseManager.build_import_history_row(
+            album_path, operation_type, files_processed, changes_made,
+            details, status, error_message
+        )
+        self._put(('step', row))
+
+    def record_change(self, file_path: str, field_name: str, old_value: Any, new_value: Any,
+                      rule_applied: str = "", module: str = "", album_path: Optional[str] = None,
+                      timestamp: Optional[str] = None) -> None:
+        """
+        Enregistre la modification d'un champ de métadonnées.
+
+        Args:
+            file_path: Fichier modifié
+            field_name: Champ modifié (ex: TIT2)
+            old_value: Valeur avant modification
+            new_value: Valeur après modification
+            rule_applied: Règle à l'origine du changement
+            module: Module ayant effectué le changement
+            album_path: Dossier de l'album (optionnel)
+            timestamp: Date ISO du changement (par défaut: maintenant)
+        """
+        row = (
+            file_path,
+            album_path,
+            field_name,
+            None if old_value is None else str(old_value),
+            None if new_value is None else str(new_value),
+            rule_applied,
+            module,
+            timestamp or datetime.now().isoformat()
+        )
+        self._put(('change', row))
+
+    def flush(self, wait: bool = False, timeout: float = 5.0) -> bool:
+        """
+        Demande l'écriture immédiate des enregistrements en attente.
+
+        Args:
+            wait: Si True, attend que l'écriture soit terminée
+            timeout: Attente maximale en secondes
+
+        Returns:
+            True si l'écriture est terminée (ou non attendue)
+        """
+        done = threading.Event()
+        with self._thread_lock:
+            if self._thread is None:
+                return True
+            self._queue.put(('flush', done))
+        if wait:
+            return done.wait(timeout)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Écrit les enregistrements restants et arrête le thread d'écriture."""
+        done = threading.Event()
+        with self._thread_lock:
+            if self._thread is None:
+                return
+            # Dernier élément de cette file : les enregistrements suivants
+            # démarrent un nouvel écrivain
+            self._queue.put(('stop', done))
+            self._thread = None
+        done.wait(timeout)
+
+    # === Thread d'écriture ===
+
+    def _put(self, item) -> None:
+        """Met un enregistrement en file, démarre l'écrivain au premier usage (ou après close)."""
+        with self._thread_lock:
+            if self._thread is None:
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._queue,), name="NonotagsHistoryWriter", daemon=True
+                )
+                self._thread.start()
+            self._queue.put(item)
+
+    def _run(self, work_queue: "queue.Queue") -> None:
+        """Boucle du thread d'écriture."""
+        step_rows: List[tuple] = []
+        change_rows: List[tuple] = []
+
+        while True:
+            try:
+                kind, payload = work_queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if step_rows or change_rows:
+                    self._write(step_rows, change_rows)
+                    step_rows, change_rows = [], []
+                continue
+
+            if kind == 'step':
+                step_rows.append(payload)
+            elif kind == 'change':
+                change_rows.append(payload)
+            elif kind in ('flush', 'stop'):
+                self._write(step_rows, change_rows)
+                step_rows, change_rows = [], []
+                payload.set()
+                if kind == 'stop':
+                    self.db_manager.close()
+                    return
+                continue
+
+            if len(step_rows) + len(change_rows) >= self.batch_size:
+                self._write(step_rows, change_rows)
+                step_rows, change_rows = [], []
+
+    def _write(self, step_rows: List[tuple], change_rows: List[tuple]) -> None:
+        """Écrit un lot dans une transaction unique."""
+        if not step_rows and not change_rows:
+            return
+        try:
+            self.db_manager.save_history_batch(step_rows, change_rows)
+        except Exception as e:
+            self.logger.error(f"Failed to write history batch ({len(step_rows)} steps, "
+                              f"{len(change_rows)} changes): {e}")
+
+
+# Instance globale partagée par les modules core
+_history_writer_instance = None
+_history_writer_lock = threading.Lock()
+
+def get_history_writer() -> HistoryWriter:
+    """Retourne l'écrivain d'historique global."""
+    global _history_writer_instance
+
+    if _history_writer_instance is None:
+        with _history_writer_lock:
+            if _history_writer_instance is None:
+                _history_writer_instance = HistoryWriter()
+                # Écrire l'historique en attente à la fermeture de l'application
+                atexit.register(_history_writer_instance.close)
+
+    return _history_writer_instance
@@ -0,0 +1,502 @@
+"""
+Catalogue persistant de la bibliothèque musicale
+Conserve les albums et pistes scannés pour réafficher la bibliothèque au démarrage
+sans rescanner, puis ne réanalyser que les dossiers modifiés.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from support.logger import get_logger
+from support.config_manager import ConfigManager
+from support.service_container import get_services
+from database.db_manager import ConnectionPool
+
+
+# Extensions des fichiers audio retenus par le scanner (et dans l'empreinte d'un dossier)
+MUSIC_EXTENSIONS = ('.mp3', '.flac', '.ogg', '.m4a', '.wav')
+
+
+def folder_signature(folder_path: str, music_files: Iterable[str]) -> Optional[str]:
+    """
+    Empreinte d'un dossier d'album : noms, tailles et dates des fichiers audio.
+
+    Change dès qu'un fichier est ajouté, supprimé, renommé ou réécrit
+    (modification de tags comprise), sans lire le contenu des fichiers.
+
+    Returns:
+        Empreinte hexadécimale ou None si le dossier est illisible
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        for name in sorted(music_files):
+            stat = os.stat(os.path.join(folder_path, name))
+            digest.update(f"{name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode('utf-8', 'surrogateescape'))
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class LibraryCatalog:
+    """Catalogue SQLite des albums et pistes de la bibliothèque."""
+
+    # Colonnes d'album restituées dans le format du scanner
+    _ALBUM_FIELDS = ('title', 'artist', 'album', 'year', 'genre', 'emoji', 'color')
+
+    # Faits dérivés de l'album (plage d'années, durée, pochette), calculés une fois
+    _FACT_FIELDS = ('year_range', 'total_duration', 'has_cover')
+    
+    # Colonnes de piste modifiables par les écritures de tags
+    _TRACK_FIELDS = ('title', 'artist', 'album', 'year', 'genre', 'track_number')
+
+    # Ligne d'index plein texte d'un album : valeurs de l'album et de ses pistes
+    _SEARCH_ROWS = """
+        SELECT a.id,
+               COALESCE(a.artist, '') || ' ' || COALESCE(group_concat(DISTINCT t.artist), ''),
+               COALESCE(a.album, '') || ' ' || COALESCE(a.title, '') || ' '
+                   || COALESCE(group_concat(DISTINCT t.album), ''),
+               COALESCE(group_concat(t.title, ' '), ''),
+               COALESCE(a.genre, '') || ' ' || COALESCE(group_concat(DISTINCT t.genre), '')
+        FROM albums a LEFT JOIN tracks t ON t.album_id = a.id
+    """
+
+    def __init__(self, db_path: Optional[str] = None, config: Optional[ConfigManager] = None):
+        """
+        Args:
+            db_path: Chemin de la base du catalogue (par défaut: library.db du dossier de config)
+            config: Gestionnaire de configuration (optionnel)
+        """
+        self.logger = get_logger()
+
+        if db_path is None:
+            config_dir = Path(config.config_dir) if config else Path.home() / ".config" / "nonotags"
+            config_dir.mkdir(parents=True, exist_ok=True)
+            db_path = config_dir / "library.db"
+
+        self.db_path = str(db_path)
+        self._pool = ConnectionPool(self.db_path)
+        self.fts_enabled = False
+        self._initialize_database()
+
+    def _initialize_database(self):
+        """Crée les tables et index du catalogue."""
+        with self._pool.get() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS library_roots (
+                    root_path TEXT PRIMARY KEY,
+                    last_scan TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS albums (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    folder_path TEXT NOT NULL UNIQUE,
+                    root_path TEXT,
+                    title TEXT,
+                    artist TEXT,
+                    album TEXT,
+                    year TEXT,
+                    genre TEXT,
+                    track_count INTEGER DEFAULT 0,
+                    cover_path TEXT,
+                    emoji TEXT,
+                    color TEXT,
+                    signature TEXT,
+                    scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    year_range TEXT,
+                    total_duration REAL,
+                    has_cover INTEGER
+                )
+            """)
+            self._migrate_albums(conn)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tracks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    album_id INTEGER NOT NULL,
+                    file_path TEXT NOT NULL UNIQUE,
+                    file_name TEXT NOT NULL,
+                    title TEXT,
+                    artist TEXT,
+                    album TEXT,
+                    year TEXT,
+                    genre TEXT,
+                    track_number TEXT
+                )
+            """)
+
+            for table, column in (('albums', 'artist'), ('albums', 'album'), ('albums', 'year'),
+                                  ('albums', 'genre'), ('albums', 'cover_path'), ('albums', 'root_path'),
+                                  ('tracks', 'album_id'), ('tracks', 'artist'), ('tracks', 'album'),
+                                  ('tracks', 'year'), ('tracks', 'genre')):
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column})")
+
+            self._create_search_index(conn)
+
+    def _migrate_albums(self, conn):
+        """Ajoute les colonnes de faits dérivés aux catalogues créés avant leur introduction."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(albums)")}
+        for column, column_type in (('year_range', 'TEXT'), ('total_duration', 'REAL'), ('has_cover', 'INTEGER')):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE albums ADD COLUMN {column} {column_type}")
+
+    def _create_search_index(self, conn):
+        """
+        Crée l'index plein texte FTS5 (artiste, album, titres, genre).
+
+        Une ligne par album (rowid = id de l'album), sans accents ni casse,
+        avec index de préfixes pour la recherche au fil de la frappe.
+        Sans FTS5 dans SQLite, la recherche se replie sur LIKE.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'album_search'"
+        ).fetchone() is not None
+        try:
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS album_search USING fts5(
+                    artist, album, title, genre,
+                    tokenize = 'unicode61 remove_diacritics 2',
+                    prefix = '1 2 3'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"Index plein texte indisponible (FTS5) : {e}")
+            return
+
+        self.fts_enabled = True
+        if not exists:
+            conn.execute(f"INSERT INTO album_search (rowid, artist, album, title, genre) {self._SEARCH_ROWS} GROUP BY a.id")
+
+    def _index_albums(self, conn, album_ids: List[int]):
+        """Recalcule les lignes d'index plein texte des albums donnés."""
+        if not self.fts_enabled or not album_ids:
+            return
+        for start in range(0, len(album_ids), 500):
+            chunk = album_ids[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            conn.execute(f"DELETE FROM album_search WHERE rowid IN ({placeholders})", chunk)
+            conn.execute(f"""
+                INSERT INTO album_search (rowid, artist, album, title, genre)
+                {self._SEARCH_ROWS} WHERE a.id IN ({placeholders}) GROUP BY a.id
+            """, chunk)
+
+    def _connection(self):
+        """Connexion du thread courant (à utiliser avec `with` pour une transaction)."""
+        return self._pool.get()
+
+    # === Lecture ===
+
+    def get_roots(self) -> List[str]:
+        """Dossiers racines importés, du plus récent au plus ancien."""
+        cursor = self._connection().execute(
+            "SELECT root_path FROM library_roots ORDER BY last_scan DESC"
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def has_albums(self) -> bool:
+        """Indique si le catalogue contient au moins un album."""
+        return self._connection().execute("SELECT 1 FROM albums LIMIT 1").fetchone() is not None
+
+    def load_albums(self, root_path: Optional[str] = None) -> List[Dict]:
+        """
+        Charge les albums du catalogue au format du scanner (deux requêtes au total).
+
+        Args:
+            root_path: Limite aux albums d'un dossier racine (optionnel)
+
+        Returns:
+            Liste de dictionnaires d'album (folder_path, artist, album, year, files...)
+        """
+        conn = self._connection()
+        where, params = ("WHERE root_path = ?", (root_path,)) if root_path else ("", ())
+
+        albums = {}
+        for row in conn.execute(f"""
+            SELECT id, folder_path, title, artist, album, year, genre, emoji, color,
+                   track_count, cover_path, signature, year_range, total_duration, has_cover
+            FROM albums {where}
+        """, params):
+            album = dict(zip(self._ALBUM_FIELDS, row[2:9]))
+            album.update({
+                'folder_path': row[1],
+                'tracks': row[9],
+                'cover_path': row[10],
+                'signature': row[11],
+                'files': []
+            })
+            # Faits absents (album jamais analysé) : calculés à l'affichage en arrière-plan
+            if row[12] is not None:
+                album.update({'year_range': row[12], 'total_duration': row[13],
+                              'has_cover': bool(row[14])})
+            albums[row[0]] = album
+
+        track_query = "SELECT album_id, file_name FROM tracks ORDER BY album_id, file_name"
+        if root_path:
+            track_query = """
+                SELECT t.album_id, t.file_name FROM tracks t JOIN albums a ON a.id = t.album_id
+                WHERE a.root_path = ? ORDER BY t.album_id, t.file_name
+            """
+        for album_id, file_name in conn.execute(track_query, params):
+            album = albums.get(album_id)
+            if album is not None:
+                album['files'].append(file_name)
+
+        return list(albums.values())
+
+    def get_signatures(self, root_path: str) -> Dict[str, Optional[str]]:
+        """Empreintes connues des dossiers d'une racine ({folder_path: signature})."""
+        cursor = self._connection().execute(
+            "SELECT folder_path, signature FROM albums WHERE root_path = ?", (root_path,)
+        )
+        return dict(cursor.fetchall())
+
+    def search(self, text: str, limit: int = 500) -> List[str]:
+        """
+        Recherche des albums par artiste, album, titre de piste ou genre.
+
+        Chaque mot saisi est un préfixe ("beat abb" trouve "The Beatles - Abbey Road"),
+        sans tenir compte des accents ni de la casse.
+
+        Args:
+            text: Texte saisi
+            limit: Nombre maximal de résultats
+
+        Returns:
+            Dossiers des albums trouvés, les plus pertinents en premier
+        """
+        words = re.findall(r'\w+', text or '')
+        if not words:
+            return []
+        conn = self._connection()
+
+        if self.fts_enabled:
+            query = ' '.join(f'"{word}"*' for word in words)
+            cursor = conn.execute("""
+                SELECT a.folder_path FROM album_search s JOIN albums a ON a.id = s.rowid
+                WHERE album_search MATCH ? ORDER BY s.rank LIMIT ?
+            """, (query, limit))
+            return [row[0] for row in cursor.fetchall()]
+
+        conditions, params = [], []
+        for word in words:
+            conditions.append("""(a.artist LIKE ? OR a.album LIKE ? OR a.genre LIKE ?
+                OR EXISTS (SELECT 1 FROM tracks t WHERE t.album_id = a.id AND t.title LIKE ?))""")
+            params.extend([f'%{word}%'] * 4)
+        cursor = conn.execute(
+            f"SELECT a.folder_path FROM albums a WHERE {' AND '.join(conditions)} LIMIT ?",
+            [*params, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    # === Écriture ===
+
+    def save_albums(self, albums: List[Dict], root_path: Optional[str] = None):
+        """
+        Enregistre ou met à jour des albums et leurs pistes (une transaction).
+
+        Args:
+            albums: Albums au format du scanner ; les clés optionnelles
+                    'track_metadata' (pistes détaillées), 'signature' et
+                    'cover_path' sont utilisées si présentes
+            root_path: Dossier racine d'import
+        """
+        conn = self._connection()
+        album_ids = []
+        with conn:
+            if root_path:
+                conn.execute("""
+                    INSERT INTO library_roots (root_path) VALUES (?)
+                    ON CONFLICT (root_path) DO UPDATE SET last_scan = CURRENT_TIMESTAMP
+                """, (root_path,))
+
+            for album in albums:
+                folder_path = album.get('folder_path') or album.get('path', '')
+                if not folder_path:
+                    continue
+                files = album.get('files') or []
+                signature = album.get('signature') or folder_signature(folder_path, files)
+
+                values = [album.get(field) for field in self._ALBUM_FIELDS]
+                conn.execute(f"""
+                    INSERT INTO albums (folder_path, root_path, {', '.join(self._ALBUM_FIELDS)},
+                                        track_count, cover_path, signature, {', '.join(self._FACT_FIELDS)},
+                                        scanned_at)
+                    VALUES (?, ?, {', '.join('?' * len(self._ALBUM_FIELDS))}, ?, ?, ?,
+                            {', '.join('?' * len(self._FACT_FIELDS))}, CURRENT_TIMESTAMP)
+                    ON CONFLICT (folder_path) DO UPDATE SET
+                        root_path = COALESCE(excluded.root_path, root_path),
+                        {', '.join(f'{field} = excluded.{field}' for field in self._ALBUM_FIELDS)},
+                        track_count = excluded.track_count,
+                        cover_path = excluded.cover_path,
+                        signature = excluded.signature,
+                        {', '.join(f'{field} = excluded.{field}' for field in self._FACT_FIELDS)},
+                        scanned_at = CURRENT_TIMESTAMP
+                """, [folder_path, root_path, *values,
+                      album.get('tracks', len(files)), album.get('cover_path'), signature,
+                      *self._fact_values(album)])
+                album_id = conn.execute(
+                    "SELECT id FROM albums WHERE folder_path = ?", (folder_path,)
+                ).fetchone()[0]
+                album_ids.append(album_id)
+
+                conn.execute("DELETE FROM tracks WHERE album_id = ?", (album_id,))
+                track_metadata = album.get('track_metadata') or [{'file_name': name} for name in files]
+                conn.executemany("""
+                    INSERT OR REPLACE INTO tracks
+                    (album_id, file_path, file_name, title, artist, album, year, genre, track_number)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (album_id, os.path.join(folder_path, track['file_name']), track['file_name'],
+                     track.get('title'), track.get('artist'), track.get('album'), track.get('year'),
+                     track.get('genre'),
+                     None if track.get('track_number') is None else str(track.get('track_number')))
+                    for track in track_metadata if track.get('file_name')
+                ])
+
+            self._index_albums(conn, album_ids)
+
+    def _fact_values(self, album: Dict) -> List:
+        """Valeurs des faits dérivés d'un album (toutes None si jamais calculés)."""
+        if 'year_range' not in album:
+            return [None] * len(self._FACT_FIELDS)
+        return [album.get('year_range') or '', album.get('total_duration'),
+                None if album.get('has_cover') is None else int(bool(album.get('has_cover')))]
+
+    def update_album_facts(self, folder_path: str, facts: Dict):
+        """
+        Enregistre les faits dérivés recalculés d'un album.
+
+        Args:
+            folder_path: Dossier de l'album
+            facts: year_range, tracks, total_duration, has_cover, cover_path
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute(f"""
+                UPDATE albums SET {', '.join(f'{field} = ?' for field in self._FACT_FIELDS)},
+                                  track_count = COALESCE(?, track_count), cover_path = ?
+                WHERE folder_path = ?
+            """, [*self._fact_values(facts), facts.get('tracks'), facts.get('cover_path'), folder_path])
+
+    def update_album_tags(self, folder_path: str, fields: Dict[str, Optional[str]]):
+        """
+        Reporte une modification de tags appliquée à tout un album.
+
+        Args:
+            folder_path: Dossier de l'album
+            fields: Valeurs écrites (album, artist, year, genre) ; les valeurs vides sont ignorées
+        """
+        fields = {key: value for key, value in fields.items()
+                  if key in ('album', 'artist', 'year', 'genre') and value}
+        if not fields:
+            return
+        album_fields = dict(fields)
+        if 'album' in fields:
+            album_fields['title'] = fields['album']
+
+        conn = self._connection()
+        with conn:
+            row = conn.execute("SELECT id FROM albums WHERE folder_path = ?", (folder_path,)).fetchone()
+            if row is None:
+                return
+            conn.execute(
+                f"UPDATE albums SET {', '.join(f'{key} = ?' for key in album_fields)} WHERE id = ?",
+                [*album_fields.values(), row[0]]
+            )
+            conn.execute(
+                f"UPDATE tracks SET {', '.join(f'{key} = ?' for key in fields)} WHERE album_id = ?",
+                [*fields.values(), row[0]]
+            )
+            self._index_albums(conn, [row[0]])
+            self._refresh_signature(conn, row[0], folder_path)
+
+    def update_track_tags(self, file_path: str, fields: Dict[str, Optional[str]],
+                          new_file_path: Optional[str] = None):
+        """
+        Reporte une modification de tags (et un éventuel renommage) d'une piste.
+
+        Args:
+            file_path: Chemin actuel de la piste dans le catalogue
+            fields: Valeurs écrites (title, artist, album, year, genre, track_number)
+            new_file_path: Nouveau chemin si le fichier a été renommé
+        """
+        fields = {key: None if value is None else str(value)
+                  for key, value in fields.items() if key in self._TRACK_FIELDS}
+        if new_file_path and new_file_path != file_path:
+            fields['file_path'] = new_file_path
+            fields['file_name'] = os.path.basename(new_file_path)
+        if not fields:
+            return
+
+        conn = self._connection()
+        with conn:
+            row = conn.execute("SELECT album_id FROM tracks WHERE file_path = ?", (file_path,)).fetchone()
+            if row is None:
+                return
+            conn.execute(
+                f"UPDATE tracks SET {', '.join(f'{key} = ?' for key in fields)} WHERE file_path = ?",
+                [*fields.values(), file_path]
+            )
+            self._index_albums(conn, [row[0]])
+            self._refresh_signature(conn, row[0], os.path.dirname(new_file_path or file_path))
+
+    def _refresh_signature(self, conn, album_id: int, folder_path: str):
+        """
+        Réenregistre l'empreinte d'un dossier après une écriture de tags faite par l'application.
+
+        Sans cela, les dates de modification changées par l'écriture feraient
+        réanalyser l'album au prochain démarrage. L'empreinte n'est mise à
+        jour que si le dossier contient exactement les pistes du catalogue :
+        un fichier ajouté ou supprimé entre-temps reste détecté par le scan.
+        """
+        try:
+            music_files = [name for name in os.listdir(folder_path)
+                           if name.lower().endswith(MUSIC_EXTENSIONS)]
+        except OSError:
+            return
+        known = {name for (name,) in conn.execute(
+            "SELECT file_name FROM tracks WHERE album_id = ?", (album_id,)
+        )}
+        if set(music_files) != known:
+            return
+        signature = folder_signature(folder_path, music_files)
+        if signature is not None:
+            conn.execute("UPDATE albums SET signature = ? WHERE id = ?", (signature, album_id))
+
+    def remove_albums(self, folder_paths: Iterable[str]):
+        """Retire des albums et leurs pistes du catalogue."""
+        params = [(path,) for path in folder_paths]
+        conn = self._connection()
+        with conn:
+            if self.fts_enabled:
+                conn.executemany(
+                    "DELETE FROM album_search WHERE rowid IN (SELECT id FROM albums WHERE folder_path = ?)", params
+                )
+            conn.executemany(
+                "DELETE FROM tracks WHERE album_id IN (SELECT id FROM albums WHERE folder_path = ?)", params
+            )
+            conn.executemany("DELETE FROM albums WHERE folder_path = ?", params)
+
+    def close(self):
+        """Ferme la connexion du thread courant."""
+        self._pool.close()
+
+
+# Instance globale
+_library_catalog_instance = None
+_library_catalog_lock = threading.Lock()
+
+def get_library_catalog() -> LibraryCatalog:
+    """Retourne le catalogue de bibliothèque global."""
+    global _library_catalog_instance
+
+    if _library_catalog_instance is None:
+        with _library_catalog_lock:
+            if _library_catalog_instance is None:
+                _library_catalog_instance = LibraryCatalog(config=get_services().config)
+
+    return _library_catalog_instance
@@ -10,9 +10,7 @@ import os
 # Ajout du répertoire du projet au PYTHONPATH
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from support.logger import AppLogger
-from support.config_manager import ConfigManager
-from support.state_manager import StateManager
+from support.logger import get_logger
 from ui.views.main_window import NonotagsApp
 
 # Configuration GTK3 avec CSS moderne
@@ -72,10 +70,8 @@ def main():
     # Configuration GTK3
     setup_gtk3_css()
     
-    # Initialisation des modules de support
-    logger = AppLogger()
-    config = ConfigManager()
-    state = StateManager()
+    # Modules de support : instances partagées du conteneur, créées à la demande
+    logger = get_logger()
     
     logger.info("Démarrage de l'application Nonotags")
     
@@ -0,0 +1,259 @@
+"""
+Miniatures des pochettes locales pour les cartes d'album
+Décodage sur threads de travail, cache mémoire LRU et cache disque persistant borné
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import gi
+gi.require_version('GdkPixbuf', '2.0')
+from gi.repository import GLib, GdkPixbuf
+
+from support.cache import gtk_thread_cache
+from support.logger import AppLogger
+
+
+class AlbumCoverThumbnails:
+    """
+    Fournit les pochettes d'album redimensionnées sans bloquer le thread GTK
+
+    Une miniature est identifiée par (chemin de la pochette, mtime, taille du
+    fichier, taille d'affichage) : remplacer cover.jpg invalide naturellement
+    les entrées existantes. Le décodage JPEG/PNG se fait sur le pool ; une
+    miniature déjà calculée est relue depuis le cache disque (PNG de quelques
+    dizaines de Ko) au lieu de décoder l'image d'origine. Au-delà de sa taille
+    maximale, le cache disque est élagué des miniatures les moins récemment lues.
+    Plusieurs cartes demandant la même pochette partagent un seul décodage.
+    """
+
+    # Élagage du cache disque jusqu'à cette fraction de sa taille maximale
+    DISK_PRUNE_RATIO = 0.8
+
+    def __init__(self, max_workers: int = 2, cache_size: int = 256,
+                 cache_dir: Optional[str] = None, disk_cache_max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_workers: Nombre de décodages simultanés
+            cache_size: Nombre de miniatures conservées en mémoire
+            cache_dir: Dossier du cache disque (par défaut ~/.cache/nonotags/thumbnails)
+            disk_cache_max_bytes: Taille maximale du cache disque
+        """
+        self.logger = AppLogger()
+        self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / ".cache" / "nonotags" / "thumbnails"
+        self.disk_cache_max_bytes = disk_cache_max_bytes
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="NonotagsCover"
+        )
+        self.cache = gtk_thread_cache(cache_size)
+
+        self._tickets = count(1)
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple, Tuple[object, Dict[int, Callable]]] = {}
+        self._ticket_keys: Dict[int, Tuple] = {}
+
+        self._disk_lock = threading.Lock()
+        self._disk_usage: Optional[int] = None  # Octets du cache disque, mesurés au premier enregistrement
+
+    # === Clés ===
+
+    @staticmethod
+    def cache_key(cover_path: str, size: int) -> Optional[Tuple]:
+        """
+        Clé (chemin, mtime, taille du fichier, taille d'affichage), None si fichier absent
+
+        Calculée une fois par affichage et passée à get_cached() puis load().
+        """
+        try:
+            stat = os.stat(cover_path)
+        except OSError:
+            return None
+        return (cover_path, stat.st_mtime_ns, stat.st_size, size)
+
+    def _disk_path(self, key: Tuple) -> Path:
+        """Fichier du cache disque correspondant à une clé"""
+        digest = hashlib.sha1("\0".join(str(part) for part in key).encode('utf-8', 'surrogateescape'))
+        name = digest.hexdigest()
+        return self.cache_dir / name[:2] / f"{name}.png"
+
+    # === API (thread GTK) ===
+
+    def get_cached(self, key: Optional[Tuple]) -> Optional[GdkPixbuf.Pixbuf]:
+        """Miniature déjà en mémoire, sans aucun décodage (None sinon)"""
+        return self.cache.get(key) if key else None
+
+    def load(self, key: Optional[Tuple],
+             callback: Callable[[Optional[GdkPixbuf.Pixbuf]], None]) -> Optional[int]:
+        """
+        Demande une miniature
+
+        Args:
+            key: Clé de la pochette (cache_key() : chemin et taille d'affichage)
+            callback: Appelé sur le thread GTK avec le pixbuf (ou None si échec)
+
+        Returns:
+            Ticket utilisable avec cancel(), None si le callback a déjà été appelé
+        """
+        if key is None:
+            callback(None)
+            return None
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            callback(cached)
+            return None
+
+        ticket = next(self._tickets)
+        with self._lock:
+            self._ticket_keys[ticket] = key
+            if key in self._inflight:
+                self._inflight[key][1][ticket] = callback
+                return ticket
+
+            future = self.executor.submit(self._produce, key)
+            self._inflight[key] = (future, {ticket: callback})
+
+        future.add_done_callback(lambda f: self._on_task_done(f, key))
+        return ticket
+
+    def cancel(self, ticket: Optional[int]):
+        """Abandonne une demande (carte recyclée pour un autre album avant la livraison)"""
+        if ticket is None:
+            return
+        with self._lock:
+            key = self._ticket_keys.pop(ticket, None)
+            entry = self._inflight.get(key)
+            if entry is None:
+                return
+            future, callbacks = entry
+            callbacks.pop(ticket, None)
+            # Plus personne n'attend cette pochette : inutile de la décoder
+            if not callbacks and future.cancel():
+                del self._inflight[key]
+
+    # === Production (threads de travail) ===
+
+    def _produce(self, key: Tuple) -> GdkPixbuf.Pixbuf:
+        """Lit la miniature du cache disque, sinon décode l'original et l'enregistre"""
+        cover_path, _, _, size = key
+        disk_path = self._disk_path(key)
+
+        if disk_path.exists():
+            try:
+                pixbuf = GdkPixbuf.Pixbuf.new_from_file(str(disk_path))
+            except GLib.Error:
+                pass  # Miniature corrompue ou élaguée entre-temps : régénérée ci-dessous
+            else:
+                try:
+                    os.utime(disk_path)  # Date d'utilisation : ordre LRU de l'élagage
+                except OSError:
+                    pass
+                return pixbuf
+
+        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(cover_path, size, size, True)
+
+        try:
+            disk_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = disk_path.with_suffix(f".{threading.get_ident()}.tmp")
+            pixbuf.savev(str(temp_path), "png", [], [])
+            os.replace(temp_path, disk_path)
+            self._record_disk_write(disk_path.stat().st_size)
+        except (OSError, GLib.Error) as e:
+            self.logger.debug(f"Cache disque des miniatures indisponible: {e}")
+
+        return pixbuf
+
+    def _record_disk_write(self, size: int):
+        """Comptabilise une miniature enregistrée et élague le cache disque au-delà de sa limite"""
+        with self._disk_lock:
+            if self._disk_usage is None:
+                self._disk_usage = sum(entry[1] for entry in self._disk_entries())
+            else:
+                self._disk_usage += size
+            if self._disk_usage > self.disk_cache_max_bytes:
+                self._prune_disk_cache()
+
+    def _disk_entries(self):
+        """(chemin, taille, dernière utilisation) des miniatures du cache disque"""
+        entries = []
+        for thumbnail in self.cache_dir.glob("*/*.png"):
+            try:
+                stat = thumbnail.stat()
+            except OSError:
+                continue
+            entries.append((thumbnail, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _prune_disk_cache(self):
+        """Supprime les miniatures les moins récemment utilisées (appelé sous _disk_lock)"""
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        usage = sum(entry[1] for entry in entries)
+        target = self.disk_cache_max_bytes * self.DISK_PRUNE_RATIO
+        removed = 0
+        for thumbnail, size, _ in entries:
+            if usage <= target:
+                break
+            try:
+                thumbnail.unlink()
+            except OSError:
+                continue
+            usage -= size
+            removed += 1
+        self._disk_usage = usage
+        self.logger.debug(f"Cache disque des miniatures élagué: {removed} fichiers supprimés")
+
+    def _on_task_done(self, future, key: Tuple):
+        """Relaie le résultat vers le thread GTK"""
+        if future.cancelled():
+            return
+
+        error = future.exception()
+        if error:
+            self.logger.debug(f"Erreur décodage pochette {key[0]}: {error}")
+        GLib.idle_add(self._deliver, key, None if error else future.result())
+
+    def _deliver(self, key: Tuple, pixbuf):
+        """Met en cache et transmet la miniature aux demandeurs encore intéressés (thread GTK)"""
+        with self._lock:
+            _, callbacks = self._inflight.pop(key, (None, {}))
+            for ticket in callbacks:
+                self._ticket_keys.pop(ticket, None)
+
+        if pixbuf is not None:
+            self.cache.put(key, pixbuf)
+
+        for callback in callbacks.values():
+            try:
+                callback(pixbuf)
+            except Exception as e:
+                print(f"❌ Erreur affichage pochette: {e}")
+        return False
+
+    # === Maintenance ===
+
+    def clear_cache(self, disk: bool = False):
+        """Vide le cache mémoire (et le cache disque si demandé)"""
+        self.cache.clear()
+        if disk and self.cache_dir.exists():
+            with self._disk_lock:
+                for thumbnail in self.cache_dir.glob("*/*.png"):
+                    try:
+                        thumbnail.unlink()
+                    except OSError:
+                        pass
+                self._disk_usage = None
+
+    def shutdown(self):
+        """Arrête le pool de décodage"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Instance globale partagée par toutes les cartes
+album_cover_thumbnails = AlbumCoverThumbnails()
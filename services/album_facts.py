@@ -0,0 +1,273 @@
+"""
+Faits dérivés par album : plage d'années, nombre de pistes, durée totale, pochette
+Calculés une fois (par le scanner ou un thread de travail) et conservés avec
+l'album dans le catalogue, pour que l'affichage d'une carte ne lise aucun tag
+"""
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    from gi.repository import GLib
+except ImportError:
+    GLib = None  # Fonctions de calcul utilisables sans interface (scanner, tests)
+
+from database.library_catalog import get_library_catalog
+
+
+# Noms de pochette reconnus, par ordre de priorité
+COVER_FILE_NAMES = [
+    "cover.jpg", "cover.jpeg", "cover.png",
+    "folder.jpg", "folder.jpeg", "folder.png",
+    "front.jpg", "front.jpeg", "front.png",
+    "album.jpg", "album.jpeg", "album.png"
+]
+
+AUDIO_EXTENSIONS = ('.mp3', '.flac', '.m4a', '.mp4', '.ogg', '.wav')
+
+# Clés ajoutées au dictionnaire d'album
+FACT_KEYS = ('year_range', 'tracks', 'total_duration', 'has_cover', 'cover_path')
+
+
+def format_year_range(years: Iterable) -> str:
+    """
+    Formate les années d'un album : "1999", ou "1995-04" pour une compilation.
+
+    Args:
+        years: Valeurs d'année ou de date (seules les années 1900-2100 sont retenues)
+    """
+    valid = set()
+    for value in years:
+        for year in re.findall(r'\b\d{4}\b', str(value or '')):
+            if 1900 <= int(year) <= 2100:
+                valid.add(int(year))
+
+    if not valid:
+        return ""
+    first, last = min(valid), max(valid)
+    return str(first) if first == last else f"{first}-{str(last)[-2:]}"
+
+
+def find_cover_file(folder_path: str, file_names: Optional[Iterable[str]] = None) -> Optional[str]:
+    """
+    Cherche la pochette d'un dossier d'album.
+
+    Args:
+        folder_path: Dossier de l'album
+        file_names: Contenu du dossier déjà listé (évite les appels à os.path.exists)
+    """
+    if file_names is not None:
+        present = set(file_names)
+        for cover_name in COVER_FILE_NAMES:
+            if cover_name in present:
+                return os.path.join(folder_path, cover_name)
+        return None
+
+    for cover_name in COVER_FILE_NAMES:
+        cover_path = os.path.join(folder_path, cover_name)
+        if os.path.exists(cover_path):
+            return cover_path
+    return None
+
+
+def album_facts_from_tracks(folder_path: str, tracks_info: List[Dict],
+                            file_names: Optional[Iterable[str]] = None) -> Dict:
+    """
+    Calcule les faits d'un album à partir des pistes déjà analysées (aucune lecture de tags).
+
+    Args:
+        folder_path: Dossier de l'album
+        tracks_info: Métadonnées des pistes ('year' et 'duration' utilisés)
+        file_names: Contenu du dossier, pour chercher la pochette sans accès disque
+    """
+    cover_path = find_cover_file(folder_path, file_names)
+    return {
+        'year_range': format_year_range(track.get('year') for track in tracks_info),
+        'tracks': len(tracks_info),
+        'total_duration': round(sum(track.get('duration') or 0 for track in tracks_info), 3),
+        'has_cover': cover_path is not None,
+        'cover_path': cover_path
+    }
+
+
+def _read_track(file_path: str) -> Dict:
+    """Une seule analyse mutagen par fichier : tags usuels et durée"""
+    try:
+        import mutagen  # Import différé : seuls les threads de calcul en ont besoin
+    except ImportError:
+        return {}
+    try:
+        audio = mutagen.File(file_path, easy=True)
+    except Exception:
+        return {}
+    if audio is None:
+        return {}
+
+    tags = audio.tags or {}
+    track = {'duration': getattr(audio.info, 'length', 0) or 0}
+    for field, key in (('artist', 'artist'), ('album', 'album'), ('genre', 'genre'), ('year', 'date')):
+        try:
+            values = tags.get(key)
+        except Exception:
+            values = None
+        if values:
+            track[field] = str(values[0])
+    return track
+
+
+def read_album(folder_path: str) -> Dict:
+    """
+    Relit un dossier d'album : faits dérivés et tags du premier fichier.
+
+    Returns:
+        Faits (FACT_KEYS) complétés par artist/album/genre/year du premier fichier audio
+    """
+    file_names = os.listdir(folder_path)
+    audio_files = sorted(name for name in file_names if name.lower().endswith(AUDIO_EXTENSIONS))
+    tracks_info = [_read_track(os.path.join(folder_path, name)) for name in audio_files]
+
+    result = album_facts_from_tracks(folder_path, tracks_info, file_names)
+    result['tracks'] = len(audio_files)
+    if tracks_info:
+        for field in ('artist', 'album', 'genre', 'year'):
+            if tracks_info[0].get(field):
+                result[field] = tracks_info[0][field]
+    return result
+
+
+class AlbumFactsService:
+    """
+    Calcule en arrière-plan les faits manquants ou invalidés des albums
+
+    Les résultats sont fusionnés dans le dictionnaire d'album sur le thread GTK
+    (le même dictionnaire est partagé par la grille et les cartes) et
+    enregistrés dans le catalogue. Un calcul par album à la fois : les demandes
+    concurrentes attendent le même résultat.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        """
+        Args:
+            max_workers: Nombre de dossiers analysés simultanément
+        """
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="NonotagsAlbumFacts"
+        )
+        self._lock = threading.Lock()
+        self._pending: Dict[tuple, List[Callable]] = {}  # (dossier, avec tags) -> callbacks
+        self._stale: Dict[str, int] = {}  # dossier -> nombre d'invalidations
+        self._generation = 0  # incrémenté par une invalidation globale
+
+    @staticmethod
+    def _album_path(album_data: Dict) -> str:
+        return album_data.get('folder_path') or album_data.get('path', '')
+
+    def has_facts(self, album_data: Dict) -> bool:
+        """Indique si les faits de l'album sont connus et à jour"""
+        with self._lock:
+            return ('year_range' in album_data
+                    and album_data.get('facts_generation', 0) >= self._generation
+                    and self._album_path(album_data) not in self._stale)
+
+    def ensure(self, album_data: Dict, callback: Optional[Callable[[Dict], None]] = None) -> bool:
+        """
+        Calcule les faits de l'album s'ils manquent ou ont été invalidés.
+
+        Returns:
+            True si les faits sont déjà disponibles (callback non appelé)
+        """
+        if self.has_facts(album_data):
+            return True
+        self._submit(album_data, callback, include_tags=False)
+        return False
+
+    def refresh(self, album_data: Dict, callback: Optional[Callable[[Dict], None]] = None):
+        """Relit l'album (faits et tags du premier fichier) après une modification"""
+        self._submit(album_data, callback, include_tags=True)
+
+    def invalidate(self, album_paths: Optional[List[str]] = None):
+        """
+        Marque des albums comme modifiés (événement de métadonnées).
+
+        Args:
+            album_paths: Dossiers concernés, None pour tous les albums
+        """
+        with self._lock:
+            if album_paths is None:
+                self._generation += 1
+            else:
+                for album_path in album_paths:
+                    self._stale[album_path] = self._stale.get(album_path, 0) + 1
+
+    def _submit(self, album_data: Dict, callback, include_tags: bool):
+        album_path = self._album_path(album_data)
+        if not album_path:
+            return
+
+        key = (album_path, include_tags)
+        with self._lock:
+            if key in self._pending:
+                if callback:
+                    self._pending[key].append(callback)
+                return
+            self._pending[key] = [callback] if callback else []
+            generation = self._generation
+            stale_mark = self._stale.get(album_path)
+
+        self.executor.submit(self._compute, album_data, album_path, include_tags, generation, stale_mark)
+
+    def _compute(self, album_data: Dict, album_path: str, include_tags: bool, generation: int,
+                 stale_mark: Optional[int]):
+        """Analyse le dossier et enregistre les faits (thread de travail)"""
+        try:
+            result = read_album(album_path) if os.path.isdir(album_path) else None
+        except Exception as e:
+            print(f"⚠️ Erreur analyse album {album_path}: {e}")
+            result = None
+
+        if result is not None:
+            try:
+                get_library_catalog().update_album_facts(
+                    album_path, {key: result[key] for key in FACT_KEYS}
+                )
+            except Exception as e:
+                print(f"⚠️ Faits d'album non enregistrés pour {album_path}: {e}")
+
+        args = (album_data, album_path, result, include_tags, generation, stale_mark)
+        if GLib is None:
+            self._deliver(*args)
+        else:
+            GLib.idle_add(self._deliver, *args)
+
+    def _deliver(self, album_data: Dict, album_path: str, result: Optional[Dict],
+                 include_tags: bool, generation: int, stale_mark: Optional[int]):
+        """Fusionne les faits dans l'album et prévient les demandeurs (thread GTK)"""
+        with self._lock:
+            callbacks = self._pending.pop((album_path, include_tags), [])
+            # Une invalidation arrivée pendant le calcul reste en vigueur
+            if stale_mark is not None and self._stale.get(album_path) == stale_mark:
+                del self._stale[album_path]
+
+        # Dossier illisible : faits vides plutôt qu'un nouvel essai à chaque affichage
+        album_data.setdefault('year_range', '')
+        album_data['facts_generation'] = generation
+        if result is not None:
+            album_data.update({key: result[key] for key in FACT_KEYS})
+            if include_tags:
+                album_data.update({key: result[key] for key in ('artist', 'album', 'genre', 'year')
+                                   if key in result})
+
+        for callback in callbacks:
+            try:
+                callback(album_data)
+            except Exception as e:
+                print(f"❌ Erreur mise à jour album {album_path}: {e}")
+        return False
+
+
+# Instance globale
+album_facts = AlbumFactsService()
@@ -4,13 +4,19 @@ Convertit les fichiers audio entre différents formats
 """
 
 import os
+import selectors
 import subprocess
 import threading
+import time
 from enum import Enum
-from dataclasses import dataclass
-from typing import List, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
 import shutil
 
+from database.conversion_manifest import ConversionManifest, file_stat, settings_hash
+from services.tag_carryover import CarriedTags, read_source_tags, write_target_tags
+
 class ConversionStatus(Enum):
     """États de conversion"""
     PENDING = "En attente"
@@ -18,6 +24,7 @@ class ConversionStatus(Enum):
     COMPLETED = "Terminé"
     ERROR = "Erreur"
     CANCELLED = "Annulé"
+    SKIPPED = "À jour"  # Sortie déjà convertie depuis la source actuelle (mode incrémental)
 
 class AudioFormat(Enum):
     """Formats audio supportés"""
@@ -27,26 +34,87 @@ class AudioFormat(Enum):
     OGG = "ogg"
     M4A = "m4a"
 
-@dataclass
+@dataclass(eq=False)
 class ConversionJob:
-    """Tâche de conversion"""
+    """Tâche de conversion (comparée par identité : deux tâches ne sont jamais égales)"""
     source_path: str
     target_path: str
     source_format: str
     target_format: str
     quality: str = "standard"  # Nouveau: qualité de conversion
     delete_source: bool = False  # Nouveau: supprimer le fichier source après conversion
+    copy_tags: bool = True  # Reporter tags et pochette de la source dans la cible
     status: ConversionStatus = ConversionStatus.PENDING
     progress: float = 0.0
     error_message: str = ""
+    # Processus FFmpeg en cours et demande d'annulation (gérés par le convertisseur)
+    process: Optional[subprocess.Popen] = field(default=None, repr=False)
+    cancel_requested: bool = False
+    # Avancement réel lu sur la sortie -progress de FFmpeg (secondes audio)
+    duration: float = 0.0  # Durée de la source (mutagen), 0 si inconnue
+    position: float = 0.0  # Position déjà encodée
+    speed: float = 0.0  # Débit en « x temps réel »
+    eta: Optional[float] = None  # Secondes restantes estimées, None si inconnu
+    started_at: float = 0.0
+    # Écriture atomique : FFmpeg écrit dans partial_path, renommé en target_path à la fin
+    partial_path: str = ""
+    # Mode incrémental (manifeste) : réglages, tâche persistée, source relevée avant encodage
+    settings_hash: str = ""
+    queue_id: Optional[int] = None
+    source_stat: Optional[Tuple[int, int]] = None
+    requeue: bool = False  # Interrompue par un arrêt : remise en attente, pas annulée
+    
+    def __post_init__(self):
+        if not self.partial_path:
+            # Fichier caché à côté de la cible, extension conservée pour FFmpeg
+            directory, name = os.path.split(self.target_path)
+            stem, ext = os.path.splitext(name)
+            self.partial_path = os.path.join(directory, f".{stem}.partial{ext}")
+
+# Fin de la sortie d'erreur de FFmpeg conservée pour le message d'erreur
+STDERR_TAIL_BYTES = 8192
+
+# Disponibilité de FFmpeg, vérifiée une seule fois par processus (None = pas encore vérifiée)
+_ffmpeg_available: Optional[bool] = None
+_ffmpeg_lock = threading.Lock()
 
 class AudioConverter:
-    """Service de conversion audio utilisant FFmpeg"""
+    """
+    Service de conversion audio utilisant FFmpeg
+
+    Les tâches sont converties par plusieurs processus FFmpeg en parallèle
+    (un par cœur par défaut, chacun limité à un thread d'encodage). La liste
+    des tâches est partagée entre l'interface et les workers : elle n'est lue
+    et modifiée que sous verrou, et chaque worker y prend la prochaine tâche
+    en attente. Une tâche peut être annulée individuellement, en attente ou
+    en cours (le processus FFmpeg est alors arrêté et la sortie partielle
+    supprimée). L'avancement réel, le débit et l'ETA viennent de la sortie
+    -progress de FFmpeg. Les tags et la pochette de la source sont reportés
+    dans la cible avec mutagen. La sortie est écrite dans un fichier
+    temporaire renommé à la fin : une cible n'est jamais incomplète.
+    
+    Avec un manifeste, la conversion est incrémentale : une source déjà
+    convertie avec les mêmes réglages et inchangée depuis est ignorée, une
+    source modifiée est reconvertie vers la même cible, et la file est
+    persistée pour être reprise au redémarrage (restore_queue).
+    Les callbacks sont appelés depuis les workers.
+    """
     
-    def __init__(self):
-        self.conversion_queue: List[ConversionJob] = []
+    def __init__(self, max_workers: Optional[int] = None, manifest: Optional[ConversionManifest] = None):
+        """
+        Args:
+            max_workers: Conversions simultanées (par défaut: nombre de cœurs)
+            manifest: Manifeste des conversions (mode incrémental et reprise)
+        """
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.manifest = manifest
+        
+        self._lock = threading.Lock()
+        self._jobs: List[ConversionJob] = []  # Toutes les tâches, dans l'ordre d'ajout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._probe_executor: Optional[ThreadPoolExecutor] = None  # Durées pour l'ETA de la queue
+        self._active_workers = 0
         self.is_converting = False
-        self.current_job: Optional[ConversionJob] = None
         self.stop_flag = False
         
         # Callbacks
@@ -54,13 +122,23 @@ class AudioConverter:
         self.on_job_progress: Optional[Callable[[ConversionJob, float], None]] = None
         self.on_job_completed: Optional[Callable[[ConversionJob], None]] = None
         self.on_job_error: Optional[Callable[[ConversionJob, str], None]] = None
+        self.on_job_cancelled: Optional[Callable[[ConversionJob], None]] = None
         self.on_queue_finished: Optional[Callable[[], None]] = None
-        
-        # Vérifier la disponibilité de FFmpeg
-        self.ffmpeg_available = self._check_ffmpeg()
+    
+    @property
+    def ffmpeg_available(self) -> bool:
+        """Disponibilité de FFmpeg, vérifiée au premier besoin et non à la création"""
+        global _ffmpeg_available
+        if _ffmpeg_available is None:
+            with _ffmpeg_lock:
+                if _ffmpeg_available is None:
+                    _ffmpeg_available = self._check_ffmpeg()
+        return _ffmpeg_available
     
     def _check_ffmpeg(self) -> bool:
         """Vérifie si FFmpeg est disponible"""
+        if shutil.which('ffmpeg') is None:
+            return False  # Pas de processus à lancer si l'exécutable est absent
         try:
             result = subprocess.run(['ffmpeg', '-version'], 
                                   capture_output=True, 
@@ -79,39 +157,232 @@ class AudioConverter:
         _, ext = os.path.splitext(file_path)
         return ext.lower().lstrip('.')
     
-    def add_conversion_job(self, source_path: str, target_format: str, output_dir: str, quality: str = "standard", delete_source: bool = False) -> ConversionJob:
-        """Ajoute une tâche de conversion à la queue"""
-        source_format = self.detect_format(source_path)
-        filename = os.path.splitext(os.path.basename(source_path))[0]
-        target_path = os.path.join(output_dir, f"{filename}.{target_format}")
-        
-        # Éviter les doublons dans le nom si le fichier existe déjà
-        counter = 1
-        while os.path.exists(target_path):
-            target_path = os.path.join(output_dir, f"{filename}_{counter}.{target_format}")
-            counter += 1
-        
-        job = ConversionJob(
-            source_path=source_path,
-            target_path=target_path,
-            source_format=source_format,
-            target_format=target_format,
-            quality=quality,
-            delete_source=delete_source
-        )
+    # === File d'attente (thread GTK) ===
+    
+    @property
+    def conversion_queue(self) -> List[ConversionJob]:
+        """Copie des tâches en attente (lecture seule)"""
+        with self._lock:
+            return [job for job in self._jobs if job.status == ConversionStatus.PENDING]
+    
+    def get_jobs(self) -> List[ConversionJob]:
+        """Copie de toutes les tâches, dans l'ordre d'ajout"""
+        with self._lock:
+            return list(self._jobs)
+    
+    def add_conversion_job(self, source_path: str, target_format: str, output_dir: str, quality: str = "standard", delete_source: bool = False, copy_tags: bool = True, skip_up_to_date: bool = True) -> ConversionJob:
+        """
+        Ajoute une tâche de conversion à la queue
         
-        self.conversion_queue.append(job)
-        return job
+        Avec un manifeste et skip_up_to_date, une sortie à jour donne une
+        tâche « À jour » qui ne sera pas convertie.
+        """
+        entry = {
+            'source_path': source_path, 'target_format': target_format, 'output_dir': output_dir,
+            'quality': quality, 'delete_source': delete_source, 'copy_tags': copy_tags
+        }
+        return self.add_conversion_jobs([entry], skip_up_to_date)[0]
+    
+    def add_conversion_jobs(self, entries: List[Dict], skip_up_to_date: bool = True) -> List[ConversionJob]:
+        """
+        Ajoute les tâches d'une sélection de fichiers
+        
+        Le manifeste est consulté et la file persistante complétée en une
+        seule transaction pour toute la sélection.
+        
+        Args:
+            entries: Paramètres de add_conversion_job pour chaque fichier
+                (source_path, target_format, output_dir, puis quality,
+                delete_source et copy_tags optionnels)
+            skip_up_to_date: Voir add_conversion_job
+        
+        Returns:
+            Tâches créées, dans l'ordre de entries
+        """
+        defaults = {'quality': "standard", 'delete_source': False, 'copy_tags': True}
+        entries = [{**defaults, **entry} for entry in entries]
+        return self._add_jobs(entries, skip_up_to_date)
+    
+    def restore_queue(self) -> List[ConversionJob]:
+        """
+        Reprend les tâches inachevées d'une session précédente (manifeste requis)
+        
+        Returns:
+            Tâches remises dans la queue (les sources disparues sont oubliées)
+        """
+        if self.manifest is None:
+            return []
+        entries = []
+        for entry in self.manifest.pending_jobs():
+            if not os.path.exists(entry['source_path']):
+                self.manifest.dequeue(entry['queue_id'])
+                continue
+            entries.append(entry)
+        return self._add_jobs(entries)
+    
+    def _add_jobs(self, entries: List[Dict], skip_up_to_date: bool = True) -> List[ConversionJob]:
+        """Crée les tâches (une entrée reprise de la file persistante porte son 'queue_id')"""
+        settings = [""] * len(entries)
+        recorded = {}
+        if self.manifest is not None:
+            settings = [settings_hash(target_format=entry['target_format'], quality=entry['quality'],
+                                      copy_tags=entry['copy_tags'], output_dir=os.path.abspath(entry['output_dir']))
+                        for entry in entries]
+            recorded = self.manifest.lookup_many(
+                (entry['source_path'], settings_entry) for entry, settings_entry in zip(entries, settings)
+            )
+        previous = [recorded.get((entry['source_path'], settings_entry))
+                    for entry, settings_entry in zip(entries, settings)]
+        skipped = [skip_up_to_date and record is not None and record[1] for record in previous]
+        
+        queue_ids = [entry.get('queue_id') for entry in entries]
+        if self.manifest is not None:
+            # Entrées reprises déjà à jour : retirées de la file ; nouvelles : ajoutées en un lot
+            for index, queue_id in enumerate(queue_ids):
+                if skipped[index] and queue_id is not None:
+                    self.manifest.dequeue(queue_id)
+                    queue_ids[index] = None
+            new = [index for index in range(len(entries)) if not skipped[index] and queue_ids[index] is None]
+            new_ids = self.manifest.enqueue_many([entries[index] for index in new])
+            for index, queue_id in zip(new, new_ids):
+                queue_ids[index] = queue_id
+        
+        jobs = []
+        with self._lock:
+            # Éviter les doublons dans le nom si le fichier existe déjà ou est
+            # la destination d'une autre tâche pas encore écrite
+            reserved = {job.target_path for job in self._jobs
+                        if job.status in (ConversionStatus.PENDING, ConversionStatus.CONVERTING)}
+            for index, entry in enumerate(entries):
+                source_path = entry['source_path']
+                target_format = entry['target_format']
+                record = previous[index]
+                if skipped[index]:
+                    target_path = record[0]
+                elif record is not None and record[0] not in reserved and record[0] != source_path:
+                    # Source modifiée depuis sa conversion : la cible est remplacée sur place
+                    target_path = record[0]
+                else:
+                    filename = os.path.splitext(os.path.basename(source_path))[0]
+                    target_path = os.path.join(entry['output_dir'], f"{filename}.{target_format}")
+                    counter = 1
+                    while os.path.exists(target_path) or target_path in reserved:
+                        target_path = os.path.join(entry['output_dir'], f"{filename}_{counter}.{target_format}")
+                        counter += 1
+                
+                job = ConversionJob(
+                    source_path=source_path,
+                    target_path=target_path,
+                    source_format=self.detect_format(source_path),
+                    target_format=target_format,
+                    quality=entry['quality'],
+                    delete_source=entry['delete_source'],
+                    copy_tags=entry['copy_tags'],
+                    settings_hash=settings[index],
+                    queue_id=queue_ids[index]
+                )
+                if skipped[index]:
+                    job.status = ConversionStatus.SKIPPED
+                    job.progress = 100.0
+                else:
+                    reserved.add(target_path)
+                self._jobs.append(job)
+                jobs.append(job)
+        
+        # Durées lues en arrière-plan (ETA de la queue) : l'ajout n'ouvre pas les fichiers
+        for job in jobs:
+            if job.status == ConversionStatus.PENDING:
+                self._probe_in_background(job)
+        
+        # Tâches ajoutées pendant une conversion : les workers libres les prennent
+        self._ensure_workers()
+        return jobs
+    
+    def _probe_in_background(self, job: ConversionJob):
+        """Lit la durée d'une tâche en attente sur un thread dédié"""
+        with self._lock:
+            if self._probe_executor is None:
+                self._probe_executor = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix="NonotagsConverterProbe"
+                )
+            executor = self._probe_executor
+        executor.submit(self._probe_job_duration, job)
+    
+    def _probe_job_duration(self, job: ConversionJob):
+        """Renseigne la durée d'une tâche, sauf si un worker l'a déjà prise"""
+        if job.status != ConversionStatus.PENDING or job.duration:
+            return
+        duration = self._probe_duration(job.source_path)
+        with self._lock:
+            if not job.duration:
+                job.duration = duration
+    
+    @staticmethod
+    def _probe_duration(file_path: str) -> float:
+        """Durée du fichier source en secondes (lecture des en-têtes, 0 si inconnue)"""
+        try:
+            import mutagen  # Import différé : seul le convertisseur en a besoin ici
+            audio = mutagen.File(file_path)
+            if audio is not None and audio.info and audio.info.length:
+                return float(audio.info.length)
+        except Exception:
+            pass
+        return 0.0
     
     def remove_job(self, job: ConversionJob):
-        """Supprime une tâche de la queue"""
-        if job in self.conversion_queue and job.status == ConversionStatus.PENDING:
-            self.conversion_queue.remove(job)
+        """Supprime une tâche de la queue (une tâche en cours est annulée)"""
+        with self._lock:
+            if job.status == ConversionStatus.CONVERTING:
+                pass
+            elif job in self._jobs:
+                self._jobs.remove(job)
+                self._forget_queued(job)
+                return
+            else:
+                return
+        self.cancel_job(job)
+    
+    def cancel_job(self, job: ConversionJob, requeue: bool = False) -> bool:
+        """
+        Annule une tâche en attente ou en cours
+        
+        Args:
+            requeue: Remettre en attente une tâche en cours au lieu de l'annuler
+        
+        Returns:
+            True si la tâche était en attente ou en cours
+        """
+        with self._lock:
+            if job.status == ConversionStatus.PENDING:
+                if requeue:
+                    return True
+                job.status = ConversionStatus.CANCELLED
+                notify = True
+            elif job.status == ConversionStatus.CONVERTING:
+                # Le worker constate l'annulation à la fin du processus
+                job.cancel_requested = True
+                job.requeue = requeue
+                process = job.process
+                notify = False
+            else:
+                return False
+        
+        if notify:
+            self._forget_queued(job)
+            self._notify(self.on_job_cancelled, job)
+        elif process is not None:
+            process.terminate()
+        return True
     
     def clear_queue(self):
         """Vide la queue de conversion"""
-        if not self.is_converting:
-            self.conversion_queue.clear()
+        with self._lock:
+            if self.is_converting:
+                return
+            self._jobs.clear()
+        if self.manifest is not None:
+            self.manifest.clear_queue()
     
     def start_conversion(self):
         """Démarre la conversion de la queue"""
@@ -122,89 +393,189 @@ class AudioConverter:
             print("❌ FFmpeg n'est pas disponible. Installation requise.")
             return
         
-        self.is_converting = True
-        self.stop_flag = False
-        
-        # Lancer la conversion dans un thread séparé
-        thread = threading.Thread(target=self._process_queue, daemon=True)
-        thread.start()
+        with self._lock:
+            self.is_converting = True
+            self.stop_flag = False
+        self._ensure_workers()
     
     def stop_conversion(self):
-        """Arrête la conversion en cours"""
+        """Arrête la conversion : les tâches en cours sont interrompues et restent en attente"""
         self.stop_flag = True
+        with self._lock:
+            running = [job for job in self._jobs if job.status == ConversionStatus.CONVERTING]
+        for job in running:
+            self.cancel_job(job, requeue=True)
+    
+    # === Workers ===
+    
+    def _ensure_workers(self):
+        """Démarre des workers jusqu'à max_workers tant qu'il reste des tâches en attente"""
+        with self._lock:
+            if not self.is_converting or self.stop_flag:
+                return
+            pending = sum(1 for job in self._jobs if job.status == ConversionStatus.PENDING)
+            to_start = min(pending, self.max_workers - self._active_workers)
+            if to_start <= 0:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="NonotagsConverter"
+                )
+            self._active_workers += to_start
+            executor = self._executor
+        
+        for _ in range(to_start):
+            executor.submit(self._worker)
+    
+    def _take_pending_job(self) -> Optional[ConversionJob]:
+        """Marque et retourne la prochaine tâche en attente (appelé sous verrou)"""
+        if self.stop_flag:
+            return None
+        for job in self._jobs:
+            if job.status == ConversionStatus.PENDING:
+                job.status = ConversionStatus.CONVERTING
+                job.progress = 0.0
+                job.position = 0.0
+                job.speed = 0.0
+                job.eta = None
+                job.started_at = time.monotonic()
+                job.error_message = ""
+                job.cancel_requested = False
+                return job
+        return None
+    
+    def _worker(self):
+        """
+        Boucle d'un worker : convertit les tâches en attente une par une
+        
+        Sans tâche (ou sur arrêt), le worker est retiré du compte sous le même
+        verrou : une tâche ajoutée juste après démarre un nouveau worker.
+        """
+        while True:
+            with self._lock:
+                job = self._take_pending_job()
+                if job is None:
+                    self._active_workers -= 1
+                    finished = self._active_workers == 0
+                    if finished:
+                        self.is_converting = False
+                    break
+            self._run_job(job)
+        
+        if finished:
+            self._notify(self.on_queue_finished)
     
-    def _process_queue(self):
-        """Traite la queue de conversion"""
+    def _run_job(self, job: ConversionJob):
+        """Convertit une tâche et publie son état final"""
+        # Notifier le début de la tâche
+        self._notify(self.on_job_started, job)
+        
+        # Effectuer la conversion
+        success = self._convert_file(job)
+        
+        with self._lock:
+            job.process = None
+            if job.cancel_requested and job.requeue:
+                # Interrompue par un arrêt : reprise au prochain démarrage
+                job.status = ConversionStatus.PENDING
+                job.progress = 0.0
+                job.requeue = False
+            elif job.cancel_requested:
+                job.status = ConversionStatus.CANCELLED
+            elif success:
+                job.status = ConversionStatus.COMPLETED
+                job.progress = 100.0
+            else:
+                job.status = ConversionStatus.ERROR
+            status = job.status
+        
+        if status != ConversionStatus.PENDING:
+            self._forget_queued(job)
+        
+        if status == ConversionStatus.COMPLETED:
+            if self.manifest is not None and job.source_stat is not None:
+                try:
+                    self.manifest.record_conversion(job.source_path, job.settings_hash,
+                                                    job.source_stat, job.target_path)
+                except Exception as e:
+                    print(f"⚠️ Manifeste de conversion non mis à jour: {e}")
+            self._notify(self.on_job_completed, job)
+        elif status in (ConversionStatus.CANCELLED, ConversionStatus.PENDING):
+            self._remove_partial_output(job)
+            self._notify(self.on_job_cancelled, job)
+        else:
+            self._remove_partial_output(job)
+            self._notify(self.on_job_error, job, job.error_message)
+    
+    @staticmethod
+    def _notify(callback, *args):
+        """Appelle un callback sans laisser une erreur d'interface arrêter le worker"""
+        if callback:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"⚠️ Erreur callback conversion: {e}")
+    
+    def _forget_queued(self, job: ConversionJob):
+        """Retire une tâche terminée ou abandonnée de la file persistante"""
+        if self.manifest is None or job.queue_id is None:
+            return
         try:
-            while self.conversion_queue and not self.stop_flag:
-                self.current_job = self.conversion_queue.pop(0)
-                self.current_job.status = ConversionStatus.CONVERTING
-                
-                # Notifier le début de la tâche
-                if self.on_job_started:
-                    self.on_job_started(self.current_job)
-                
-                # Effectuer la conversion
-                success = self._convert_file(self.current_job)
-                
-                if success and not self.stop_flag:
-                    self.current_job.status = ConversionStatus.COMPLETED
-                    self.current_job.progress = 100.0
-                    if self.on_job_completed:
-                        self.on_job_completed(self.current_job)
-                elif self.stop_flag:
-                    self.current_job.status = ConversionStatus.CANCELLED
-                else:
-                    self.current_job.status = ConversionStatus.ERROR
-                    if self.on_job_error:
-                        self.on_job_error(self.current_job, self.current_job.error_message)
-            
-        finally:
-            self.is_converting = False
-            self.current_job = None
-            if self.on_queue_finished:
-                self.on_queue_finished()
+            self.manifest.dequeue(job.queue_id)
+        except Exception as e:
+            print(f"⚠️ Manifeste de conversion non mis à jour: {e}")
+        job.queue_id = None
+    
+    @staticmethod
+    def _remove_partial_output(job: ConversionJob):
+        """Supprime le fichier de sortie incomplet d'une tâche annulée ou en échec"""
+        try:
+            if os.path.exists(job.partial_path):
+                os.remove(job.partial_path)
+        except OSError:
+            pass
     
     def _convert_file(self, job: ConversionJob) -> bool:
-        """Convertit un fichier audio"""
+        """Convertit un fichier audio (thread worker)"""
         try:
             # Créer le dossier de destination si nécessaire
             os.makedirs(os.path.dirname(job.target_path), exist_ok=True)
             
+            # Source relevée avant l'encodage : une modification pendant la
+            # conversion sera vue comme un changement à la prochaine exécution
+            job.source_stat = file_stat(job.source_path)
+            
+            # Tags, pochette et durée de la source, lus une fois avant l'encodage
+            if job.copy_tags:
+                carried = self._read_carried_tags(job)
+            else:
+                carried = None
+                if not job.duration:
+                    job.duration = self._probe_duration(job.source_path)
+            
             # Construire la commande FFmpeg
             cmd = self._build_ffmpeg_command(job)
             
             print(f"🔄 Conversion: {os.path.basename(job.source_path)} → {job.target_format.upper()}")
             
-            # Exécuter FFmpeg
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            returncode, stderr = self._run_ffmpeg(job, cmd)
             
-            # Surveiller le processus et la progression
-            while process.poll() is None:
-                if self.stop_flag:
-                    process.terminate()
-                    return False
-                
-                # Simulation simple de progression (FFmpeg n'expose pas facilement la progression)
-                if job.progress < 90:
-                    job.progress += 10
-                    if self.on_job_progress:
-                        self.on_job_progress(job, job.progress)
-                
-                # Attendre un peu avant la prochaine vérification
-                import time
-                time.sleep(0.5)
+            if job.cancel_requested:
+                return False
             
             # Vérifier le résultat
-            if process.returncode == 0:
+            if returncode == 0:
                 job.progress = 100.0
-                if self.on_job_progress:
-                    self.on_job_progress(job, job.progress)
+                job.position = job.duration or job.position
+                job.eta = 0.0
+                if carried is not None:
+                    self._write_carried_tags(job, carried)
+                
+                # La cible n'apparaît (ou n'est remplacée) qu'une fois complète
+                os.replace(job.partial_path, job.target_path)
+                
+                self._notify(self.on_job_progress, job, job.progress)
                 print(f"✅ Conversion réussie: {job.target_path}")
                 
                 # Supprimer le fichier source si demandé
@@ -218,7 +589,6 @@ class AudioConverter:
                 
                 return True
             else:
-                _, stderr = process.communicate()
                 job.error_message = stderr.strip()
                 print(f"❌ Erreur conversion: {job.error_message}")
                 return False
@@ -228,9 +598,122 @@ class AudioConverter:
             print(f"❌ Exception durant conversion: {e}")
             return False
     
+    @staticmethod
+    def _read_carried_tags(job: ConversionJob) -> Optional[CarriedTags]:
+        """Lit tags, pochette et durée de la source (None si illisible)"""
+        try:
+            carried = read_source_tags(job.source_path)
+        except Exception as e:
+            print(f"⚠️ Tags illisibles, conversion sans report: {job.source_path}: {e}")
+            return None
+        if carried.duration and not job.duration:
+            job.duration = carried.duration
+        return carried
+    
+    @staticmethod
+    def _write_carried_tags(job: ConversionJob, carried: CarriedTags):
+        """Écrit en une fois les tags reportés dans le fichier converti"""
+        try:
+            write_target_tags(job.partial_path, carried)
+        except Exception as e:
+            # Le fichier audio est valide : on ne considère pas cela comme un échec
+            print(f"⚠️ Impossible d'écrire les tags de {job.target_path}: {e}")
+    
+    def _run_ffmpeg(self, job: ConversionJob, cmd: List[str]):
+        """
+        Exécute FFmpeg en lisant ses deux sorties au fil de l'eau
+        
+        Les tubes sont non bloquants et surveillés par un sélecteur : la
+        sortie standard (-progress pipe:1) est analysée ligne à ligne, la
+        sortie d'erreur est vidée en continu (seule sa fin est conservée).
+        Aucun tube ne peut se remplir et bloquer FFmpeg.
+        
+        Returns:
+            (code de retour, fin de la sortie d'erreur)
+        """
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        with self._lock:
+            job.process = process
+            cancelled = job.cancel_requested
+        if cancelled:
+            process.terminate()
+        
+        selector = selectors.DefaultSelector()
+        for stream in (process.stdout, process.stderr):
+            os.set_blocking(stream.fileno(), False)
+            selector.register(stream, selectors.EVENT_READ)
+        
+        pending = b""  # Ligne de progression incomplète
+        fields = {}  # Bloc de progression en cours (clé=valeur jusqu'à progress=)
+        stderr = bytearray()
+        try:
+            while selector.get_map():
+                for key, _ in selector.select():
+                    try:
+                        data = os.read(key.fd, 65536)
+                    except BlockingIOError:
+                        continue
+                    if not data:
+                        selector.unregister(key.fileobj)
+                        continue
+                    
+                    if key.fileobj is process.stderr:
+                        stderr += data
+                        del stderr[:-STDERR_TAIL_BYTES]
+                        continue
+                    
+                    *lines, pending = (pending + data).split(b"\n")
+                    for line in lines:
+                        name, _, value = line.decode('utf-8', 'replace').strip().partition('=')
+                        fields[name] = value
+                        if name == 'progress':
+                            self._update_progress(job, fields)
+                            fields = {}
+        finally:
+            selector.close()
+            process.stdout.close()
+            process.stderr.close()
+        
+        return process.wait(), stderr.decode('utf-8', 'replace')
+    
+    def _update_progress(self, job: ConversionJob, fields: dict):
+        """Met à jour avancement, débit et ETA d'une tâche à partir d'un bloc -progress"""
+        # out_time_ms est lui aussi en microsecondes (historique de FFmpeg)
+        raw_time = fields.get('out_time_us') or fields.get('out_time_ms')
+        try:
+            position = int(raw_time) / 1_000_000
+        except (TypeError, ValueError):
+            return  # "N/A" tant que rien n'est encodé
+        if position < 0:
+            return
+        
+        try:
+            speed = float(fields.get('speed', '').rstrip('x'))
+        except ValueError:
+            speed = 0.0
+        if speed <= 0:
+            elapsed = time.monotonic() - job.started_at
+            speed = position / elapsed if elapsed > 0 else 0.0
+        
+        job.position = position
+        job.speed = speed
+        if job.duration > 0:
+            job.progress = min(99.0, position * 100.0 / job.duration)
+            remaining = max(0.0, job.duration - position)
+            job.eta = remaining / speed if speed > 0 else None
+        
+        self._notify(self.on_job_progress, job, job.progress)
+    
     def _build_ffmpeg_command(self, job: ConversionJob) -> List[str]:
         """Construit la commande FFmpeg selon le format cible et la qualité"""
-        cmd = ['ffmpeg', '-i', job.source_path, '-y']  # -y pour écraser le fichier de sortie
+        # -y pour écraser le fichier de sortie ; avancement sur stdout, seules les erreurs sur stderr
+        cmd = ['ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'error',
+               '-progress', 'pipe:1', '-i', job.source_path, '-y']
         
         if job.target_format == 'mp3':
             # MP3 avec différentes qualités
@@ -287,18 +770,46 @@ class AudioConverter:
             elif job.quality == "maximum":
                 cmd.extend(['-codec:a', 'aac', '-b:a', '320k'])
         
-        # Préserver les métadonnées
-        cmd.extend(['-map_metadata', '0'])
+        if job.copy_tags:
+            # Tags et pochette écrits ensuite avec mutagen : FFmpeg n'en copie aucun
+            # et ignore l'image intégrée (qu'il traiterait comme un flux vidéo)
+            cmd.extend(['-map_metadata', '-1', '-vn'])
+        else:
+            # Préserver les métadonnées
+            cmd.extend(['-map_metadata', '0'])
+        
+        # Un thread d'encodage par processus : le parallélisme vient des workers
+        if self.max_workers > 1:
+            cmd.extend(['-threads', '1'])
         
-        cmd.append(job.target_path)
+        cmd.append(job.partial_path)
         return cmd
     
     def get_queue_status(self) -> dict:
         """Retourne l'état de la queue"""
-        pending = len([j for j in self.conversion_queue if j.status == ConversionStatus.PENDING])
+        with self._lock:
+            counts = {status: 0 for status in ConversionStatus}
+            for job in self._jobs:
+                counts[job.status] += 1
+            running = [job for job in self._jobs if job.status == ConversionStatus.CONVERTING]
+            current = [job.source_path for job in running]
+            # Audio restant à encoder (tâches en attente et en cours de durée connue)
+            remaining = sum(max(0.0, job.duration - job.position) for job in self._jobs
+                            if job.status in (ConversionStatus.PENDING, ConversionStatus.CONVERTING))
+            # Débit cumulé des workers, en « x temps réel »
+            speed = sum(job.speed for job in running)
         return {
-            'total_jobs': len(self.conversion_queue),
-            'pending_jobs': pending,
+            'total_jobs': sum(counts.values()),
+            'pending_jobs': counts[ConversionStatus.PENDING],
+            'running_jobs': counts[ConversionStatus.CONVERTING],
+            'completed_jobs': counts[ConversionStatus.COMPLETED],
+            'error_jobs': counts[ConversionStatus.ERROR],
+            'cancelled_jobs': counts[ConversionStatus.CANCELLED],
+            'skipped_jobs': counts[ConversionStatus.SKIPPED],
             'is_converting': self.is_converting,
-            'current_job': self.current_job.source_path if self.current_job else None
+            'workers': self.max_workers,
+            'current_jobs': current,
+            'speed': speed,
+            'remaining_audio_seconds': remaining,
+            'eta_seconds': remaining / speed if speed > 0 else None
         }
@@ -1,6 +1,7 @@
 """
 Service de lecture audio pour l'application Nonotags
-Utilise GStreamer pour la lecture audio avec support multi-formats
+Utilise GStreamer (playbin) pour la lecture audio avec support multi-formats
+et enchaînement sans blanc des pistes de l'album
 """
 
 import gi
@@ -9,8 +10,10 @@ gi.require_version('GLib', '2.0')
 
 from gi.repository import Gst, GLib
 import os
+import threading
 from enum import Enum
-from support.logger import AppLogger
+from typing import List, Optional, Tuple
+from support.logger import get_logger
 
 
 class PlayerState(Enum):
@@ -22,78 +25,102 @@ class PlayerState(Enum):
 
 
 class AudioPlayer:
-    """Service de lecture audio avec GStreamer"""
+    """
+    Service de lecture audio avec GStreamer
+    
+    Un seul playbin est créé (à la première lecture) puis réutilisé : changer
+    de piste ne fait que repasser en READY et changer l'URI. Quand une liste
+    de lecture est fournie, la piste suivante est préparée sur le signal
+    about-to-finish pour un enchaînement sans blanc. La durée vient des tags
+    déjà lus (ou du message DURATION_CHANGED) et la position est transmise
+    à partir des messages du bus : aucune requête bloquante sur le thread GTK.
+    """
+    
+    SUPPORTED_FORMATS = ['.mp3', '.wav', '.flac', '.ogg', '.m4a', '.aac']
     
     def __init__(self):
-        """Initialise le lecteur audio"""
-        self.logger = AppLogger()
+        """Initialise le lecteur audio (le pipeline GStreamer est créé à la première lecture)"""
+        self.logger = get_logger()
+        self.pipeline = None
+        self._progress_timer = None  # Repli si l'élément progressreport est absent
         
-        # Initialiser GStreamer
-        Gst.init(None)
+        # Liste de lecture (chemin, durée connue) ; lue depuis le thread de streaming
+        self._lock = threading.Lock()
+        self._playlist: List[Tuple[str, float]] = []
+        self._index: Optional[int] = None
+        self._pending_index: Optional[int] = None  # piste suivante déjà préparée
         
-        # Créer le pipeline
-        self.pipeline = Gst.Pipeline.new("audio-player")
+        # État du lecteur
+        self.state = PlayerState.STOPPED
+        self.current_file = None
+        self.duration = 0
+        self.position = 0
         
-        # Éléments du pipeline
-        self.source = Gst.ElementFactory.make("filesrc", "source")
-        self.decoder = Gst.ElementFactory.make("decodebin", "decoder")
-        self.converter = Gst.ElementFactory.make("audioconvert", "converter")
-        self.resampler = Gst.ElementFactory.make("audioresample", "resampler")
-        self.sink = Gst.ElementFactory.make("autoaudiosink", "sink")
+        # Callbacks externes (thread GTK)
+        self.on_state_changed = None
+        self.on_position_changed = None
+        self.on_duration_changed = None
+        self.on_track_changed = None  # (index, chemin) lors d'un enchaînement automatique
+        self.on_error_occurred = None
+    
+    def _ensure_pipeline(self):
+        """Crée le playbin au premier fichier chargé"""
+        if self.pipeline is not None:
+            return
         
-        if not all([self.source, self.decoder, self.converter, self.resampler, self.sink]):
+        # Initialiser GStreamer
+        Gst.init(None)
+        
+        self.pipeline = Gst.ElementFactory.make("playbin", "audio-player")
+        if self.pipeline is None:
             self.logger.error("Impossible de créer les éléments GStreamer")
             raise RuntimeError("Éléments GStreamer manquants")
         
-        # Ajouter les éléments au pipeline
-        self.pipeline.add(self.source)
-        self.pipeline.add(self.decoder)
-        self.pipeline.add(self.converter)
-        self.pipeline.add(self.resampler)
-        self.pipeline.add(self.sink)
+        # Lecture audio seule : pas de sortie vidéo ni de sous-titres
+        fakesink = Gst.ElementFactory.make("fakesink", "video-sink")
+        if fakesink:
+            self.pipeline.set_property("video-sink", fakesink)
         
-        # Lier les éléments
-        self.source.link(self.decoder)
-        self.converter.link(self.resampler)
-        self.resampler.link(self.sink)
+        # Position publiée sur le bus chaque seconde par progressreport
+        progress = Gst.ElementFactory.make("progressreport", "progress")
+        if progress:
+            progress.set_property("update-freq", 1)
+            progress.set_property("silent", True)
+            self.pipeline.set_property("audio-filter", progress)
         
-        # Connecter le signal du décodeur
-        self.decoder.connect("pad-added", self.on_decoder_pad_added)
+        # Enchaînement sans blanc : la piste suivante est donnée avant la fin
+        self.pipeline.connect("about-to-finish", self._on_about_to_finish)
         
         # Bus pour les messages
         self.bus = self.pipeline.get_bus()
         self.bus.add_signal_watch()
         self.bus.connect("message", self.on_bus_message)
         
-        # État du lecteur
-        self.state = PlayerState.STOPPED
-        self.current_file = None
-        self.duration = 0
-        self.position = 0
-        
-        # Callbacks externes
-        self.on_state_changed = None
-        self.on_position_changed = None
-        self.on_duration_changed = None
-        self.on_error_occurred = None
-        
+        self._use_progress_messages = progress is not None
         self.logger.info("AudioPlayer initialisé avec succès")
     
-    def on_decoder_pad_added(self, decoder, pad):
-        """Callback pour connecter le décodeur au convertisseur"""
-        sink_pad = self.converter.get_static_pad("sink")
-        if not sink_pad.is_linked():
-            pad.link(sink_pad)
+    # === Thread de streaming ===
+    
+    def _on_about_to_finish(self, playbin):
+        """Prépare la piste suivante de la liste (appelé par GStreamer hors thread GTK)"""
+        with self._lock:
+            if self._index is None or self._index + 1 >= len(self._playlist):
+                return
+            self._pending_index = self._index + 1
+            next_path = self._playlist[self._pending_index][0]
+        playbin.set_property("uri", Gst.filename_to_uri(os.path.abspath(next_path)))
+    
+    # === Messages du bus (thread GTK) ===
     
     def on_bus_message(self, bus, message):
         """Traite les messages du bus GStreamer"""
         msg_type = message.type
         
         if msg_type == Gst.MessageType.EOS:
-            # Fin du fichier
+            # Fin de la liste de lecture
             self.stop()
             self.logger.debug("Fin de lecture atteinte")
-            
+        
         elif msg_type == Gst.MessageType.ERROR:
             # Erreur de lecture
             err, debug = message.parse_error()
@@ -101,57 +128,158 @@ class AudioPlayer:
             self.state = PlayerState.ERROR
             if self.on_error_occurred:
                 self.on_error_occurred(str(err))
-                
+        
         elif msg_type == Gst.MessageType.STATE_CHANGED:
             # Changement d'état
             if message.src == self.pipeline:
                 old_state, new_state, pending_state = message.parse_state_changed()
                 self._update_state_from_gst(new_state)
         
+        elif msg_type == Gst.MessageType.STREAM_START:
+            self._on_stream_start()
+        
+        elif msg_type == Gst.MessageType.DURATION_CHANGED:
+            # Durée inconnue des tags : requête non bloquante une fois le flux analysé
+            if not self.duration:
+                self._update_duration_from_pipeline()
+        
+        elif msg_type == Gst.MessageType.ASYNC_DONE:
+            if not self.duration:
+                self._update_duration_from_pipeline()
+        
+        elif msg_type == Gst.MessageType.ELEMENT:
+            structure = message.get_structure()
+            if structure is not None and structure.get_name() == "progress":
+                self._report_position()
+        
         return True
     
+    def _on_stream_start(self):
+        """Début d'un flux : si c'est la piste préparée, elle devient la piste courante"""
+        with self._lock:
+            index = self._pending_index
+            if index is None:
+                return
+            self._pending_index = None
+            self._index = index
+            file_path, duration = self._playlist[index]
+        
+        self.current_file = file_path
+        self.position = 0
+        self._set_duration(duration)
+        self.logger.info(f"Piste suivante: {os.path.basename(file_path)}")
+        if self.on_track_changed:
+            self.on_track_changed(index, file_path)
+    
     def _update_state_from_gst(self, gst_state):
         """Met à jour l'état interne basé sur l'état GStreamer"""
         if gst_state == Gst.State.PLAYING:
             self.state = PlayerState.PLAYING
+            self._start_progress_timer()
         elif gst_state == Gst.State.PAUSED:
             self.state = PlayerState.PAUSED
         elif gst_state == Gst.State.NULL or gst_state == Gst.State.READY:
             self.state = PlayerState.STOPPED
+            self._stop_progress_timer()
         
         if self.on_state_changed:
             self.on_state_changed(self.state)
     
-    def load_file(self, file_path):
-        """Charge un fichier audio"""
+    def _report_position(self):
+        """Transmet la position courante (requête de position non bloquante)"""
+        if self.pipeline is None or self.state == PlayerState.STOPPED:
+            return True
+        success, position = self.pipeline.query_position(Gst.Format.TIME)
+        if success and position != Gst.CLOCK_TIME_NONE:
+            self.position = position / Gst.SECOND
+            if self.on_position_changed:
+                self.on_position_changed(self.position)
+        return True
+    
+    def _start_progress_timer(self):
+        """Repli sans progressreport : position transmise par le lecteur lui-même"""
+        if self._use_progress_messages or self._progress_timer:
+            return
+        self._progress_timer = GLib.timeout_add(500, self._report_position)
+    
+    def _stop_progress_timer(self):
+        if self._progress_timer:
+            GLib.source_remove(self._progress_timer)
+            self._progress_timer = None
+    
+    def _set_duration(self, duration):
+        self.duration = duration or 0
+        if self.duration and self.on_duration_changed:
+            self.on_duration_changed(self.duration)
+    
+    def _update_duration_from_pipeline(self):
+        """Durée du flux (requête non bloquante, sans changement d'état)"""
+        success, duration = self.pipeline.query_duration(Gst.Format.TIME)
+        if success and duration != Gst.CLOCK_TIME_NONE and duration > 0:
+            self._set_duration(duration / Gst.SECOND)
+            self.logger.debug(f"Durée: {self.duration}s")
+    
+    # === API ===
+    
+    def set_playlist(self, tracks: List[Tuple[str, float]]):
+        """
+        Définit la liste de lecture utilisée pour l'enchaînement sans blanc
+        
+        Args:
+            tracks: (chemin, durée en secondes ou 0 si inconnue) dans l'ordre de lecture
+        """
+        with self._lock:
+            self._playlist = list(tracks)
+            self._pending_index = None
+            self._index = next((i for i, (path, _) in enumerate(self._playlist)
+                                if path == self.current_file), None)
+    
+    def play_index(self, index: int) -> bool:
+        """Charge et lance la piste d'index donné de la liste de lecture"""
+        with self._lock:
+            if not 0 <= index < len(self._playlist):
+                return False
+            file_path, duration = self._playlist[index]
+        return self.load_file(file_path, duration) and self.play()
+    
+    def load_file(self, file_path, duration: float = 0):
+        """
+        Charge un fichier audio
+        
+        Args:
+            file_path: Fichier à lire
+            duration: Durée déjà connue (tags lus par le tableau des pistes), 0 sinon
+        """
         if not os.path.exists(file_path):
             self.logger.error(f"Fichier audio introuvable: {file_path}")
             return False
         
         # Formats supportés
-        supported_formats = ['.mp3', '.wav', '.flac', '.ogg', '.m4a', '.aac']
         ext = os.path.splitext(file_path)[1].lower()
         
-        if ext not in supported_formats:
+        if ext not in self.SUPPORTED_FORMATS:
             self.logger.warning(f"Format non supporté: {ext}")
             return False
         
         try:
-            # Arrêter la lecture en cours
-            self.stop()
+            self._ensure_pipeline()
             
-            # Configurer la source
-            file_uri = f"file://{os.path.abspath(file_path)}"
-            self.source.set_property("location", file_path)
+            # READY plutôt que NULL : la sortie audio reste ouverte entre deux pistes
+            self.pipeline.set_state(Gst.State.READY)
+            self.pipeline.set_property("uri", Gst.filename_to_uri(os.path.abspath(file_path)))
+            
+            with self._lock:
+                self._pending_index = None
+                self._index = next((i for i, (path, _) in enumerate(self._playlist)
+                                    if path == file_path), None)
             
             self.current_file = file_path
+            self.position = 0
+            self._set_duration(duration)
             self.logger.info(f"Fichier chargé: {os.path.basename(file_path)}")
             
-            # Ne pas interroger la durée immédiatement, attendre la lecture
-            # self._query_duration()
-            
             return True
-            
+        
         except Exception as e:
             self.logger.error(f"Erreur lors du chargement: {e}")
             return False
@@ -165,11 +293,6 @@ class AudioPlayer:
         try:
             self.pipeline.set_state(Gst.State.PLAYING)
             self.logger.debug("Lecture lancée")
-            
-            # Obtenir la durée après démarrage (avec délai)
-            from gi.repository import GLib
-            GLib.timeout_add(1000, self._delayed_query_duration)  # 1 seconde après démarrage
-            
             return True
         except Exception as e:
             self.logger.error(f"Erreur lors de la lecture: {e}")
@@ -187,8 +310,14 @@ class AudioPlayer:
     
     def stop(self):
         """Arrête la lecture"""
+        self._stop_progress_timer()
+        if self.pipeline is None:
+            self.position = 0
+            return True
         try:
             self.pipeline.set_state(Gst.State.NULL)
+            with self._lock:
+                self._pending_index = None
             self.position = 0
             self.logger.debug("Lecture arrêtée")
             return True
@@ -202,7 +331,7 @@ class AudioPlayer:
             return False
         
         try:
-            position_ns = position_seconds * Gst.SECOND
+            position_ns = int(position_seconds * Gst.SECOND)
             self.pipeline.seek_simple(
                 Gst.Format.TIME,
                 Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT,
@@ -218,17 +347,8 @@ class AudioPlayer:
     def set_volume(self, volume):
         """Définit le volume (0.0 - 1.0)"""
         try:
-            # Ajouter un élément volume si nécessaire
-            volume_element = self.pipeline.get_by_name("volume")
-            if not volume_element:
-                volume_element = Gst.ElementFactory.make("volume", "volume")
-                # Insérer dans le pipeline
-                self.pipeline.add(volume_element)
-                self.converter.unlink(self.resampler)
-                self.converter.link(volume_element)
-                volume_element.link(self.resampler)
-            
-            volume_element.set_property("volume", max(0.0, min(1.0, volume)))
+            self._ensure_pipeline()
+            self.pipeline.set_property("volume", max(0.0, min(1.0, volume)))
             self.logger.debug(f"Volume défini à {volume}")
             return True
         except Exception as e:
@@ -236,74 +356,15 @@ class AudioPlayer:
             return False
     
     def get_position(self):
-        """Obtient la position actuelle en secondes"""
-        # Retourner 0 si pas de fichier chargé ou pipeline non prêt
+        """Dernière position connue en secondes (mise à jour par les messages du bus)"""
         if not self.current_file or self.state == PlayerState.STOPPED:
             return 0
-            
-        try:
-            success, position = self.pipeline.query_position(Gst.Format.TIME)
-            if success and position != Gst.CLOCK_TIME_NONE:
-                self.position = position / Gst.SECOND
-                return self.position
-            else:
-                # Si la requête échoue, retourner la dernière position connue
-                return self.position
-        except Exception as e:
-            self.logger.debug(f"Position query failed: {e}")
-            # Retourner la dernière position connue au lieu de 0
-            return self.position
+        return self.position
     
     def get_duration(self):
         """Obtient la durée totale en secondes"""
         return self.duration
     
-    def _query_duration(self):
-        """Requête la durée du fichier"""
-        try:
-            # Sauvegarder l'état actuel
-            current_state = self.pipeline.get_state(0)[1]
-            
-            # Mettre en pause pour obtenir la durée
-            self.pipeline.set_state(Gst.State.PAUSED)
-            
-            # Attendre que l'état soit stable avec timeout
-            ret, state, pending = self.pipeline.get_state(5 * Gst.SECOND)  # 5 sec timeout
-            
-            if ret == Gst.StateChangeReturn.SUCCESS:
-                success, duration = self.pipeline.query_duration(Gst.Format.TIME)
-                if success and duration != Gst.CLOCK_TIME_NONE:
-                    self.duration = duration / Gst.SECOND
-                    if self.on_duration_changed:
-                        self.on_duration_changed(self.duration)
-                    self.logger.debug(f"Durée: {self.duration}s")
-            
-            # Restaurer l'état précédent au lieu de forcer NULL
-            if current_state != Gst.State.NULL:
-                self.pipeline.set_state(current_state)
-            else:
-                self.pipeline.set_state(Gst.State.NULL)
-            
-        except Exception as e:
-            self.logger.error(f"Erreur lors de la requête de durée: {e}")
-            self.duration = 0
-    
-    def _delayed_query_duration(self):
-        """Interroge la durée avec délai après démarrage de la lecture"""
-        if self.current_file and self.state == PlayerState.PLAYING:
-            try:
-                success, duration = self.pipeline.query_duration(Gst.Format.TIME)
-                if success and duration != Gst.CLOCK_TIME_NONE:
-                    self.duration = duration / Gst.SECOND
-                    if self.on_duration_changed:
-                        self.on_duration_changed(self.duration)
-                    self.logger.info(f"Durée obtenue: {self.duration}s")
-                else:
-                    self.logger.warning("Impossible d'obtenir la durée")
-            except Exception as e:
-                self.logger.error(f"Erreur requête durée delayed: {e}")
-        return False  # Ne pas répéter le timeout
-    
     def get_state(self):
         """Retourne l'état actuel du lecteur"""
         return self.state
@@ -326,14 +387,15 @@ class AudioPlayer:
     
     def get_supported_formats(self):
         """Retourne la liste des formats supportés"""
-        return ['.mp3', '.wav', '.flac', '.ogg', '.m4a', '.aac']
+        return list(self.SUPPORTED_FORMATS)
     
     def cleanup(self):
         """Nettoie les ressources"""
         try:
             self.stop()
-            self.bus.remove_signal_watch()
+            if self.pipeline is not None:
+                self.bus.remove_signal_watch()
             self.pipeline = None
             self.logger.info("AudioPlayer nettoyé")
         except Exception as e:
-            self.logger.error(f"Erreur lors du nettoyage: {e}")
\ No newline at end of file
+            self.logger.error(f"Erreur lors du nettoyage: {e}")
@@ -0,0 +1,231 @@
+"""
+Recherche de pochettes en lot pour tous les albums sans pochette
+Choisit automatiquement le meilleur résultat et reprend après interruption grâce à un point de contrôle
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from services.cover_search import CoverSearchService, CoverSearchError
+from support.logger import AppLogger
+
+# Statuts enregistrés dans le point de contrôle
+STATUS_FOUND = "found"
+STATUS_NOT_FOUND = "not_found"
+STATUS_SKIPPED = "skipped"
+STATUS_ERROR = "error"
+
+# Statuts définitifs : l'album n'est pas retraité lors d'une reprise
+FINAL_STATUSES = {STATUS_FOUND, STATUS_NOT_FOUND, STATUS_SKIPPED}
+
+# Valeurs de remplissage du scanner, inutilisables pour une recherche
+UNKNOWN_VALUES = {"", "Artiste Inconnu", "Album Inconnu", "----"}
+
+
+class BatchCoverCheckpoint:
+    """Point de contrôle JSON d'une recherche en lot (chemin d'album → statut)"""
+
+    def __init__(self, checkpoint_path: str):
+        self.checkpoint_path = Path(checkpoint_path)
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self.load()
+
+    def load(self):
+        """Charge le point de contrôle existant (s'il y en a un)"""
+        try:
+            if self.checkpoint_path.exists():
+                with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('albums', {})
+        except Exception as e:
+            print(f"⚠️ Point de contrôle illisible, reprise depuis zéro: {e}")
+            self.entries = {}
+
+    def is_done(self, album_path: str) -> bool:
+        """Vérifie si un album a déjà un statut définitif"""
+        with self._lock:
+            entry = self.entries.get(album_path)
+        return bool(entry) and entry.get('status') in FINAL_STATUSES
+
+    def mark(self, album_path: str, status: str, flush_every: int = 10):
+        """Enregistre le statut d'un album, écrit sur disque tous les N albums"""
+        with self._lock:
+            self.entries[album_path] = {
+                'status': status,
+                'date': datetime.now().isoformat(timespec='seconds')
+            }
+            self._dirty += 1
+            should_flush = self._dirty >= flush_every
+
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """Écrit le point de contrôle de façon atomique (fichier temporaire + rename)"""
+        with self._lock:
+            data = {'albums': dict(self.entries)}
+            self._dirty = 0
+
+        try:
+            self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.checkpoint_path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.checkpoint_path)
+        except Exception as e:
+            print(f"❌ Erreur écriture point de contrôle: {e}")
+
+    def clear(self):
+        """Supprime le point de contrôle (lot terminé)"""
+        with self._lock:
+            self.entries = {}
+            self._dirty = 0
+        try:
+            if self.checkpoint_path.exists():
+                self.checkpoint_path.unlink()
+        except Exception as e:
+            print(f"⚠️ Impossible de supprimer le point de contrôle: {e}")
+
+
+class BatchCoverSearch:
+    """Recherche et télécharge automatiquement les pochettes manquantes d'une liste d'albums"""
+
+    def __init__(self, cover_search: Optional[CoverSearchService] = None,
+                 checkpoint_path: Optional[str] = None, max_workers: int = 3,
+                 candidates_per_album: int = 3):
+        """
+        Args:
+            cover_search: Service de recherche (partagé entre les threads)
+            checkpoint_path: Fichier de point de contrôle (par défaut dans le dossier de config)
+            max_workers: Nombre d'albums traités en parallèle
+            candidates_per_album: Nombre de résultats essayés avant d'abandonner un album
+        """
+        self.logger = AppLogger()
+        self.cover_search = cover_search or CoverSearchService()
+        self.max_workers = max_workers
+        self.candidates_per_album = candidates_per_album
+
+        if checkpoint_path is None:
+            checkpoint_path = Path(self.cover_search.config.config_dir) / "cover_batch_checkpoint.json"
+        self.checkpoint = BatchCoverCheckpoint(str(checkpoint_path))
+
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Demande l'arrêt du lot (les albums en cours se terminent, le point de contrôle est conservé)"""
+        self._stop_event.set()
+
+    def is_stopped(self) -> bool:
+        """Indique si un arrêt a été demandé"""
+        return self._stop_event.is_set()
+
+    def run(self, albums: List[Dict], progress_callback: Optional[Callable] = None) -> Dict[str, int]:
+        """
+        Traite une liste d'albums sans pochette
+
+        Args:
+            albums: Albums (dictionnaires du scanner avec folder_path, artist, album, year)
+            progress_callback: Appelé depuis les threads de travail avec
+                               (traités, total, chemin_album, statut)
+
+        Returns:
+            Compteurs par statut
+        """
+        self._stop_event.clear()
+
+        pending = []
+        for album in albums:
+            album_path = album.get('folder_path') or album.get('path', '')
+            if album_path and not self.checkpoint.is_done(album_path):
+                pending.append(album)
+
+        resumed = len(albums) - len(pending)
+        if resumed:
+            print(f"⏩ Reprise du lot: {resumed} albums déjà traités ignorés")
+
+        counters = {STATUS_FOUND: 0, STATUS_NOT_FOUND: 0, STATUS_SKIPPED: 0, STATUS_ERROR: 0}
+        total = len(pending)
+        processed = 0
+
+        print(f"🖼️ Recherche de pochettes en lot: {total} albums")
+        self.logger.info(f"Recherche de pochettes en lot: {total} albums")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="NonotagsCoverBatch") as executor:
+            futures = {executor.submit(self._process_album, album): album for album in pending}
+
+            for future in as_completed(futures):
+                album = futures[future]
+                album_path = album.get('folder_path') or album.get('path', '')
+
+                if future.cancelled():
+                    continue
+                status = future.result()
+                if status is None:
+                    # Album interrompu par stop() : il sera repris au prochain lancement
+                    continue
+
+                self.checkpoint.mark(album_path, status)
+                counters[status] += 1
+                processed += 1
+
+                if progress_callback:
+                    progress_callback(processed, total, album_path, status)
+
+                if self._stop_event.is_set():
+                    for other in futures:
+                        other.cancel()
+
+        if self._stop_event.is_set():
+            self.checkpoint.flush()
+            print(f"⏸️ Lot interrompu après {processed}/{total} albums (reprise possible)")
+        else:
+            self.checkpoint.clear()
+            print(f"✅ Lot terminé: {counters[STATUS_FOUND]} pochettes trouvées, "
+                  f"{counters[STATUS_NOT_FOUND]} introuvables, {counters[STATUS_ERROR]} erreurs")
+
+        self.logger.info(f"Lot pochettes: {counters}")
+        return counters
+
+    def _process_album(self, album: Dict) -> Optional[str]:
+        """Recherche et télécharge la meilleure pochette d'un album (thread de travail)"""
+        if self._stop_event.is_set():
+            return None
+
+        album_path = album.get('folder_path') or album.get('path', '')
+        artist = (album.get('artist') or '').strip()
+        title = (album.get('album') or '').strip()
+        year = str(album.get('year') or '').strip()
+
+        if artist in UNKNOWN_VALUES or title in UNKNOWN_VALUES:
+            return STATUS_SKIPPED
+        if year in UNKNOWN_VALUES:
+            year = None
+
+        target_path = os.path.join(album_path, 'cover.jpg')
+        if os.path.exists(target_path):
+            return STATUS_FOUND
+
+        try:
+            # search_covers renvoie déjà les résultats triés par _filter_and_sort_results
+            results = self.cover_search.search_covers(artist, title, year)
+        except CoverSearchError as e:
+            self.logger.warning(f"Recherche pochette échouée pour {album_path}: {e}")
+            return STATUS_ERROR
+        except Exception as e:
+            self.logger.error(f"Erreur inattendue pour {album_path}: {e}")
+            return STATUS_ERROR
+
+        for candidate in results[:self.candidates_per_album]:
+            if self._stop_event.is_set():
+                return None
+            if self.cover_search.download_cover(candidate, target_path):
+                return STATUS_FOUND
+
+        return STATUS_NOT_FOUND
@@ -7,11 +7,12 @@ import requests
 import json
 import os
 import urllib.parse
-from PIL import Image
+from PIL import Image, ImageFile
 import io
 import time
-from support.logger import AppLogger
-from support.config_manager import ConfigManager
+from support.logger import get_logger
+from support.service_container import get_services
+from support.rate_limiter import get_rate_limiter
 
 
 class CoverSearchError(Exception):
@@ -38,8 +39,8 @@ class CoverSearchService:
     
     def __init__(self):
         """Initialise le service de recherche"""
-        self.logger = AppLogger()
-        self.config = ConfigManager()
+        self.logger = get_logger()
+        self.config = get_services().config
         
         # Configuration des APIs
         self.musicbrainz_base = "https://musicbrainz.org/ws/2"
@@ -58,27 +59,23 @@ class CoverSearchService:
         self.max_results = 20
         self.min_cover_size = 200  # Taille minimum 200x200 (plus souple)
         self.required_formats = ['jpg', 'jpeg']  # JPG uniquement comme demandé
+        self.max_cover_dimension = 8000  # Au-delà : image aberrante, rejetée avant téléchargement complet
+        self.max_download_bytes = self.config.api.max_cover_size_mb * 1024 * 1024
+        self.output_cover_size = 500  # Taille finale de cover.jpg
+        self.download_chunk_size = 16384
         
-        # Délais entre requêtes (politesse envers les APIs)
-        self.request_delay = 0.5  # Plus rapide
-        self.last_request_time = 0
+        # Délais entre requêtes (politesse envers les APIs), partagés entre toutes les instances
+        self.rate_limiter = get_rate_limiter()
         
         self.logger.info("CoverSearchService initialisé")
     
-    def _wait_for_rate_limit(self):
-        """Respecte les limites de taux des APIs"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.request_delay:
-            wait_time = self.request_delay - time_since_last
-            time.sleep(wait_time)
-        
-        self.last_request_time = time.time()
+    def _wait_for_rate_limit(self, url):
+        """Respecte les limites de taux de l'API visée (limiteur partagé entre threads)"""
+        self.rate_limiter.wait(url)
     
     def _make_request(self, url, headers=None, raise_on_error=False):
         """Effectue une requête HTTP avec gestion d'erreurs"""
-        self._wait_for_rate_limit()
+        self._wait_for_rate_limit(url)
         
         try:
             req_headers = self.headers.copy()
@@ -341,6 +338,7 @@ class CoverSearchService:
             # URL de recherche
             search_url = f"{self.itunes_base}"
             
+            self._wait_for_rate_limit(search_url)
             response = requests.get(search_url, params=params, headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
             
@@ -390,9 +388,10 @@ class CoverSearchService:
             # Validation simple: essayer juste de télécharger les headers
             response = requests.head(image_url, headers=self.headers, timeout=3)
             
-            # Si HEAD ne fonctionne pas, essayer GET avec limite
+            # Si HEAD ne fonctionne pas, essayer GET en streaming sans lire le corps
             if response.status_code != 200:
                 response = requests.get(image_url, stream=True, timeout=3, headers=self.headers)
+                response.close()  # Seuls les en-têtes sont utiles : libérer la connexion
                 response.raise_for_status()
             
             # Vérifier le type de contenu
@@ -446,6 +445,7 @@ class CoverSearchService:
             else:
                 print("🌐 Utilisation API Discogs publique")
             
+            self._wait_for_rate_limit(search_url)
             response = requests.get(search_url, params=params, headers=headers, timeout=self.timeout)
             
             # Gérer les erreurs spécifiques
@@ -545,6 +545,11 @@ class CoverSearchService:
         """
         Télécharge une pochette et la sauvegarde
         
+        Le corps est lu en streaming : les dimensions sont extraites de l'en-tête
+        dès les premiers blocs, ce qui permet d'abandonner une image trop petite
+        ou aberrante sans la télécharger entièrement. Le volume total est plafonné
+        par max_download_bytes.
+        
         Args:
             cover_result (CoverResult): Résultat de recherche
             output_path (str): Chemin de sauvegarde
@@ -555,25 +560,36 @@ class CoverSearchService:
         try:
             self.logger.info(f"Téléchargement pochette: {cover_result.url}")
             
-            response = self._make_request(cover_result.url)
-            if not response:
-                return False
+            self._wait_for_rate_limit(cover_result.url)
+            with requests.get(cover_result.url, headers=self.headers,
+                              timeout=self.timeout, stream=True) as response:
+                if response.status_code == 404:
+                    self.logger.debug(f"Ressource non trouvée: {cover_result.url}")
+                    return False
+                response.raise_for_status()
+                
+                # Vérifier le type de contenu
+                content_type = response.headers.get('content-type', '')
+                if not content_type.startswith('image/'):
+                    self.logger.warning(f"Type de contenu invalide: {content_type}")
+                    return False
+                
+                # Taille annoncée : rejet immédiat si elle dépasse le budget
+                content_length = response.headers.get('content-length')
+                if content_length and content_length.isdigit() and int(content_length) > self.max_download_bytes:
+                    self.logger.warning(f"Image trop volumineuse: {content_length} octets")
+                    return False
+                
+                image_data = self._read_cover_stream(response)
+                if image_data is None:
+                    return False
             
-            # Vérifier le type de contenu
-            content_type = response.headers.get('content-type', '')
-            if not content_type.startswith('image/'):
-                self.logger.warning(f"Type de contenu invalide: {content_type}")
-                return False
+            image = Image.open(image_data)
             
-            # Traiter l'image avec PIL
-            image_data = response.content
-            image = Image.open(io.BytesIO(image_data))
+            # JPEG : décodage directement à une échelle réduite proche de la taille finale
+            image.draft('RGB', (self.output_cover_size, self.output_cover_size))
             
-            # Vérifier la taille minimum
             width, height = image.size
-            if width < self.min_cover_size or height < self.min_cover_size:
-                self.logger.warning(f"Image trop petite: {width}x{height}")
-                return False
             
             # Redimensionner si nécessaire (carré)
             if width != height:
@@ -582,8 +598,12 @@ class CoverSearchService:
                                  (width + size) // 2, (height + size) // 2))
             
             # Redimensionner à 500x500 maximum
-            if image.size[0] > 500:
-                image = image.resize((500, 500), Image.Resampling.LANCZOS)
+            if image.size[0] > self.output_cover_size:
+                image = image.resize((self.output_cover_size, self.output_cover_size),
+                                     Image.Resampling.LANCZOS)
+            
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
             
             # Sauvegarder
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -596,6 +616,56 @@ class CoverSearchService:
             self.logger.error(f"Erreur téléchargement pochette: {e}")
             return False
     
+    def _read_cover_stream(self, response):
+        """
+        Lit le corps d'une réponse image en contrôlant dimensions et volume
+        
+        Returns:
+            io.BytesIO prêt à être ouvert par PIL, ou None si l'image est rejetée
+        """
+        buffer = io.BytesIO()
+        parser = ImageFile.Parser()
+        dimensions_checked = False
+        total = 0
+        
+        for chunk in response.iter_content(chunk_size=self.download_chunk_size):
+            total += len(chunk)
+            if total > self.max_download_bytes:
+                self.logger.warning(f"Image trop volumineuse: plus de {self.max_download_bytes} octets")
+                return None
+            buffer.write(chunk)
+            
+            if not dimensions_checked:
+                # Le parser n'est alimenté que jusqu'à la lecture de l'en-tête
+                parser.feed(chunk)
+                if parser.image is not None:
+                    dimensions_checked = True
+                    width, height = parser.image.size
+                    if width < self.min_cover_size or height < self.min_cover_size:
+                        self.logger.warning(f"Image trop petite: {width}x{height}")
+                        return None
+                    if width > self.max_cover_dimension or height > self.max_cover_dimension:
+                        self.logger.warning(f"Image trop grande: {width}x{height}")
+                        return None
+        
+        if not dimensions_checked:
+            # En-tête non reconnu pendant le flux : contrôle sur l'image complète
+            try:
+                with Image.open(io.BytesIO(buffer.getvalue())) as probe:
+                    width, height = probe.size
+            except Exception as e:
+                self.logger.warning(f"Image illisible: {e}")
+                return None
+            if width < self.min_cover_size or height < self.min_cover_size:
+                self.logger.warning(f"Image trop petite: {width}x{height}")
+                return None
+            if width > self.max_cover_dimension or height > self.max_cover_dimension:
+                self.logger.warning(f"Image trop grande: {width}x{height}")
+                return None
+        
+        buffer.seek(0)
+        return buffer
+    
     def get_image_info(self, cover_result):
         """
         Obtient les informations d'une image sans la télécharger
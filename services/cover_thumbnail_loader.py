@@ -0,0 +1,167 @@
+"""
+Chargeur de miniatures de pochettes pour le dialogue de recherche
+Téléchargements parallèles bornés, annulables, avec cache mémoire LRU des images décodées
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import requests
+import gi
+gi.require_version('GdkPixbuf', '2.0')
+from gi.repository import GLib, Gio, GdkPixbuf
+
+from support.cache import gtk_thread_cache
+from support.logger import AppLogger
+
+
+class ThumbnailCancelled(Exception):
+    """Levée en interne quand un téléchargement appartient à une génération annulée"""
+    pass
+
+
+class CoverThumbnailLoader:
+    """
+    Charge les miniatures distantes hors du thread GTK
+
+    Les téléchargements passent par un pool de taille fixe. Chaque appel à
+    cancel_pending() ouvre une nouvelle « génération » : les tâches encore en
+    file sont annulées et celles en cours s'interrompent au prochain bloc lu.
+    Les pixbufs décodés restent en cache pour une réouverture du dialogue.
+    """
+
+    def __init__(self, max_workers: int = 4, cache_size: int = 64,
+                 timeout: int = 10, max_bytes: int = 5 * 1024 * 1024):
+        """
+        Args:
+            max_workers: Nombre maximum de téléchargements simultanés
+            cache_size: Nombre de miniatures décodées conservées en mémoire
+            timeout: Timeout réseau en secondes
+            max_bytes: Taille maximale acceptée pour une miniature
+        """
+        self.logger = AppLogger()
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.headers = {
+            'User-Agent': 'Nonotags/1.0 ( https://github.com/Rono40230/Nonotags )'
+        }
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="NonotagsThumbnail"
+        )
+        self.cache = gtk_thread_cache(cache_size)
+
+        self._generation = 0
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def _cache_key(self, url: str, size: int) -> str:
+        """Clé de cache : même URL à deux tailles différentes = deux entrées"""
+        return f"{size}:{url}"
+
+    def load(self, url: str, size: int, callback: Callable[[Optional[GdkPixbuf.Pixbuf]], None]):
+        """
+        Demande une miniature
+
+        Args:
+            url: URL de l'image
+            size: Taille d'affichage (carré, ratio conservé)
+            callback: Appelé sur le thread GTK avec le pixbuf (ou None si échec).
+                      Jamais appelé si la requête a été annulée entre-temps.
+        """
+        cached = self.cache.get(self._cache_key(url, size))
+        if cached is not None:
+            callback(cached)
+            return
+
+        with self._lock:
+            generation = self._generation
+            future = self.executor.submit(self._fetch_and_decode, url, size, generation)
+            self._pending.add(future)
+
+        future.add_done_callback(
+            lambda f: self._on_task_done(f, url, size, generation, callback)
+        )
+
+    def cancel_pending(self):
+        """Annule toutes les miniatures en attente (fermeture du dialogue ou nouvelle recherche)"""
+        with self._lock:
+            self._generation += 1
+            pending = list(self._pending)
+            self._pending.clear()
+
+        cancelled = sum(1 for future in pending if future.cancel())
+        if pending:
+            self.logger.debug(f"Miniatures annulées: {cancelled} en file, {len(pending) - cancelled} interrompues")
+
+    def _is_current(self, generation: int) -> bool:
+        """Vérifie qu'une tâche appartient encore à la génération active"""
+        with self._lock:
+            return generation == self._generation
+
+    def _fetch_and_decode(self, url: str, size: int, generation: int) -> GdkPixbuf.Pixbuf:
+        """Télécharge puis décode l'image à la taille d'affichage (thread de travail)"""
+        chunks = []
+        total = 0
+
+        with requests.get(url, headers=self.headers, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=16384):
+                if not self._is_current(generation):
+                    raise ThumbnailCancelled(url)
+                total += len(chunk)
+                if total > self.max_bytes:
+                    raise ValueError(f"Miniature trop volumineuse (> {self.max_bytes} octets)")
+                chunks.append(chunk)
+
+        # Décodage directement à la taille voulue : évite de garder l'original en mémoire
+        stream = Gio.MemoryInputStream.new_from_bytes(GLib.Bytes.new(b''.join(chunks)))
+        try:
+            return GdkPixbuf.Pixbuf.new_from_stream_at_scale(stream, size, size, True, None)
+        finally:
+            stream.close(None)
+
+    def _on_task_done(self, future, url: str, size: int, generation: int, callback):
+        """Relaie le résultat d'une tâche vers le thread GTK"""
+        with self._lock:
+            self._pending.discard(future)
+
+        if future.cancelled():
+            return
+
+        error = future.exception()
+        if isinstance(error, ThumbnailCancelled):
+            return
+        if error:
+            self.logger.debug(f"Erreur chargement miniature {url}: {error}")
+
+        pixbuf = None if error else future.result()
+        GLib.idle_add(self._deliver, url, size, generation, pixbuf, callback)
+
+    def _deliver(self, url: str, size: int, generation: int, pixbuf, callback):
+        """Met en cache et transmet la miniature (thread GTK)"""
+        # Une image entièrement téléchargée est gardée même si le dialogue a été fermé
+        if pixbuf is not None:
+            self.cache.put(self._cache_key(url, size), pixbuf)
+
+        if self._is_current(generation):
+            try:
+                callback(pixbuf)
+            except Exception as e:
+                print(f"❌ Erreur affichage miniature: {e}")
+        return False
+
+    def clear_cache(self):
+        """Vide le cache mémoire des miniatures"""
+        self.cache.clear()
+
+    def shutdown(self):
+        """Arrête le pool de téléchargement"""
+        self.cancel_pending()
+        self.executor.shutdown(wait=False)
+
+
+# Instance globale : le cache survit à la fermeture du dialogue de recherche
+cover_thumbnail_loader = CoverThumbnailLoader()
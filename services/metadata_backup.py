@@ -5,46 +5,117 @@ Permet d'annuler les corrections automatiques appliquées lors de l'import
 
 import os
 import json
-import sqlite3
 import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from mutagen.mp3 import MP3
 from mutagen.flac import FLAC
 from mutagen.mp4 import MP4
 from mutagen.id3 import ID3NoHeaderError
 
+from database.db_manager import ConnectionPool
+from support.audio_fingerprint import audio_fingerprint
+from services import tag_snapshot
+
+AUDIO_EXTENSIONS = ('.mp3', '.flac', '.m4a', '.mp4')
+
+# Modes de calcul de l'empreinte des fichiers
+HASH_MODE_AUDIO = "audio"  # données audio seules : stable malgré les modifications de tags
+HASH_MODE_HEAD = "head"    # MD5 des 64 premiers Ko (ancien comportement)
+
+# Longueur des empreintes audio (BLAKE2, 20 octets) ; les MD5 hérités font 32 caractères
+AUDIO_HASH_LENGTH = 40
+
 class MetadataBackup:
     """Gestionnaire de sauvegarde et restauration des métadonnées originales"""
     
-    def __init__(self, db_path="database/metadata_backup.db"):
+    def __init__(self, db_path="database/metadata_backup.db", restore_workers=4,
+                 hash_mode=HASH_MODE_AUDIO):
         self.db_path = db_path
+        self.restore_workers = restore_workers
+        self.hash_mode = hash_mode
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        # Une connexion persistante par thread (WAL) au lieu d'une connexion par appel
+        self._pool = ConnectionPool(self.db_path)
         self._init_database()
     
+    def _get_connection(self):
+        """Connexion du thread courant (à utiliser avec `with` pour une transaction)"""
+        return self._pool.get()
+    
     def _init_database(self):
         """Initialise la base de données de sauvegarde"""
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS original_metadata (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                file_path TEXT NOT NULL,
-                file_hash TEXT NOT NULL,
-                original_metadata TEXT NOT NULL,
-                backup_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                album_path TEXT,
-                UNIQUE(file_path, file_hash)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self._get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS original_metadata (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_path TEXT NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    original_metadata TEXT NOT NULL,
+                    backup_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    album_path TEXT,
+                    UNIQUE(file_path, file_hash)
+                )
+            ''')
+            
+            # Index de recherche : dernière sauvegarde d'un fichier, sauvegardes d'un album
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_original_metadata_file_date
+                ON original_metadata(file_path, backup_date)
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_original_metadata_album
+                ON original_metadata(album_path)
+            ''')
+            # Suivi des fichiers renommés par empreinte audio
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_original_metadata_hash
+                ON original_metadata(file_hash)
+            ''')
+            
+            # Instantanés compressés des tags bruts, un par album
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS tag_snapshots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    album_path TEXT NOT NULL,
+                    snapshot_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    file_count INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    data BLOB NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_tag_snapshots_album
+                ON tag_snapshots(album_path, snapshot_date)
+            ''')
+            
+            # Pochettes intégrées, stockées une seule fois par contenu
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS snapshot_blobs (
+                    blob_hash TEXT PRIMARY KEY,
+                    data BLOB NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS snapshot_blob_refs (
+                    snapshot_id INTEGER NOT NULL,
+                    blob_hash TEXT NOT NULL,
+                    PRIMARY KEY (snapshot_id, blob_hash)
+                )
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_snapshot_blob_refs_hash
+                ON snapshot_blob_refs(blob_hash)
+            ''')
     
     def _get_file_hash(self, file_path):
         """Calcule un hash du fichier pour détecter les changements"""
         try:
+            if self.hash_mode == HASH_MODE_AUDIO:
+                return audio_fingerprint(file_path)
+            
             with open(file_path, 'rb') as f:
                 # Lire seulement les premiers 64KB pour la performance
                 content = f.read(65536)
@@ -110,6 +181,54 @@ class MetadataBackup:
             print(f"❌ Erreur extraction métadonnées {file_path}: {e}")
             return None
     
+    _INSERT_BACKUP = '''
+        INSERT OR REPLACE INTO original_metadata
+        (file_path, file_hash, original_metadata, album_path)
+        VALUES (?, ?, ?, ?)
+    '''
+    
+    def _is_already_backed_up(self, file_hash, known_hashes):
+        """
+        Indique si une sauvegarde existante couvre déjà ce contenu audio
+        
+        En mode audio, la première sauvegarde d'un contenu est l'originale :
+        on ne l'écrase pas après une modification de tags. Les empreintes
+        MD5 héritées ne sont pas comparables et valent sauvegarde.
+        """
+        if self.hash_mode != HASH_MODE_AUDIO:
+            return False
+        return any(known == file_hash or len(known) != AUDIO_HASH_LENGTH for known in known_hashes)
+    
+    def _relink_renamed(self, conn, file_path, file_hash, album_path):
+        """
+        Rattache à son nouveau chemin la sauvegarde d'un fichier renommé
+        
+        Returns:
+            True si une sauvegarde orpheline de même empreinte a été déplacée
+        """
+        cursor = conn.execute('''
+            SELECT id, file_path FROM original_metadata WHERE file_hash = ? AND file_path != ?
+        ''', (file_hash, file_path))
+        
+        for backup_id, old_path in cursor.fetchall():
+            if not os.path.exists(old_path):
+                updated = conn.execute('''
+                    UPDATE OR IGNORE original_metadata SET file_path = ?, album_path = ? WHERE id = ?
+                ''', (file_path, album_path, backup_id))
+                if updated.rowcount == 0:
+                    # Le nouveau chemin a déjà sa propre sauvegarde : rien n'a été rattaché
+                    return False
+                print(f"🔗 Sauvegarde rattachée après renommage: {os.path.basename(file_path)}")
+                return True
+        return False
+    
+    def _store_backups(self, rows):
+        """Enregistre des sauvegardes (file_path, file_hash, json, album_path) en une transaction"""
+        with self._get_connection() as conn:
+            if self.hash_mode == HASH_MODE_AUDIO:
+                rows = [row for row in rows if not self._relink_renamed(conn, row[0], row[1], row[3])]
+            conn.executemany(self._INSERT_BACKUP, rows)
+    
     def backup_file_metadata(self, file_path, album_path=None):
         """Sauvegarde les métadonnées originales d'un fichier"""
         try:
@@ -122,23 +241,19 @@ class MetadataBackup:
             if not file_hash:
                 return False
             
+            cursor = self._get_connection().execute(
+                "SELECT file_hash FROM original_metadata WHERE file_path = ?", (file_path,)
+            )
+            if self._is_already_backed_up(file_hash, [row[0] for row in cursor.fetchall()]):
+                return True
+            
             # Extraire les métadonnées
             metadata = self._extract_metadata(file_path)
             if not metadata:
                 return False
             
             # Sauvegarder en base
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO original_metadata 
-                (file_path, file_hash, original_metadata, album_path)
-                VALUES (?, ?, ?, ?)
-            ''', (file_path, file_hash, json.dumps(metadata), album_path))
-            
-            conn.commit()
-            conn.close()
+            self._store_backups([(file_path, file_hash, json.dumps(metadata), album_path)])
             
             print(f"✅ Métadonnées sauvegardées: {os.path.basename(file_path)}")
             return True
@@ -154,17 +269,35 @@ class MetadataBackup:
                 print(f"Dossier album introuvable: {album_path}")
                 return False
             
-            backup_count = 0
-            audio_extensions = ('.mp3', '.flac', '.m4a', '.mp4')
-            
-            for filename in os.listdir(album_path):
-                if filename.lower().endswith(audio_extensions):
-                    file_path = os.path.join(album_path, filename)
-                    if self.backup_file_metadata(file_path, album_path):
-                        backup_count += 1
-            
-            print(f"✅ {backup_count} fichiers sauvegardés pour l'album {os.path.basename(album_path)}")
-            return backup_count > 0
+            known_hashes = {}
+            for file_path, file_hash in self._query_album(album_path, 'file_hash'):
+                known_hashes.setdefault(file_path, []).append(file_hash)
+            
+            rows = []
+            unchanged = 0
+            fingerprints = {}
+            for file_path in self._list_audio_files(album_path):
+                file_hash = self._get_file_hash(file_path)
+                if not file_hash:
+                    continue
+                if self.hash_mode == HASH_MODE_AUDIO:
+                    fingerprints[file_path] = file_hash
+                if self._is_already_backed_up(file_hash, known_hashes.get(file_path, [])):
+                    unchanged += 1
+                    continue
+                metadata = self._extract_metadata(file_path)
+                if metadata:
+                    rows.append((file_path, file_hash, json.dumps(metadata), album_path))
+            
+            # Toutes les pistes de l'album dans une seule transaction
+            if rows:
+                self._store_backups(rows)
+                # Nouveau contenu : instantané complet des tags d'origine
+                self.snapshot_album(album_path, fingerprints)
+            
+            print(f"✅ {len(rows)} fichiers sauvegardés pour l'album {os.path.basename(album_path)}"
+                  f" ({unchanged} déjà sauvegardés)")
+            return len(rows) + unchanged > 0
             
         except Exception as e:
             print(f"Erreur sauvegarde album {album_path}: {e}")
@@ -173,17 +306,11 @@ class MetadataBackup:
     def has_backup(self, file_path):
         """Vérifie si une sauvegarde existe pour ce fichier"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT COUNT(*) FROM original_metadata WHERE file_path = ?
+            cursor = self._get_connection().execute('''
+                SELECT 1 FROM original_metadata WHERE file_path = ? LIMIT 1
             ''', (file_path,))
             
-            count = cursor.fetchone()[0]
-            conn.close()
-            
-            return count > 0
+            return cursor.fetchone() is not None
             
         except Exception as e:
             print(f"Erreur vérification sauvegarde {file_path}: {e}")
@@ -197,16 +324,12 @@ class MetadataBackup:
                 return False
             
             # Récupérer la sauvegarde
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            cursor = self._get_connection().execute('''
                 SELECT original_metadata FROM original_metadata 
                 WHERE file_path = ? ORDER BY backup_date DESC LIMIT 1
             ''', (file_path,))
             
             result = cursor.fetchone()
-            conn.close()
             
             if not result:
                 print(f"Aucune sauvegarde trouvée pour: {file_path}")
@@ -300,42 +423,277 @@ class MetadataBackup:
             print(f"Erreur écriture métadonnées {file_path}: {e}")
             return False
     
+    def _list_audio_files(self, album_path):
+        """Liste les fichiers audio d'un dossier d'album"""
+        return [
+            os.path.join(album_path, filename)
+            for filename in os.listdir(album_path)
+            if filename.lower().endswith(AUDIO_EXTENSIONS)
+        ]
+    
+    def _query_album(self, album_path, column):
+        """
+        Lit une colonne pour toutes les sauvegardes des fichiers d'un album, en une requête
+        
+        Les fichiers sont retrouvés par album_path ou par préfixe de chemin
+        (sauvegardes faites fichier par fichier, sans album_path) ; les
+        sous-dossiers sont exclus.
+        
+        Returns:
+            Liste de (chemin_fichier, valeur), de la plus ancienne à la plus récente
+        """
+        album_path = album_path.rstrip(os.sep)
+        prefix = album_path + os.sep
+        # Borne haute du préfixe : le séparateur suivi du caractère suivant
+        prefix_end = album_path + chr(ord(os.sep) + 1)
+        
+        cursor = self._get_connection().execute(f'''
+            SELECT file_path, {column} FROM original_metadata
+            WHERE album_path = ? OR (file_path >= ? AND file_path < ?)
+            ORDER BY file_path, backup_date
+        ''', (album_path, prefix, prefix_end))
+        
+        return [row for row in cursor.fetchall() if os.path.dirname(row[0]) == album_path]
+    
+    def get_album_backups(self, album_path):
+        """
+        Récupère en une requête la dernière sauvegarde de chaque fichier d'un album
+        
+        Returns:
+            Dictionnaire {chemin_fichier: métadonnées originales}
+        """
+        try:
+            # La dernière sauvegarde de chaque fichier l'emporte
+            backups = dict(self._query_album(album_path, 'original_metadata'))
+            return {path: json.loads(data) for path, data in backups.items()}
+            
+        except Exception as e:
+            print(f"Erreur récupération sauvegardes album {album_path}: {e}")
+            return {}
+    
     def restore_album_metadata(self, album_path):
         """Restaure les métadonnées de tous les fichiers d'un album"""
+        restored = self.restore_albums_metadata([album_path])
+        return restored.get(album_path, 0) > 0
+    
+    def restore_albums_metadata(self, album_paths, progress_callback=None):
+        """
+        Restaure les métadonnées originales d'une liste d'albums
+        
+        Une requête par album, puis écriture des fichiers en parallèle
+        (les écritures mutagen sont indépendantes d'un fichier à l'autre).
+        
+        Args:
+            album_paths: Dossiers des albums à restaurer
+            progress_callback: Appelé avec (albums_traités, total, chemin_album, fichiers_restaurés)
+            
+        Returns:
+            Dictionnaire {chemin_album: nombre de fichiers restaurés}
+        """
+        restored = {}
+        total = len(album_paths)
+        
+        with ThreadPoolExecutor(max_workers=self.restore_workers,
+                                thread_name_prefix="NonotagsRestore") as executor:
+            for index, album_path in enumerate(album_paths, 1):
+                try:
+                    if not os.path.exists(album_path):
+                        print(f"Dossier album introuvable: {album_path}")
+                        restored[album_path] = 0
+                        continue
+                    
+                    backups = self.get_album_backups(album_path)
+                    jobs = [
+                        executor.submit(self._write_metadata_to_file, file_path, backups[file_path])
+                        for file_path in self._list_audio_files(album_path)
+                        if file_path in backups
+                    ]
+                    restored_count = sum(1 for job in jobs if job.result())
+                    
+                except Exception as e:
+                    print(f"Erreur restauration album {album_path}: {e}")
+                    restored_count = 0
+                
+                restored[album_path] = restored_count
+                print(f"✅ {restored_count} fichiers restaurés pour l'album {os.path.basename(album_path)}")
+                
+                if progress_callback:
+                    progress_callback(index, total, album_path, restored_count)
+        
+        return restored
+    
+    # === Instantanés complets des tags ===
+    
+    def snapshot_album(self, album_path, fingerprints=None):
+        """
+        Capture les tags bruts complets de tous les fichiers d'un album
+        
+        Les blocs de tags sont compressés ensemble ; les pochettes intégrées
+        sont stockées une seule fois par contenu. Aucun instantané n'est ajouté
+        si le contenu est identique au dernier instantané de l'album.
+        
+        Args:
+            album_path: Dossier de l'album
+            fingerprints: Empreintes audio déjà calculées par chemin (optionnel)
+        
+        Returns:
+            Identifiant de l'instantané (nouveau ou existant), None en cas d'échec
+        """
         try:
             if not os.path.exists(album_path):
                 print(f"Dossier album introuvable: {album_path}")
-                return False
+                return None
             
-            restored_count = 0
-            audio_extensions = ('.mp3', '.flac', '.m4a', '.mp4')
+            blobs = {}
+            files = {}
+            for file_path in self._list_audio_files(album_path):
+                try:
+                    entry = tag_snapshot.capture_file(file_path, blobs,
+                                                      (fingerprints or {}).get(file_path))
+                except Exception as e:
+                    print(f"⚠️ Tags non capturés pour {os.path.basename(file_path)}: {e}")
+                    continue
+                if entry:
+                    files[os.path.basename(file_path)] = entry
+            
+            if not files:
+                return None
+            
+            data = tag_snapshot.encode_snapshot(files)
+            content_hash = hashlib.blake2b(data, digest_size=20).hexdigest()
+            
+            with self._get_connection() as conn:
+                latest = conn.execute('''
+                    SELECT id, content_hash FROM tag_snapshots
+                    WHERE album_path = ? ORDER BY snapshot_date DESC, id DESC LIMIT 1
+                ''', (album_path,)).fetchone()
+                if latest and latest[1] == content_hash:
+                    return latest[0]
+                
+                conn.executemany(
+                    "INSERT OR IGNORE INTO snapshot_blobs (blob_hash, data) VALUES (?, ?)",
+                    [(digest, sqlite3.Binary(blob)) for digest, blob in blobs.items()]
+                )
+                snapshot_id = conn.execute('''
+                    INSERT INTO tag_snapshots (album_path, file_count, content_hash, data)
+                    VALUES (?, ?, ?, ?)
+                ''', (album_path, len(files), content_hash, sqlite3.Binary(data))).lastrowid
+                conn.executemany(
+                    "INSERT OR IGNORE INTO snapshot_blob_refs (snapshot_id, blob_hash) VALUES (?, ?)",
+                    [(snapshot_id, digest) for digest in blobs]
+                )
+            
+            print(f"📸 Instantané des tags: {len(files)} fichiers, {len(data)} octets, "
+                  f"{len(blobs)} pochettes ({os.path.basename(album_path)})")
+            return snapshot_id
             
-            for filename in os.listdir(album_path):
-                if filename.lower().endswith(audio_extensions):
-                    file_path = os.path.join(album_path, filename)
-                    if self.restore_file_metadata(file_path):
-                        restored_count += 1
+        except Exception as e:
+            print(f"Erreur instantané album {album_path}: {e}")
+            return None
+    
+    def list_album_snapshots(self, album_path):
+        """Liste les instantanés d'un album, du plus ancien au plus récent"""
+        try:
+            cursor = self._get_connection().execute('''
+                SELECT id, snapshot_date, file_count, LENGTH(data) FROM tag_snapshots
+                WHERE album_path = ? ORDER BY snapshot_date, id
+            ''', (album_path,))
             
-            print(f"✅ {restored_count} fichiers restaurés pour l'album {os.path.basename(album_path)}")
-            return restored_count > 0
+            return [
+                {'id': row[0], 'snapshot_date': row[1], 'file_count': row[2], 'size_bytes': row[3]}
+                for row in cursor.fetchall()
+            ]
             
         except Exception as e:
-            print(f"Erreur restauration album {album_path}: {e}")
-            return False
+            print(f"Erreur liste instantanés {album_path}: {e}")
+            return []
+    
+    def restore_album_snapshot(self, album_path, snapshot_id=None):
+        """
+        Réécrit à l'octet près les tags capturés dans un instantané
+        
+        Un fichier n'est restauré que si son empreinte audio correspond à
+        l'entrée capturée : par nom, sinon par empreinte s'il a été renommé.
+        Un fichier de même nom dont l'audio a changé (réencodé, remplacé)
+        est laissé intact, les en-têtes capturés ne décrivant pas son flux.
+        Les données audio actuelles sont conservées.
+        
+        Args:
+            album_path: Dossier de l'album
+            snapshot_id: Instantané à restaurer (par défaut le plus ancien : tags d'origine)
+            
+        Returns:
+            Nombre de fichiers restaurés
+        """
+        try:
+            conn = self._get_connection()
+            if snapshot_id is None:
+                row = conn.execute('''
+                    SELECT data FROM tag_snapshots
+                    WHERE album_path = ? ORDER BY snapshot_date, id LIMIT 1
+                ''', (album_path,)).fetchone()
+            else:
+                row = conn.execute("SELECT data FROM tag_snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+            
+            if not row:
+                print(f"Aucun instantané trouvé pour: {album_path}")
+                return 0
+            
+            files = tag_snapshot.decode_snapshot(bytes(row[0]))
+            digests = tag_snapshot.referenced_blobs(files)
+            blobs = {}
+            if digests:
+                placeholders = ','.join('?' * len(digests))
+                blobs = {
+                    digest: bytes(data) for digest, data in conn.execute(
+                        f"SELECT blob_hash, data FROM snapshot_blobs WHERE blob_hash IN ({placeholders})",
+                        digests
+                    )
+                }
+            
+            by_fingerprint = {entry.fingerprint: entry for entry in files.values()}
+            
+            def restore(file_path):
+                try:
+                    # Association fichier actuel → entrée, toujours vérifiée par l'empreinte audio
+                    fingerprint = audio_fingerprint(file_path)
+                    named = files.get(os.path.basename(file_path))
+                    if named is not None and named.fingerprint == fingerprint:
+                        entry = named
+                    else:
+                        entry = by_fingerprint.get(fingerprint)
+                    if entry is None:
+                        if named is not None:
+                            print(f"⚠️ Audio modifié depuis l'instantané, fichier ignoré: "
+                                  f"{os.path.basename(file_path)}")
+                        return False
+                    head = tag_snapshot.join_segments(entry.segments, blobs)
+                    tag_snapshot.restore_file(file_path, entry.kind, head, entry.tail)
+                    return True
+                except Exception as e:
+                    print(f"Erreur restauration instantané {file_path}: {e}")
+                    return False
+            
+            with ThreadPoolExecutor(max_workers=self.restore_workers,
+                                    thread_name_prefix="NonotagsRestore") as executor:
+                restored_count = sum(1 for ok in executor.map(restore, self._list_audio_files(album_path)) if ok)
+            
+            print(f"✅ {restored_count} fichiers restaurés depuis l'instantané ({os.path.basename(album_path)})")
+            return restored_count
+            
+        except Exception as e:
+            print(f"Erreur restauration instantané {album_path}: {e}")
+            return 0
     
     def get_backup_info(self, file_path):
         """Récupère les informations de sauvegarde d'un fichier"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            cursor = self._get_connection().execute('''
                 SELECT backup_date, original_metadata FROM original_metadata 
                 WHERE file_path = ? ORDER BY backup_date DESC LIMIT 1
             ''', (file_path,))
             
             result = cursor.fetchone()
-            conn.close()
             
             if result:
                 return {
@@ -352,17 +710,27 @@ class MetadataBackup:
     def cleanup_old_backups(self, days_old=30):
         """Nettoie les anciennes sauvegardes"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                DELETE FROM original_metadata 
-                WHERE backup_date < datetime('now', '-{} days')
-            '''.format(days_old))
-            
-            deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
+            with self._get_connection() as conn:
+                cursor = conn.execute('''
+                    DELETE FROM original_metadata 
+                    WHERE backup_date < datetime('now', ?)
+                ''', (f'-{int(days_old)} days',))
+                
+                deleted_count = cursor.rowcount
+                
+                # Instantanés expirés, puis pochettes qui ne sont plus référencées
+                conn.execute('''
+                    DELETE FROM snapshot_blob_refs WHERE snapshot_id IN (
+                        SELECT id FROM tag_snapshots WHERE snapshot_date < datetime('now', ?)
+                    )
+                ''', (f'-{int(days_old)} days',))
+                conn.execute('''
+                    DELETE FROM tag_snapshots WHERE snapshot_date < datetime('now', ?)
+                ''', (f'-{int(days_old)} days',))
+                conn.execute('''
+                    DELETE FROM snapshot_blobs
+                    WHERE blob_hash NOT IN (SELECT blob_hash FROM snapshot_blob_refs)
+                ''')
             
             print(f"🧹 {deleted_count} anciennes sauvegardes supprimées")
             return deleted_count
@@ -371,5 +739,23 @@ class MetadataBackup:
             print(f"Erreur nettoyage sauvegardes: {e}")
             return 0
 
-# Instance globale
-metadata_backup = MetadataBackup()
\ No newline at end of file
+# Instance globale, créée au premier usage : importer le module n'ouvre aucune base
+_metadata_backup_instance = None
+_metadata_backup_lock = threading.Lock()
+
+def get_metadata_backup() -> MetadataBackup:
+    """Retourne le gestionnaire de sauvegarde global."""
+    global _metadata_backup_instance
+
+    if _metadata_backup_instance is None:
+        with _metadata_backup_lock:
+            if _metadata_backup_instance is None:
+                _metadata_backup_instance = MetadataBackup()
+
+    return _metadata_backup_instance
+
+def __getattr__(name):
+    """Accès historique : from services.metadata_backup import metadata_backup"""
+    if name == 'metadata_backup':
+        return get_metadata_backup()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,8 +3,9 @@ Gestionnaire d'événements pour les métadonnées
 Système d'observateur pour notifier automatiquement les cards des changements
 """
 
-from typing import Dict, List, Callable, Set
-import os
+from typing import Dict, List, Callable, Tuple
+
+from support.event_bus import Dispatch, EventBus, Subscription, Topic
 
 
 class MetadataEventManager:
@@ -23,22 +24,35 @@ class MetadataEventManager:
             return
         self._initialized = True
         
-        # Dictionnaire : album_path -> set(callbacks)
-        self._observers: Dict[str, Set[Callable]] = {}
-        print("📡 MetadataEventManager initialisé")
+        # Bus d'événements : abonnement par préfixe de chemin d'album
+        self.events = EventBus()
+        
+        # (album_path, callback) -> abonnement, pour le désenregistrement
+        self._observers: Dict[Tuple[str, Callable], Subscription] = {}
     
-    def register_observer(self, album_path: str, callback: Callable):
+    def register_observer(self, album_path: str, callback: Callable,
+                          dispatch: Dispatch = Dispatch.GTK):
         """Enregistre un observateur pour un album spécifique
         
         Args:
-            album_path: Chemin de l'album à observer
+            album_path: Chemin de l'album à observer (les sous-dossiers sont inclus)
             callback: Fonction à appeler lors des changements
+            dispatch: Thread de livraison (par défaut la boucle GTK : les observateurs
+                      sont des cartes et celui qui notifie n'attend pas leur mise à jour)
         """
-        if album_path not in self._observers:
-            self._observers[album_path] = set()
+        if (album_path, callback) in self._observers:
+            return
+        
+        def deliver(event):
+            updated_metadata = event.data.get('metadata')
+            if updated_metadata is not None:
+                callback(updated_metadata)
+            else:
+                callback()
         
-        self._observers[album_path].add(callback)
-        print(f"📝 Observateur enregistré pour: {os.path.basename(album_path)}")
+        self._observers[(album_path, callback)] = self.events.subscribe(
+            Topic.METADATA_CHANGED, deliver, path_prefix=album_path, dispatch=dispatch
+        )
     
     def unregister_observer(self, album_path: str, callback: Callable):
         """Désenregistre un observateur
@@ -47,39 +61,30 @@ class MetadataEventManager:
             album_path: Chemin de l'album
             callback: Fonction à retirer
         """
-        if album_path in self._observers:
-            self._observers[album_path].discard(callback)
-            if not self._observers[album_path]:
-                del self._observers[album_path]
-            print(f"📝 Observateur désenregistré pour: {os.path.basename(album_path)}")
+        subscription = self._observers.pop((album_path, callback), None)
+        if subscription is not None:
+            self.events.unsubscribe(subscription)
     
-    def notify_metadata_changed(self, album_paths: List[str], updated_metadata: Dict = None):
+    def notify_metadata_changed(self, album_paths: List[str], updated_metadata: Dict = None) -> int:
         """Notifie tous les observateurs des albums modifiés
         
         Args:
             album_paths: Liste des chemins d'albums modifiés
             updated_metadata: Métadonnées mises à jour (optionnel)
+            
+        Returns:
+            Nombre de notifications envoyées ou mises en file
         """
         if not album_paths:
-            return
+            return 0
         
         notifications_sent = 0
-        
         for album_path in album_paths:
-            if album_path in self._observers:
-                observers = self._observers[album_path].copy()  # Copie pour éviter les modifications concurrentes
-                for callback in observers:
-                    try:
-                        # Appeler le callback avec les nouvelles métadonnées si disponibles
-                        if updated_metadata and album_path in updated_metadata:
-                            callback(updated_metadata[album_path])
-                        else:
-                            callback()
-                        notifications_sent += 1
-                    except Exception as e:
-                        print(f"❌ Erreur notification observateur pour {os.path.basename(album_path)}: {e}")
-        
-        print(f"📡 {notifications_sent} notifications envoyées pour {len(album_paths)} albums modifiés")
+            metadata = updated_metadata.get(album_path) if updated_metadata else None
+            notifications_sent += self.events.publish(
+                Topic.METADATA_CHANGED, {'metadata': metadata}, album_path
+            )
+        return notifications_sent
     
     def notify_single_album(self, album_path: str, updated_metadata: Dict = None):
         """Notifie les observateurs d'un seul album
@@ -92,18 +97,21 @@ class MetadataEventManager:
     
     def get_observer_count(self) -> int:
         """Retourne le nombre total d'observateurs enregistrés"""
-        return sum(len(observers) for observers in self._observers.values())
+        return len(self._observers)
     
     def get_observed_albums(self) -> List[str]:
         """Retourne la liste des albums actuellement observés"""
-        return list(self._observers.keys())
+        return list({album_path for album_path, _ in self._observers})
+    
+    def get_statistics(self) -> Dict:
+        """Coût mesuré des notifications (publication et observateurs)"""
+        return self.events.get_stats()
     
     def clear_all_observers(self):
         """Supprime tous les observateurs (pour nettoyage)"""
-        count = self.get_observer_count()
+        self.events.clear()
         self._observers.clear()
-        print(f"🧹 {count} observateurs supprimés")
 
 
 # Instance globale pour accès facile
-metadata_event_manager = MetadataEventManager()
\ No newline at end of file
+metadata_event_manager = MetadataEventManager()
@@ -5,7 +5,7 @@ Détecte automatiquement les albums et extrait les métadonnées
 
 import os
 import re
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 import mutagen
 from mutagen.mp3 import MP3
@@ -24,12 +24,14 @@ except ImportError:
     WAV = None
 from services.metadata_backup import metadata_backup
 from support.thread_pool import get_thread_pool
+from database.library_catalog import MUSIC_EXTENSIONS, folder_signature
+from services.album_facts import album_facts_from_tracks
 
 class MusicScanner:
     """Service de scan des dossiers musicaux"""
     
     def __init__(self):
-        self.supported_formats = ['.mp3', '.flac', '.ogg', '.m4a', '.wav']
+        self.supported_formats = list(MUSIC_EXTENSIONS)
         self.albums_found = []
         
     def scan_directory(self, directory_path: str, progress_callback=None) -> List[Dict]:
@@ -53,7 +55,7 @@ class MusicScanner:
             music_files = self._filter_music_files(files)
             
             if music_files:
-                album_data = self._analyze_folder(root, music_files)
+                album_data = self._analyze_folder(root, music_files, files)
                 if album_data:
                     # Sauvegarder les métadonnées originales avant toute correction
                     try:
@@ -68,6 +70,55 @@ class MusicScanner:
         
         return self.albums_found
     
+    def reconcile_directory(self, directory_path: str, known_signatures: Dict[str, Optional[str]],
+                            progress_callback=None) -> Tuple[List[Dict], List[str]]:
+        """
+        Compare un dossier au catalogue et ne réanalyse que les albums modifiés
+        
+        Seuls les noms, tailles et dates des fichiers sont lus pour les
+        dossiers inchangés ; les tags ne sont relus que si l'empreinte diffère.
+        
+        Args:
+            directory_path: Dossier racine de la bibliothèque
+            known_signatures: Empreintes du catalogue ({folder_path: signature})
+            progress_callback: Appelé avec (dossiers_vérifiés, albums_modifiés)
+            
+        Returns:
+            (albums nouveaux ou modifiés, chemins des albums disparus)
+        """
+        changed = []
+        seen = set()
+        checked = 0
+        
+        if not os.path.exists(directory_path):
+            return changed, list(known_signatures)
+        
+        for root, dirs, files in os.walk(directory_path):
+            music_files = self._filter_music_files(files)
+            if not music_files:
+                continue
+            
+            checked += 1
+            signature = folder_signature(root, music_files)
+            if root in known_signatures and known_signatures[root] == signature:
+                seen.add(root)
+                continue
+            
+            album_data = self._analyze_folder(root, music_files, files)
+            if album_data:
+                seen.add(root)
+                try:
+                    metadata_backup.backup_album_metadata(root)
+                except Exception as e:
+                    print(f"⚠️ Erreur sauvegarde métadonnées {root}: {e}")
+                changed.append(album_data)
+            
+            if progress_callback:
+                progress_callback(checked, len(changed))
+        
+        removed = [path for path in known_signatures if path not in seen]
+        return changed, removed
+    
     def _process_album_batch(self, root: str, music_files: List[str]) -> Optional[Dict]:
         """Traite un album dans un contexte threadé (pour batch processing)"""
         album_data = self._analyze_folder(root, music_files)
@@ -77,10 +128,15 @@ class MusicScanner:
         """Filtre les fichiers musicaux supportés"""
         return [f for f in files if any(f.lower().endswith(ext) for ext in self.supported_formats)]
     
-    def _analyze_folder(self, folder_path: str, music_files: List[str]) -> Optional[Dict]:
+    def _analyze_folder(self, folder_path: str, music_files: List[str],
+                        folder_files: Optional[List[str]] = None) -> Optional[Dict]:
         """
         Analyse un dossier contenant des fichiers musicaux
         Essaie de déterminer s'il s'agit d'un album cohérent
+        
+        Les faits dérivés (plage d'années, durée totale, pochette) sont calculés
+        au passage depuis les pistes déjà lues, sans relire les fichiers.
+        folder_files (contenu complet du dossier) évite de tester chaque nom de pochette.
         """
         if not music_files:
             return None
@@ -100,6 +156,7 @@ class MusicScanner:
             file_path = os.path.join(folder_path, music_file)
             track_metadata = self._extract_metadata(file_path)
             if track_metadata:
+                track_metadata['file_name'] = music_file
                 tracks_info.append(track_metadata)
         
         # Vérifie la cohérence (même artiste/album pour la majorité des pistes)
@@ -110,9 +167,14 @@ class MusicScanner:
                 'tracks': len(music_files),
                 'folder_path': folder_path,
                 'files': music_files,
+                'track_metadata': tracks_info,
+                'signature': folder_signature(folder_path, music_files),
                 'emoji': self._get_genre_emoji(refined_metadata.get('genre', '')),
                 'color': self._get_genre_color(refined_metadata.get('genre', ''))
             })
+            facts = album_facts_from_tracks(folder_path, tracks_info, folder_files)
+            facts['tracks'] = len(music_files)
+            refined_metadata.update(facts)
             return refined_metadata
             
         return None
@@ -131,7 +193,8 @@ class MusicScanner:
                     'album': self._get_tag_value(audio, 'TALB') or 'Album Inconnu',
                     'year': self._extract_year(audio),
                     'genre': self._get_tag_value(audio, 'TCON') or 'Genre Inconnu',
-                    'track_number': self._get_tag_value(audio, 'TRCK')
+                    'track_number': self._get_tag_value(audio, 'TRCK'),
+                    'duration': audio.info.length
                 }
             
             elif file_ext('.flac') and FLAC:
@@ -143,7 +206,8 @@ class MusicScanner:
                     'album': audio.get('album', ['Album Inconnu'])[0],
                     'year': audio.get('date', ['----'])[0][:4] if audio.get('date') else '----',
                     'genre': audio.get('genre', ['Genre Inconnu'])[0],
-                    'track_number': audio.get('tracknumber', [None])[0]
+                    'track_number': audio.get('tracknumber', [None])[0],
+                    'duration': audio.info.length
                 }
             
             elif (file_ext('.m4a') or file_ext('.mp4')) and MP4:
@@ -155,7 +219,8 @@ class MusicScanner:
                     'album': audio.get('\xa9alb', ['Album Inconnu'])[0],
                     'year': audio.get('\xa9day', ['----'])[0][:4] if audio.get('\xa9day') else '----',
                     'genre': audio.get('\xa9gen', ['Genre Inconnu'])[0],
-                    'track_number': audio.get('trkn', [(None,)])[0][0]
+                    'track_number': audio.get('trkn', [(None,)])[0][0],
+                    'duration': audio.info.length
                 }
             
             elif file_ext('.ogg'):
@@ -169,7 +234,8 @@ class MusicScanner:
                         'album': audio.get('album', ['Album Inconnu'])[0],
                         'year': audio.get('date', ['----'])[0][:4] if audio.get('date') else '----',
                         'genre': audio.get('genre', ['Genre Inconnu'])[0],
-                        'track_number': audio.get('tracknumber', [None])[0]
+                        'track_number': audio.get('tracknumber', [None])[0],
+                        'duration': audio.info.length
                     }
                 except ImportError:
                     # Fallback si mutagen.oggvorbis n'est pas disponible
@@ -179,7 +245,9 @@ class MusicScanner:
                 # Support WAV (métadonnées limitées)
                 audio = WAV(file_path)
                 # WAV a très peu de métadonnées, on utilise le nom de fichier
-                return self._guess_metadata_from_filename(file_path)
+                metadata = self._guess_metadata_from_filename(file_path)
+                metadata['duration'] = audio.info.length
+                return metadata
         
         except (ID3NoHeaderError, Exception) as e:
             # Erreur lecture métadonnées, utiliser le nom de fichier
@@ -0,0 +1,258 @@
+"""
+Report des tags et de la pochette lors d'une conversion
+Une seule lecture mutagen du fichier source, une seule écriture du fichier
+converti : la sortie n'a pas à repasser dans le pipeline de traitement
+"""
+
+import base64
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+
+# Champs reportés : nom générique -> (trame ID3, clé Vorbis, clé MP4)
+CARRY_FIELDS = {
+    'title': ('TIT2', 'TITLE', '\xa9nam'),
+    'artist': ('TPE1', 'ARTIST', '\xa9ART'),
+    'album_artist': ('TPE2', 'ALBUMARTIST', 'aART'),
+    'album': ('TALB', 'ALBUM', '\xa9alb'),
+    'year': ('TDRC', 'DATE', '\xa9day'),
+    'genre': ('TCON', 'GENRE', '\xa9gen'),
+    'composer': ('TCOM', 'COMPOSER', '\xa9wrt'),
+    'track_number': ('TRCK', 'TRACKNUMBER', 'trkn'),
+    'disc_number': ('TPOS', 'DISCNUMBER', 'disk'),
+}
+
+# Totaux Vorbis séparés du numéro (TRACKNUMBER=3 + TRACKTOTAL=12 -> "3/12")
+_VORBIS_TOTALS = {
+    'track_number': ('TRACKTOTAL', 'TOTALTRACKS'),
+    'disc_number': ('DISCTOTAL', 'TOTALDISCS'),
+}
+
+_FRONT_COVER = 3  # Type d'image « couverture avant » (ID3 APIC / FLAC PICTURE)
+
+
+@dataclass
+class CarriedTags:
+    """Tags normalisés et pochette lus sur le fichier source"""
+    fields: Dict[str, str] = field(default_factory=dict)
+    cover: Optional[bytes] = None
+    cover_mime: str = "image/jpeg"
+    duration: float = 0.0
+
+    def is_empty(self) -> bool:
+        return not self.fields and self.cover is None
+
+
+def _normalize(value) -> str:
+    """Valeur de tag en texte, sans espaces superflus"""
+    return " ".join(str(value).split())
+
+
+def _pick_cover(pictures) -> Optional[Tuple[bytes, str]]:
+    """Couverture avant si présente, sinon la première image"""
+    pictures = [p for p in pictures if p.data]
+    if not pictures:
+        return None
+    front = next((p for p in pictures if p.type == _FRONT_COVER), pictures[0])
+    return front.data, front.mime or "image/jpeg"
+
+
+# === Lecture de la source ===
+
+def _read_id3(tags, carried: CarriedTags):
+    for name, (frame_id, _, _) in CARRY_FIELDS.items():
+        frame = tags.get(frame_id)
+        if frame is not None and frame.text:
+            carried.fields[name] = _normalize(frame.text[0])
+    cover = _pick_cover(tags.getall('APIC'))
+    if cover:
+        carried.cover, carried.cover_mime = cover
+
+
+def _read_vorbis(audio, carried: CarriedTags):
+    tags = audio.tags or {}
+    for name, (_, key, _) in CARRY_FIELDS.items():
+        values = tags.get(key)
+        if values:
+            carried.fields[name] = _normalize(values[0])
+
+    for name, total_keys in _VORBIS_TOTALS.items():
+        number = carried.fields.get(name)
+        total = next((tags[key][0] for key in total_keys if tags.get(key)), None)
+        if number and total and '/' not in number:
+            carried.fields[name] = f"{number}/{_normalize(total)}"
+
+    from mutagen.flac import Picture
+    pictures = list(getattr(audio, 'pictures', []))  # FLAC : blocs PICTURE
+    for encoded in tags.get('METADATA_BLOCK_PICTURE', []):  # Ogg : images en base64
+        try:
+            pictures.append(Picture(base64.b64decode(encoded)))
+        except Exception:
+            continue
+    cover = _pick_cover(pictures)
+    if cover:
+        carried.cover, carried.cover_mime = cover
+
+
+def _read_mp4(tags, carried: CarriedTags):
+    from mutagen.mp4 import MP4Cover
+
+    for name, (_, _, key) in CARRY_FIELDS.items():
+        values = tags.get(key)
+        if not values:
+            continue
+        if key in ('trkn', 'disk'):
+            number, total = values[0]
+            if number:
+                carried.fields[name] = f"{number}/{total}" if total else str(number)
+        else:
+            carried.fields[name] = _normalize(values[0])
+
+    covers = tags.get('covr')
+    if covers:
+        cover = covers[0]
+        carried.cover = bytes(cover)
+        carried.cover_mime = "image/png" if cover.imageformat == MP4Cover.FORMAT_PNG else "image/jpeg"
+
+
+def read_source_tags(file_path: str) -> CarriedTags:
+    """
+    Lit en une seule ouverture les tags, la pochette et la durée d'un fichier audio
+
+    Args:
+        file_path: Fichier source (MP3, FLAC, OGG, M4A, WAV...)
+
+    Returns:
+        Tags normalisés (vide si le fichier n'a pas de tags lisibles)
+    """
+    import mutagen  # Import différé : seul le convertisseur en a besoin
+    from mutagen.id3 import ID3
+    from mutagen.mp4 import MP4Tags
+
+    carried = CarriedTags()
+    audio = mutagen.File(file_path)
+    if audio is None:
+        return carried
+    if audio.info and audio.info.length:
+        carried.duration = float(audio.info.length)
+
+    tags = audio.tags
+    if isinstance(tags, ID3):
+        _read_id3(tags, carried)
+    elif isinstance(tags, MP4Tags):
+        _read_mp4(tags, carried)
+    elif tags is not None or getattr(audio, 'pictures', None):
+        _read_vorbis(audio, carried)  # FLAC sans commentaires mais avec pochette compris
+    return carried
+
+
+# === Écriture de la cible ===
+
+def _fill_id3(tags, carried: CarriedTags):
+    from mutagen.id3 import APIC, Frames
+
+    tags.clear()  # Rien de ce qu'a écrit FFmpeg n'est conservé
+    for name, value in carried.fields.items():
+        frame_id = CARRY_FIELDS[name][0]
+        tags.add(Frames[frame_id](encoding=3, text=value))
+    if carried.cover is not None:
+        tags.add(APIC(encoding=3, mime=carried.cover_mime, type=_FRONT_COVER,
+                      desc='Cover', data=carried.cover))
+
+
+def _flac_picture(carried: CarriedTags):
+    from mutagen.flac import Picture
+
+    picture = Picture()
+    picture.type = _FRONT_COVER
+    picture.mime = carried.cover_mime
+    picture.desc = 'Cover'
+    picture.data = carried.cover
+    return picture
+
+
+def _fill_vorbis(tags, carried: CarriedTags):
+    tags.clear()
+    for name, value in carried.fields.items():
+        key = CARRY_FIELDS[name][1]
+        if name in _VORBIS_TOTALS and '/' in value:
+            value, _, total = value.partition('/')
+            tags[_VORBIS_TOTALS[name][0]] = total
+        tags[key] = value
+
+
+def _fill_mp4(tags, carried: CarriedTags):
+    from mutagen.mp4 import MP4Cover
+
+    tags.clear()
+    for name, value in carried.fields.items():
+        key = CARRY_FIELDS[name][2]
+        if key in ('trkn', 'disk'):
+            number, _, total = value.partition('/')
+            try:
+                tags[key] = [(int(number), int(total) if total else 0)]
+            except ValueError:
+                continue
+        else:
+            tags[key] = [value]
+    if carried.cover is not None:
+        image_format = MP4Cover.FORMAT_PNG if carried.cover_mime == "image/png" else MP4Cover.FORMAT_JPEG
+        tags['covr'] = [MP4Cover(carried.cover, imageformat=image_format)]
+
+
+def write_target_tags(file_path: str, carried: CarriedTags):
+    """
+    Écrit les tags et la pochette reportés dans le fichier converti, en une sauvegarde
+
+    Les tags déjà présents dans la cible sont remplacés.
+
+    Args:
+        file_path: Fichier converti (mp3, flac, ogg, m4a, wav)
+        carried: Tags lus par read_source_tags()
+
+    Raises:
+        Exception: Erreur mutagen ou d'accès au fichier (remontée à l'appelant)
+    """
+    lower_path = file_path.lower()
+
+    if lower_path.endswith('.mp3'):
+        from mutagen.id3 import ID3
+        tags = ID3()
+        _fill_id3(tags, carried)
+        tags.save(file_path)
+
+    elif lower_path.endswith('.wav'):
+        from mutagen.wave import WAVE
+        audio = WAVE(file_path)
+        if audio.tags is None:
+            audio.add_tags()
+        _fill_id3(audio.tags, carried)
+        audio.save()
+
+    elif lower_path.endswith('.flac'):
+        from mutagen.flac import FLAC
+        audio = FLAC(file_path)
+        if audio.tags is None:
+            audio.add_tags()
+        _fill_vorbis(audio.tags, carried)
+        audio.clear_pictures()
+        if carried.cover is not None:
+            audio.add_picture(_flac_picture(carried))
+        audio.save()
+
+    elif lower_path.endswith('.ogg'):
+        from mutagen.oggvorbis import OggVorbis
+        audio = OggVorbis(file_path)
+        _fill_vorbis(audio.tags, carried)
+        if carried.cover is not None:
+            encoded = base64.b64encode(_flac_picture(carried).write()).decode('ascii')
+            audio.tags['METADATA_BLOCK_PICTURE'] = [encoded]
+        audio.save()
+
+    elif lower_path.endswith(('.m4a', '.mp4')):
+        from mutagen.mp4 import MP4
+        audio = MP4(file_path)
+        if audio.tags is None:
+            audio.add_tags()
+        _fill_mp4(audio.tags, carried)
+        audio.save()
@@ -0,0 +1,351 @@
+"""
+Instantanés binaires des blocs de tags bruts
+Capture les tags complets d'un fichier (ID3v2/ID3v1/APE, blocs FLAC, atome MP4 ilst)
+pour une restauration à l'octet près ; les pochettes intégrées sont extraites
+et dédupliquées par empreinte de contenu.
+"""
+
+import hashlib
+import io
+import os
+import struct
+import zlib
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from support.audio_fingerprint import audio_fingerprint, audio_payload_range
+
+# Types de fichiers d'un instantané
+KIND_RAW = 1   # tags en tête et en fin de fichier autour des données audio (MP3, FLAC)
+KIND_MP4 = 2   # atome ilst (restauré via mutagen)
+
+# Segments d'un bloc de tags
+SEGMENT_INLINE = 0
+SEGMENT_BLOB = 1
+
+# En dessous de cette taille une image reste dans le bloc de tags
+MIN_BLOB_SIZE = 1024
+
+SNAPSHOT_MAGIC = b'NTS1'
+
+# Segment : octets bruts ou référence (empreinte) vers une image dédupliquée
+Segment = Tuple[int, bytes]
+
+
+class SnapshotEntry(NamedTuple):
+    """Tags capturés d'un fichier"""
+    kind: int
+    fingerprint: str          # empreinte audio : retrouve le fichier après renommage
+    segments: List[Segment]   # bloc de tête (ou ilst) découpé
+    tail: bytes               # tags de fin de fichier (ID3v1, APE)
+
+
+class SnapshotError(Exception):
+    """Instantané illisible ou incompatible avec le fichier"""
+
+
+def blob_hash(data: bytes) -> str:
+    """Empreinte de contenu d'une image intégrée"""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+# === Découpage des blocs de tags ===
+
+def _id3_picture_ranges(raw: bytes, offset: int) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    Repère les corps des trames APIC d'un tag ID3v2.3/2.4 commençant à `offset`
+
+    Returns:
+        (plages (début, fin) des images, position de fin du tag)
+    """
+    size = 0
+    for byte in raw[offset + 6:offset + 10]:
+        size = (size << 7) | (byte & 0x7F)
+    version, flags = raw[offset + 3], raw[offset + 5]
+    tag_end = offset + 10 + size + (10 if flags & 0x10 else 0)
+
+    # ID3v2.2 ou désynchronisation globale : tag conservé tel quel
+    if version not in (3, 4) or flags & 0x80:
+        return [], tag_end
+
+    position = offset + 10
+    if flags & 0x40:  # en-tête étendu
+        ext = raw[position:position + 4]
+        if version == 4:
+            position += (ext[0] << 21) | (ext[1] << 14) | (ext[2] << 7) | ext[3]
+        else:
+            position += 4 + struct.unpack('>I', ext)[0]
+
+    ranges = []
+    frames_end = offset + 10 + size
+    while position + 10 <= frames_end:
+        frame_id = raw[position:position + 4]
+        if frame_id[:1] == b'\x00':  # remplissage
+            break
+        size_bytes = raw[position + 4:position + 8]
+        if version == 4:
+            frame_size = (size_bytes[0] << 21) | (size_bytes[1] << 14) | (size_bytes[2] << 7) | size_bytes[3]
+        else:
+            frame_size = struct.unpack('>I', size_bytes)[0]
+        body_start = position + 10
+        if frame_id == b'APIC' and frame_size >= MIN_BLOB_SIZE:
+            ranges.append((body_start, body_start + frame_size))
+        position = body_start + frame_size
+
+    return ranges, tag_end
+
+
+def _flac_picture_ranges(raw: bytes, offset: int) -> List[Tuple[int, int]]:
+    """Repère les corps des blocs PICTURE après le marqueur fLaC"""
+    ranges = []
+    position = offset + 4
+    while position + 4 <= len(raw):
+        header = raw[position:position + 4]
+        length = int.from_bytes(header[1:4], 'big')
+        body_start = position + 4
+        if header[0] & 0x7F == 6 and length >= MIN_BLOB_SIZE:
+            ranges.append((body_start, body_start + length))
+        position = body_start + length
+        if header[0] & 0x80:
+            break
+    return ranges
+
+
+def _head_picture_ranges(raw: bytes) -> List[Tuple[int, int]]:
+    """Images intégrées dans l'en-tête d'un fichier (ID3v2 empilés puis blocs FLAC)"""
+    ranges = []
+    position = 0
+    while raw[position:position + 3] == b'ID3' and position + 10 <= len(raw):
+        tag_ranges, position = _id3_picture_ranges(raw, position)
+        ranges.extend(tag_ranges)
+    if raw[position:position + 4] == b'fLaC':
+        ranges.extend(_flac_picture_ranges(raw, position))
+    return ranges
+
+
+def _ilst_picture_ranges(raw: bytes) -> List[Tuple[int, int]]:
+    """Corps des atomes covr d'un atome ilst"""
+    ranges = []
+    position = 8
+    while position + 8 <= len(raw):
+        size = struct.unpack('>I', raw[position:position + 4])[0]
+        if size < 8:
+            break
+        if raw[position + 4:position + 8] == b'covr' and size - 8 >= MIN_BLOB_SIZE:
+            ranges.append((position + 8, position + size))
+        position += size
+    return ranges
+
+
+def _split_segments(raw: bytes, ranges: List[Tuple[int, int]],
+                    blobs: Dict[str, bytes]) -> List[Segment]:
+    """Découpe un bloc en segments, les plages d'images devenant des références"""
+    segments: List[Segment] = []
+    position = 0
+    for start, end in ranges:
+        if start > position:
+            segments.append((SEGMENT_INLINE, raw[position:start]))
+        data = raw[start:end]
+        digest = blob_hash(data)
+        blobs[digest] = data
+        segments.append((SEGMENT_BLOB, digest.encode('ascii')))
+        position = end
+    if position < len(raw) or not segments:
+        segments.append((SEGMENT_INLINE, raw[position:]))
+    return segments
+
+
+def join_segments(segments: List[Segment], blobs: Dict[str, bytes]) -> bytes:
+    """Reconstitue un bloc de tags à partir de ses segments et des images"""
+    parts = []
+    for segment_type, data in segments:
+        if segment_type == SEGMENT_BLOB:
+            digest = data.decode('ascii')
+            if digest not in blobs:
+                raise SnapshotError(f"Image manquante dans l'instantané: {digest}")
+            parts.append(blobs[digest])
+        else:
+            parts.append(data)
+    return b''.join(parts)
+
+
+# === Lecture des tags bruts ===
+
+def _iter_atoms(fileobj, start: int, end: int) -> Iterator[Tuple[bytes, int, int, int]]:
+    """Parcourt les atomes MP4 d'une plage : (nom, début, taille d'en-tête, taille totale)"""
+    position = start
+    while position + 8 <= end:
+        fileobj.seek(position)
+        header = fileobj.read(8)
+        size = struct.unpack('>I', header[:4])[0]
+        header_size = 8
+        if size == 1:
+            size = struct.unpack('>Q', fileobj.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            size = end - position
+        if size < header_size:
+            return
+        yield header[4:8], position, header_size, size
+        position += size
+
+
+def _read_ilst(file_path: str) -> Optional[bytes]:
+    """Lit l'atome moov/udta/meta/ilst complet d'un fichier MP4"""
+    with open(file_path, 'rb') as f:
+        start, end = 0, os.path.getsize(file_path)
+        for name in (b'moov', b'udta', b'meta', b'ilst'):
+            for atom_name, position, header_size, size in _iter_atoms(f, start, end):
+                if atom_name == name:
+                    start, end = position + header_size, position + size
+                    if name == b'meta':  # meta est une "full box" (version + flags)
+                        start += 4
+                    if name == b'ilst':
+                        f.seek(position)
+                        return f.read(size)
+                    break
+            else:
+                return None
+    return None
+
+
+def capture_file(file_path: str, blobs: Dict[str, bytes],
+                 fingerprint: Optional[str] = None) -> Optional[SnapshotEntry]:
+    """
+    Capture les tags bruts d'un fichier
+
+    Args:
+        file_path: Fichier audio
+        blobs: Dictionnaire d'images (empreinte → données) complété au passage
+        fingerprint: Empreinte audio déjà calculée (évite une seconde lecture de l'audio)
+
+    Returns:
+        Entrée d'instantané ou None si le fichier n'a pas de tags lisibles
+    """
+    if fingerprint is None:
+        fingerprint = audio_fingerprint(file_path)
+
+    if file_path.lower().endswith(('.m4a', '.mp4')):
+        ilst = _read_ilst(file_path)
+        if ilst is None:
+            return None
+        return SnapshotEntry(KIND_MP4, fingerprint,
+                             _split_segments(ilst, _ilst_picture_ranges(ilst), blobs), b'')
+
+    start, end = audio_payload_range(file_path)
+    with open(file_path, 'rb') as f:
+        head = f.read(start)
+        f.seek(end)
+        tail = f.read()
+    return SnapshotEntry(KIND_RAW, fingerprint,
+                         _split_segments(head, _head_picture_ranges(head), blobs), tail)
+
+
+# === Restauration ===
+
+def _restore_raw(file_path: str, head: bytes, tail: bytes) -> None:
+    """Remplace les tags de tête et de fin en conservant les données audio actuelles"""
+    start, end = audio_payload_range(file_path)
+    temp_path = file_path + '.nonotags-restore'
+    try:
+        with open(file_path, 'rb') as source, open(temp_path, 'wb') as target:
+            target.write(head)
+            source.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = source.read(min(1024 * 1024, remaining))
+                if not chunk:
+                    break
+                target.write(chunk)
+                remaining -= len(chunk)
+            target.write(tail)
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _restore_mp4(file_path: str, ilst: bytes) -> None:
+    """Recharge un atome ilst dans mutagen et réécrit les tags du fichier"""
+    from mutagen.mp4 import MP4
+
+    # Conteneur minimal moov/udta/meta/ilst, ouvert comme un fichier MP4 sans piste
+    meta = struct.pack('>I4s', 12 + len(ilst), b'meta') + b'\x00\x00\x00\x00' + ilst
+    udta = struct.pack('>I4s', 8 + len(meta), b'udta') + meta
+    moov = struct.pack('>I4s', 8 + len(udta), b'moov') + udta
+    tags = MP4(io.BytesIO(moov)).tags or {}
+
+    audio = MP4(file_path)
+    if audio.tags is None:
+        audio.add_tags()
+    audio.tags.clear()
+    audio.tags.update(tags)
+    audio.save()
+
+
+def restore_file(file_path: str, kind: int, head: bytes, tail: bytes) -> None:
+    """Réécrit les tags capturés dans un fichier"""
+    if kind == KIND_MP4:
+        _restore_mp4(file_path, head)
+    elif kind == KIND_RAW:
+        _restore_raw(file_path, head, tail)
+    else:
+        raise SnapshotError(f"Type d'instantané inconnu: {kind}")
+
+
+# === Sérialisation d'un album ===
+
+def encode_snapshot(files: Dict[str, SnapshotEntry]) -> bytes:
+    """
+    Sérialise et compresse les tags d'un album
+
+    Args:
+        files: {nom_de_fichier: entrée}
+    """
+    out = io.BytesIO()
+    out.write(SNAPSHOT_MAGIC)
+    out.write(struct.pack('>I', len(files)))
+    for name, (kind, fingerprint, segments, tail) in sorted(files.items()):
+        encoded_name = name.encode('utf-8')
+        encoded_fingerprint = fingerprint.encode('ascii')
+        out.write(struct.pack('>HBIB', len(encoded_name), kind, len(segments), len(encoded_fingerprint)))
+        out.write(encoded_name)
+        out.write(encoded_fingerprint)
+        for segment_type, data in segments:
+            out.write(struct.pack('>BI', segment_type, len(data)))
+            out.write(data)
+        out.write(struct.pack('>I', len(tail)))
+        out.write(tail)
+    return zlib.compress(out.getvalue(), 9)
+
+
+def decode_snapshot(data: bytes) -> Dict[str, SnapshotEntry]:
+    """Décompresse et relit un instantané d'album (inverse de encode_snapshot)"""
+    try:
+        stream = io.BytesIO(zlib.decompress(data))
+        if stream.read(4) != SNAPSHOT_MAGIC:
+            raise SnapshotError("Format d'instantané inconnu")
+        files = {}
+        (count,) = struct.unpack('>I', stream.read(4))
+        for _ in range(count):
+            name_length, kind, segment_count, fingerprint_length = struct.unpack('>HBIB', stream.read(8))
+            name = stream.read(name_length).decode('utf-8')
+            fingerprint = stream.read(fingerprint_length).decode('ascii')
+            segments = []
+            for _ in range(segment_count):
+                segment_type, length = struct.unpack('>BI', stream.read(5))
+                segments.append((segment_type, stream.read(length)))
+            (tail_length,) = struct.unpack('>I', stream.read(4))
+            files[name] = SnapshotEntry(kind, fingerprint, segments, stream.read(tail_length))
+        return files
+    except (zlib.error, struct.error, UnicodeDecodeError) as e:
+        raise SnapshotError(f"Instantané corrompu: {e}")
+
+
+def referenced_blobs(files: Dict[str, SnapshotEntry]) -> List[str]:
+    """Empreintes des images référencées par un instantané"""
+    return sorted({
+        data.decode('ascii')
+        for entry in files.values()
+        for segment_type, data in entry.segments
+        if segment_type == SEGMENT_BLOB
+    })
@@ -0,0 +1,300 @@
+"""
+File d'écriture différée des tags (write-behind)
+Les modifications de l'éditeur sont fusionnées par fichier et écrites par un
+thread dédié, une seule sauvegarde par fichier, sans bloquer le thread GTK
+"""
+
+import atexit
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from mutagen.id3 import ID3, ID3NoHeaderError, TIT2, TPE1, TPE2, TALB, TDRC, TCON, TRCK
+from mutagen.flac import FLAC
+from mutagen.mp4 import MP4
+
+try:
+    from gi.repository import GLib
+except ImportError:
+    GLib = None  # Écriture utilisable sans interface (tests) : callbacks appelés directement
+
+
+# Champs gérés : nom générique -> (trame ID3, clé Vorbis FLAC, clé MP4)
+# 'artist' renseigne aussi l'artiste de l'album, comme le faisait l'éditeur
+TAG_FIELDS = {
+    'title': ('TIT2', 'TITLE', '\xa9nam'),
+    'artist': ('TPE1', 'ARTIST', '\xa9ART'),
+    'album': ('TALB', 'ALBUM', '\xa9alb'),
+    'year': ('TDRC', 'DATE', '\xa9day'),
+    'genre': ('TCON', 'GENRE', '\xa9gen'),
+    'track_number': ('TRCK', 'TRACKNUMBER', 'trkn'),
+}
+
+_ID3_FRAMES = {'TIT2': TIT2, 'TPE1': TPE1, 'TALB': TALB, 'TDRC': TDRC, 'TCON': TCON, 'TRCK': TRCK}
+
+
+def write_tags(file_path: str, fields: Dict[str, str]):
+    """
+    Écrit plusieurs champs en une seule ouverture et une seule sauvegarde du fichier.
+
+    Args:
+        file_path: Fichier audio (MP3, FLAC, M4A/MP4)
+        fields: Champs génériques (voir TAG_FIELDS) et leurs nouvelles valeurs
+
+    Raises:
+        Exception: Erreur mutagen ou d'accès au fichier (remontée à l'appelant)
+    """
+    lower_path = file_path.lower()
+
+    if lower_path.endswith('.mp3'):
+        try:
+            audio = ID3(file_path)
+        except ID3NoHeaderError:
+            audio = ID3()
+        for field, value in fields.items():
+            frame = TAG_FIELDS[field][0]
+            audio[frame] = _ID3_FRAMES[frame](encoding=3, text=value)
+            if field == 'artist':
+                audio['TPE2'] = TPE2(encoding=3, text=value)  # Artiste de l'album
+        audio.save(file_path)
+
+    elif lower_path.endswith('.flac'):
+        audio = FLAC(file_path)
+        for field, value in fields.items():
+            audio[TAG_FIELDS[field][1]] = value
+            if field == 'artist':
+                audio['ALBUMARTIST'] = value
+        audio.save()
+
+    elif lower_path.endswith(('.m4a', '.mp4')):
+        audio = MP4(file_path)
+        for field, value in fields.items():
+            key = TAG_FIELDS[field][2]
+            if key == 'trkn':
+                # "3" ou "3/12" : numéro et total de pistes
+                number, _, total = value.partition('/')
+                audio[key] = [(int(number), int(total) if total else 0)]
+            else:
+                audio[key] = [value]
+            if field == 'artist':
+                audio['aART'] = [value]
+        audio.save()
+
+
+class _PendingWrite:
+    """Modifications en attente pour un fichier"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.fields: Dict[str, str] = {}
+        self.rename_to: Optional[str] = None
+        self.after_write: List[Callable] = []
+        self.on_error: List[Callable] = []
+
+
+class TagWriteQueue:
+    """
+    File d'écriture des tags avec fusion par fichier
+
+    enqueue() ne fait que fusionner les champs en mémoire : plusieurs
+    modifications d'un même fichier avant l'écriture donnent une seule
+    sauvegarde. Le thread d'écriture attend un court délai d'inactivité
+    (pour regrouper une saisie) puis écrit les fichiers dans l'ordre des
+    demandes. Un renommage demandé avec l'écriture est fait juste après
+    celle-ci ; d'ici là, le nouveau chemin désigne l'écriture en attente.
+    Les erreurs sont renvoyées sur le thread GTK aux callbacks fournis.
+    """
+
+    def __init__(self, delay: float = 0.3):
+        """
+        Args:
+            delay: Délai d'inactivité (secondes) avant l'écriture des modifications
+        """
+        self.delay = delay
+        self._pending: Dict[str, _PendingWrite] = {}  # ordre d'insertion = ordre d'écriture
+        self._aliases: Dict[str, str] = {}  # chemin après renommage -> chemin actuel
+        self._flush_callbacks: List[Callable] = []
+        self._condition = threading.Condition()
+        self._last_change = 0.0
+        self._force = False
+        self._writing = False
+        self._stopped = False
+        self._thread = None
+
+    # === API (thread GTK) ===
+
+    def enqueue(self, file_path: str, fields: Dict[str, str], rename_to: Optional[str] = None,
+                after_write: Optional[Callable[[str, str, Dict[str, str]], None]] = None,
+                on_error: Optional[Callable[[str, str], None]] = None):
+        """
+        Ajoute des modifications de tags pour un fichier (fusionnées avec celles en attente)
+
+        Args:
+            file_path: Chemin du fichier tel que connu de l'interface (éventuellement déjà renommé)
+            fields: Champs génériques à écrire (voir TAG_FIELDS)
+            rename_to: Nouveau chemin du fichier après écriture
+            after_write: Appelé sur le thread d'écriture après succès avec
+                         (chemin d'origine, chemin final, tous les champs écrits)
+            on_error: Appelé sur le thread GTK avec (chemin, message) en cas d'échec
+        """
+        with self._condition:
+            key = self._aliases.get(file_path, file_path)
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = _PendingWrite(key)
+
+            entry.fields.update(fields)
+            if rename_to:
+                if entry.rename_to:
+                    self._aliases.pop(entry.rename_to, None)
+                entry.rename_to = None if rename_to == key else rename_to
+                if entry.rename_to:
+                    self._aliases[entry.rename_to] = key
+            if after_write:
+                entry.after_write.append(after_write)
+            if on_error:
+                entry.on_error.append(on_error)
+
+            self._last_change = time.monotonic()
+            self._start_writer()
+            self._condition.notify_all()
+
+    def flush(self, on_flushed: Optional[Callable[[], None]] = None):
+        """
+        Écrit sans attendre le délai d'inactivité tout ce qui est en attente
+
+        Args:
+            on_flushed: Appelé sur le thread GTK une fois la file vide
+        """
+        with self._condition:
+            if not self._pending and not self._writing:
+                if on_flushed:
+                    self._deliver(on_flushed)
+                return
+            if on_flushed:
+                self._flush_callbacks.append(on_flushed)
+            self._force = True
+            self._start_writer()
+            self._condition.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Force l'écriture et attend que la file soit vide (bloquant : fermeture de l'application)
+
+        Returns:
+            True si tout a été écrit avant le timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            if not self._pending and not self._writing:
+                return True
+            self._force = True
+            self._start_writer()
+            self._condition.notify_all()
+            while self._pending or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def has_pending(self) -> bool:
+        """Indique si des écritures sont en attente ou en cours"""
+        with self._condition:
+            return bool(self._pending) or self._writing
+
+    def shutdown(self, timeout: float = 10.0):
+        """Écrit ce qui reste puis arrête le thread d'écriture"""
+        self.wait_idle(timeout)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    # === Thread d'écriture ===
+
+    def _start_writer(self):
+        """Démarre le thread d'écriture à la première demande (appelé sous verrou)"""
+        if self._thread is None and not self._stopped:
+            self._thread = threading.Thread(target=self._writer_loop, name="NonotagsTagWriter", daemon=True)
+            self._thread.start()
+
+    def _next_entry(self) -> Optional[_PendingWrite]:
+        """Attend le délai d'inactivité puis retire la plus ancienne écriture (None = arrêt)"""
+        with self._condition:
+            while True:
+                if self._stopped and not self._pending:
+                    return None
+                if self._pending:
+                    idle = time.monotonic() - self._last_change
+                    if self._force or self._stopped or idle >= self.delay:
+                        key = next(iter(self._pending))
+                        entry = self._pending.pop(key)
+                        if entry.rename_to:
+                            self._aliases.pop(entry.rename_to, None)
+                        self._writing = True
+                        return entry
+                    self._condition.wait(self.delay - idle)
+                else:
+                    self._condition.wait()
+
+    def _writer_loop(self):
+        while True:
+            entry = self._next_entry()
+            if entry is None:
+                return
+
+            try:
+                self._write(entry)
+            finally:
+                with self._condition:
+                    self._writing = False
+                    if not self._pending:
+                        self._force = False
+                        callbacks, self._flush_callbacks = self._flush_callbacks, []
+                        for callback in callbacks:
+                            self._deliver(callback)
+                    self._condition.notify_all()
+
+    def _write(self, entry: _PendingWrite):
+        """Une sauvegarde du fichier, puis renommage éventuel"""
+        file_path = entry.file_path
+        try:
+            if entry.fields:
+                write_tags(file_path, entry.fields)
+            if entry.rename_to:
+                os.rename(file_path, entry.rename_to)
+                file_path = entry.rename_to
+        except Exception as e:
+            print(f"❌ Erreur écriture tags {entry.file_path}: {e}")
+            for on_error in entry.on_error:
+                self._deliver(on_error, entry.file_path, str(e))
+            return
+
+        for after_write in entry.after_write:
+            try:
+                after_write(entry.file_path, file_path, dict(entry.fields))
+            except Exception as e:
+                print(f"⚠️ Erreur après écriture {file_path}: {e}")
+
+    @staticmethod
+    def _deliver(callback, *args):
+        """Transmet un callback au thread GTK"""
+        def run():
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"❌ Erreur notification écriture tags: {e}")
+            return False
+
+        if GLib is not None:
+            GLib.idle_add(run)
+        else:
+            run()
+
+
+# Instance globale : la file survit à la fermeture des fenêtres d'édition
+tag_write_queue = TagWriteQueue()
+
+# Aucune modification perdue à la fermeture de l'application
+atexit.register(tag_write_queue.shutdown)
@@ -0,0 +1,260 @@
+"""
+Chargement des pistes pour le tableau de la fenêtre d'édition
+Analyse des fichiers sur un pool de threads, une seule lecture mutagen par fichier,
+livraison par lots sur le thread GTK et cache partagé des pistes déjà lues
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from typing import Callable, Dict, List, Optional
+
+from mutagen.id3 import ID3
+from mutagen.mp3 import MP3
+from mutagen.mp4 import MP4
+from mutagen.flac import FLAC
+from gi.repository import GLib
+
+from support.cache import LRUCache
+from support.logger import AppLogger
+
+
+# Extensions affichées dans le tableau des pistes
+TRACK_EXTENSIONS = ('.mp3', '.flac', '.m4a', '.ogg')
+
+
+def _default_metadata(file_path: str) -> Dict:
+    """Valeurs affichées quand aucun tag n'est lisible"""
+    return {
+        'title': os.path.splitext(os.path.basename(file_path))[0],
+        'artist': '', 'performer': '', 'album': '',
+        'year': '', 'genre': '', 'track': ''
+    }
+
+
+def read_track_row(file_path: str) -> Dict:
+    """
+    Lit en une seule analyse les tags d'une piste, sa durée et la présence d'une pochette intégrée.
+
+    Returns:
+        {'metadata': {title, artist, performer, album, year, genre, track},
+         'has_cover': bool, 'duration': secondes (0 si inconnue)}
+    """
+    metadata = {}
+    has_cover = False
+    duration = 0
+    lower_path = file_path.lower()
+
+    try:
+        if lower_path.endswith('.mp3'):
+            # Essayer plusieurs méthodes de lecture MP3 (fichier corrompu = valeurs par défaut)
+            audio = None
+            try:
+                audio = MP3(file_path, ID3=ID3)
+            except Exception:
+                try:
+                    audio = MP3(file_path)
+                except Exception:
+                    pass
+
+            if audio:
+                duration = audio.info.length
+            if audio and audio.tags:
+                tags = audio.tags
+                for field, frame in (('title', 'TIT2'), ('artist', 'TPE1'), ('performer', 'TPE1'),
+                                     ('album', 'TALB'), ('year', 'TDRC'), ('genre', 'TCON'),
+                                     ('track', 'TRCK')):
+                    metadata[field] = str(tags.get(frame)) if tags.get(frame) else ''
+                has_cover = any(key.startswith('APIC:') for key in tags.keys())
+
+        elif lower_path.endswith('.flac'):
+            audio = FLAC(file_path)
+            duration = audio.info.length
+            has_cover = len(audio.pictures) > 0
+
+        elif lower_path.endswith(('.m4a', '.mp4')):
+            audio = MP4(file_path)
+            duration = audio.info.length
+            has_cover = 'covr' in audio.tags if audio.tags else False
+
+    except Exception as e:
+        print(f"Erreur extraction métadonnées {file_path}: {e}")
+
+    return {'metadata': metadata or _default_metadata(file_path), 'has_cover': has_cover,
+            'duration': duration or 0}
+
+
+class TrackTableLoader:
+    """
+    Remplit le tableau des pistes sans bloquer le thread GTK
+
+    Un coordinateur liste les dossiers et répartit les fichiers sur le pool ;
+    les résultats sont remis dans l'ordre (albums puis fichiers triés) et
+    livrés par lots via GLib.idle_add. Chaque fichier n'est analysé qu'une
+    fois : le cache est indexé par (chemin, mtime, taille), donc une piste
+    réécrite entre-temps est relue. Chaque chargement a son ticket : les lots
+    d'un chargement annulé (fenêtre fermée ou rechargée) ne sont jamais
+    livrés, sans affecter les autres fenêtres d'édition ouvertes.
+    """
+
+    BATCH_SIZE = 25  # Lignes ajoutées au tableau par passage dans la boucle GTK
+
+    def __init__(self, max_workers: int = 4, cache_size: int = 5000):
+        """
+        Args:
+            max_workers: Nombre de fichiers analysés simultanément
+            cache_size: Nombre de pistes lues conservées en mémoire
+        """
+        self.logger = AppLogger()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="NonotagsTracks"
+        )
+        # Coordinateur séparé : il attend les analyses sans occuper une place du pool
+        self.coordinator = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="NonotagsTracksQueue"
+        )
+        # Lu et écrit depuis les threads de travail : protégé par le verrou
+        self.cache = LRUCache(max_size=cache_size, ttl=0)
+
+        self._tickets = count(1)
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def load(self, folders: List[str],
+             on_rows: Callable[[List[Dict]], None],
+             on_finished: Optional[Callable[[], None]] = None) -> int:
+        """
+        Charge les pistes de plusieurs dossiers d'album
+
+        Args:
+            folders: Dossiers dans l'ordre d'affichage (un fichier = son dossier parent)
+            on_rows: Appelé sur le thread GTK avec un lot de lignes
+                     {'album_index', 'file_path', 'metadata', 'has_cover', 'duration'}
+            on_finished: Appelé sur le thread GTK une fois toutes les pistes livrées
+
+        Returns:
+            Ticket utilisable avec cancel()
+        """
+        ticket = next(self._tickets)
+        with self._lock:
+            self._active.add(ticket)
+        self.coordinator.submit(self._run, list(folders), ticket, on_rows, on_finished)
+        return ticket
+
+    def cancel(self, ticket: Optional[int]):
+        """Abandonne un chargement (fenêtre fermée ou rechargée)"""
+        with self._lock:
+            self._active.discard(ticket)
+
+    def _is_current(self, ticket: int) -> bool:
+        with self._lock:
+            return ticket in self._active
+
+    # === Threads de travail ===
+
+    @staticmethod
+    def _list_tracks(folder_path: str) -> List[str]:
+        """Fichiers audio d'un dossier, triés"""
+        if os.path.isfile(folder_path):
+            folder_path = os.path.dirname(folder_path)
+        try:
+            names = os.listdir(folder_path)
+        except OSError as e:
+            print(f"Chemin album invalide: {folder_path} ({e})")
+            return []
+        return sorted(os.path.join(folder_path, name) for name in names
+                      if name.lower().endswith(TRACK_EXTENSIONS))
+
+    def _read_cached(self, file_path: str, ticket: int) -> Optional[Dict]:
+        """Piste depuis le cache, sinon analyse du fichier (None si chargement abandonné)"""
+        if not self._is_current(ticket):
+            return None
+        try:
+            stat = os.stat(file_path)
+            key = (file_path, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            key = None
+
+        if key is not None:
+            with self._lock:
+                cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        row = read_track_row(file_path)
+        if key is not None:
+            with self._lock:
+                self.cache.put(key, row)
+        return row
+
+    def _run(self, folders: List[str], ticket: int, on_rows, on_finished):
+        """Répartit les analyses puis livre les lignes dans l'ordre d'affichage"""
+        jobs = []
+        for album_index, folder_path in enumerate(folders):
+            for file_path in self._list_tracks(folder_path):
+                jobs.append((album_index, file_path,
+                             self.executor.submit(self._read_cached, file_path, ticket)))
+
+        batch = []
+        for album_index, file_path, future in jobs:
+            if not self._is_current(ticket):
+                for _, _, pending in jobs:
+                    pending.cancel()
+                return
+            try:
+                row = future.result()
+            except Exception as e:
+                self.logger.debug(f"Erreur lecture {file_path}: {e}")
+                row = {'metadata': _default_metadata(file_path), 'has_cover': False, 'duration': 0}
+            if row is None:
+                continue
+            batch.append(dict(row, album_index=album_index, file_path=file_path))
+            if len(batch) >= self.BATCH_SIZE:
+                GLib.idle_add(self._deliver, ticket, on_rows, batch)
+                batch = []
+
+        if batch:
+            GLib.idle_add(self._deliver, ticket, on_rows, batch)
+        GLib.idle_add(self._finish, ticket, on_finished)
+
+    # === Thread GTK ===
+
+    def _deliver(self, ticket: int, callback, rows):
+        """Transmet un lot si le chargement est toujours d'actualité"""
+        if self._is_current(ticket):
+            try:
+                callback(rows)
+            except Exception as e:
+                print(f"❌ Erreur ajout des pistes: {e}")
+        return False
+
+    def _finish(self, ticket: int, on_finished):
+        """Fin d'un chargement : libère le ticket et prévient le demandeur"""
+        if not self._is_current(ticket):
+            return False
+        self.cancel(ticket)
+        if on_finished:
+            try:
+                on_finished()
+            except Exception as e:
+                print(f"❌ Erreur fin de chargement des pistes: {e}")
+        return False
+
+    def clear_cache(self):
+        """Vide le cache des pistes"""
+        with self._lock:
+            self.cache.clear()
+
+    def shutdown(self):
+        """Arrête les pools d'analyse"""
+        with self._lock:
+            self._active.clear()
+        self.coordinator.shutdown(wait=False, cancel_futures=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Instance globale : le cache est partagé entre les fenêtres d'édition successives
+track_table_loader = TrackTableLoader()
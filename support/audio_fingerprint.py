@@ -0,0 +1,160 @@
+"""
+Empreinte du contenu audio d'un fichier, indépendante des tags
+Ignore les blocs de métadonnées (ID3v2, ID3v1, APEv2, blocs FLAC, atomes MP4 hors mdat)
+pour que l'empreinte reste stable quand on modifie les tags ou renomme le fichier
+"""
+
+import hashlib
+import os
+import struct
+from typing import BinaryIO, Optional, Tuple
+
+# Échantillonnage : nombre de blocs lus et taille de chaque bloc
+DEFAULT_SAMPLES = 8
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _skip_id3v2(f: BinaryIO, offset: int) -> int:
+    """Saute les tags ID3v2 (éventuellement empilés) à partir d'une position"""
+    while True:
+        f.seek(offset)
+        header = f.read(10)
+        if len(header) < 10 or header[:3] != b'ID3':
+            return offset
+        # Taille "synchsafe" sur 4 octets de 7 bits, hors en-tête
+        size = 0
+        for byte in header[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        offset += 10 + size
+        if header[5] & 0x10:  # pied de tag présent
+            offset += 10
+
+
+def _skip_flac_metadata(f: BinaryIO, offset: int) -> int:
+    """Saute le marqueur fLaC et tous les blocs de métadonnées FLAC"""
+    f.seek(offset)
+    if f.read(4) != b'fLaC':
+        return offset
+    offset += 4
+    while True:
+        header = f.read(4)
+        if len(header) < 4:
+            return offset
+        is_last = header[0] & 0x80
+        length = int.from_bytes(header[1:4], 'big')
+        offset += 4 + length
+        if is_last:
+            return offset
+        f.seek(offset)
+
+
+def _strip_trailing_tags(f: BinaryIO, start: int, end: int) -> int:
+    """Retire les tags de fin de fichier (ID3v1, APEv2) en les dépilant"""
+    while end - start >= 32:
+        if end - start >= 128:
+            f.seek(end - 128)
+            if f.read(3) == b'TAG':
+                end -= 128
+                continue
+
+        f.seek(end - 32)
+        footer = f.read(32)
+        if footer[:8] == b'APETAGEX':
+            # Taille : éléments + pied (l'en-tête optionnel de 32 octets est en plus)
+            size, flags = struct.unpack('<I', footer[12:16])[0], struct.unpack('<I', footer[20:24])[0]
+            end -= size
+            if flags & 0x80000000:
+                end -= 32
+            continue
+
+        return max(end, start)
+    return max(end, start)
+
+
+def _mp4_mdat_range(f: BinaryIO, file_size: int) -> Optional[Tuple[int, int]]:
+    """Retourne la plage de l'atome mdat (données audio) d'un fichier MP4"""
+    offset = 0
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        header = f.read(8)
+        size = struct.unpack('>I', header[:4])[0]
+        atom_type = header[4:8]
+        header_size = 8
+        if size == 1:  # taille étendue sur 64 bits
+            size = struct.unpack('>Q', f.read(8))[0]
+            header_size = 16
+        elif size == 0:  # atome jusqu'à la fin du fichier
+            size = file_size - offset
+        if size < header_size:
+            return None
+        if atom_type == b'mdat':
+            return offset + header_size, min(offset + size, file_size)
+        offset += size
+    return None
+
+
+def audio_payload_range(file_path: str) -> Tuple[int, int]:
+    """
+    Calcule la plage d'octets contenant uniquement les données audio.
+
+    Args:
+        file_path: Fichier audio
+
+    Returns:
+        Tuple (début, fin) ; tout le fichier pour un format non reconnu
+    """
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        if file_path.lower().endswith(('.m4a', '.mp4')):
+            mdat = _mp4_mdat_range(f, file_size)
+            if mdat:
+                return mdat
+            return 0, file_size
+
+        start = _skip_id3v2(f, 0)
+        start = _skip_flac_metadata(f, start)
+        start = min(start, file_size)
+        end = _strip_trailing_tags(f, start, file_size)
+        return start, end
+
+
+def audio_fingerprint(file_path: str, samples: int = DEFAULT_SAMPLES,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    """
+    Empreinte BLAKE2 des données audio, par échantillonnage.
+
+    Les petits fichiers sont hachés en entier ; au-delà, `samples` blocs
+    répartis régulièrement (début et fin inclus) sont lus. La taille des
+    données audio entre dans l'empreinte.
+
+    Args:
+        file_path: Fichier audio
+        samples: Nombre de blocs échantillonnés
+        chunk_size: Taille d'un bloc en octets
+
+    Returns:
+        Empreinte hexadécimale (40 caractères)
+    """
+    start, end = audio_payload_range(file_path)
+    length = end - start
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(length.to_bytes(8, 'little'))
+
+    with open(file_path, 'rb') as f:
+        if length <= samples * chunk_size:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                data = f.read(min(chunk_size, remaining))
+                if not data:
+                    break
+                digest.update(data)
+                remaining -= len(data)
+        else:
+            step = (length - chunk_size) / (samples - 1) if samples > 1 else 0
+            for index in range(samples):
+                f.seek(start + int(index * step))
+                digest.update(f.read(chunk_size))
+
+    return digest.hexdigest()
@@ -78,6 +78,14 @@ class LRUCache:
             "ttl": self.ttl
         }
 
+def gtk_thread_cache(max_size: int) -> LRUCache:
+    """
+    Cache LRU sans expiration pour les images décodées (pixbufs)
+
+    Réservé au thread GTK, seul à le lire et l'écrire : il ne prend aucun verrou.
+    """
+    return LRUCache(max_size=max_size, ttl=0)
+
 # Instance globale pour métadonnées
 metadata_cache = LRUCache(max_size=200, ttl=600)  # 200 entrées, 10 minutes TTL
 
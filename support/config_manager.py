@@ -33,6 +33,9 @@ class ProcessingConfig:
     # Configuration FileRenamer (Module 5)
     rename_folders: bool = True  # Activer le renommage des dossiers d'albums
     
+    # Historique détaillé champ par champ (écrit par lots en arrière-plan)
+    record_field_history: bool = False
+    
     # Configuration FileCleaner (Module 1)
     unwanted_files: List[str] = None
     cover_rename_patterns: Dict[str, str] = None
@@ -0,0 +1,290 @@
+"""
+Bus d'événements de l'application
+Sujets typés, abonnement par préfixe de chemin d'album, livraison synchrone,
+sur la boucle GTK ou sur un pool de threads, avec regroupement par lots
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
+
+from support.logger import get_logger
+
+try:
+    from gi.repository import GLib
+except ImportError:
+    GLib = None  # Sans GTK, la livraison « boucle GTK » devient synchrone
+
+
+class Topic(str, Enum):
+    """Sujets d'événements connus (les chaînes libres restent acceptées)"""
+    APP_STATE_CHANGED = "app_state_changed"
+    ALBUM_ADDED = "album_added"
+    ALBUM_UPDATED = "album_updated"
+    ALBUM_REMOVED = "album_removed"
+    ALBUM_SELECTED = "album_selected"
+    ALBUM_DESELECTED = "album_deselected"
+    SELECTION_CLEARED = "selection_cleared"
+    IMPORT_TASK_STARTED = "import_task_started"
+    IMPORT_TASK_UPDATED = "import_task_updated"
+    IMPORT_TASK_FINISHED = "import_task_finished"
+    STATISTICS_RESET = "statistics_reset"
+    ALBUM_STATUS_CHANGED = "album_status_changed"
+    METADATA_CHANGED = "metadata_changed"
+
+
+class Dispatch(Enum):
+    """Mode de livraison d'un abonnement"""
+    SYNC = "sync"  # Dans le thread qui publie (comportement historique)
+    GTK = "gtk"    # Sur la boucle principale GTK (observateurs d'interface)
+    POOL = "pool"  # Sur le pool de threads du bus
+
+
+@dataclass
+class Event:
+    """Événement publié sur le bus"""
+    topic: str
+    data: Dict[str, Any]
+    album_path: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+
+
+class Subscription:
+    """Abonnement à un sujet ; les modes asynchrones ont leur propre file d'attente"""
+
+    def __init__(self, topic: str, handler: Callable, path_prefix: Optional[str],
+                 dispatch: Dispatch, batch: bool):
+        self.topic = topic
+        self.handler = handler
+        self.path_prefix = path_prefix.rstrip(os.sep) if path_prefix else None
+        self.dispatch = dispatch
+        self.batch = batch
+        self.active = True
+        self.queue: Deque[Event] = deque()
+        self.scheduled = False  # une livraison est déjà programmée pour cette file
+
+    def matches(self, album_path: Optional[str]) -> bool:
+        """Filtre par préfixe de chemin (par composant : /a/b ne couvre pas /a/bc)"""
+        if self.path_prefix is None:
+            return True
+        if not album_path:
+            return False
+        return album_path == self.path_prefix or album_path.startswith(self.path_prefix + os.sep)
+
+
+def _topic_name(topic: Union[Topic, str]) -> str:
+    return topic.value if isinstance(topic, Topic) else topic
+
+
+class EventBus:
+    """
+    Diffusion d'événements vers des abonnés
+
+    publish() ne fait qu'évaluer les filtres et, pour les abonnements
+    asynchrones, ajouter l'événement à leur file : le thread qui publie
+    (pipeline de traitement) n'attend jamais un observateur d'interface.
+    Chaque file asynchrone n'a qu'une livraison programmée à la fois ;
+    une rafale d'événements est vidée en une passe, et un abonnement
+    « batch » reçoit la rafale entière en un seul appel.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        """
+        Args:
+            max_workers: Threads du pool de livraison (créé à la première utilisation)
+        """
+        self.logger = get_logger()
+        self._max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, List[Subscription]] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    # === Abonnements ===
+
+    def subscribe(self, topic: Union[Topic, str], handler: Callable,
+                  path_prefix: Optional[str] = None,
+                  dispatch: Dispatch = Dispatch.SYNC,
+                  batch: bool = False) -> Subscription:
+        """
+        Abonne un gestionnaire à un sujet
+
+        Args:
+            topic: Sujet (Topic ou nom libre)
+            handler: Appelé avec un Event, ou une liste d'Event si batch
+            path_prefix: Ne recevoir que les événements des albums sous ce chemin
+            dispatch: Thread de livraison (voir Dispatch)
+            batch: Recevoir les événements accumulés en un seul appel (modes asynchrones)
+
+        Returns:
+            Abonnement, à passer à unsubscribe()
+        """
+        subscription = Subscription(_topic_name(topic), handler, path_prefix, dispatch, batch)
+        with self._lock:
+            # Copie à l'écriture : publish() parcourt la liste sans verrou
+            subscriptions = self._subscriptions.get(subscription.topic, [])
+            self._subscriptions[subscription.topic] = subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Retire un abonnement (les événements encore en file ne sont pas livrés)"""
+        subscription.active = False
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.topic, [])
+            self._subscriptions[subscription.topic] = [s for s in subscriptions if s is not subscription]
+
+    def has_subscribers(self, topic: Union[Topic, str]) -> bool:
+        """Indique si un sujet a des abonnés (évite de construire des données inutiles)"""
+        return bool(self._subscriptions.get(_topic_name(topic)))
+
+    def clear(self):
+        """Retire tous les abonnements"""
+        with self._lock:
+            for subscriptions in self._subscriptions.values():
+                for subscription in subscriptions:
+                    subscription.active = False
+            self._subscriptions = {}
+
+    # === Publication ===
+
+    def publish(self, topic: Union[Topic, str], data: Optional[Dict[str, Any]] = None,
+                album_path: Optional[str] = None) -> int:
+        """
+        Publie un événement
+
+        Args:
+            topic: Sujet
+            data: Données de l'événement
+            album_path: Album concerné (pour les abonnements par préfixe)
+
+        Returns:
+            Nombre d'abonnements ayant reçu ou mis en file l'événement
+        """
+        start = time.perf_counter()
+        name = _topic_name(topic)
+        subscriptions = self._subscriptions.get(name)
+        if not subscriptions:
+            self._record(name, start, 0)
+            return 0
+
+        event = Event(name, data if data is not None else {}, album_path)
+        matched = 0
+        for subscription in subscriptions:
+            if not subscription.active or not subscription.matches(album_path):
+                continue
+            matched += 1
+            if subscription.dispatch is Dispatch.SYNC or (subscription.dispatch is Dispatch.GTK and GLib is None):
+                self._call(subscription, [event] if subscription.batch else event)
+            else:
+                self._enqueue(subscription, event)
+
+        self._record(name, start, matched)
+        return matched
+
+    def _enqueue(self, subscription: Subscription, event: Event):
+        """Ajoute à la file de l'abonnement et programme une livraison si nécessaire"""
+        with self._lock:
+            subscription.queue.append(event)
+            if subscription.scheduled:
+                return
+            subscription.scheduled = True
+
+        if subscription.dispatch is Dispatch.GTK:
+            GLib.idle_add(self._drain, subscription)
+        else:
+            self._get_executor().submit(self._drain, subscription)
+
+    def _drain(self, subscription: Subscription):
+        """
+        Livre tout ce qui est en file pour un abonnement (thread de livraison)
+
+        Une seule livraison à la fois par abonnement : les événements arrivés
+        pendant l'appel sont livrés ensuite, dans l'ordre de publication.
+        """
+        while True:
+            with self._lock:
+                events = list(subscription.queue)
+                subscription.queue.clear()
+                if not events or not subscription.active:
+                    subscription.scheduled = False
+                    return False  # Pour GLib.idle_add
+
+            if subscription.batch:
+                self._call(subscription, events)
+            else:
+                for event in events:
+                    self._call(subscription, event)
+
+    def _call(self, subscription: Subscription, payload):
+        start = time.perf_counter()
+        try:
+            subscription.handler(payload)
+        except Exception as e:
+            self.logger.error(f"Error in event handler for {subscription.topic}: {e}")
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats = self._stats.setdefault(subscription.topic, self._new_stats())
+            stats['handler_calls'] += 1
+            stats['handler_seconds'] += elapsed
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="NonotagsEvents"
+                )
+            return self._executor
+
+    # === Mesures ===
+
+    @staticmethod
+    def _new_stats() -> Dict[str, float]:
+        return {'published': 0, 'delivered': 0, 'publish_seconds': 0.0,
+                'handler_calls': 0, 'handler_seconds': 0.0}
+
+    def _record(self, topic: str, start: float, matched: int):
+        """Compte le coût de publish() pour le thread qui publie"""
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats = self._stats.setdefault(topic, self._new_stats())
+            stats['published'] += 1
+            stats['delivered'] += matched
+            stats['publish_seconds'] += elapsed
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Statistiques par sujet, avec le surcoût moyen par événement
+
+        Returns:
+            {sujet: {published, delivered, publish_seconds, handler_calls,
+                     handler_seconds, publish_us_per_event, handler_us_per_call}}
+        """
+        with self._lock:
+            result = {topic: dict(stats) for topic, stats in self._stats.items()}
+        for stats in result.values():
+            stats['publish_us_per_event'] = (
+                stats['publish_seconds'] * 1e6 / stats['published'] if stats['published'] else 0.0
+            )
+            stats['handler_us_per_call'] = (
+                stats['handler_seconds'] * 1e6 / stats['handler_calls'] if stats['handler_calls'] else 0.0
+            )
+        return result
+
+    def reset_stats(self):
+        """Remet les statistiques à zéro"""
+        with self._lock:
+            self._stats = {}
+
+    def shutdown(self):
+        """Arrête le pool de livraison"""
+        self.clear()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -57,14 +57,20 @@ class HonestLogger:
         else:
             self.log_file = component_name
             
-        self.ensure_log_dir()
         self.session_start = time.time()
         self.total_lies_detected = 0
         
-        # Vider le fichier de log au démarrage
+        # Le fichier n'est vidé qu'au premier message : créer le logger
+        # (à l'import d'un module) ne touche pas au disque
+        self._session_started = False
+    
+    def _start_session(self):
+        """Vide le fichier de log et écrit l'en-tête de session"""
+        self.ensure_log_dir()
         with open(self.log_file, 'w') as f:
-            f.write(f"🎯 SESSION HONNÊTE DÉMARRÉE - {datetime.now()}\n")
+            f.write(f"🎯 SESSION HONNÊTE DÉMARRÉE - {datetime.fromtimestamp(self.session_start)}\n")
             f.write("=" * 80 + "\n\n")
+        self._session_started = True
     
     def ensure_log_dir(self):
         """Crée le répertoire de logs si nécessaire"""
@@ -78,6 +84,8 @@ class HonestLogger:
         log_line = f"[{timestamp}] {level.value} {message}\n"
         
         # Écriture dans le fichier seulement
+        if not self._session_started:
+            self._start_session()
         with open(self.log_file, 'a') as f:
             f.write(log_line)
         
@@ -0,0 +1,77 @@
+"""
+Limiteur de débit partagé par hôte pour les APIs externes
+Garantit l'espacement des requêtes même quand plusieurs threads interrogent la même API
+"""
+
+import threading
+import time
+import urllib.parse
+from typing import Dict, Optional
+
+
+class HostRateLimiter:
+    """Réserve des créneaux de requête par hôte, thread-safe"""
+
+    def __init__(self, default_interval: float = 0.5, host_intervals: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            default_interval: Délai minimum entre deux requêtes vers un même hôte (secondes)
+            host_intervals: Délais spécifiques par hôte (ex: {'musicbrainz.org': 1.0})
+        """
+        self.default_interval = default_interval
+        self.host_intervals = host_intervals or {}
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _interval_for(self, host: str) -> float:
+        """Retourne le délai applicable à un hôte (sous-domaines inclus)"""
+        for known_host, interval in self.host_intervals.items():
+            if host == known_host or host.endswith('.' + known_host):
+                return interval
+        return self.default_interval
+
+    def wait(self, url: str) -> float:
+        """
+        Attend le prochain créneau libre pour l'hôte de l'URL
+
+        Le créneau est réservé sous verrou puis l'attente se fait hors verrou :
+        des threads visant des hôtes différents ne se bloquent pas entre eux.
+
+        Returns:
+            Temps d'attente effectif en secondes
+        """
+        host = urllib.parse.urlparse(url).netloc.lower()
+        interval = self._interval_for(host)
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return max(delay, 0.0)
+
+
+# Instance globale partagée par tous les services de recherche
+_rate_limiter_instance = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> HostRateLimiter:
+    """Retourne le limiteur de débit global"""
+    global _rate_limiter_instance
+
+    if _rate_limiter_instance is None:
+        with _rate_limiter_lock:
+            if _rate_limiter_instance is None:
+                # MusicBrainz impose 1 requête/seconde, Discogs ~25/minute sans token
+                _rate_limiter_instance = HostRateLimiter(
+                    default_interval=0.5,
+                    host_intervals={
+                        'musicbrainz.org': 1.0,
+                        'api.discogs.com': 2.4,
+                    }
+                )
+
+    return _rate_limiter_instance
@@ -0,0 +1,183 @@
+"""
+Conteneur de services de support
+Une seule instance partagée par processus pour la configuration, l'état,
+les validateurs et la base de données, créée à la première utilisation
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from support.logger import get_logger
+
+
+class LazyService:
+    """
+    Référence différée vers un service du conteneur
+
+    Le service n'est créé qu'au premier accès à l'un de ses attributs :
+    un module peut conserver la référence dans son constructeur sans payer
+    l'initialisation (ouverture de la base, création du schéma) s'il ne
+    s'en sert jamais.
+    """
+
+    def __init__(self, container: "ServiceContainer", name: str):
+        object.__setattr__(self, '_container', container)
+        object.__setattr__(self, '_name', name)
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._container.get(self._name), attribute)
+
+    def __setattr__(self, attribute: str, value):
+        setattr(self._container.get(self._name), attribute, value)
+
+    def __repr__(self):
+        state = "créé" if self._container.is_initialized(self._name) else "non créé"
+        return f"<LazyService {self._name} ({state})>"
+
+
+class ServiceContainer:
+    """
+    Registre des services partagés
+
+    Chaque service est décrit par une fabrique ; get() crée l'instance au
+    premier appel (verrouillage à double vérification) puis renvoie toujours
+    la même. Le temps de création de chaque service est mesuré pour le
+    banc d'essai de démarrage.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._timings: Dict[str, float] = {}
+        # Réentrant : une fabrique peut demander un autre service (db -> config)
+        self._lock = threading.RLock()
+        self._register_defaults()
+
+    def _register_defaults(self):
+        """Services de support de l'application"""
+        from support.config_manager import ConfigManager
+        from support.state_manager import StateManager
+        from support.validator import FileValidator, MetadataValidator, Validator
+
+        self.register('config', ConfigManager)
+        self.register('state', StateManager)
+        self.register('validator', Validator)
+        self.register('file_validator', FileValidator)
+        self.register('metadata_validator', MetadataValidator)
+        self.register('db', self._create_database)
+
+    def _create_database(self):
+        # Import local : la couche support ne dépend de la base qu'à la demande
+        from database.db_manager import DatabaseManager
+        return DatabaseManager(config=self.config)
+
+    # === Registre ===
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """
+        Déclare (ou remplace) la fabrique d'un service
+
+        Args:
+            name: Nom du service
+            factory: Appelable sans argument qui crée l'instance
+        """
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """
+        Retourne l'instance partagée d'un service, créée au premier appel
+
+        Raises:
+            KeyError: Service inconnu
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                factory = self._factories[name]
+                start = time.perf_counter()
+                instance = factory()
+                self._timings[name] = time.perf_counter() - start
+                self._instances[name] = instance
+                get_logger().debug(f"Service '{name}' créé en {self._timings[name] * 1000:.1f} ms")
+        return instance
+
+    def lazy(self, name: str) -> LazyService:
+        """Référence vers un service, créé seulement à sa première utilisation"""
+        if name not in self._factories:
+            raise KeyError(name)
+        return LazyService(self, name)
+
+    def is_initialized(self, name: str) -> bool:
+        """Indique si le service a déjà été créé"""
+        return name in self._instances
+
+    def override(self, name: str, instance: Any):
+        """Impose une instance (tests, outils en ligne de commande)"""
+        with self._lock:
+            self._instances[name] = instance
+
+    def reset(self):
+        """Oublie les instances créées (les fabriques sont conservées)"""
+        with self._lock:
+            self._instances.clear()
+            self._timings.clear()
+
+    def get_timings(self) -> Dict[str, float]:
+        """Durée de création (secondes) de chaque service déjà créé"""
+        with self._lock:
+            return dict(self._timings)
+
+    # === Accès typés ===
+
+    @property
+    def config(self):
+        """Gestionnaire de configuration (ConfigManager)"""
+        return self.get('config')
+
+    @property
+    def state(self):
+        """Gestionnaire d'état (StateManager)"""
+        return self.get('state')
+
+    @property
+    def validator(self):
+        """Validateur complet (Validator)"""
+        return self.get('validator')
+
+    @property
+    def file_validator(self):
+        """Validateur de fichiers (FileValidator)"""
+        return self.get('file_validator')
+
+    @property
+    def metadata_validator(self):
+        """Validateur de métadonnées (MetadataValidator)"""
+        return self.get('metadata_validator')
+
+    @property
+    def db(self):
+        """Gestionnaire de base de données (DatabaseManager)"""
+        return self.get('db')
+
+
+# Instance globale
+_services_instance = None
+_services_lock = threading.Lock()
+
+def get_services() -> ServiceContainer:
+    """Retourne le conteneur de services global."""
+    global _services_instance
+
+    if _services_instance is None:
+        with _services_lock:
+            if _services_instance is None:
+                _services_instance = ServiceContainer()
+
+    return _services_instance
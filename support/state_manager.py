@@ -10,6 +10,7 @@ from threading import Lock
 import time
 import os
 from support.logger import get_logger
+from support.event_bus import Dispatch, EventBus, Subscription, Topic
 
 class ApplicationState(Enum):
     """États possibles de l'application."""
@@ -73,8 +74,9 @@ class StateManager:
         # Tâches d'import en cours
         self._import_tasks: Dict[str, ImportTask] = {}
         
-        # Système d'événements
-        self._event_handlers: Dict[str, List[Callable]] = {}
+        # Système d'événements (livraison synchrone, GTK ou pool selon l'abonnement)
+        self.events = EventBus()
+        self._handler_subscriptions: Dict[tuple, Subscription] = {}
         
         # Statistiques
         self._stats = {
@@ -143,7 +145,7 @@ class StateManager:
             self._albums[album.id] = album
         
         self.logger.debug(f"Album added: {album.name} ({album.id})")
-        self._emit_event('album_added', {'album': album})
+        self._emit_event('album_added', {'album': album}, album.path)
         return True
     
     def update_album(self, album_id: str, **kwargs) -> bool:
@@ -202,7 +204,7 @@ class StateManager:
                 self._selected_albums.remove(album_id)
         
         self.logger.debug(f"Album removed: {album_id}")
-        self._emit_event('album_removed', {'album_id': album_id, 'album': album})
+        self._emit_event('album_removed', {'album_id': album_id, 'album': album}, album.path)
         return True
     
     def get_album(self, album_id: str) -> Optional[AlbumState]:
@@ -369,19 +371,33 @@ class StateManager:
     
     # === Système d'événements ===
     
-    def register_event_handler(self, event_type: str, handler: Callable):
+    def register_event_handler(self, event_type: str, handler: Callable,
+                               dispatch: Dispatch = Dispatch.SYNC,
+                               path_prefix: Optional[str] = None,
+                               batch: bool = False) -> Subscription:
         """
         Enregistre un gestionnaire d'événement.
         
         Args:
             event_type: Type d'événement
-            handler: Fonction gestionnaire
+            handler: Fonction gestionnaire (reçoit les données, ou leur liste si batch)
+            dispatch: Thread de livraison ; les observateurs d'interface utilisent
+                      Dispatch.GTK pour ne jamais bloquer le pipeline
+            path_prefix: Ne recevoir que les événements des albums sous ce chemin
+            batch: Recevoir les événements accumulés en un seul appel
+            
+        Returns:
+            Abonnement sur le bus d'événements
         """
-        if event_type not in self._event_handlers:
-            self._event_handlers[event_type] = []
+        if batch:
+            callback = lambda events: handler([event.data for event in events])
+        else:
+            callback = lambda event: handler(event.data)
         
-        self._event_handlers[event_type].append(handler)
+        subscription = self.events.subscribe(event_type, callback, path_prefix, dispatch, batch)
+        self._handler_subscriptions[(event_type, handler)] = subscription
         self.logger.debug(f"Event handler registered for: {event_type}")
+        return subscription
     
     def unregister_event_handler(self, event_type: str, handler: Callable):
         """
@@ -391,27 +407,21 @@ class StateManager:
             event_type: Type d'événement
             handler: Fonction gestionnaire
         """
-        if event_type in self._event_handlers:
-            try:
-                self._event_handlers[event_type].remove(handler)
-                self.logger.debug(f"Event handler unregistered for: {event_type}")
-            except ValueError:
-                pass
+        subscription = self._handler_subscriptions.pop((event_type, handler), None)
+        if subscription is not None:
+            self.events.unsubscribe(subscription)
+            self.logger.debug(f"Event handler unregistered for: {event_type}")
     
-    def _emit_event(self, event_type: str, data: Dict[str, Any]):
+    def _emit_event(self, event_type: str, data: Dict[str, Any], album_path: Optional[str] = None):
         """
         Émet un événement.
         
         Args:
             event_type: Type d'événement
             data: Données de l'événement
+            album_path: Album concerné (abonnements par préfixe de chemin)
         """
-        if event_type in self._event_handlers:
-            for handler in self._event_handlers[event_type]:
-                try:
-                    handler(data)
-                except Exception as e:
-                    self.logger.error(f"Error in event handler for {event_type}: {e}")
+        self.events.publish(event_type, data, album_path or data.get('album_path'))
     
     # === Statistiques ===
     
@@ -459,8 +469,12 @@ class StateManager:
             # Log du changement de statut
             self.logger.debug(f"Album {album_path} status: {status}")
             
-            # Émettre un événement pour notifier l'UI
-            self._emit_event('album_status_changed', {
+            # Émis plusieurs fois par étape et par album : rien à construire sans abonné
+            if not self.events.has_subscribers(Topic.ALBUM_STATUS_CHANGED):
+                return True
+            
+            # Émettre un événement pour notifier l'UI (sans attendre les observateurs asynchrones)
+            self._emit_event(Topic.ALBUM_STATUS_CHANGED, {
                 'album_path': album_path,
                 'status': status,
                 'timestamp': time.time()
@@ -0,0 +1,59 @@
+"""
+Tests unitaires pour le module album_facts
+"""
+
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+
+from services import album_facts as module
+from services.album_facts import AlbumFactsService, album_facts_from_tracks, format_year_range
+
+
+class TestAlbumFacts:
+    """Tests pour les faits dérivés d'un album"""
+
+    def test_year_range(self):
+        """Année unique, plage de compilation et valeurs invalides"""
+        assert format_year_range(["1999", "1999-05-01"]) == "1999"
+        assert format_year_range(["2004", "1995", "----"]) == "1995-04"
+        assert format_year_range(["----", None, "0042"]) == ""
+
+    def test_facts_from_tracks_without_disk_access(self):
+        """Les faits sont calculés depuis les pistes et le contenu du dossier déjà listé"""
+        folder = tempfile.mkdtemp()
+        tracks = [{'year': "2001", 'duration': 100.5}, {'year': "2003", 'duration': 60}]
+        facts = album_facts_from_tracks(folder, tracks, ["01.mp3", "02.mp3", "folder.jpg"])
+        assert facts == {
+            'year_range': "2001-03",
+            'tracks': 2,
+            'total_duration': 160.5,
+            'has_cover': True,
+            'cover_path': os.path.join(folder, "folder.jpg")
+        }
+
+    def test_invalidation_during_compute_kept(self):
+        """Une invalidation reçue pendant le calcul n'est pas effacée par son résultat"""
+        folder = tempfile.mkdtemp()
+        album = {'folder_path': folder}
+        service = AlbumFactsService(max_workers=1)
+        computing, resume, delivered = threading.Event(), threading.Event(), threading.Event()
+
+        def read_album(path):
+            computing.set()
+            resume.wait(5)
+            return album_facts_from_tracks(path, [])
+
+        with patch.object(module, 'GLib', None), patch.object(module, 'read_album', read_album), \
+                patch.object(module, 'get_library_catalog'):
+            service.invalidate([folder])
+            service.ensure(album, lambda data: delivered.set())
+            assert computing.wait(5)
+            service.invalidate([folder])
+            resume.set()
+            assert delivered.wait(5)
+
+        assert 'year_range' in album
+        assert not service.has_facts(album)
+        service.executor.shutdown()
@@ -0,0 +1,199 @@
+"""
+Tests unitaires pour le service audio_converter
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
+
+from database.conversion_manifest import ConversionManifest
+from services.audio_converter import AudioConverter, ConversionStatus
+
+
+class SleepConverter(AudioConverter):
+    """Convertisseur dont la « conversion » est un processus Python qui dort"""
+
+    duration = 0.3
+
+    @property
+    def ffmpeg_available(self) -> bool:
+        return True
+
+    def _build_ffmpeg_command(self, job):
+        return [sys.executable, '-c',
+                f"import time; time.sleep({self.duration}); open({job.partial_path!r}, 'w').close()"]
+
+
+PROGRESS_SCRIPT = """
+import sys
+for position in (500000, 1000000, 1500000):
+    sys.stderr.write('x' * 200000)  # Sortie d'erreur bavarde : ne doit pas bloquer
+    print(f'out_time_us={position}\\nspeed=3.0x\\nprogress=continue', flush=True)
+print('out_time_us=2000000\\nspeed=N/A\\nprogress=end', flush=True)
+open(sys.argv[1], 'w').close()
+"""
+
+
+class ProgressConverter(SleepConverter):
+    """Convertisseur dont le processus imite la sortie -progress de FFmpeg"""
+
+    def _build_ffmpeg_command(self, job):
+        return [sys.executable, '-c', PROGRESS_SCRIPT, job.partial_path]
+
+
+class TestAudioConverter:
+    """Tests pour les workers de conversion parallèles"""
+
+    def setup_method(self):
+        """Configuration avant chaque test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.finished = threading.Event()
+
+    def teardown_method(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _converter(self, files, max_workers, manifest=None):
+        converter = SleepConverter(max_workers=max_workers, manifest=manifest)
+        converter.on_queue_finished = self.finished.set
+        jobs = []
+        for index in range(files):
+            source = os.path.join(self.temp_dir, f"piste{index}.flac")
+            if not os.path.exists(source):
+                open(source, 'w').close()
+            jobs.append(converter.add_conversion_job(source, 'mp3', self.temp_dir))
+        return converter, jobs
+
+    def _manifest(self):
+        return ConversionManifest(db_path=os.path.join(self.temp_dir, "conversions.db"))
+
+    def test_jobs_run_in_parallel(self):
+        """Les tâches sont converties simultanément, chacune vers sa propre cible"""
+        converter, jobs = self._converter(4, max_workers=4)
+        running = []
+        converter.on_job_started = lambda job: running.append(converter.get_queue_status()['running_jobs'])
+
+        converter.start_conversion()
+        assert self.finished.wait(10)
+
+        assert all(job.status == ConversionStatus.COMPLETED for job in jobs)
+        assert all(os.path.exists(job.target_path) for job in jobs)
+        assert max(running) > 1
+        assert not converter.is_converting
+
+    def test_cancel_running_job(self):
+        """Une tâche en cours annulée n'arrête pas les autres et ne laisse pas de sortie"""
+        converter, jobs = self._converter(3, max_workers=2)
+        converter.duration = 2
+        started = threading.Event()
+        converter.on_job_started = lambda job: job is jobs[0] and started.set()
+
+        converter.start_conversion()
+        assert started.wait(5)
+        assert converter.cancel_job(jobs[0])
+        converter.duration = 0.1
+        assert self.finished.wait(10)
+
+        assert jobs[0].status == ConversionStatus.CANCELLED
+        assert not os.path.exists(jobs[0].target_path)
+        assert jobs[2].status == ConversionStatus.COMPLETED
+
+    def test_progress_parsed_from_ffmpeg_output(self):
+        """Avancement, débit et ETA sont lus sur -progress sans bloquer sur stderr"""
+        converter = ProgressConverter(max_workers=1)
+        converter.on_queue_finished = self.finished.set
+        source = os.path.join(self.temp_dir, "piste.flac")
+        open(source, 'w').close()
+        job = converter.add_conversion_job(source, 'mp3', self.temp_dir)
+        job.duration = 2.0  # Fichier factice : durée imposée
+        updates = []
+        converter.on_job_progress = lambda job, progress: updates.append((progress, job.speed, job.eta))
+
+        converter.start_conversion()
+        assert self.finished.wait(10)
+
+        assert job.status == ConversionStatus.COMPLETED
+        assert updates[0] == (25.0, 3.0, 0.5)
+        assert [progress for progress, _, _ in updates] == [25.0, 50.0, 75.0, 99.0, 100.0]
+        assert updates[3][1] > 0  # speed=N/A : débit recalculé sur le temps écoulé
+
+    def test_duration_probed_off_caller_thread(self):
+        """L'ajout d'une tâche n'ouvre pas la source : sa durée est lue en arrière-plan"""
+        probed = threading.Event()
+        threads = []
+
+        def probe_duration(file_path):
+            threads.append(threading.current_thread())
+            probed.set()
+            return 42.0
+
+        converter = SleepConverter(max_workers=1)
+        converter._probe_duration = probe_duration
+        source = os.path.join(self.temp_dir, "piste.flac")
+        open(source, 'w').close()
+        job = converter.add_conversion_job(source, 'mp3', self.temp_dir)
+
+        assert probed.wait(5)
+        converter._probe_executor.shutdown(wait=True)
+        assert threads == [threads[0]] and threads[0] is not threading.current_thread()
+        assert job.duration == 42.0
+        assert converter.get_queue_status()['remaining_audio_seconds'] == 42.0
+
+    def test_incremental_run_converts_only_changed_sources(self):
+        """Une nouvelle exécution ignore les sources inchangées et remplace la cible des autres"""
+        manifest = self._manifest()
+        converter, jobs = self._converter(2, max_workers=2, manifest=manifest)
+        converter.duration = 0.05
+        converter.start_conversion()
+        assert self.finished.wait(10)
+        assert not any(name.startswith('.') and 'partial' in name for name in os.listdir(self.temp_dir))
+
+        with open(jobs[1].source_path, 'w') as f:
+            f.write("modifié")
+        _, rerun = self._converter(2, max_workers=2, manifest=manifest)
+
+        assert [job.status for job in rerun] == [ConversionStatus.SKIPPED, ConversionStatus.PENDING]
+        assert [job.target_path for job in rerun] == [job.target_path for job in jobs]
+
+    def test_selection_queued_in_one_batch(self):
+        """Une sélection est ajoutée à la file persistante en un seul lot"""
+        manifest = self._manifest()
+        converter = SleepConverter(manifest=manifest)
+        sources = []
+        for index in range(3):
+            sources.append(os.path.join(self.temp_dir, f"piste{index}.flac"))
+            open(sources[-1], 'w').close()
+        entries = [{'source_path': source, 'target_format': 'mp3', 'output_dir': self.temp_dir}
+                   for source in sources]
+
+        with patch.object(manifest, 'enqueue_many', wraps=manifest.enqueue_many) as enqueue_many:
+            jobs = converter.add_conversion_jobs(entries)
+
+        enqueue_many.assert_called_once()
+        assert [(job['queue_id'], job['source_path']) for job in manifest.pending_jobs()] == \
+            [(job.queue_id, job.source_path) for job in jobs]
+        assert len({job.target_path for job in jobs}) == 3
+
+    def test_stopped_queue_resumes_after_restart(self):
+        """Une tâche interrompue par un arrêt reste dans la file reprise au redémarrage"""
+        manifest = self._manifest()
+        converter, jobs = self._converter(3, max_workers=1, manifest=manifest)
+        converter.duration = 2
+        started = threading.Event()
+        converter.on_job_started = lambda job: started.set()
+
+        converter.start_conversion()
+        assert started.wait(5)
+        converter.stop_conversion()
+        assert self.finished.wait(10)
+
+        assert jobs[0].status == ConversionStatus.PENDING
+        assert not os.path.exists(jobs[0].partial_path)
+        assert not os.path.exists(jobs[0].target_path)
+
+        restored = SleepConverter(manifest=manifest).restore_queue()
+        assert [job.source_path for job in restored] == [job.source_path for job in jobs]
+        assert all(job.status == ConversionStatus.PENDING for job in restored)
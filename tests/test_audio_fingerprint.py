@@ -0,0 +1,46 @@
+"""
+Tests unitaires pour le module audio_fingerprint
+"""
+
+import os
+import tempfile
+
+from support.audio_fingerprint import audio_fingerprint, audio_payload_range
+
+
+class TestAudioFingerprint:
+    """Tests pour l'empreinte des données audio"""
+
+    def setup_method(self):
+        """Configuration avant chaque test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.audio = os.urandom(600 * 1024)
+
+    def _write(self, name, data):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def _id3v2(self, payload_size):
+        """En-tête ID3v2.4 minimal suivi de remplissage"""
+        size = bytes((payload_size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+        return b'ID3\x04\x00\x00' + size + bytes(payload_size)
+
+    def test_tags_do_not_change_fingerprint(self):
+        """Les tags ID3v2 et ID3v1 sont ignorés"""
+        plain = self._write("plain.mp3", self.audio)
+        tagged = self._write("tagged.mp3", self._id3v2(5000) + self.audio + b'TAG' + bytes(125))
+        assert audio_fingerprint(plain) == audio_fingerprint(tagged)
+
+    def test_audio_change_changes_fingerprint(self):
+        """Une modification des données audio change l'empreinte"""
+        original = self._write("a.mp3", self.audio)
+        modified = self._write("b.mp3", b'\x00' + self.audio[1:])
+        assert audio_fingerprint(original) != audio_fingerprint(modified)
+
+    def test_flac_metadata_blocks_skipped(self):
+        """Les blocs de métadonnées FLAC sont exclus de la plage audio"""
+        header = b'fLaC' + bytes([0x00, 0, 0, 34]) + bytes(34) + bytes([0x84, 0, 0, 10]) + bytes(10)
+        path = self._write("x.flac", header + b'AUDIO')
+        assert audio_payload_range(path) == (len(header), len(header) + 5)
@@ -0,0 +1,106 @@
+"""
+Tests unitaires pour le module db_manager
+"""
+
+import os
+import tempfile
+import threading
+
+from database.db_manager import DatabaseManager
+
+
+class TestDatabaseManager:
+    """Tests pour DatabaseManager"""
+
+    def setup_method(self):
+        """Configuration avant chaque test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "test.db")
+        self.db = DatabaseManager(db_path=self.db_path)
+
+    def test_connection_reused_in_same_thread(self):
+        """Une seule connexion par thread, partagée entre instances"""
+        other = DatabaseManager(db_path=self.db_path)
+        assert self.db.get_connection() is other.get_connection()
+
+    def test_connection_per_thread(self):
+        """Chaque thread obtient sa propre connexion"""
+        connections = []
+        thread = threading.Thread(target=lambda: connections.append(self.db.get_connection()))
+        thread.start()
+        thread.join()
+        assert connections[0] is not self.db.get_connection()
+
+    def test_wal_journal_mode(self):
+        """La base est ouverte en mode WAL"""
+        mode = self.db.get_connection().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode.lower() == "wal"
+
+    def test_case_exception_roundtrip(self):
+        """Ajout puis lecture d'une exception de casse"""
+        assert self.db.add_case_exception("AC/DC", "AC/DC")
+        assert self.db.get_case_exception("ac/dc") == "AC/DC"
+        assert self.db.remove_case_exception("AC/DC")
+        assert self.db.get_case_exception("ac/dc") is None
+
+    def test_history_writer_batches_rows(self):
+        """L'écrivain d'historique insère étapes et changements par lot"""
+        from database.history_writer import HistoryWriter
+
+        writer = HistoryWriter(db_manager=self.db, batch_size=1000)
+        writer.record_step("/music/album", "case_correction", files_processed=3, changes_made=2)
+        for i in range(5):
+            writer.record_change(f"/music/album/{i}.mp3", "TIT2", "old", "New",
+                                 rule_applied="case", module="test", album_path="/music/album")
+        assert writer.flush(wait=True)
+        writer.close()
+
+        history = self.db.get_import_history()
+        assert len(history) == 1
+        assert history[0]['rules_applied']['operation_type'] == "case_correction"
+        changes = self.db.get_change_history(album_path="/music/album")
+        assert len(changes) == 5
+        assert changes[0]['new_value'] == "New"
+
+    def test_history_writer_restarts_after_close(self):
+        """Un enregistrement reçu après close() est écrit par un nouvel écrivain"""
+        from database.history_writer import HistoryWriter
+
+        writer = HistoryWriter(db_manager=self.db)
+        writer.record_step("/music/a", "case_correction")
+        writer.close()
+        writer.record_step("/music/b", "file_renaming")
+        writer.close()
+
+        assert sorted(entry['album_path'] for entry in self.db.get_import_history()) == ["/music/a", "/music/b"]
+
+    def test_statistics_follow_inserts_and_cleanup(self):
+        """Les cumuls suivent les insertions et suppressions"""
+        self.db.save_import_history("/music/a", "case_correction", files_processed=4)
+        self.db.save_import_history("/music/b", "file_renaming", files_processed=2, status="error")
+        self.db.add_import_record("/music/c", "success", files_processed=1)
+
+        stats = self.db.get_import_statistics()
+        assert stats['total_imports'] == 3
+        assert stats['failed_imports'] == 1
+        assert stats['total_files_processed'] == 7
+        assert stats['by_operation'] == {'case_correction': 1, 'file_renaming': 1, 'import': 1}
+
+        conn = self.db.get_connection()
+        with conn:
+            conn.execute("UPDATE import_history SET import_date = '2000-01-01 00:00:00' WHERE album_path = '/music/b'")
+        assert self.db.cleanup_old_records(days=30) == 1
+        assert self.db.get_import_statistics()['total_imports'] == 2
+
+    def test_history_pages(self):
+        """La pagination par curseur parcourt tout l'historique sans doublon"""
+        for i in range(5):
+            self.db.save_import_history(f"/music/{i}", "case_correction")
+
+        first = self.db.get_import_history_page(page_size=2)
+        second = self.db.get_import_history_page(page_size=2, before_id=first['next_before_id'])
+        third = self.db.get_import_history_page(page_size=2, before_id=second['next_before_id'])
+
+        paths = [r['album_path'] for page in (first, second, third) for r in page['records']]
+        assert paths == [f"/music/{i}" for i in range(4, -1, -1)]
+        assert third['next_before_id'] is None
@@ -0,0 +1,51 @@
+"""
+Tests unitaires pour le module event_bus
+"""
+
+import threading
+
+from support.event_bus import Dispatch, EventBus, Topic
+
+
+class TestEventBus:
+    """Tests pour le bus d'événements"""
+
+    def setup_method(self):
+        """Configuration avant chaque test"""
+        self.bus = EventBus()
+
+    def teardown_method(self):
+        """Nettoyage après chaque test"""
+        self.bus.shutdown()
+
+    def test_path_prefix_subscription(self):
+        """Un abonnement par préfixe couvre l'album et ses sous-dossiers uniquement"""
+        received = []
+        self.bus.subscribe(Topic.METADATA_CHANGED, lambda event: received.append(event.album_path),
+                           path_prefix="/music/Album")
+        for path in ("/music/Album", "/music/Album/CD1", "/music/Album 2", None):
+            self.bus.publish(Topic.METADATA_CHANGED, {}, path)
+        assert received == ["/music/Album", "/music/Album/CD1"]
+
+    def test_pool_dispatch_does_not_block_publisher(self):
+        """Le thread qui publie n'attend pas un observateur lent ; la rafale est livrée en lot"""
+        release = threading.Event()
+        done = threading.Event()
+        batches = []
+
+        def slow_handler(events):
+            release.wait(5)
+            batches.append([event.data['step'] for event in events])
+            if sum(len(batch) for batch in batches) == 3:
+                done.set()
+
+        self.bus.subscribe("album_status_changed", slow_handler, dispatch=Dispatch.POOL, batch=True)
+        for step in range(3):
+            assert self.bus.publish("album_status_changed", {'step': step}) == 1
+        release.set()
+
+        assert done.wait(5)
+        assert [step for batch in batches for step in batch] == [0, 1, 2]
+        stats = self.bus.get_stats()["album_status_changed"]
+        assert stats['published'] == 3
+        assert stats['handler_calls'] == len(batches)
@@ -0,0 +1,88 @@
+"""
+Tests unitaires pour le module library_catalog
+"""
+
+import os
+import tempfile
+
+from database.library_catalog import LibraryCatalog, folder_signature
+
+
+class TestLibraryCatalog:
+    """Tests pour le catalogue persistant de la bibliothèque"""
+
+    def setup_method(self):
+        """Configuration avant chaque test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.catalog = LibraryCatalog(db_path=os.path.join(self.temp_dir, "library.db"))
+        self.album_dir = os.path.join(self.temp_dir, "Artiste - Album")
+        os.makedirs(self.album_dir)
+        for name in ("01.mp3", "02.mp3"):
+            with open(os.path.join(self.album_dir, name), 'wb') as f:
+                f.write(b'x')
+
+    def teardown_method(self):
+        """Nettoyage après chaque test"""
+        self.catalog.close()
+
+    def _album(self):
+        return {
+            'folder_path': self.album_dir, 'artist': "Artiste", 'album': "Album",
+            'year': "2001", 'tracks': 2, 'files': ["01.mp3", "02.mp3"]
+        }
+
+    def test_save_and_load_roundtrip(self):
+        """Les albums enregistrés sont rechargés avec leurs fichiers"""
+        self.catalog.save_albums([self._album()], self.temp_dir)
+        albums = self.catalog.load_albums()
+        assert len(albums) == 1
+        assert albums[0]['files'] == ["01.mp3", "02.mp3"]
+        assert albums[0]['artist'] == "Artiste"
+        assert self.catalog.get_roots() == [self.temp_dir]
+
+    def test_signature_follows_folder_changes(self):
+        """L'empreinte stockée diffère dès qu'un fichier du dossier change"""
+        self.catalog.save_albums([self._album()], self.temp_dir)
+        stored = self.catalog.get_signatures(self.temp_dir)[self.album_dir]
+        assert stored == folder_signature(self.album_dir, ["01.mp3", "02.mp3"])
+
+        with open(os.path.join(self.album_dir, "02.mp3"), 'ab') as f:
+            f.write(b'tag')
+        assert stored != folder_signature(self.album_dir, ["01.mp3", "02.mp3"])
+
+    def test_signature_refreshed_after_tag_write(self):
+        """Une écriture de tags faite par l'application ne fait pas réanalyser l'album"""
+        self.catalog.save_albums([self._album()], self.temp_dir)
+        track = os.path.join(self.album_dir, "02.mp3")
+        with open(track, 'ab') as f:
+            f.write(b'tag')
+
+        self.catalog.update_track_tags(track, {'title': "Intro"})
+        stored = self.catalog.get_signatures(self.temp_dir)[self.album_dir]
+        assert stored == folder_signature(self.album_dir, ["01.mp3", "02.mp3"])
+
+        # Fichier ajouté hors de l'application : l'empreinte reste périmée
+        with open(os.path.join(self.album_dir, "03.mp3"), 'wb') as f:
+            f.write(b'x')
+        self.catalog.update_album_tags(self.album_dir, {'genre': "Rock"})
+        assert self.catalog.get_signatures(self.temp_dir)[self.album_dir] == stored
+
+    def test_remove_albums(self):
+        """Les albums retirés disparaissent avec leurs pistes"""
+        self.catalog.save_albums([self._album()], self.temp_dir)
+        self.catalog.remove_albums([self.album_dir])
+        assert not self.catalog.has_albums()
+        assert self.catalog.load_albums() == []
+
+    def test_search_follows_tag_writes(self):
+        """La recherche par préfixe suit les écritures de tags"""
+        album = self._album()
+        album['artist'] = "Beyoncé"
+        album['track_metadata'] = [{'file_name': "01.mp3", 'title': "Formation"},
+                                   {'file_name': "02.mp3", 'title': "Sorry"}]
+        self.catalog.save_albums([album], self.temp_dir)
+        assert self.catalog.search("beyon form") == [self.album_dir]
+
+        self.catalog.update_track_tags(os.path.join(self.album_dir, "01.mp3"), {'title': "Hold Up"})
+        assert self.catalog.search("formation") == []
+        assert self.catalog.search("hold") == [self.album_dir]
@@ -0,0 +1,29 @@
+"""
+Tests unitaires pour le module service_container
+"""
+
+from support.service_container import ServiceContainer
+
+
+class TestServiceContainer:
+    """Tests pour le conteneur de services partagés"""
+
+    def setup_method(self):
+        """Configuration avant chaque test"""
+        self.container = ServiceContainer()
+        self.created = []
+        self.container.register('heavy', lambda: self.created.append(1) or {'value': 42})
+
+    def test_instance_shared(self):
+        """Un service n'est créé qu'une fois puis partagé"""
+        assert self.container.get('heavy') is self.container.get('heavy')
+        assert self.created == [1]
+        assert 'heavy' in self.container.get_timings()
+
+    def test_lazy_reference_created_on_first_use(self):
+        """Une référence différée ne crée le service qu'à son premier usage"""
+        reference = self.container.lazy('heavy')
+        assert not self.container.is_initialized('heavy')
+        assert reference.get('value') == 42
+        assert self.container.is_initialized('heavy')
+        assert self.created == [1]
@@ -0,0 +1,77 @@
+"""
+Tests unitaires pour le module tag_carryover
+"""
+
+import os
+import shutil
+import tempfile
+
+from mutagen.flac import FLAC, Picture
+
+from services.tag_carryover import CarriedTags, read_source_tags, write_target_tags
+
+
+class TestTagCarryover:
+    """Tests pour le report des tags et de la pochette lors d'une conversion"""
+
+    def setup_method(self):
+        """Configuration avant chaque test"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _flac(self, name):
+        """Fichier FLAC minimal : STREAMINFO (1 s à 44,1 kHz) puis données audio"""
+        path = os.path.join(self.temp_dir, name)
+        stream_info = (4096).to_bytes(2, 'big') * 2 + bytes(6)
+        stream_info += ((44100 << 44) | (1 << 41) | (15 << 36) | 44100).to_bytes(8, 'big') + bytes(16)
+        with open(path, 'wb') as f:
+            f.write(b'fLaC' + bytes([0x80, 0, 0, 34]) + stream_info + b'\xff\xf8' + bytes(100))
+        return path
+
+    def _mp3(self, name):
+        """Fichier MP3 sans tags : trames MPEG-1 Layer III 128 kbit/s"""
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write((b'\xff\xfb\x90\x64' + bytes(413)) * 20)
+        return path
+
+    def test_flac_to_mp3_carries_normalized_tags_and_cover(self):
+        """Tags normalisés et pochette passent d'un FLAC à un MP3"""
+        source = self._flac("source.flac")
+        audio = FLAC(source)
+        audio['TITLE'] = "  Premier   titre "
+        audio['ARTIST'] = "Artiste"
+        audio['TRACKNUMBER'] = "3"
+        audio['TRACKTOTAL'] = "12"
+        picture = Picture()
+        picture.type = 3
+        picture.mime = "image/png"
+        picture.data = b'PNG-DATA'
+        audio.add_picture(picture)
+        audio.save()
+
+        carried = read_source_tags(source)
+        assert carried.duration == 1.0
+
+        target = self._mp3("cible.mp3")
+        write_target_tags(target, carried)
+
+        written = read_source_tags(target)
+        assert written.fields == {'title': "Premier titre", 'artist': "Artiste", 'track_number': "3/12"}
+        assert (written.cover, written.cover_mime) == (b'PNG-DATA', "image/png")
+
+    def test_existing_target_tags_replaced(self):
+        """Les tags déjà présents dans la cible (écrits par l'encodeur) sont remplacés"""
+        target = self._flac("cible.flac")
+        audio = FLAC(target)
+        audio['ENCODER'] = "Lavf"
+        audio['TITLE'] = "Ancien"
+        audio.save()
+
+        write_target_tags(target, CarriedTags(fields={'title': "Nouveau", 'disc_number': "1/2"}))
+
+        audio = FLAC(target)
+        assert sorted(audio.tags) == [('DISCNUMBER', "1"), ('DISCTOTAL', "2"), ('TITLE', "Nouveau")]
@@ -0,0 +1,69 @@
+"""
+Tests unitaires pour le module tag_snapshot
+"""
+
+import os
+import tempfile
+
+from services import tag_snapshot
+from services.metadata_backup import MetadataBackup
+
+
+class TestTagSnapshot:
+    """Tests pour les instantanés de tags bruts"""
+
+    def setup_method(self):
+        """Configuration avant chaque test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.picture = os.urandom(4096)
+
+    def _flac(self, name, picture):
+        """Fichier FLAC minimal : STREAMINFO, PICTURE (dernier bloc) puis données audio"""
+        path = os.path.join(self.temp_dir, name)
+        header = b'fLaC' + bytes([0x00, 0, 0, 34]) + bytes(34)
+        header += bytes([0x86]) + len(picture).to_bytes(3, 'big') + picture
+        with open(path, 'wb') as f:
+            f.write(header + b'AUDIODATA')
+        return path
+
+    def test_identical_covers_stored_once(self):
+        """Deux pochettes identiques ne produisent qu'une image"""
+        blobs = {}
+        tag_snapshot.capture_file(self._flac("1.flac", self.picture), blobs)
+        tag_snapshot.capture_file(self._flac("2.flac", self.picture), blobs)
+        assert list(blobs) == [tag_snapshot.blob_hash(self.picture)]
+
+    def test_encode_decode_restore_roundtrip(self):
+        """Un fichier restauré depuis un instantané est identique à l'octet près"""
+        path = self._flac("1.flac", self.picture)
+        with open(path, 'rb') as f:
+            original = f.read()
+
+        blobs = {}
+        entry = tag_snapshot.capture_file(path, blobs)
+        files = tag_snapshot.decode_snapshot(tag_snapshot.encode_snapshot({"1.flac": entry}))
+
+        with open(path, 'wb') as f:
+            f.write(b'fLaC' + bytes([0x80, 0, 0, 34]) + bytes(34) + b'AUDIODATA')
+
+        restored = files["1.flac"]
+        head = tag_snapshot.join_segments(restored.segments, blobs)
+        tag_snapshot.restore_file(path, restored.kind, head, restored.tail)
+        with open(path, 'rb') as f:
+            assert f.read() == original
+
+    def test_same_name_file_with_different_audio_left_untouched(self, tmp_path):
+        """Un fichier de même nom mais d'audio différent n'est pas restauré"""
+        backup = MetadataBackup(db_path=str(tmp_path / "backup.db"))
+        path = self._flac("1.flac", self.picture)
+        assert backup.snapshot_album(self.temp_dir) is not None
+
+        # Fichier remplacé (réencodé) : autres en-têtes et autres données audio
+        with open(path, 'wb') as f:
+            f.write(b'fLaC' + bytes([0x80, 0, 0, 34]) + bytes(range(34)) + b'OTHERAUDIO')
+        with open(path, 'rb') as f:
+            replaced = f.read()
+
+        assert backup.restore_album_snapshot(self.temp_dir) == 0
+        with open(path, 'rb') as f:
+            assert f.read() == replaced
@@ -0,0 +1,74 @@
+"""
+Tests unitaires pour le module tag_write_queue
+"""
+
+import os
+import tempfile
+from unittest.mock import patch
+
+from mutagen.id3 import ID3
+
+from services import tag_write_queue as module
+from services.tag_write_queue import TagWriteQueue
+
+
+class TestTagWriteQueue:
+    """Tests pour la file d'écriture différée des tags"""
+
+    def setup_method(self):
+        """Configuration avant chaque test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, "01.mp3")
+        with open(self.file_path, 'wb') as f:
+            f.write(b'\x00' * 128)
+        self.queue = TagWriteQueue(delay=60)  # Écriture déclenchée uniquement par flush
+
+    def teardown_method(self):
+        """Nettoyage après chaque test"""
+        self.queue.shutdown()
+
+    def test_edits_merged_into_one_save(self):
+        """Plusieurs modifications d'un fichier donnent une seule sauvegarde"""
+        with patch.object(module, 'write_tags', wraps=module.write_tags) as write_tags:
+            self.queue.enqueue(self.file_path, {'title': "Intro"})
+            self.queue.enqueue(self.file_path, {'year': "1999", 'title': "Outro"})
+            assert self.queue.wait_idle(timeout=5)
+
+        write_tags.assert_called_once_with(self.file_path, {'title': "Outro", 'year': "1999"})
+        tags = ID3(self.file_path)
+        assert str(tags['TIT2']) == "Outro"
+        assert str(tags['TDRC']) == "1999"
+
+    def test_rename_then_edit_by_new_path(self):
+        """Une modification adressée au chemin renommé rejoint l'écriture en attente"""
+        new_path = os.path.join(self.temp_dir, "01 - Intro.mp3")
+        written = []
+        self.queue.enqueue(self.file_path, {'title': "Intro"}, rename_to=new_path)
+        self.queue.enqueue(new_path, {'track_number': "1"},
+                           after_write=lambda old, new, fields: written.append((old, new, fields)))
+        assert self.queue.wait_idle(timeout=5)
+
+        assert not os.path.exists(self.file_path)
+        assert str(ID3(new_path)['TRCK']) == "1"
+        assert written == [(self.file_path, new_path, {'title': "Intro", 'track_number': "1"})]
+
+    def test_failure_reported(self):
+        """Un échec d'écriture est transmis au callback d'erreur"""
+        errors = []
+        missing = os.path.join(self.temp_dir, "absent.flac")
+        self.queue.enqueue(missing, {'title': "X"}, on_error=lambda path, message: errors.append(path))
+        assert self.queue.wait_idle(timeout=5)
+        assert errors == [missing]
+
+    def test_mp4_track_number_with_total(self):
+        """Un numéro de piste « n/total » est écrit tel quel dans l'atome trkn"""
+        class FakeMP4(dict):
+            def __init__(self, path):
+                super().__init__()
+            def save(self):
+                saved.update(self)
+
+        saved = {}
+        with patch.object(module, 'MP4', FakeMP4):
+            module.write_tags(os.path.join(self.temp_dir, "01.m4a"), {'track_number': "3/12"})
+        assert saved['trkn'] == [(3, 12)]
@@ -7,19 +7,14 @@ import os
 import gi
 gi.require_version('Gtk', '3.0')
 
-from gi.repository import Gtk, Pango, GdkPixbuf, GdkPixbuf
+from gi.repository import Gtk, GLib, Pango, GdkPixbuf
 from typing import Dict
 import os
 from pathlib import Path
 import glob
 
-# Import pour lecture métadonnées
-try:
-    from mutagen.mp3 import MP3
-    from mutagen.id3 import ID3NoHeaderError
-    MUTAGEN_AVAILABLE = True
-except ImportError:
-    MUTAGEN_AVAILABLE = False
+from services.album_cover_thumbnails import album_cover_thumbnails
+from services.album_facts import album_facts, find_cover_file
 
 # Import du gestionnaire d'événements - DÉSACTIVÉ, remplacé par RefreshManager
 # from services.metadata_event_manager import metadata_event_manager
@@ -64,7 +59,7 @@ class AlbumCard(Gtk.Frame):
         # Case de sélection à droite
         self.selection_checkbox = Gtk.CheckButton()
         self.selection_checkbox.set_halign(Gtk.Align.END)
-        self.selection_checkbox.connect("toggled", self.on_selection_toggled)
+        self._selection_handler = self.selection_checkbox.connect("toggled", self.on_selection_toggled)
         header_box.pack_end(self.selection_checkbox, False, False, 0)
         
         vbox.pack_start(header_box, False, False, 0)
@@ -74,9 +69,12 @@ class AlbumCard(Gtk.Frame):
         cover_frame.set_size_request(300, 300)
         cover_frame.set_halign(Gtk.Align.CENTER)
         
-        # Affichage de la pochette d'album (vraie image ou placeholder)
-        self.cover_widget = self._create_cover_widget()
-        cover_frame.add(self.cover_widget)
+        # Affichage de la pochette d'album (placeholder puis image décodée en arrière-plan)
+        self.cover_frame = cover_frame
+        self.cover_widget = None
+        self._cover_ticket = None
+        self._cover_key = None  # pochette affichée, pour ne rien redessiner si elle n'a pas changé
+        self._show_cover()
         
         vbox.pack_start(cover_frame, False, False, 0)
         
@@ -86,32 +84,14 @@ class AlbumCard(Gtk.Frame):
         
         # Ligne 1 : Artiste (en gras)
         artist_label = Gtk.Label()
-        artist_label.set_markup(f'<b>{album_data.get("artist", "Artiste Inconnu")}</b>')
         artist_label.set_halign(Gtk.Align.CENTER)
         artist_label.set_justify(Gtk.Justification.CENTER)
         artist_label.set_ellipsize(Pango.EllipsizeMode.END)
         artist_label.set_max_width_chars(25)
         info_box.pack_start(artist_label, False, False, 0)
         
-        # Ligne 2 : Titre = métadonnées album (priorité) puis nom du dossier (fallback)
-        # Priorité aux métadonnées de l'album plutôt qu'au nom du dossier
-        album_title = album_data.get('album', '')
-        if not album_title:
-            # Fallback sur le nom du dossier seulement si pas de métadonnées album
-            folder_path = album_data.get('folder_path') or album_data.get('path')
-            album_title = os.path.basename(folder_path) if folder_path else 'Album Inconnu'
-        
-        # Ajouter l'année au format (Année) Titre
-        # Calculer la plage d'années en scannant TOUS les fichiers
-        folder_path = album_data.get('folder_path') or album_data.get('path')
-        year_range = self._calculate_compilation_year_range(folder_path)
-        
-        if year_range:
-            year_title_text = f"({year_range}) {album_title}"
-        else:
-            year_title_text = album_title
+        # Ligne 2 : (Année) Titre
         year_title_label = Gtk.Label()
-        year_title_label.set_text(year_title_text)
         year_title_label.set_halign(Gtk.Align.CENTER)
         year_title_label.set_justify(Gtk.Justification.CENTER)
         year_title_label.get_style_context().add_class("subtitle-label")
@@ -121,7 +101,6 @@ class AlbumCard(Gtk.Frame):
         
         # Ligne 3 : Genre
         genre_label = Gtk.Label()
-        genre_label.set_text(album_data.get("genre", "Genre inconnu"))
         genre_label.set_halign(Gtk.Align.CENTER)
         genre_label.set_justify(Gtk.Justification.CENTER)
         genre_label.get_style_context().add_class("subtitle-label")
@@ -131,6 +110,12 @@ class AlbumCard(Gtk.Frame):
         
         vbox.pack_start(info_box, False, False, 0)
         
+        self.artist_label = artist_label
+        self.year_title_label = year_title_label
+        self.genre_label = genre_label
+        self._shown = {}  # texte affiché par label, pour ne toucher que les labels modifiés
+        self._apply_labels()
+        
         # Boutons d'action compacts sans classe CSS contraignante
         self.edit_button = Gtk.Button(label="Éditer l'album")
         self.edit_button.set_size_request(-1, 20)  
@@ -150,11 +135,65 @@ class AlbumCard(Gtk.Frame):
         vbox.pack_start(self.remove_button, False, False, 2)
         
         self.add(vbox)
+        self._apply_selection()
         
         # S'enregistrer comme observateur pour les changements de métadonnées - DÉSACTIVÉ
         # Remplacé par RefreshManager qui gère centralement les mises à jour
         # self._register_metadata_observer()
     
+    def bind(self, album_data: Dict):
+        """
+        Réaffecte la carte à un autre album (recyclage par la grille virtuelle).
+        
+        Args:
+            album_data: Données du nouvel album à afficher
+        """
+        self.album_data = album_data
+        self.original_album_path = album_data.get('folder_path') or album_data.get('path', '')
+        self._apply_labels()
+        self._apply_selection()
+        self._show_cover()
+    
+    def _apply_labels(self):
+        """Met à jour les labels artiste, (année) titre et genre depuis album_data (seulement ceux qui changent)"""
+        self._set_label('artist', self.artist_label.set_markup,
+                        f'<b>{GLib.markup_escape_text(self.album_data.get("artist") or "Artiste Inconnu")}</b>')
+        
+        # Titre = métadonnées album (priorité) puis nom du dossier (fallback)
+        folder_path = self.album_data.get('folder_path') or self.album_data.get('path') or self.original_album_path
+        album_title = self.album_data.get('album', '')
+        if not album_title:
+            album_title = os.path.basename(folder_path) if folder_path else 'Album Inconnu'
+        
+        # Ajouter l'année au format (Année) Titre (plage d'années pour les compilations)
+        # La plage vient des faits de l'album ; calculée en arrière-plan si inconnue
+        year_range = self.album_data.get('year_range') if album_facts.has_facts(self.album_data) else None
+        if year_range is None:
+            album_facts.ensure(self.album_data, self._on_album_facts)
+        self._set_label('year_title', self.year_title_label.set_text,
+                        f"({year_range}) {album_title}" if year_range else album_title)
+        
+        self._set_label('genre', self.genre_label.set_text, self.album_data.get("genre") or "Genre inconnu")
+    
+    def _set_label(self, name, setter, text):
+        """Applique un texte de label s'il diffère de celui déjà affiché"""
+        if self._shown.get(name) != text:
+            self._shown[name] = text
+            setter(text)
+    
+    def _on_album_facts(self, album_data):
+        """Faits de l'album calculés (thread GTK) : met à jour la carte si elle l'affiche encore"""
+        if album_data is not self.album_data:
+            return  # Carte recyclée entre-temps pour un autre album
+        self._apply_labels()
+        self._show_cover()
+    
+    def _apply_selection(self):
+        """Restaure l'état de la case de sélection (conservé dans album_data)"""
+        self.selection_checkbox.handler_block(self._selection_handler)
+        self.selection_checkbox.set_active(bool(self.album_data.get('selected')))
+        self.selection_checkbox.handler_unblock(self._selection_handler)
+    
     def _register_metadata_observer(self):
         """Enregistre cette card comme observateur des changements de métadonnées - DÉSACTIVÉ"""
         # album_path = self.album_data.get('folder_path') or self.album_data.get('path', '')
@@ -224,12 +263,12 @@ class AlbumCard(Gtk.Frame):
         try:
             album_title = self.album_data.get('title') or self.album_data.get('album', 'Album')
             
-            # Notifier l'application parent pour supprimer des structures de données
+            # Notifier l'application parent qui retire l'album de la grille
             if self.parent_app and hasattr(self.parent_app, 'remove_album_from_list'):
                 self.parent_app.remove_album_from_list(self.album_data)
-            
-            # Retirer de la grille parent directement
-            if self.get_parent():
+                self._show_success(f"Album '{album_title}' retiré de la liste")
+            elif self.get_parent():
+                # Sans application parent : retirer de la grille directement
                 self.get_parent().remove(self)
                 self._show_success(f"Album '{album_title}' retiré de la liste")
                     
@@ -295,187 +334,12 @@ class AlbumCard(Gtk.Frame):
         print(f"❌ {message}")
         # TODO: Implémenter notification toast si disponible
     
-    def _calculate_compilation_year_range(self, folder_path):
-        """
-        Calcule la plage d'années en scannant TOUS les fichiers audio d'un dossier.
-        Retourne une chaîne formatée pour les compilations ou l'année unique.
-        """
-        import re
-        from mutagen.id3 import ID3
-        from mutagen.mp3 import MP3
-        from mutagen.mp4 import MP4
-        from mutagen.flac import FLAC
-        
-        if not folder_path or not os.path.exists(folder_path):
-            return ""
-        
-        all_years = set()
-        
-        # Scanner TOUS les fichiers audio du dossier
-        audio_files = [f for f in os.listdir(folder_path) 
-                      if f.lower().endswith(('.mp3', '.flac', '.m4a', '.mp4'))]
-        
-        for audio_file in audio_files:
-            file_path = os.path.join(folder_path, audio_file)
-            try:
-                year = ""
-                
-                if file_path.lower().endswith('.mp3'):
-                    audio = MP3(file_path)
-                    if audio.tags:
-                        year = audio.get('TYER', [''])[0] if audio.get('TYER') else ''
-                        if not year:
-                            year = audio.get('TDRC', [''])[0] if audio.get('TDRC') else ''
-                        
-                elif file_path.lower().endswith('.flac'):
-                    audio = FLAC(file_path)
-                    if audio.tags:
-                        year = audio.get('DATE', [''])[0] if audio.get('DATE') else ''
-                        
-                elif file_path.lower().endswith(('.m4a', '.mp4')):
-                    audio = MP4(file_path)
-                    if audio.tags:
-                        year = str(audio.get('©day', [''])[0]) if audio.get('©day') else ''
-                
-                # Extraire l'année de la chaîne (peut contenir date complète)
-                if year:
-                    years_found = re.findall(r'\b\d{4}\b', str(year))
-                    for y in years_found:
-                        if 1900 <= int(y) <= 2100:
-                            all_years.add(y)
-                            
-            except Exception as e:
-                # Ignorer les erreurs de fichiers individuels
-                continue
-        
-        if not all_years:
-            return ""
-        
-        # Si une seule année, la retourner
-        if len(all_years) == 1:
-            return list(all_years)[0]
-        
-        # Si plusieurs années, créer la plage
-        sorted_years = sorted([int(y) for y in all_years])
-        min_year = sorted_years[0]
-        max_year = sorted_years[-1]
-        
-        if min_year == max_year:
-            return str(min_year)
-        else:
-            # Format compilation : YYYY-YY
-            return f"{min_year}-{str(max_year)[-2:]}"
-    
     def _update_display(self):
-        """Met à jour l'affichage de la carte après édition"""
-        try:
-            # Utiliser le chemin d'album ORIGINAL au lieu des données corrompues
-            folder_path = self.original_album_path
-            if folder_path and os.path.exists(folder_path):
-                # Recharger les métadonnées depuis le premier fichier audio du dossier
-                audio_files = [f for f in os.listdir(folder_path) 
-                              if f.lower().endswith(('.mp3', '.flac', '.m4a', '.mp4'))]
-                
-                if audio_files:
-                    first_file = os.path.join(folder_path, audio_files[0])
-                    fresh_metadata = self._load_metadata_from_file(first_file)
-                    
-                    # REMPLACER complètement album_data au lieu de seulement mettre à jour
-                    # Utiliser le chemin original préservé au lieu du chemin corrompu
-                    self.album_data = fresh_metadata.copy()  # Nouvelles métadonnées complètes
-                    self.album_data['folder_path'] = self.original_album_path  # Utiliser le chemin ORIGINAL
-                    self.album_data['path'] = self.original_album_path  # Utiliser le chemin ORIGINAL
-                else:
-                    pass  # Fichiers audio non trouvés
-            else:
-                pass  # Dossier introuvable
-        
-            # Parcourir la hiérarchie pour trouver les labels
-            for child in self.get_children():
-                if isinstance(child, Gtk.Box):
-                    for box_child in child.get_children():
-                        if isinstance(box_child, Gtk.Box):  # Info box
-                            labels = [w for w in box_child.get_children() if isinstance(w, Gtk.Label)]
-                            if len(labels) >= 3:  # Artiste + Titre + Genre (minimum)
-                                # Label 0 : Artiste
-                                artist_label = labels[0]
-                                new_artist = self.album_data.get("artist", "Artiste Inconnu")
-                                artist_label.set_markup(f'<b>{new_artist}</b>')
-                                
-                                # Label 1 : Titre (métadonnées album plutôt que nom du dossier)
-                                title_label = labels[1]
-                                # Priorité aux métadonnées de l'album plutôt qu'au nom du dossier
-                                new_title = self.album_data.get('album', '')
-                                if not new_title:
-                                    # Fallback sur le nom du dossier seulement si pas de métadonnées album
-                                    folder_path = self.album_data.get('folder_path') or self.album_data.get('path')
-                                    new_title = os.path.basename(folder_path) if folder_path else 'Album Inconnu'
-                                
-                                # Ajouter l'année au format (Année) Titre
-                                # Calculer la plage d'années en scannant TOUS les fichiers
-                                folder_path = self.album_data.get('folder_path') or self.album_data.get('path') or self.original_album_path
-                                year_range = self._calculate_compilation_year_range(folder_path)
-                                
-                                if year_range:
-                                    new_title_with_year = f"({year_range}) {new_title}"
-                                else:
-                                    new_title_with_year = new_title
-                                
-                                title_label.set_text(new_title_with_year)
-                                
-                                # Label 2 : Genre
-                                genre_label = labels[2]
-                                new_genre = self.album_data.get("genre", "Genre inconnu")
-                                genre_label.set_text(new_genre)
-                                
-                                return
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-    
-    def _load_metadata_from_file(self, file_path):
-        """Charge les métadonnées depuis un fichier audio"""
-        try:
-            from mutagen.id3 import ID3
-            from mutagen.mp3 import MP3
-            from mutagen.mp4 import MP4
-            from mutagen.flac import FLAC
-            
-            metadata = {}
-            
-            if file_path.lower().endswith('.mp3'):
-                audio = MP3(file_path, ID3=ID3)
-                if audio.tags:
-                    artist = str(audio.tags.get('TPE1', [''])[0]) if audio.tags.get('TPE1') else ''
-                    album = str(audio.tags.get('TALB', [''])[0]) if audio.tags.get('TALB') else ''
-                    genre = str(audio.tags.get('TCON', [''])[0]) if audio.tags.get('TCON') else ''
-                    year = str(audio.tags.get('TDRC', [''])[0]) if audio.tags.get('TDRC') else ''
-                    
-                    metadata['artist'] = artist
-                    metadata['album'] = album
-                    metadata['genre'] = genre
-                    metadata['year'] = year
-                    
-            elif file_path.lower().endswith('.flac'):
-                audio = FLAC(file_path)
-                if audio.tags:
-                    metadata['artist'] = audio.get('ARTIST', [''])[0] if audio.get('ARTIST') else ''
-                    metadata['album'] = audio.get('ALBUM', [''])[0] if audio.get('ALBUM') else ''
-                    metadata['genre'] = audio.get('GENRE', [''])[0] if audio.get('GENRE') else ''
-                    metadata['year'] = audio.get('DATE', [''])[0] if audio.get('DATE') else ''
-                    
-            elif file_path.lower().endswith(('.m4a', '.mp4')):
-                audio = MP4(file_path)
-                if audio.tags:
-                    metadata['artist'] = audio.get('\xa9ART', [''])[0] if audio.get('\xa9ART') else ''
-                    metadata['album'] = audio.get('\xa9alb', [''])[0] if audio.get('\xa9alb') else ''
-                    metadata['genre'] = audio.get('\xa9gen', [''])[0] if audio.get('\xa9gen') else ''
-                    metadata['year'] = str(audio.get('\xa9day', [''])[0]) if audio.get('\xa9day') else ''
-            
-            return metadata
-            
-        except Exception as e:
-            return {}
+        """Met à jour l'affichage de la carte après édition (relecture en arrière-plan)"""
+        # Utiliser le chemin d'album ORIGINAL au lieu des données corrompues
+        self.album_data['folder_path'] = self.original_album_path
+        self.album_data['path'] = self.original_album_path
+        album_facts.refresh(self.album_data, self._on_album_facts)
     
     def update_folder_path(self, new_folder_path: str):
         """Met à jour le chemin du dossier après renommage et rafraîchit l'affichage"""
@@ -488,114 +352,79 @@ class AlbumCard(Gtk.Frame):
     def refresh_cover(self):
         """Met à jour la pochette de la carte après téléchargement"""
         try:
-            # Trouver le frame qui contient la pochette
-            for child in self.get_children():
-                if isinstance(child, Gtk.Box):
-                    for box_child in child.get_children():
-                        if isinstance(box_child, Gtk.Frame):  # Cover frame
-                            # Supprimer l'ancien widget
-                            old_cover = box_child.get_child()
-                            if old_cover:
-                                box_child.remove(old_cover)
-                            
-                            # Créer le nouveau widget pochette
-                            new_cover = self._create_cover_widget()
-                            box_child.add(new_cover)
-                            box_child.show_all()
-                            
-                            print(f"🔄 Pochette de carte rafraîchie")
-                            return True
-            
-            print(f"⚠️ Frame pochette introuvable")
-            return False
-            
+            cover_path = find_cover_file(self.original_album_path) if self.original_album_path else None
+            self.album_data['cover_path'] = cover_path
+            self.album_data['has_cover'] = cover_path is not None
+            self._show_cover(force=True)  # même chemin, mais le fichier a pu être remplacé
+            print(f"🔄 Pochette de carte rafraîchie")
+            return True
         except Exception as e:
             print(f"❌ Erreur rafraîchissement pochette: {e}")
             return False
     
     def update_cover(self):
         """Met à jour la pochette de la carte après téléchargement d'une nouvelle pochette"""
-        try:
-            # Récupérer le frame qui contient la pochette
-            for child in self.get_children():
-                if isinstance(child, Gtk.Box):
-                    for box_child in child.get_children():
-                        if isinstance(box_child, Gtk.Frame):  # Cover frame
-                            # Supprimer l'ancien widget de pochette
-                            old_cover = box_child.get_child()
-                            if old_cover:
-                                box_child.remove(old_cover)
-                            
-                            # Créer et ajouter la nouvelle pochette
-                            new_cover_widget = self._create_cover_widget()
-                            box_child.add(new_cover_widget)
-                            box_child.show_all()
-                            
-                            print(f"✅ Pochette de carte mise à jour")
-                            return True
-            
-            print(f"⚠️ Frame de pochette non trouvé pour mise à jour")
-            return False
-            
-        except Exception as e:
-            print(f"❌ Erreur mise à jour pochette carte: {e}")
-            return False
+        return self.refresh_cover()
     
     def on_selection_toggled(self, checkbox):
         """Gère la sélection/déselection de l'album"""
         is_selected = checkbox.get_active()
+        self.album_data['selected'] = is_selected
         album_title = self.album_data.get('album', 'Album Sans Titre')
         if is_selected:
             print(f"✅ Album sélectionné: {album_title}")
         else:
             print(f"❌ Album désélectionné: {album_title}")
 
-    def _create_cover_widget(self):
-        """Crée le widget de pochette - vraie image ou placeholder"""
-        album_path = self.album_data.get('path') or self.album_data.get('folder_path')
-        
-        if album_path and os.path.exists(album_path):
-            # Chercher une pochette dans le dossier
-            cover_path = self._find_cover_file(album_path)
-            
-            if cover_path and os.path.exists(cover_path):
-                # Charger et afficher la vraie pochette
-                return self._create_cover_image(cover_path)
+    def _show_cover(self, force: bool = False):
+        """
+        Affiche la pochette : immédiatement si la miniature est en cache,
+        sinon le placeholder, remplacé à la livraison du décodage en arrière-plan
         
-        # Fallback: placeholder avec emoji
-        return self._create_cover_placeholder()
+        Args:
+            force: Recharger même si la pochette affichée est déjà celle de l'album
+        """
+        # Présence de la pochette connue par les faits de l'album (aucun accès disque ici)
+        cover_path = self.album_data.get('cover_path') if self.album_data.get('has_cover') else None
+        
+        # Placeholder : son apparence dépend de l'emoji et de la couleur de l'album
+        cover_key = cover_path or (self.album_data.get("emoji"), self.album_data.get("color"))
+        if cover_key == self._cover_key and not force:
+            return
+        self._cover_key = cover_key
+        
+        album_cover_thumbnails.cancel(self._cover_ticket)
+        self._cover_ticket = None
+        
+        # Clé calculée une seule fois (un os.stat) pour le cache mémoire et le chargement
+        thumbnail_key = album_cover_thumbnails.cache_key(cover_path, 300) if cover_path else None
+        pixbuf = album_cover_thumbnails.get_cached(thumbnail_key)
+        if pixbuf is not None:
+            self._set_cover_widget(Gtk.Image.new_from_pixbuf(pixbuf))
+            return
+        
+        self._set_cover_widget(self._create_cover_placeholder())
+        if cover_path:
+            self._cover_ticket = album_cover_thumbnails.load(
+                thumbnail_key, lambda pixbuf: self._on_cover_loaded(cover_path, pixbuf)
+            )
     
-    def _find_cover_file(self, album_path):
-        """Cherche un fichier de pochette dans le dossier d'album"""
-        cover_names = [
-            'cover.jpg', 'cover.jpeg', 'cover.png',
-            'folder.jpg', 'folder.jpeg', 'folder.png',
-            'front.jpg', 'front.jpeg', 'front.png',
-            'album.jpg', 'album.jpeg', 'album.png'
-        ]
-        
-        for cover_name in cover_names:
-            cover_path = os.path.join(album_path, cover_name)
-            if os.path.exists(cover_path):
-                return cover_path
-        
-        return None
+    def _on_cover_loaded(self, cover_path, pixbuf):
+        """Réception de la miniature décodée (thread GTK)"""
+        self._cover_ticket = None
+        if pixbuf is None:
+            print(f"Erreur chargement pochette {cover_path}")
+            return
+        self._set_cover_widget(Gtk.Image.new_from_pixbuf(pixbuf))
     
-    def _create_cover_image(self, cover_path):
-        """Crée un widget Gtk.Image avec la pochette redimensionnée"""
-        try:
-            # Charger et redimensionner l'image à 300x300
-            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                cover_path, 300, 300, True
-            )
-            
-            image = Gtk.Image()
-            image.set_from_pixbuf(pixbuf)
-            return image
-            
-        except Exception as e:
-            print(f"Erreur chargement pochette {cover_path}: {e}")
-            return self._create_cover_placeholder()
+    def _set_cover_widget(self, widget):
+        """Remplace le contenu du cadre de pochette"""
+        old_cover = self.cover_frame.get_child()
+        if old_cover:
+            self.cover_frame.remove(old_cover)
+        self.cover_widget = widget
+        self.cover_frame.add(widget)
+        widget.show_all()
     
     def _create_cover_placeholder(self):
         """Crée le placeholder coloré avec emoji"""
@@ -0,0 +1,199 @@
+"""
+Composant VirtualAlbumGrid
+Grille d'albums virtualisée : seules les rangées visibles ont des cartes,
+recyclées depuis un pool lors du défilement
+"""
+
+import gi
+gi.require_version('Gtk', '3.0')
+
+from gi.repository import Gtk, Gdk
+from typing import Callable, Dict, List, Optional
+
+from core.refresh_manager import refresh_manager
+
+
+class VirtualAlbumGrid(Gtk.Layout):
+    """
+    Grille d'albums à défilement virtuel.
+
+    La hauteur défilable correspond à toutes les rangées, mais seules les
+    rangées visibles (plus une marge) portent une carte. Les cartes qui
+    sortent de la vue retournent dans un pool et sont réaffectées via
+    AlbumCard.bind : le nombre de widgets reste constant quel que soit
+    le nombre d'albums.
+    """
+
+    CARD_WIDTH = 320
+    CARD_HEIGHT = 500
+    SPACING = 15
+    MARGIN = 20
+    OVERSCAN_ROWS = 1  # Rangées préparées au-dessus et en dessous de la vue
+
+    def __init__(self, card_factory: Callable[[Dict], Gtk.Widget]):
+        """
+        Args:
+            card_factory: Crée une carte pour un album (AlbumCard)
+        """
+        super().__init__()
+        self.card_factory = card_factory
+
+        self.albums: List[Dict] = []
+        self._index_by_path: Dict[str, int] = {}
+        self._bound: Dict[int, Gtk.Widget] = {}  # index d'album -> carte affichée
+        self._pool: List[Gtk.Widget] = []  # cartes libres, masquées
+
+        self._columns = 1
+        self._left = self.MARGIN
+        self._width = 0
+        self._vadjustment = None
+        self._vadjustment_handler = None
+
+        self.add_events(Gdk.EventMask.BUTTON_PRESS_MASK)
+        self.connect("size-allocate", self._on_size_allocate)
+        self.connect("notify::vadjustment", self._on_vadjustment_changed)
+
+    # === Données ===
+
+    @staticmethod
+    def album_path(album: Dict) -> str:
+        """Chemin identifiant un album"""
+        return album.get('folder_path') or album.get('path', '')
+
+    def set_albums(self, albums: List[Dict], keep_position: bool = False):
+        """
+        Remplace la liste d'albums affichée (doublons de chemin ignorés).
+
+        Args:
+            albums: Albums dans l'ordre d'affichage
+            keep_position: Conserver la position de défilement (sinon retour en haut)
+        """
+        self._index_by_path = {}
+        unique = []
+        for album in albums:
+            path = self.album_path(album)
+            if path in self._index_by_path:
+                continue
+            self._index_by_path[path] = len(unique)
+            unique.append(album)
+        self.albums = unique
+
+        for index in list(self._bound):
+            self._release(index)
+
+        vadjustment = self.get_vadjustment()
+        if vadjustment and not keep_position:
+            vadjustment.set_value(0)
+        self._relayout()
+
+    def get_cards(self) -> List[Gtk.Widget]:
+        """Cartes actuellement affichées (les cartes du pool sont exclues)"""
+        return list(self._bound.values())
+
+    def card_for_path(self, album_path: str) -> Optional[Gtk.Widget]:
+        """Carte affichée pour un album, None s'il est hors de la vue"""
+        index = self._index_by_path.get(album_path)
+        return self._bound.get(index) if index is not None else None
+
+    def refresh_album(self, album_path: str):
+        """Réaffecte la carte d'un album visible après modification de ses données"""
+        index = self._index_by_path.get(album_path)
+        card = self._bound.get(index) if index is not None else None
+        if card is not None:
+            card.bind(self.albums[index])
+
+    # === Disposition ===
+
+    def _on_vadjustment_changed(self, widget, pspec):
+        """Suit le défilement de l'ajustement vertical fourni par le ScrolledWindow"""
+        if self._vadjustment is not None:
+            self._vadjustment.disconnect(self._vadjustment_handler)
+            self._vadjustment, self._vadjustment_handler = None, None
+
+        vadjustment = self.get_vadjustment()
+        if vadjustment is not None:
+            self._vadjustment = vadjustment
+            self._vadjustment_handler = vadjustment.connect(
+                "value-changed", lambda adjustment: self._update_visible()
+            )
+
+    def _on_size_allocate(self, widget, allocation):
+        """Recalcule les colonnes quand la largeur change"""
+        if allocation.width != self._width:
+            self._width = allocation.width
+            self._relayout()
+        else:
+            self._update_visible()
+
+    def _relayout(self):
+        """Recalcule colonnes et hauteur totale, puis replace les cartes affichées"""
+        width = max(self._width, self.CARD_WIDTH + 2 * self.MARGIN)
+        cell = self.CARD_WIDTH + self.SPACING
+        self._columns = max(1, (width - 2 * self.MARGIN + self.SPACING) // cell)
+
+        # Centrer les colonnes dans la largeur disponible
+        used = self._columns * cell - self.SPACING
+        self._left = max(self.MARGIN, (width - used) // 2)
+
+        rows = -(-len(self.albums) // self._columns)
+        height = 2 * self.MARGIN + max(0, rows * (self.CARD_HEIGHT + self.SPACING) - self.SPACING)
+        self.set_size(self._width, height)
+
+        for index, card in self._bound.items():
+            self.move(card, *self._position(index))
+        self._update_visible()
+
+    def _position(self, index: int):
+        """Coordonnées (x, y) de la carte d'indice donné"""
+        row, column = divmod(index, self._columns)
+        return (self._left + column * (self.CARD_WIDTH + self.SPACING),
+                self.MARGIN + row * (self.CARD_HEIGHT + self.SPACING))
+
+    def _visible_range(self):
+        """Indices [début, fin) des albums à afficher pour la position de défilement"""
+        vadjustment = self.get_vadjustment()
+        top = vadjustment.get_value() if vadjustment else 0
+        page = vadjustment.get_page_size() if vadjustment else 0
+        page = page or self.get_allocated_height()
+
+        row_height = self.CARD_HEIGHT + self.SPACING
+        first_row = max(0, int((top - self.MARGIN) // row_height) - self.OVERSCAN_ROWS)
+        last_row = int((top + page - self.MARGIN) // row_height) + self.OVERSCAN_ROWS
+        return first_row * self._columns, min(len(self.albums), (last_row + 1) * self._columns)
+
+    def _update_visible(self):
+        """Libère les cartes sorties de la vue et affecte celles qui y entrent"""
+        start, end = self._visible_range()
+
+        for index in [index for index in self._bound if not start <= index < end]:
+            self._release(index)
+
+        for index in range(start, end):
+            if index not in self._bound:
+                self._acquire(index)
+
+    def _acquire(self, index: int):
+        """Affiche l'album d'indice donné avec une carte du pool (ou une nouvelle)"""
+        album = self.albums[index]
+        x, y = self._position(index)
+
+        if self._pool:
+            card = self._pool.pop()
+            card.bind(album)
+            self.move(card, x, y)
+            card.show()
+        else:
+            card = self.card_factory(album)
+            self.put(card, x, y)
+            card.show_all()
+
+        self._bound[index] = card
+        refresh_manager.register_card(self.album_path(album), card)
+
+    def _release(self, index: int):
+        """Masque la carte d'un album sorti de la vue et la rend au pool"""
+        card = self._bound.pop(index)
+        # Chemin lu sur la carte : la liste d'albums a pu être remplacée (set_albums)
+        refresh_manager.unregister_card(card.original_album_path, card)
+        card.hide()
+        self._pool.append(card)
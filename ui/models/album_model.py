@@ -9,6 +9,9 @@ from enum import Enum
 import os
 from pathlib import Path
 
+from services.album_facts import COVER_FILE_NAMES
+
+
 class AlbumStatus(Enum):
     """États possibles d'un album"""
     PENDING = "pending"      # En attente de traitement
@@ -131,24 +134,32 @@ class AlbumModel:
         """Classe CSS pour le statut"""
         return f"status-{self.status.value}"
     
-    def _find_cover_image(self):
-        """Trouve l'image de pochette dans le dossier"""
-        if not self.folder_path or not os.path.exists(self.folder_path):
-            return
+    @staticmethod
+    def find_cover_file(folder_path: str) -> Optional[str]:
+        """
+        Cherche un fichier de pochette dans un dossier d'album
         
-        # Noms de fichiers de pochette courants
-        cover_names = [
-            "cover.jpg", "cover.jpeg", "cover.png",
-            "folder.jpg", "folder.jpeg", "folder.png",
-            "front.jpg", "front.jpeg", "front.png",
-            "album.jpg", "album.jpeg", "album.png"
-        ]
+        Args:
+            folder_path: Dossier de l'album
+            
+        Returns:
+            Chemin de la pochette ou None si absente
+        """
+        if not folder_path or not os.path.exists(folder_path):
+            return None
         
-        for cover_name in cover_names:
-            cover_path = os.path.join(self.folder_path, cover_name)
+        for cover_name in COVER_FILE_NAMES:
+            cover_path = os.path.join(folder_path, cover_name)
             if os.path.exists(cover_path):
-                self.cover_path = cover_path
-                break
+                return cover_path
+        
+        return None
+    
+    def _find_cover_image(self):
+        """Trouve l'image de pochette dans le dossier"""
+        cover_path = self.find_cover_file(self.folder_path)
+        if cover_path:
+            self.cover_path = cover_path
     
     def _load_tracks(self):
         """Charge les pistes depuis le dossier"""
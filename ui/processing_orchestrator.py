@@ -3,26 +3,20 @@ Gestionnaire d'orchestration UI pour le pipeline de traitement
 Connecte l'interface utilisateur aux 6 modules core de traitement
 """
 
+import importlib
 import os
 import threading
 from enum import Enum
 from typing import List, Dict, Callable, Optional
 from gi.repository import GLib
 
-# Import des modules core (règles hardcodées)
-from core.file_cleaner import FileCleaner  # GROUPE 1 - Nettoyage des fichiers
-from core.case_corrector import CaseCorrector  # GROUPE 2 - Correction de la casse
-from core.metadata_processor import MetadataProcessor  # GROUPE 3 - Traitement métadonnées
-from core.metadata_formatter import MetadataFormatter  # GROUPE 4 - Formatage métadonnées  
-from core.file_renamer import FileRenamer  # GROUPE 5 - Renommage des fichiers
-from core.tag_synchronizer import TagSynchronizer  # GROUPE 6 - Synchronisation
+# Modules core (règles hardcodées) : importés au premier traitement, voir _module()
 
 # Imports des modules support
-from support.logger import AppLogger
+from support.logger import get_logger
 from support.honest_logger import honest_logger
-from support.config_manager import ConfigManager
-from support.state_manager import StateManager
-from support.validator import Validator
+from support.service_container import get_services
+from database.history_writer import get_history_writer
 
 class ProcessingState(Enum):
     """États du traitement"""
@@ -47,10 +41,12 @@ class ProcessingOrchestrator:
     
     def __init__(self):
         """Initialise l'orchestrateur"""
-        self.logger = AppLogger()
-        self.config = ConfigManager()
-        self.state_manager = StateManager()
-        self.validator = Validator()
+        self.logger = get_logger()
+        services = get_services()
+        self.config = services.config
+        self.state_manager = services.state
+        self.validator = services.validator
+        self.history_writer = get_history_writer()
         
         # État du traitement
         self.current_state = ProcessingState.IDLE
@@ -59,21 +55,10 @@ class ProcessingOrchestrator:
         self.total_albums = 0
         self.processed_albums = 0
         
-        # Modules de traitement
-        self.file_cleaner = FileCleaner()
-        self.metadata_processor = MetadataProcessor()
-        self.case_corrector = CaseCorrector()
-        self.metadata_formatter = MetadataFormatter()
-        self.file_renamer = FileRenamer()
-        self.tag_synchronizer = TagSynchronizer()
-        
-        # Partage de l'instance StateManager avec tous les modules
-        self.file_cleaner.state = self.state_manager
-        self.metadata_processor.state = self.state_manager
-        self.case_corrector.state_manager = self.state_manager
-        self.metadata_formatter.state_manager = self.state_manager
-        self.file_renamer.state_manager = self.state_manager
-        self.tag_synchronizer.state_manager = self.state_manager
+        # Modules de traitement : importés et créés au premier traitement
+        # (ils partagent le StateManager du conteneur de services)
+        self._modules = {}
+        self._modules_lock = threading.Lock()
         
         # Thread de traitement
         self.processing_thread = None
@@ -92,6 +77,52 @@ class ProcessingOrchestrator:
         
         self.logger.info("ProcessingOrchestrator initialisé")
     
+    def _module(self, name: str, module_path: str, class_name: str):
+        """
+        Retourne un module de traitement, importé et créé à la première utilisation
+        
+        Les modules core (mutagen, PIL...) ne sont ainsi chargés qu'au premier
+        traitement, pas au lancement de l'interface.
+        """
+        module = self._modules.get(name)
+        if module is None:
+            with self._modules_lock:
+                module = self._modules.get(name)
+                if module is None:
+                    module_class = getattr(importlib.import_module(module_path), class_name)
+                    module = self._modules[name] = module_class()
+        return module
+    
+    @property
+    def file_cleaner(self):
+        """GROUPE 1 - Nettoyage des fichiers"""
+        return self._module('file_cleaner', 'core.file_cleaner', 'FileCleaner')
+    
+    @property
+    def metadata_processor(self):
+        """GROUPE 3 - Traitement métadonnées"""
+        return self._module('metadata_processor', 'core.metadata_processor', 'MetadataProcessor')
+    
+    @property
+    def case_corrector(self):
+        """GROUPE 2 - Correction de la casse"""
+        return self._module('case_corrector', 'core.case_corrector', 'CaseCorrector')
+    
+    @property
+    def metadata_formatter(self):
+        """GROUPE 4 - Formatage métadonnées"""
+        return self._module('metadata_formatter', 'core.metadata_formatter', 'MetadataFormatter')
+    
+    @property
+    def file_renamer(self):
+        """GROUPE 5 - Renommage des fichiers"""
+        return self._module('file_renamer', 'core.file_renamer', 'FileRenamer')
+    
+    @property
+    def tag_synchronizer(self):
+        """GROUPE 6 - Synchronisation"""
+        return self._module('tag_synchronizer', 'core.tag_synchronizer', 'TagSynchronizer')
+    
     def add_albums(self, albums: List[Dict]):
         """
         Ajoute des albums à la queue de traitement
@@ -175,6 +206,9 @@ class ProcessingOrchestrator:
                 # Traiter l'album
                 success = self._process_single_album(album, i + 1)
                 
+                # Un lot d'historique par album : une seule transaction
+                self.history_writer.flush()
+                
                 if success:
                     self.processed_albums += 1
                     GLib.idle_add(self._notify_album_processed, album, True)
@@ -196,6 +230,10 @@ class ProcessingOrchestrator:
             self.logger.error(f"Erreur durant le traitement: {e}")
             GLib.idle_add(self._notify_error_occurred, str(e))
             GLib.idle_add(self._update_state, ProcessingState.ERROR)
+        
+        finally:
+            # L'historique est écrit avant de rendre la main à l'interface
+            self.history_writer.flush(wait=True)
     
     def _process_single_album(self, album: Dict, album_number: int) -> bool:
         """
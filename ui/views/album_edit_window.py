@@ -8,14 +8,15 @@ gi.require_version('Gtk', '3.0')
 
 from gi.repository import Gtk, GLib, GdkPixbuf, Pango
 import os
-from mutagen.id3 import ID3, TIT2, TPE1, TALB, TDRC, TCON
-from mutagen.mp3 import MP3
-from mutagen.mp4 import MP4
-from mutagen.flac import FLAC
+import threading
 from services.audio_player import AudioPlayer, PlayerState
 from services.cover_search import CoverSearchService
+from services.cover_thumbnail_loader import cover_thumbnail_loader
+from services.track_table_loader import track_table_loader
+from services.tag_write_queue import tag_write_queue
 from core.case_corrector import CaseCorrector
 from services.metadata_backup import metadata_backup
+from database.library_catalog import get_library_catalog
 # from services.metadata_event_manager import metadata_event_manager  # DÉSACTIVÉ - Remplacé par RefreshManager
 from core.refresh_manager import refresh_manager
 
@@ -37,6 +38,10 @@ class AlbumEditWindow(Gtk.Window):
         
         self.parent_card = parent_card
         self.tracks = []
+        self._track_albums = []
+        self._tracks_ticket = None  # chargement des pistes en cours (track_table_loader)
+        self._write_errors = []  # échecs d'écriture des tags pas encore signalés
+        self._closed = False
         
         # Créer une HeaderBar
         self._setup_header_bar()
@@ -51,6 +56,7 @@ class AlbumEditWindow(Gtk.Window):
         self.audio_player.on_state_changed = self.on_audio_state_changed
         self.audio_player.on_position_changed = self.on_audio_position_changed
         self.audio_player.on_duration_changed = self.on_audio_duration_changed
+        self.audio_player.on_track_changed = self.on_audio_track_changed
         
         # Configurer l'interface utilisateur
         self._setup_ui()
@@ -68,9 +74,6 @@ class AlbumEditWindow(Gtk.Window):
         """Configure l'interface utilisateur"""
         self.audio_player.on_error_occurred = self.on_audio_error
         
-        # Timer pour mise à jour position
-        self.position_timer = None
-        
         # Timer pour sauvegarde automatique des métadonnées (debounce)
         self.metadata_save_timer = None
         
@@ -341,161 +344,74 @@ class AlbumEditWindow(Gtk.Window):
         self._load_all_selected_albums_tracks()
     
     def _load_all_selected_albums_tracks(self):
-        """Charge les pistes de tous les albums sélectionnés dans le tableau"""
+        """Charge en arrière-plan les pistes de tous les albums sélectionnés dans le tableau"""
         print(f"Chargement des pistes pour {len(self.selected_albums)} albums...")
         
-        for album_data in self.selected_albums:
-            folder_path = album_data.get('folder_path') or album_data.get('path', '')
-            if folder_path and os.path.exists(folder_path):
-                self._load_tracks_to_table(folder_path, album_data)
+        # Rechargement (ex. après restauration) : repartir d'un tableau vide
+        track_table_loader.cancel(self._tracks_ticket)
+        self.metadata_store.clear()
+        self.tracks = []
+        self.current_track_index = 0
+        
+        self._track_albums = [album_data for album_data in self.selected_albums
+                              if album_data.get('folder_path') or album_data.get('path')]
+        folders = [album_data.get('folder_path') or album_data.get('path') for album_data in self._track_albums]
+        
+        # Analyse des fichiers sur le pool, lignes ajoutées par lots sur le thread GTK
+        self._tracks_ticket = track_table_loader.load(
+            folders, self._append_track_rows, self._on_tracks_loaded
+        )
     
-    def _load_tracks_to_table(self, folder_path, album_data=None):
-        """Charge les pistes dans le tableau des métadonnées"""
-        if not folder_path or not os.path.exists(folder_path):
-            print(f"Chemin album invalide: {folder_path}")
-            return
+    def _append_track_rows(self, rows):
+        """Ajoute un lot de pistes analysées au tableau et à la liste de lecture (thread GTK)"""
+        for row in rows:
+            file_path = row['file_path']
+            metadata = row['metadata']
             
-        # Si c'est un fichier, prendre le dossier parent
-        if os.path.isfile(folder_path):
-            folder_path = os.path.dirname(folder_path)
-        
-        # Utiliser album_data si fourni, sinon self.album_data
-        current_album = album_data or self.album_data
-        album_title = current_album.get('album', 'Album Inconnu')  # ✅ FIX: 'album' au lieu de 'title'
-        album_artist = current_album.get('artist', 'Artiste Inconnu')
-        
-        # ✅ FIX: Réinitialiser self.tracks pour le premier album seulement
-        if not hasattr(self, '_tracks_initialized'):
-            self.tracks = []
-            self.current_track_index = 0
-            self._tracks_initialized = True
+            # Titre de l'album sélectionné auquel appartient la piste
+            album_title = self._track_albums[row['album_index']].get('album', 'Album Inconnu')
             
-        audio_files = []
-        for file in os.listdir(folder_path):
-            if file.lower().endswith(('.mp3', '.flac', '.m4a', '.ogg')):
-                audio_files.append(os.path.join(folder_path, file))
-        
-        if not audio_files:
-            return  # Aucun fichier audio trouvé
+            # Vérifier si pochette associée
+            has_cover = "✅" if row['has_cover'] else "❌"
             
-        audio_files.sort()
-        
-        for file_path in audio_files:
-            try:
-                metadata = self._extract_track_metadata(file_path)
-                
-                # Vérifier si pochette associée
-                has_cover = "✅" if self._has_embedded_cover(file_path) else "❌"
-                
-                # Formatage nom fichier SANS extension pour affichage
-                display_filename = os.path.splitext(os.path.basename(file_path))[0]
-                
-                # Formatage numéro piste avec zéro initial pour affichage
-                track_num = metadata.get('track', '')
-                if track_num and '/' in str(track_num):
-                    track_num = str(track_num).split('/')[0]
-                if track_num and str(track_num).isdigit() and len(str(track_num)) == 1:
-                    track_num = f"0{track_num}"
-                
-                self.metadata_store.append([
-                    has_cover,                                    # Cover
-                    display_filename,                            # Nom fichier SANS extension
-                    metadata.get('title', ''),                  # Titre
-                    metadata.get('performer', ''),              # Interprète
-                    metadata.get('artist', ''),                 # Artiste
-                    album_title,                                 # Album (utilise le titre de l'album sélectionné)
-                    str(metadata.get('year', '')),              # Année
-                    str(track_num),                             # N° piste AVEC zéro initial
-                    metadata.get('genre', ''),                  # Genre
-                    file_path                                    # Path (caché)
-                ])
-                
-                # ✅ FIX: Ajouter à self.tracks pour le lecteur audio
-                track_data = {
-                    'file_path': file_path,
-                    'title': metadata.get('title', display_filename),
-                    'artist': metadata.get('artist', ''),
-                    'album': album_title,
-                    'track_num': track_num,
-                    'display_filename': display_filename
-                }
-                self.tracks.append(track_data)
-                
-            except Exception as e:
-                print(f"Erreur lecture {file_path}: {e}")
-    
-    def _extract_track_metadata(self, file_path):
-        """Extrait les métadonnées d'une piste"""
-        metadata = {}
-        
-        try:
-            if file_path.lower().endswith('.mp3'):
-                # Essayer plusieurs méthodes de lecture MP3
-                audio = None
-                try:
-                    audio = MP3(file_path, ID3=ID3)
-                except:
-                    try:
-                        audio = MP3(file_path)
-                    except:
-                        # Fichier MP3 corrompu - utiliser valeurs par défaut
-                        pass
-                
-                if audio and audio.tags:
-                    metadata['title'] = str(audio.tags.get('TIT2', '')) if audio.tags.get('TIT2') else ''
-                    metadata['artist'] = str(audio.tags.get('TPE1', '')) if audio.tags.get('TPE1') else ''
-                    metadata['performer'] = str(audio.tags.get('TPE1', '')) if audio.tags.get('TPE1') else ''  # Copie artiste vers interprète
-                    metadata['album'] = str(audio.tags.get('TALB', '')) if audio.tags.get('TALB') else ''
-                    metadata['year'] = str(audio.tags.get('TDRC', '')) if audio.tags.get('TDRC') else ''
-                    metadata['genre'] = str(audio.tags.get('TCON', '')) if audio.tags.get('TCON') else ''
-                    metadata['track'] = str(audio.tags.get('TRCK', '')) if audio.tags.get('TRCK') else ''
-                    
-        except Exception as e:
-            print(f"Erreur extraction métadonnées {file_path}: {e}")
+            # Formatage nom fichier SANS extension pour affichage
+            display_filename = os.path.splitext(os.path.basename(file_path))[0]
             
-        # Valeurs par défaut si extraction échoue
-        if not metadata:
-            metadata = {
-                'title': os.path.splitext(os.path.basename(file_path))[0],
-                'artist': '', 'performer': '', 'album': '',
-                'year': '', 'genre': '', 'track': ''
-            }
-        
-        return metadata
-    
-    def _has_embedded_cover(self, file_path):
-        """Vérifie si une pochette est intégrée dans le fichier"""
-        try:
-            if file_path.lower().endswith('.mp3'):
-                # Essayer plusieurs méthodes de lecture
-                try:
-                    audio = MP3(file_path, ID3=ID3)
-                except:
-                    try:
-                        audio = MP3(file_path)
-                    except:
-                        return False
-                
-                if audio.tags:
-                    # Chercher toutes les tags APIC (Attached Picture)
-                    for key in audio.tags.keys():
-                        if key.startswith('APIC:'):
-                            return True
-                return False
-                
-            elif file_path.lower().endswith('.flac'):
-                audio = FLAC(file_path)
-                return len(audio.pictures) > 0
-                
-            elif file_path.lower().endswith(('.m4a', '.mp4')):
-                audio = MP4(file_path)
-                return 'covr' in audio.tags if audio.tags else False
-                
-        except Exception as e:
-            # Erreur de lecture du fichier - pas de pochette détectable
-            pass
+            # Formatage numéro piste avec zéro initial pour affichage
+            track_num = metadata.get('track', '')
+            if track_num and '/' in str(track_num):
+                track_num = str(track_num).split('/')[0]
+            if track_num and str(track_num).isdigit() and len(str(track_num)) == 1:
+                track_num = f"0{track_num}"
             
-        return False
+            self.metadata_store.append([
+                has_cover,                                    # Cover
+                display_filename,                            # Nom fichier SANS extension
+                metadata.get('title', ''),                  # Titre
+                metadata.get('performer', ''),              # Interprète
+                metadata.get('artist', ''),                 # Artiste
+                album_title,                                 # Album (utilise le titre de l'album sélectionné)
+                str(metadata.get('year', '')),              # Année
+                str(track_num),                             # N° piste AVEC zéro initial
+                metadata.get('genre', ''),                  # Genre
+                file_path                                    # Path (caché)
+            ])
+            
+            # Ajouter à self.tracks pour le lecteur audio
+            self.tracks.append({
+                'file_path': file_path,
+                'title': metadata.get('title', display_filename),
+                'artist': metadata.get('artist', ''),
+                'album': album_title,
+                'track_num': track_num,
+                'display_filename': display_filename,
+                'duration': row.get('duration', 0)  # Durée lue avec les tags
+            })
+    
+    def _on_tracks_loaded(self):
+        """Toutes les pistes sont dans le tableau"""
+        self._tracks_ticket = None
+        print(f"✅ {len(self.tracks)} pistes chargées")
     
     def _load_album_cover(self):
         """Charge et affiche la pochette d'album si elle existe"""
@@ -621,15 +537,8 @@ class AlbumEditWindow(Gtk.Window):
                 self._show_error_dialog("Impossible de déterminer le chemin de l'album")
                 return
             
-            # Vérifier qu'il y a des sauvegardes
-            has_backups = False
-            for track in self.tracks:
-                file_path = track.get('file_path')
-                if file_path and metadata_backup.has_backup(file_path):
-                    has_backups = True
-                    break
-            
-            if not has_backups:
+            # Vérifier qu'il y a des sauvegardes (une seule requête pour l'album)
+            if not metadata_backup.get_album_backups(album_path):
                 self._show_info_dialog(
                     "Aucune sauvegarde trouvée",
                     "Aucune sauvegarde de métadonnées originales n'a été trouvée pour cet album. "
@@ -638,7 +547,17 @@ class AlbumEditWindow(Gtk.Window):
                 )
                 return
             
-            # Restaurer les métadonnées
+            # Restaurer les métadonnées une fois les écritures en attente terminées
+            # (elles ne doivent pas écraser la restauration) sans bloquer l'interface
+            tag_write_queue.flush(lambda: self._restore_original_metadata(album_path))
+                
+        except Exception as e:
+            print(f"Erreur annulation corrections: {e}")
+            self._show_error_dialog(f"Erreur inattendue: {str(e)}")
+    
+    def _restore_original_metadata(self, album_path):
+        """Restaure les métadonnées originales (appelé après l'écriture des tags en attente)"""
+        try:
             success = metadata_backup.restore_album_metadata(album_path)
             
             if success:
@@ -653,7 +572,6 @@ class AlbumEditWindow(Gtk.Window):
                 self._show_error_dialog(
                     "Erreur lors de la restauration. Consultez les logs pour plus de détails."
                 )
-                
         except Exception as e:
             print(f"Erreur annulation corrections: {e}")
             self._show_error_dialog(f"Erreur inattendue: {str(e)}")
@@ -693,7 +611,7 @@ class AlbumEditWindow(Gtk.Window):
         # Sauvegarder le titre dans les métadonnées physiques et renommer le fichier
         file_path = self.metadata_store.get_value(iter, 9)  # Path caché
         track_num = self.metadata_store.get_value(iter, 7)  # N° piste
-        if file_path and os.path.exists(file_path):
+        if file_path:
             new_file_path = self._save_title_to_file(file_path, new_text, track_num)
             if new_file_path and new_file_path != file_path:
                 # Mettre à jour le tableau avec le nouveau nom de fichier
@@ -727,7 +645,7 @@ class AlbumEditWindow(Gtk.Window):
         
         # Sauvegarder l'année dans les métadonnées physiques
         file_path = self.metadata_store.get_value(iter, 9)  # Path caché
-        if file_path and os.path.exists(file_path):
+        if file_path:
             self._save_year_to_file(file_path, year_str)
             
             # Mettre à jour self.tracks pour cohérence
@@ -756,7 +674,7 @@ class AlbumEditWindow(Gtk.Window):
         # Sauvegarder le numéro de piste dans les métadonnées physiques
         file_path = self.metadata_store.get_value(iter, 9)  # Path caché
         title = self.metadata_store.get_value(iter, 2)  # Titre pour renommage
-        if file_path and os.path.exists(file_path):
+        if file_path:
             new_file_path = self._save_track_number_to_file(file_path, track_num_str, title)
             if new_file_path and new_file_path != file_path:
                 # Mettre à jour le tableau avec le nouveau nom de fichier
@@ -786,12 +704,7 @@ class AlbumEditWindow(Gtk.Window):
                     break
             
             # Lancer la lecture
-            if self.audio_player.load_file(file_path):
-                self.audio_player.play()
-                self._start_position_timer()
-                print(f"🎵 Lecture démarrée: {os.path.basename(file_path)}")
-            else:
-                print(f"Erreur chargement: {file_path}")
+            self._play_current_track()
     
     # === CALLBACKS LECTEUR AUDIO ===
     def on_play(self, button):
@@ -826,9 +739,6 @@ class AlbumEditWindow(Gtk.Window):
     def on_stop(self, button):
         """Arrêter la lecture"""
         self.audio_player.stop()
-        if self.position_timer:
-            GLib.source_remove(self.position_timer)
-            self.position_timer = None
     
     def on_seek(self, scale, scroll_type, value):
         """Seek dans la piste"""
@@ -860,59 +770,15 @@ class AlbumEditWindow(Gtk.Window):
         file_path = track.get('file_path')
         
         if file_path and os.path.exists(file_path):
-            if self.audio_player.load_file(file_path):
-                self.audio_player.play()
+            # Toute la liste est transmise : les pistes suivantes s'enchaînent sans blanc
+            self.audio_player.set_playlist([(t.get('file_path'), t.get('duration', 0)) for t in self.tracks])
+            if self.audio_player.play_index(self.current_track_index):
                 print(f"🎵 Lecture: {track.get('display_filename', os.path.basename(file_path))}")
             else:
                 print(f"Erreur chargement: {file_path}")
         else:
             print(f"Fichier introuvable: {file_path}")
     
-    def _start_position_timer(self):
-        """Démarre le timer de mise à jour de la position"""
-        if hasattr(self, 'position_timer') and self.position_timer:
-            GLib.source_remove(self.position_timer)
-        
-        # ✅ FIX: Ajouter import GLib si manquant
-        from gi.repository import GLib
-        self.position_timer = GLib.timeout_add(500, self._update_position)  # Toutes les 500ms
-    
-    def _update_position(self):
-        """Met à jour la position du lecteur"""
-        # Vérifier que le lecteur et les widgets existent encore
-        if not hasattr(self, 'audio_player') or not hasattr(self, 'progress_scale'):
-            return False  # Arrêter le timer
-            
-        # Continuer le timer même si pas en lecture pour éviter les arrêts intempestifs
-        # Le timer sera arrêté explicitement dans on_audio_state_changed
-        position = self.audio_player.get_position()
-        duration = self.audio_player.get_duration()
-        
-        # Debug: afficher les valeurs obtenues
-        if hasattr(self, '_debug_counter'):
-            self._debug_counter += 1
-        else:
-            self._debug_counter = 1
-            
-        if self._debug_counter % 20 == 0:  # Afficher toutes les 10 secondes
-            print(f"🎵 DEBUG: position={position:.1f}s, duration={duration:.1f}s")
-        
-        if duration > 0 and position >= 0:
-            progress = min(100, max(0, (position / duration) * 100))
-            
-            # Éviter les mises à jour trop fréquentes qui peuvent causer des saccades
-            current_value = self.progress_scale.get_value()
-            if abs(progress - current_value) > 0.5:  # Seuil de 0.5%
-                self.progress_scale.set_value(progress)
-            
-            # Mettre à jour les labels de temps
-            pos_str = self._format_time(position)
-            dur_str = self._format_time(duration)
-            self.time_start_label.set_text(pos_str)
-            self.time_end_label.set_text(dur_str)
-        
-        return True  # Continuer le timer
-    
     def _format_time(self, seconds):
         """Formate le temps en mm:ss"""
         minutes = int(seconds // 60)
@@ -923,16 +789,8 @@ class AlbumEditWindow(Gtk.Window):
         """Callback changement d'état audio"""
         if state == PlayerState.PLAYING:
             self.play_btn.set_label("⏸️")
-            # Démarrer le timer seulement si pas déjà actif
-            if not hasattr(self, 'position_timer') or not self.position_timer:
-                self._start_position_timer()
         elif state == PlayerState.STOPPED:
             self.play_btn.set_label("▶️")
-            # Arrêter le timer seulement lors d'un arrêt complet
-            if hasattr(self, 'position_timer') and self.position_timer:
-                from gi.repository import GLib
-                GLib.source_remove(self.position_timer)
-                self.position_timer = None
             # Remettre la barre de progression à zéro
             if hasattr(self, 'progress_scale'):
                 self.progress_scale.set_value(0)
@@ -940,11 +798,31 @@ class AlbumEditWindow(Gtk.Window):
                 self.time_start_label.set_text("00:00")
         else:  # PAUSED ou autres états
             self.play_btn.set_label("▶️")
-            # Ne PAS arrêter le timer pour les pauses, permet de reprendre fluidement
     
     def on_audio_position_changed(self, position):
-        """Callback changement de position"""
-        pass  # Géré par le timer
+        """Callback changement de position (messages du bus du lecteur)"""
+        if not hasattr(self, 'progress_scale'):
+            return
+        
+        duration = self.audio_player.get_duration()
+        if duration > 0 and position >= 0:
+            progress = min(100, max(0, (position / duration) * 100))
+            
+            # Éviter les mises à jour trop fréquentes qui peuvent causer des saccades
+            current_value = self.progress_scale.get_value()
+            if abs(progress - current_value) > 0.5:  # Seuil de 0.5%
+                self.progress_scale.set_value(progress)
+            
+            # Mettre à jour les labels de temps
+            self.time_start_label.set_text(self._format_time(position))
+            self.time_end_label.set_text(self._format_time(duration))
+    
+    def on_audio_track_changed(self, index, file_path):
+        """Callback enchaînement automatique sur la piste suivante"""
+        self.current_track_index = index
+        if hasattr(self, 'progress_scale'):
+            self.progress_scale.set_value(0)
+        print(f"🎵 Lecture: {os.path.basename(file_path)}")
     
     def on_audio_duration_changed(self, duration):
         """Callback changement de durée"""
@@ -991,6 +869,9 @@ class AlbumEditWindow(Gtk.Window):
     
     def _open_cover_search_dialog(self, artist, album, year):
         """Ouvre le dialog de recherche de pochettes"""
+        # Nouvelle recherche : abandonner les miniatures d'une recherche précédente
+        cover_thumbnail_loader.cancel_pending()
+        
         dialog = Gtk.Dialog(
             title="Recherche de pochettes",
             transient_for=self,
@@ -1059,6 +940,8 @@ class AlbumEditWindow(Gtk.Window):
                 msg_dialog.run()
                 msg_dialog.destroy()
         
+        # Dialogue fermé : stopper les téléchargements de miniatures encore actifs
+        cover_thumbnail_loader.cancel_pending()
         dialog.destroy()
     
     def _apply_selected_cover(self, cover_result):
@@ -1097,23 +980,8 @@ class AlbumEditWindow(Gtk.Window):
                 print(f"🎯 Fichier cover.jpg sauvé: {cover_path}")
                 
                 # Appliquer la pochette aux tags de tous les morceaux de l'album
-                print(f"🎯 AVANT appel _embed_cover_to_tracks")
-                self._embed_cover_to_tracks(cover_path)
-                print(f"🎯 APRÈS appel _embed_cover_to_tracks")
-                
-                # Mettre à jour l'affichage de la pochette dans la fenêtre d'édition
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(cover_path, 250, 250, True)
-                self.cover_image.set_from_pixbuf(pixbuf)
-                
-                # Mettre à jour la carte dans la fenêtre principale
-                if self.parent_card and hasattr(self.parent_card, 'refresh_cover'):
-                    def update_card_cover():
-                        try:
-                            self.parent_card.refresh_cover()
-                        except Exception as e:
-                            print(f"Erreur rafraîchissement carte: {e}")
-                    
-                    GLib.idle_add(update_card_cover)
+                # une fois les écritures de tags en attente sur ces fichiers terminées
+                tag_write_queue.flush(lambda: self._apply_cover_after_flush(cover_path, album_folder))
             else:
                 print("⚠️ Aucun morceau chargé pour appliquer la pochette")
                 
@@ -1122,6 +990,27 @@ class AlbumEditWindow(Gtk.Window):
             import traceback
             traceback.print_exc()
     
+    def _apply_cover_after_flush(self, cover_path, album_folder):
+        """Intègre la pochette et met à jour l'affichage (après l'écriture des tags en attente)"""
+        try:
+            self._embed_cover_to_tracks(cover_path)
+            
+            # Mettre à jour l'affichage de la pochette dans la fenêtre d'édition
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(cover_path, 250, 250, True)
+            self.cover_image.set_from_pixbuf(pixbuf)
+            
+            # Mettre à jour la carte dans la fenêtre principale (si l'album est visible :
+            # la carte d'origine a pu être recyclée pour un autre album)
+            for album in self.selected_albums:
+                if (album.get('folder_path') or album.get('path')) == album_folder:
+                    album['cover_path'] = cover_path
+                    album['has_cover'] = True
+            card = refresh_manager.get_card(album_folder)
+            if card is not None:
+                card.refresh_cover()
+        except Exception as e:
+            print(f"Erreur application pochette: {e}")
+    
     def _embed_cover_to_tracks(self, cover_path):
         """Intègre la pochette dans les tags de tous les morceaux de l'album"""
         if not os.path.exists(cover_path):
@@ -1297,17 +1186,12 @@ class AlbumEditWindow(Gtk.Window):
     
     def _save_metadata_single_album(self, new_album, new_artist, new_year, new_genre):
         """Sauvegarde pour un seul album - applique toutes les valeurs saisies"""
-        for track in self.tracks:
-            file_path = track['file_path']
-            if not os.path.exists(file_path):
-                continue
-            
-            if file_path.lower().endswith('.mp3'):
-                self._save_metadata_mp3(file_path, new_album, new_artist, new_year, new_genre)
-            elif file_path.lower().endswith('.flac'):
-                self._save_metadata_flac(file_path, new_album, new_artist, new_year, new_genre)
-            elif file_path.lower().endswith(('.m4a', '.mp4')):
-                self._save_metadata_mp4(file_path, new_album, new_artist, new_year, new_genre)
+        album_path = self.album_data.get('folder_path') or self.album_data.get('path', '')
+        self._enqueue_album_tags(
+            [track['file_path'] for track in self.tracks],
+            self._album_tag_fields(new_album, new_artist, new_year, new_genre),
+            lambda: self._update_catalog_album(album_path, new_album, new_artist, new_year, new_genre)
+        )
     
     def _save_metadata_multi_album(self, new_artist, new_year, new_genre):
         """Sauvegarde pour plusieurs albums - préserve les titres individuels"""
@@ -1319,23 +1203,114 @@ class AlbumEditWindow(Gtk.Window):
             album_titles[album_path] = album_title
             print(f"📀 Album {os.path.basename(album_path)} → Titre préservé: '{album_title}'")
         
+        # Regrouper les pistes par album (le titre de l'album dépend du dossier du fichier)
+        album_files = {}
         for track in self.tracks:
             file_path = track['file_path']
-            if not os.path.exists(file_path):
-                continue
-            
-            # Déterminer le titre de l'album pour ce fichier
-            track_album_path = os.path.dirname(file_path)
+            album_files.setdefault(os.path.dirname(file_path), []).append(file_path)
+        
+        for track_album_path, file_paths in album_files.items():
             original_album_title = album_titles.get(track_album_path, "Album Inconnu")
+            print(f"💾 {len(file_paths)} fichiers de {os.path.basename(track_album_path)} → Album: '{original_album_title}'")
             
-            print(f"💾 Fichier {os.path.basename(file_path)} → Album: '{original_album_title}'")
-            
-            if file_path.lower().endswith('.mp3'):
-                self._save_metadata_mp3(file_path, original_album_title, new_artist, new_year, new_genre)
-            elif file_path.lower().endswith('.flac'):
-                self._save_metadata_flac(file_path, original_album_title, new_artist, new_year, new_genre)
-            elif file_path.lower().endswith(('.m4a', '.mp4')):
-                self._save_metadata_mp4(file_path, original_album_title, new_artist, new_year, new_genre)
+            # Seuls les albums sélectionnés sont reportés dans le catalogue
+            on_album_written = None
+            if track_album_path in album_titles:
+                on_album_written = (lambda path=track_album_path, title=original_album_title:
+                                    self._update_catalog_album(path, title, new_artist, new_year, new_genre))
+            self._enqueue_album_tags(
+                file_paths,
+                self._album_tag_fields(original_album_title, new_artist, new_year, new_genre),
+                on_album_written
+            )
+    
+    def _album_tag_fields(self, album, artist, year, genre):
+        """Champs d'album à écrire : valeurs vides ignorées, sentence case sur l'album"""
+        fields = {}
+        if artist:
+            fields['artist'] = artist
+        if album:
+            fields['album'] = self.case_corrector.correct_text_case(album, 'album').corrected
+        if year:
+            fields['year'] = year
+        if genre:
+            fields['genre'] = genre
+        return fields
+    
+    def _enqueue_album_tags(self, file_paths, fields, on_album_written=None):
+        """
+        Met en file d'écriture les tags d'album de chaque fichier
+        
+        Args:
+            file_paths: Fichiers de l'album
+            fields: Champs à écrire (voir _album_tag_fields)
+            on_album_written: Appelé une fois tous les fichiers traités, si au moins
+                un a été écrit (thread d'écriture, ou GTK si le dernier a échoué)
+        """
+        if not on_album_written:
+            for file_path in file_paths:
+                tag_write_queue.enqueue(file_path, fields, on_error=self._on_tag_write_failed)
+            return
+        
+        # Compteur partagé par les fichiers : le dernier terminé, réussi ou non,
+        # déclenche la mise à jour du catalogue
+        lock = threading.Lock()
+        state = {'remaining': len(file_paths), 'written': 0}
+        
+        def file_done(written):
+            with lock:
+                state['remaining'] -= 1
+                state['written'] += written
+                finished = state['remaining'] == 0 and state['written'] > 0
+            if finished:
+                on_album_written()
+        
+        def on_error(file_path, message):
+            self._on_tag_write_failed(file_path, message)
+            file_done(0)
+        
+        for file_path in file_paths:
+            tag_write_queue.enqueue(file_path, fields, after_write=lambda *_: file_done(1),
+                                    on_error=on_error)
+    
+    def _update_catalog_album(self, album_path, album, artist, year, genre):
+        """Reporte les tags d'album écrits dans le catalogue (index de recherche)"""
+        try:
+            get_library_catalog().update_album_tags(
+                album_path, {'album': album, 'artist': artist, 'year': year, 'genre': genre}
+            )
+        except Exception as e:
+            print(f"⚠️ Catalogue non mis à jour pour {album_path}: {e}")
+    
+    def _update_catalog_track(self, file_path, fields, new_file_path=None):
+        """Reporte les tags d'une piste (et son renommage) dans le catalogue"""
+        try:
+            get_library_catalog().update_track_tags(file_path, fields, new_file_path)
+        except Exception as e:
+            print(f"⚠️ Catalogue non mis à jour pour {file_path}: {e}")
+    
+    def _on_track_written(self, file_path, new_file_path, fields):
+        """Écriture différée d'une piste terminée (thread d'écriture) : mise à jour du catalogue"""
+        self._update_catalog_track(file_path, fields, new_file_path)
+    
+    def _on_tag_write_failed(self, file_path, message):
+        """Échec d'une écriture différée (thread GTK) : signalé à l'utilisateur"""
+        if self._closed:
+            return  # Fenêtre fermée : l'erreur a été journalisée par la file d'écriture
+        self._write_errors.append(f"{os.path.basename(file_path)} : {message}")
+        if len(self._write_errors) == 1:
+            # Un seul dialogue pour toutes les erreurs d'une même écriture
+            GLib.idle_add(self._show_write_errors)
+    
+    def _show_write_errors(self):
+        """Affiche les échecs d'écriture accumulés"""
+        errors, self._write_errors = self._write_errors, []
+        if errors and not self._closed:
+            details = "\n".join(errors[:10])
+            if len(errors) > 10:
+                details += f"\n… et {len(errors) - 10} autres fichiers"
+            self._show_error_dialog(f"Les tags n'ont pas pu être enregistrés :\n{details}")
+        return False
 
     def _emit_metadata_changed_events(self, new_album, new_artist, new_year, new_genre):
         """Émet les événements de changement de métadonnées pour tous les albums modifiés"""
@@ -1383,190 +1358,35 @@ class AlbumEditWindow(Gtk.Window):
         except Exception as e:
             print(f"Erreur émission événements: {e}")
     
-    def _save_title_to_file(self, file_path, title, track_num=None):
-        """Sauvegarde un titre individuel dans les métadonnées physiques et renomme le fichier"""
-        try:
-            # 1. Sauvegarder les métadonnées
-            if file_path.lower().endswith('.mp3'):
-                from mutagen.id3 import ID3, TIT2, ID3NoHeaderError
-                try:
-                    audio = ID3(file_path)
-                except ID3NoHeaderError:
-                    audio = ID3()
-                audio['TIT2'] = TIT2(encoding=3, text=title)
-                audio.save(file_path)
-                
-            elif file_path.lower().endswith('.flac'):
-                from mutagen.flac import FLAC
-                audio = FLAC(file_path)
-                audio['TITLE'] = title
-                audio.save()
-                
-            elif file_path.lower().endswith(('.m4a', '.mp4')):
-                from mutagen.mp4 import MP4
-                audio = MP4(file_path)
-                audio['\xa9nam'] = title
-                audio.save()
-            
-            # 2. Renommer le fichier selon la règle "N° - Titre"
-            new_file_path = file_path
-            if track_num and title:
-                directory = os.path.dirname(file_path)
-                extension = os.path.splitext(file_path)[1]
-                
-                # Nettoyer le titre pour le nom de fichier
-                clean_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
-                new_filename = f"{track_num} - {clean_title}{extension}"
-                new_file_path = os.path.join(directory, new_filename)
-                
-                # Renommer seulement si le nom change
-                if new_file_path != file_path:
-                    os.rename(file_path, new_file_path)
-            
-            return new_file_path
-            
-        except Exception as e:
-            print(f"Erreur sauvegarde titre {file_path}: {e}")
+    def _renamed_track_path(self, file_path, track_num, title):
+        """Chemin du fichier selon la règle "N° - Titre" (inchangé sans numéro ou sans titre)"""
+        if not (track_num and title):
             return file_path
+        directory = os.path.dirname(file_path)
+        extension = os.path.splitext(file_path)[1]
+        
+        # Nettoyer le titre pour le nom de fichier
+        clean_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
+        return os.path.join(directory, f"{track_num} - {clean_title}{extension}")
+    
+    def _save_title_to_file(self, file_path, title, track_num=None):
+        """Programme l'écriture d'un titre et le renommage du fichier ; retourne le nouveau chemin"""
+        new_file_path = self._renamed_track_path(file_path, track_num, title)
+        tag_write_queue.enqueue(file_path, {'title': title}, rename_to=new_file_path,
+                                after_write=self._on_track_written, on_error=self._on_tag_write_failed)
+        return new_file_path
     
     def _save_year_to_file(self, file_path, year):
-        """Sauvegarde l'année dans les métadonnées physiques"""
-        try:
-            if file_path.lower().endswith('.mp3'):
-                from mutagen.id3 import ID3, TDRC, ID3NoHeaderError
-                try:
-                    audio = ID3(file_path)
-                except ID3NoHeaderError:
-                    audio = ID3()
-                audio['TDRC'] = TDRC(encoding=3, text=year)
-                audio.save(file_path)
-                
-            elif file_path.lower().endswith('.flac'):
-                from mutagen.flac import FLAC
-                audio = FLAC(file_path)
-                audio['DATE'] = year
-                audio.save()
-                
-            elif file_path.lower().endswith(('.m4a', '.mp4')):
-                from mutagen.mp4 import MP4
-                audio = MP4(file_path)
-                audio['\xa9day'] = year
-                audio.save()
-            
-            print(f"Année {year} sauvegardée dans {os.path.basename(file_path)}")
-            
-        except Exception as e:
-            print(f"Erreur sauvegarde année {file_path}: {e}")
+        """Programme l'écriture de l'année d'une piste"""
+        tag_write_queue.enqueue(file_path, {'year': year},
+                                after_write=self._on_track_written, on_error=self._on_tag_write_failed)
     
     def _save_track_number_to_file(self, file_path, track_number, title=None):
-        """Sauvegarde le numéro de piste dans les métadonnées physiques et renomme le fichier"""
-        try:
-            # 1. Sauvegarder les métadonnées
-            if file_path.lower().endswith('.mp3'):
-                from mutagen.id3 import ID3, TRCK, ID3NoHeaderError
-                try:
-                    audio = ID3(file_path)
-                except ID3NoHeaderError:
-                    audio = ID3()
-                audio['TRCK'] = TRCK(encoding=3, text=track_number)
-                audio.save(file_path)
-                
-            elif file_path.lower().endswith('.flac'):
-                from mutagen.flac import FLAC
-                audio = FLAC(file_path)
-                audio['TRACKNUMBER'] = track_number
-                audio.save()
-                
-            elif file_path.lower().endswith(('.m4a', '.mp4')):
-                from mutagen.mp4 import MP4
-                audio = MP4(file_path)
-                audio['trkn'] = [(int(track_number), 0)]
-                audio.save()
-            
-            # 2. Renommer le fichier selon la règle "N° - Titre"
-            new_file_path = file_path
-            if track_number and title:
-                directory = os.path.dirname(file_path)
-                extension = os.path.splitext(file_path)[1]
-                
-                # Nettoyer le titre pour le nom de fichier
-                clean_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
-                new_filename = f"{track_number} - {clean_title}{extension}"
-                new_file_path = os.path.join(directory, new_filename)
-                
-                # Renommer seulement si le nom change
-                if new_file_path != file_path:
-                    os.rename(file_path, new_file_path)
-            
-            print(f"Numéro de piste {track_number} sauvegardé dans {os.path.basename(new_file_path or file_path)}")
-            return new_file_path
-            
-        except Exception as e:
-            print(f"Erreur sauvegarde numéro de piste {file_path}: {e}")
-            return file_path
-    
-    def _save_metadata_mp3(self, file_path, album, artist, year, genre):
-        """Sauvegarde métadonnées MP3"""
-        try:
-            from mutagen.id3 import ID3, TIT2, TPE1, TPE2, TALB, TDRC, TCON, ID3NoHeaderError
-            try:
-                audio = ID3(file_path)
-            except ID3NoHeaderError:
-                audio = ID3()
-            
-            if artist:
-                audio['TPE1'] = TPE1(encoding=3, text=artist)  # Artiste
-                audio['TPE2'] = TPE2(encoding=3, text=artist)  # Artiste de l'album
-            if album:
-                # Appliquer sentence case sur l'album
-                corrected_album = self.case_corrector.correct_text_case(album, 'album').corrected
-                audio['TALB'] = TALB(encoding=3, text=corrected_album)
-            if year:
-                audio['TDRC'] = TDRC(encoding=3, text=year)
-            if genre:
-                audio['TCON'] = TCON(encoding=3, text=genre)
-            
-            audio.save(file_path)
-        except Exception as e:
-            print(f"Erreur MP3 {file_path}: {e}")
-    
-    def _save_metadata_flac(self, file_path, album, artist, year, genre):
-        """Sauvegarde métadonnées FLAC"""
-        try:
-            audio = FLAC(file_path)
-            if artist:
-                audio['ARTIST'] = artist
-                audio['ALBUMARTIST'] = artist  # Artiste de l'album
-            if album:
-                # Appliquer sentence case sur l'album
-                corrected_album = self.case_corrector.correct_text_case(album, 'album').corrected
-                audio['ALBUM'] = corrected_album
-            if year:
-                audio['DATE'] = year
-            if genre:
-                audio['GENRE'] = genre
-            audio.save()
-        except Exception as e:
-            print(f"Erreur FLAC {file_path}: {e}")
-    
-    def _save_metadata_mp4(self, file_path, album, artist, year, genre):
-        """Sauvegarde métadonnées MP4"""
-        try:
-            audio = MP4(file_path)
-            if artist:
-                audio['\xa9ART'] = [artist]
-                audio['aART'] = [artist]  # Artiste de l'album
-            if album:
-                # Appliquer sentence case sur l'album
-                corrected_album = self.case_corrector.correct_text_case(album, 'album').corrected
-                audio['\xa9alb'] = [corrected_album]
-            if year:
-                audio['\xa9day'] = [year]
-            if genre:
-                audio['\xa9gen'] = [genre]
-            audio.save()
-        except Exception as e:
-            print(f"Erreur MP4 {file_path}: {e}")
+        """Programme l'écriture du numéro de piste et le renommage du fichier ; retourne le nouveau chemin"""
+        new_file_path = self._renamed_track_path(file_path, track_number, title)
+        tag_write_queue.enqueue(file_path, {'track_number': track_number}, rename_to=new_file_path,
+                                after_write=self._on_track_written, on_error=self._on_tag_write_failed)
+        return new_file_path
     
     def _display_cover_results(self, dialog, content_area, results, spinner, loading_label):
         """Affiche les résultats de recherche de pochettes"""
@@ -1633,56 +1453,18 @@ class AlbumEditWindow(Gtk.Window):
         dialog.show_all()
     
     def _load_cover_image_async(self, cover_result, image_widget, size=300):
-        """Charge une image de pochette en arrière-plan"""
-        def load_image():
-            try:
-                import requests
-                from PIL import Image as PILImage
-                import io
-                
-                # Utiliser l'URL de miniature si disponible, sinon l'URL complète
-                url = cover_result.thumbnail_url or cover_result.url
-                
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                
-                # Convertir en GdkPixbuf
-                pil_image = PILImage.open(io.BytesIO(response.content))
-                
-                # Redimensionner à la taille demandée
-                pil_image.thumbnail((size, size), PILImage.Resampling.LANCZOS)
-                
-                # Convertir en format compatible GTK
-                if pil_image.mode != 'RGB':
-                    pil_image = pil_image.convert('RGB')
-                
-                # Sauver temporairement et charger avec GTK
-                temp_path = f"/tmp/cover_{hash(url)}.jpg"
-                pil_image.save(temp_path, 'JPEG')
-                
-                # Charger dans GTK
-                GLib.idle_add(self._update_cover_image, image_widget, temp_path, size)
-                
-            except Exception as e:
-                print(f"Erreur chargement image {url}: {e}")
-                GLib.idle_add(self._update_cover_image, image_widget, None, size)
-        
-        import threading
-        thread = threading.Thread(target=load_image)
-        thread.daemon = True
-        thread.start()
+        """Charge une image de pochette en arrière-plan (pool borné + cache partagé)"""
+        # Utiliser l'URL de miniature si disponible, sinon l'URL complète
+        url = cover_result.thumbnail_url or cover_result.url
+        cover_thumbnail_loader.load(
+            url, size, lambda pixbuf: self._update_cover_image(image_widget, pixbuf)
+        )
     
-    def _update_cover_image(self, image_widget, image_path, size=300):
+    def _update_cover_image(self, image_widget, pixbuf):
         """Met à jour l'image dans le thread principal GTK"""
         try:
-            if image_path and os.path.exists(image_path):
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(image_path, size, size, True)
+            if pixbuf is not None:
                 image_widget.set_from_pixbuf(pixbuf)
-                # Nettoyer le fichier temporaire
-                try:
-                    os.remove(image_path)
-                except:
-                    pass
             else:
                 image_widget.set_from_icon_name("image-missing", Gtk.IconSize.DIALOG)
         except Exception as e:
@@ -1773,10 +1555,12 @@ class AlbumEditWindow(Gtk.Window):
     def on_window_closing(self, window, event):
         """Gestionnaire de fermeture de la fenêtre d'édition"""
         
+        self._closed = True
+        
         # Forcer une sauvegarde finale et émission d'événements si nécessaire
         if hasattr(self, 'metadata_save_timer') and self.metadata_save_timer:
             GLib.source_remove(self.metadata_save_timer)
-            self._save_metadata_delayed()  # Sauvegarde immédiate
+            self._save_metadata_to_files()  # Mise en file immédiate
         
         # Collecter les albums modifiés pour notification
         modified_albums = []
@@ -1789,69 +1573,42 @@ class AlbumEditWindow(Gtk.Window):
                     album_folders.add(album_folder)
             modified_albums = list(album_folders)
         
-        # Notifier le RefreshManager des changements
-        if modified_albums:
-            refresh_manager.notify_metadata_changed(modified_albums, immediate=True)
+        # Écrire sans délai les tags en attente, puis notifier le RefreshManager
+        # (les cartes relisent les fichiers : elles doivent voir les tags écrits)
+        def on_flushed():
+            if modified_albums:
+                refresh_manager.notify_metadata_changed(modified_albums, immediate=True)
+        
+        tag_write_queue.flush(on_flushed)
+        
+        # Abandonner le chargement des pistes s'il n'est pas terminé
+        track_table_loader.cancel(self._tracks_ticket)
         
         # Nettoyer le lecteur audio
         if hasattr(self, 'audio_player'):
             self.audio_player.cleanup()
         
-        # Arrêter le timer
-        if hasattr(self, 'position_timer') and self.position_timer:
-            GLib.source_remove(self.position_timer)
-        
         return False
     
     def _refresh_all_modified_cards(self):
-        """Rafraîchit toutes les cartes correspondant aux albums modifiés (mode multi-albums)"""
-        try:
-            # Récupérer l'instance de l'application principale (NonotagsApp)
-            app_instance = None
-            for widget in Gtk.Window.list_toplevels():
-                if hasattr(widget, 'albums_grid'):  # NonotagsApp a albums_grid
-                    app_instance = widget
-                    break
-            
-            if not app_instance:
-                print("⚠️ Impossible de trouver l'instance de l'application principale")
-                return
-            
-            # Récupérer toutes les cartes existantes
-            all_cards = app_instance.albums_grid.get_children()
-            
-            # Créer un set des chemins d'albums modifiés pour recherche rapide
-            modified_paths = set()
-            for album in self.selected_albums:
-                path = album.get('folder_path') or album.get('path', '')
-                if path:
-                    modified_paths.add(path)
-            
-            # Rafraîchir chaque carte correspondant aux albums modifiés
-            refreshed_count = 0
-            for card in all_cards:
-                if hasattr(card, 'album_data'):
-                    card_path = card.album_data.get('folder_path') or card.album_data.get('path', '')
-                    if card_path in modified_paths:
-                        GLib.idle_add(card._update_display)
-                        refreshed_count += 1
-            
-        except Exception as e:
-            print(f"Erreur lors du rafraîchissement multi-cartes: {e}")
-            import traceback
-            traceback.print_exc()
+        """Rafraîchit les cartes affichées des albums modifiés (mode multi-albums)"""
+        modified_paths = [album.get('folder_path') or album.get('path', '') for album in self.selected_albums]
+        modified_paths = [path for path in modified_paths if path]
+        if modified_paths:
+            refresh_manager.notify_metadata_changed(modified_paths)
     
     def on_startup_window_close(self, window, event):
         """Gestionnaire de fermeture de la fenêtre"""
+        self._closed = True
+        tag_write_queue.flush()
+        
+        # Abandonner le chargement des pistes s'il n'est pas terminé
+        track_table_loader.cancel(self._tracks_ticket)
         
         # Nettoyer le lecteur audio
         if hasattr(self, 'audio_player'):
             self.audio_player.cleanup()
         
-        # Arrêter le timer
-        if hasattr(self, 'position_timer') and self.position_timer:
-            GLib.source_remove(self.position_timer)
-        
         return False
     
     def _load_album_cover(self):
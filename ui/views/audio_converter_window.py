@@ -10,10 +10,14 @@ from gi.repository import Gtk, GLib, GdkPixbuf
 import os
 import threading
 from services.audio_converter import AudioConverter, ConversionStatus, AudioFormat
+from database.conversion_manifest import get_conversion_manifest
 
 class AudioConverterWindow(Gtk.Window):
     """Fenêtre de conversion audio avec layout 4 blocs"""
     
+    # Rafraîchissement de la progression globale et des statistiques pendant la conversion
+    PROGRESS_REFRESH_MS = 500
+    
     def __init__(self):
         super().__init__(title="Convertisseur Audio")
         
@@ -22,12 +26,14 @@ class AudioConverterWindow(Gtk.Window):
         self.set_resizable(True)
         self.set_position(Gtk.WindowPosition.CENTER)
         
-        # Service de conversion
-        self.converter = AudioConverter()
+        # Service de conversion (incrémental : manifeste des conversions déjà faites)
+        self.converter = AudioConverter(manifest=get_conversion_manifest())
         self._setup_converter_callbacks()
         
         # Variables d'état
         self.selected_files = []
+        self._job_rows = {}  # id(job) -> Gtk.TreeRowReference de sa ligne dans la queue
+        self.progress_timer = None
         
         # Conteneur principal
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=10)
@@ -55,6 +61,11 @@ class AudioConverterWindow(Gtk.Window):
         
         # Vérification initiale de FFmpeg
         self._check_ffmpeg_availability()
+        
+        # Reprise de la queue interrompue lors d'une session précédente
+        self._restore_queue()
+        
+        self.connect("destroy", self._on_destroy)
     
     def _create_file_selection_block(self, parent_box):
         """BLOC 1 : Sélection des fichiers sources"""
@@ -171,6 +182,11 @@ class AudioConverterWindow(Gtk.Window):
         
         vbox.pack_start(quality_box, False, False, 0)
         
+        # Conversion incrémentale
+        self.skip_up_to_date_check = Gtk.CheckButton(label="Ignorer les fichiers déjà convertis et inchangés")
+        self.skip_up_to_date_check.set_active(True)
+        vbox.pack_start(self.skip_up_to_date_check, False, False, 0)
+        
         # Informations
         info_frame = Gtk.Frame(label="Information")
         info_vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
@@ -318,6 +334,7 @@ Qualités disponibles:
         self.converter.on_job_progress = self._on_job_progress
         self.converter.on_job_completed = self._on_job_completed
         self.converter.on_job_error = self._on_job_error
+        self.converter.on_job_cancelled = self._on_job_cancelled
         self.converter.on_queue_finished = self._on_queue_finished
     
     def _check_ffmpeg_availability(self):
@@ -406,299 +423,28 @@ Qualités disponibles:
         if not target_quality:
             target_quality = "standard"  # Valeur par défaut
         
-        # Ajouter les fichiers à la queue (utilise le dossier source de chaque fichier)
-        added_count = 0
-        for file_path in self.selected_files:
-            # Utiliser le dossier du fichier source comme destination
-            source_directory = os.path.dirname(file_path)
-            job = self.converter.add_conversion_job(file_path, target_format, source_directory, target_quality)
-            self._add_job_to_queue_display(job)
-            added_count += 1
-        
-        self._update_stats()
-        print(f"{added_count} fichiers ajoutés à la queue de conversion avec qualité {target_quality}")
-    
-    def on_remove_from_queue(self, button):
-        """Supprimer les éléments sélectionnés de la queue"""
-        selection = self.queue_view.get_selection()
-        model, tree_iter = selection.get_selected()
-        
-        if tree_iter:
-            job = model[tree_iter][5]  # L'objet job est dans la dernière colonne
-            self.converter.remove_job(job)
-            model.remove(tree_iter)
-            self._update_stats()
-    
-    def on_clear_queue(self, button):
-        """Vider la queue de conversion"""
-        if not self.converter.is_converting:
-            self.converter.clear_queue()
-            self.queue_store.clear()
-            self._update_stats()
-    
-    def on_start_conversion(self, button):
-        """Démarrer la conversion"""
-        if not self.converter.conversion_queue:
-            self._show_message("Queue vide", "Ajoutez des fichiers à la queue avant de démarrer.")
-            return
-        
-        self.start_btn.set_sensitive(False)
-        self.stop_btn.set_sensitive(True)
-        self.converter.start_conversion()
-    
-    def on_stop_conversion(self, button):
-        """Arrêter la conversion"""
-        self.converter.stop_conversion()
-        self.start_btn.set_sensitive(True)
-        self.stop_btn.set_sensitive(False)
-    
-    def on_format_changed(self, combo):
-        """Met à jour les informations de qualité selon le format sélectionné"""
-        format_selected = combo.get_active_id()
-        
-        # Informations détaillées sur les qualités par format
-        quality_info = {
-            "mp3": "MP3 - Qualités:\n• Basse: 128 kbps\n• Standard: 192 kbps\n• Haute: 256 kbps\n• Maximum: 320 kbps",
-            "flac": "FLAC - Qualités (niveau de compression):\n• Basse: Rapide, fichiers plus gros\n• Standard: Équilibré\n• Haute: Compression élevée\n• Maximum: Compression maximale",
-            "wav": "WAV - Qualités (fréquence d'échantillonnage):\n• Basse: 22 kHz, 16-bit\n• Standard: 44.1 kHz, 16-bit\n• Haute: 48 kHz, 24-bit\n• Maximum: 96 kHz, 32-bit",
-            "ogg": "OGG Vorbis - Qualités:\n• Basse: Qualité 2\n• Standard: Qualité 5\n• Haute: Qualité 7\n• Maximum: Qualité 10",
-            "m4a": "M4A/AAC - Qualités:\n• Basse: 128 kbps\n• Standard: 192 kbps\n• Haute: 256 kbps\n• Maximum: 320 kbps"
-        }
-        
-        # Afficher les informations détaillées pour le format sélectionné
-        if hasattr(self, 'format_specific_info'):
-            info_text = quality_info.get(format_selected, "Sélectionnez un format pour voir les détails")
-            self.format_specific_info.set_text(info_text)
-    
-    # === CALLBACKS DE L'INTERFACE ===
-    
-    def on_add_files(self, button):
-        """Ajouter des fichiers individuels"""
-        dialog = Gtk.FileChooserDialog(
-            title="Sélectionner des fichiers audio",
-            parent=self,
-            action=Gtk.FileChooserAction.OPEN
-        )
-        dialog.add_button("Annuler", Gtk.ResponseType.CANCEL)
-        dialog.add_button("Ouvrir", Gtk.ResponseType.OK)
-        dialog.set_select_multiple(True)
-        
-        # Filtres pour les fichiers audio
-        audio_filter = Gtk.FileFilter()
-        audio_filter.set_name("Fichiers audio")
-        audio_filter.add_pattern("*.mp3")
-        audio_filter.add_pattern("*.flac")
-        audio_filter.add_pattern("*.wav")
-        audio_filter.add_pattern("*.ogg")
-        audio_filter.add_pattern("*.m4a")
-        audio_filter.add_pattern("*.aac")
-        dialog.add_filter(audio_filter)
-        
-        response = dialog.run()
-        if response == Gtk.ResponseType.OK:
-            files = dialog.get_filenames()
-            self._add_files_to_list(files)
-        
-        dialog.destroy()
-    
-    def on_add_folder(self, button):
-        """Ajouter tous les fichiers audio d'un dossier"""
-        dialog = Gtk.FileChooserDialog(
-            title="Sélectionner un dossier",
-            parent=self,
-            action=Gtk.FileChooserAction.SELECT_FOLDER
-        )
-        dialog.add_button("Annuler", Gtk.ResponseType.CANCEL)
-        dialog.add_button("Sélectionner", Gtk.ResponseType.OK)
-        
-        response = dialog.run()
-        if response == Gtk.ResponseType.OK:
-            folder = dialog.get_filename()
-            audio_files = []
-            
-            # Parcourir le dossier pour trouver les fichiers audio
-            for root, dirs, files in os.walk(folder):
-                for file in files:
-                    if file.lower().endswith(('.mp3', '.flac', '.wav', '.ogg', '.m4a', '.aac')):
-                        audio_files.append(os.path.join(root, file))
-            
-            self._add_files_to_list(audio_files)
-        
-        dialog.destroy()
-    
-    def on_clear_files(self, button):
-        """Vider la liste des fichiers"""
-        self.selected_files.clear()
-        self.files_store.clear()
-        self._update_files_info()
-    
-    def on_add_to_queue(self, button):
-        """Ajouter les fichiers sélectionnés à la queue de conversion"""
-        if not self.selected_files:
-            self._show_message("Aucun fichier sélectionné", "Veuillez d'abord sélectionner des fichiers à convertir.")
-            return
-        
-        target_format = self.format_combo.get_active_id()
-        if not target_format:
-            self._show_message("Format non sélectionné", "Veuillez choisir un format de sortie.")
-            return
-        
-        target_quality = self.quality_combo.get_active_id()
-        if not target_quality:
-            target_quality = "standard"  # Valeur par défaut
-        
-        # Ajouter les fichiers à la queue (utilise le dossier source de chaque fichier)
-        added_count = 0
-        for file_path in self.selected_files:
-            # Utiliser le dossier du fichier source comme destination
-            source_directory = os.path.dirname(file_path)
-            job = self.converter.add_conversion_job(file_path, target_format, source_directory, target_quality)
-            self._add_job_to_queue_display(job)
-            added_count += 1
-        
-        self._update_stats()
-        print(f"{added_count} fichiers ajoutés à la queue de conversion avec qualité {target_quality}")
-    
-    def on_remove_from_queue(self, button):
-        """Supprimer les éléments sélectionnés de la queue"""
-        selection = self.queue_view.get_selection()
-        model, tree_iter = selection.get_selected()
-        
-        if tree_iter:
-            job = model[tree_iter][5]  # L'objet job est dans la dernière colonne
-            self.converter.remove_job(job)
-            model.remove(tree_iter)
-            self._update_stats()
-    
-    def on_clear_queue(self, button):
-        """Vider la queue de conversion"""
-        if not self.converter.is_converting:
-            self.converter.clear_queue()
-            self.queue_store.clear()
-            self._update_stats()
-    
-    def on_start_conversion(self, button):
-        """Démarrer la conversion"""
-        if not self.converter.conversion_queue:
-            self._show_message("Queue vide", "Ajoutez des fichiers à la queue avant de démarrer.")
-            return
-        
-        self.start_btn.set_sensitive(False)
-        self.stop_btn.set_sensitive(True)
-        self.converter.start_conversion()
-    
-    def on_stop_conversion(self, button):
-        """Arrêter la conversion"""
-        self.converter.stop_conversion()
-        self.start_btn.set_sensitive(True)
-        self.stop_btn.set_sensitive(False)
-    
-    def on_format_changed(self, combo):
-        """Met à jour les informations de qualité selon le format sélectionné"""
-        format_selected = combo.get_active_id()
-        
-        # Informations détaillées sur les qualités par format
-        quality_info = {
-            "mp3": "MP3 - Qualités:\n• Basse: 128 kbps\n• Standard: 192 kbps\n• Haute: 256 kbps\n• Maximum: 320 kbps",
-            "flac": "FLAC - Qualités (niveau de compression):\n• Basse: Rapide, fichiers plus gros\n• Standard: Équilibré\n• Haute: Compression élevée\n• Maximum: Compression maximale",
-            "wav": "WAV - Qualités (fréquence d'échantillonnage):\n• Basse: 22 kHz, 16-bit\n• Standard: 44.1 kHz, 16-bit\n• Haute: 48 kHz, 24-bit\n• Maximum: 96 kHz, 32-bit",
-            "ogg": "OGG Vorbis - Qualités:\n• Basse: Qualité 2\n• Standard: Qualité 5\n• Haute: Qualité 7\n• Maximum: Qualité 10",
-            "m4a": "M4A/AAC - Qualités:\n• Basse: 128 kbps\n• Standard: 192 kbps\n• Haute: 256 kbps\n• Maximum: 320 kbps"
-        }
-        
-        # Afficher les informations détaillées pour le format sélectionné
-        if hasattr(self, 'format_specific_info'):
-            info_text = quality_info.get(format_selected, "Sélectionnez un format pour voir les détails")
-            self.format_specific_info.set_text(info_text)
-    
-    # === CALLBACKS DE L'INTERFACE ===
-    
-    def on_add_files(self, button):
-        """Ajouter des fichiers individuels"""
-        dialog = Gtk.FileChooserDialog(
-            title="Sélectionner des fichiers audio",
-            parent=self,
-            action=Gtk.FileChooserAction.OPEN
-        )
-        dialog.add_button("Annuler", Gtk.ResponseType.CANCEL)
-        dialog.add_button("Ouvrir", Gtk.ResponseType.OK)
-        dialog.set_select_multiple(True)
-        
-        # Filtres pour les fichiers audio
-        audio_filter = Gtk.FileFilter()
-        audio_filter.set_name("Fichiers audio")
-        audio_filter.add_pattern("*.mp3")
-        audio_filter.add_pattern("*.flac")
-        audio_filter.add_pattern("*.wav")
-        audio_filter.add_pattern("*.ogg")
-        audio_filter.add_pattern("*.m4a")
-        audio_filter.add_pattern("*.aac")
-        dialog.add_filter(audio_filter)
-        
-        response = dialog.run()
-        if response == Gtk.ResponseType.OK:
-            files = dialog.get_filenames()
-            self._add_files_to_list(files)
-        
-        dialog.destroy()
-    
-    def on_add_folder(self, button):
-        """Ajouter tous les fichiers audio d'un dossier"""
-        dialog = Gtk.FileChooserDialog(
-            title="Sélectionner un dossier",
-            parent=self,
-            action=Gtk.FileChooserAction.SELECT_FOLDER
+        # Ajouter les fichiers à la queue en un lot (destination : dossier source de chaque fichier)
+        entries = [
+            {'source_path': file_path, 'target_format': target_format,
+             'output_dir': os.path.dirname(file_path), 'quality': target_quality}
+            for file_path in self.selected_files
+        ]
+        jobs = self.converter.add_conversion_jobs(
+            entries, skip_up_to_date=self.skip_up_to_date_check.get_active()
         )
-        dialog.add_button("Annuler", Gtk.ResponseType.CANCEL)
-        dialog.add_button("Sélectionner", Gtk.ResponseType.OK)
-        
-        response = dialog.run()
-        if response == Gtk.ResponseType.OK:
-            folder = dialog.get_filename()
-            audio_files = []
-            
-            # Parcourir le dossier pour trouver les fichiers audio
-            for root, dirs, files in os.walk(folder):
-                for file in files:
-                    if file.lower().endswith(('.mp3', '.flac', '.wav', '.ogg', '.m4a', '.aac')):
-                        audio_files.append(os.path.join(root, file))
-            
-            self._add_files_to_list(audio_files)
-        
-        dialog.destroy()
-    
-    def on_clear_files(self, button):
-        """Vider la liste des fichiers"""
-        self.selected_files.clear()
-        self.files_store.clear()
-        self._update_files_info()
-    
-    def on_add_to_queue(self, button):
-        """Ajouter les fichiers sélectionnés à la queue de conversion"""
-        if not self.selected_files:
-            self._show_message("Aucun fichier sélectionné", "Veuillez d'abord sélectionner des fichiers à convertir.")
-            return
-        
-        target_format = self.format_combo.get_active_id()
-        if not target_format:
-            self._show_message("Format non sélectionné", "Veuillez choisir un format de sortie.")
-            return
         
-        target_quality = self.quality_combo.get_active_id()
-        if not target_quality:
-            target_quality = "standard"  # Valeur par défaut
-        
-        # Ajouter les fichiers à la queue (utilise le dossier source de chaque fichier)
         added_count = 0
-        for file_path in self.selected_files:
-            # Utiliser le dossier du fichier source comme destination
-            source_directory = os.path.dirname(file_path)
-            job = self.converter.add_conversion_job(file_path, target_format, source_directory, target_quality)
+        skipped_count = 0
+        for job in jobs:
             self._add_job_to_queue_display(job)
-            added_count += 1
+            if job.status == ConversionStatus.SKIPPED:
+                skipped_count += 1
+            else:
+                added_count += 1
         
         self._update_stats()
-        print(f"{added_count} fichiers ajoutés à la queue de conversion avec qualité {target_quality}")
+        print(f"{added_count} fichiers ajoutés à la queue de conversion avec qualité {target_quality}"
+              f" ({skipped_count} déjà à jour)")
     
     def on_remove_from_queue(self, button):
         """Supprimer les éléments sélectionnés de la queue"""
@@ -707,14 +453,20 @@ Qualités disponibles:
         
         if tree_iter:
             job = model[tree_iter][5]  # L'objet job est dans la dernière colonne
-            self.converter.remove_job(job)
-            model.remove(tree_iter)
+            if job.status == ConversionStatus.CONVERTING:
+                # Tâche en cours : annulée, la ligne est mise à jour par le callback
+                self.converter.cancel_job(job)
+            else:
+                self.converter.remove_job(job)
+                self._job_rows.pop(id(job), None)
+                model.remove(tree_iter)
             self._update_stats()
     
     def on_clear_queue(self, button):
         """Vider la queue de conversion"""
         if not self.converter.is_converting:
             self.converter.clear_queue()
+            self._job_rows.clear()
             self.queue_store.clear()
             self._update_stats()
     
@@ -726,153 +478,18 @@ Qualités disponibles:
         
         self.start_btn.set_sensitive(False)
         self.stop_btn.set_sensitive(True)
+        self.progress_bar.set_fraction(0.0)
         self.converter.start_conversion()
-    
-    def on_stop_conversion(self, button):
-        """Arrêter la conversion"""
-        self.converter.stop_conversion()
-        self.start_btn.set_sensitive(True)
-        self.stop_btn.set_sensitive(False)
-    
-    def on_format_changed(self, combo):
-        """Met à jour les informations de qualité selon le format sélectionné"""
-        format_selected = combo.get_active_id()
-        
-        # Informations détaillées sur les qualités par format
-        quality_info = {
-            "mp3": "MP3 - Qualités:\n• Basse: 128 kbps\n• Standard: 192 kbps\n• Haute: 256 kbps\n• Maximum: 320 kbps",
-            "flac": "FLAC - Qualités (niveau de compression):\n• Basse: Rapide, fichiers plus gros\n• Standard: Équilibré\n• Haute: Compression élevée\n• Maximum: Compression maximale",
-            "wav": "WAV - Qualités (fréquence d'échantillonnage):\n• Basse: 22 kHz, 16-bit\n• Standard: 44.1 kHz, 16-bit\n• Haute: 48 kHz, 24-bit\n• Maximum: 96 kHz, 32-bit",
-            "ogg": "OGG Vorbis - Qualités:\n• Basse: Qualité 2\n• Standard: Qualité 5\n• Haute: Qualité 7\n• Maximum: Qualité 10",
-            "m4a": "M4A/AAC - Qualités:\n• Basse: 128 kbps\n• Standard: 192 kbps\n• Haute: 256 kbps\n• Maximum: 320 kbps"
-        }
-        
-        # Afficher les informations détaillées pour le format sélectionné
-        if hasattr(self, 'format_specific_info'):
-            info_text = quality_info.get(format_selected, "Sélectionnez un format pour voir les détails")
-            self.format_specific_info.set_text(info_text)
-    
-    # === CALLBACKS DE L'INTERFACE ===
-    
-    def on_add_files(self, button):
-        """Ajouter des fichiers individuels"""
-        dialog = Gtk.FileChooserDialog(
-            title="Sélectionner des fichiers audio",
-            parent=self,
-            action=Gtk.FileChooserAction.OPEN
-        )
-        dialog.add_button("Annuler", Gtk.ResponseType.CANCEL)
-        dialog.add_button("Ouvrir", Gtk.ResponseType.OK)
-        dialog.set_select_multiple(True)
-        
-        # Filtres pour les fichiers audio
-        audio_filter = Gtk.FileFilter()
-        audio_filter.set_name("Fichiers audio")
-        audio_filter.add_pattern("*.mp3")
-        audio_filter.add_pattern("*.flac")
-        audio_filter.add_pattern("*.wav")
-        audio_filter.add_pattern("*.ogg")
-        audio_filter.add_pattern("*.m4a")
-        audio_filter.add_pattern("*.aac")
-        dialog.add_filter(audio_filter)
-        
-        response = dialog.run()
-        if response == Gtk.ResponseType.OK:
-            files = dialog.get_filenames()
-            self._add_files_to_list(files)
-        
-        dialog.destroy()
-    
-    def on_add_folder(self, button):
-        """Ajouter tous les fichiers audio d'un dossier"""
-        dialog = Gtk.FileChooserDialog(
-            title="Sélectionner un dossier",
-            parent=self,
-            action=Gtk.FileChooserAction.SELECT_FOLDER
-        )
-        dialog.add_button("Annuler", Gtk.ResponseType.CANCEL)
-        dialog.add_button("Sélectionner", Gtk.ResponseType.OK)
-        
-        response = dialog.run()
-        if response == Gtk.ResponseType.OK:
-            folder = dialog.get_filename()
-            audio_files = []
-            
-            # Parcourir le dossier pour trouver les fichiers audio
-            for root, dirs, files in os.walk(folder):
-                for file in files:
-                    if file.lower().endswith(('.mp3', '.flac', '.wav', '.ogg', '.m4a', '.aac')):
-                        audio_files.append(os.path.join(root, file))
-            
-            self._add_files_to_list(audio_files)
-        
-        dialog.destroy()
-    
-    def on_clear_files(self, button):
-        """Vider la liste des fichiers"""
-        self.selected_files.clear()
-        self.files_store.clear()
-        self._update_files_info()
-    
-    def on_add_to_queue(self, button):
-        """Ajouter les fichiers sélectionnés à la queue de conversion"""
-        if not self.selected_files:
-            self._show_message("Aucun fichier sélectionné", "Veuillez d'abord sélectionner des fichiers à convertir.")
-            return
-        
-        target_format = self.format_combo.get_active_id()
-        if not target_format:
-            self._show_message("Format non sélectionné", "Veuillez choisir un format de sortie.")
-            return
-        
-        target_quality = self.quality_combo.get_active_id()
-        if not target_quality:
-            target_quality = "standard"  # Valeur par défaut
-        
-        # Ajouter les fichiers à la queue (utilise le dossier source de chaque fichier)
-        added_count = 0
-        for file_path in self.selected_files:
-            # Utiliser le dossier du fichier source comme destination
-            source_directory = os.path.dirname(file_path)
-            job = self.converter.add_conversion_job(file_path, target_format, source_directory, target_quality)
-            self._add_job_to_queue_display(job)
-            added_count += 1
-        
-        self._update_stats()
-        print(f"{added_count} fichiers ajoutés à la queue de conversion avec qualité {target_quality}")
-    
-    def on_remove_from_queue(self, button):
-        """Supprimer les éléments sélectionnés de la queue"""
-        selection = self.queue_view.get_selection()
-        model, tree_iter = selection.get_selected()
-        
-        if tree_iter:
-            job = model[tree_iter][5]  # L'objet job est dans la dernière colonne
-            self.converter.remove_job(job)
-            model.remove(tree_iter)
-            self._update_stats()
-    
-    def on_clear_queue(self, button):
-        """Vider la queue de conversion"""
         if not self.converter.is_converting:
-            self.converter.clear_queue()
-            self.queue_store.clear()
-            self._update_stats()
-    
-    def on_start_conversion(self, button):
-        """Démarrer la conversion"""
-        if not self.converter.conversion_queue:
-            self._show_message("Queue vide", "Ajoutez des fichiers à la queue avant de démarrer.")
-            return
-        
-        self.start_btn.set_sensitive(False)
-        self.stop_btn.set_sensitive(True)
-        self.converter.start_conversion()
+            # FFmpeg absent : rien n'a démarré
+            self.start_btn.set_sensitive(True)
+            self.stop_btn.set_sensitive(False)
+        elif self.progress_timer is None:
+            self.progress_timer = GLib.timeout_add(self.PROGRESS_REFRESH_MS, self._refresh_progress)
     
     def on_stop_conversion(self, button):
-        """Arrêter la conversion"""
+        """Arrêter la conversion (Démarrer redevient actif à la sortie des workers)"""
         self.converter.stop_conversion()
-        self.start_btn.set_sensitive(True)
         self.stop_btn.set_sensitive(False)
     
     def on_format_changed(self, combo):
@@ -894,48 +511,174 @@ Qualités disponibles:
             self.format_specific_info.set_text(info_text)
     
     # === CALLBACKS CONVERTISSEUR ===
+    # Appelés depuis les workers de conversion : tout passe par GLib.idle_add
+    # (seule la ligne de la tâche ; la progression globale suit le timer)
     
     def _on_job_started(self, job):
         """Callback: job démarré"""
         GLib.idle_add(self._update_job_in_queue, job, job.status.value, "0%")
-        GLib.idle_add(self._update_progress_label, f"Conversion: {os.path.basename(job.source_path)}")
     
     def _on_job_progress(self, job, progress):
-        """Callback: progression du job"""
-        GLib.idle_add(self._update_job_in_queue, job, job.status.value, f"{progress:.0f}%")
-        GLib.idle_add(self._update_progress_bar, progress / 100.0)
+        """Callback: progression du job (avec débit et temps restant)"""
+        details = [f"{progress:.0f}%"] if job.duration else [self._format_time(job.position)]
+        if job.speed:
+            details.append(f"{job.speed:.1f}x")
+        if job.eta is not None and progress < 100:
+            details.append(self._format_time(job.eta))
+        GLib.idle_add(self._update_job_in_queue, job, job.status.value, " • ".join(details))
     
     def _on_job_completed(self, job):
         """Callback: job terminé"""
         GLib.idle_add(self._update_job_in_queue, job, job.status.value, "100%")
-        GLib.idle_add(self._update_stats)
     
     def _on_job_error(self, job, error_message):
         """Callback: erreur de job"""
         GLib.idle_add(self._update_job_in_queue, job, job.status.value, "Erreur")
-        GLib.idle_add(self._update_stats)
+    
+    def _on_job_cancelled(self, job):
+        """Callback: job annulé"""
+        GLib.idle_add(self._update_job_in_queue, job, job.status.value, "-")
     
     def _on_queue_finished(self):
         """Callback: queue terminée"""
         GLib.idle_add(self._conversion_finished)
     
+    # === AFFICHAGE ===
+    
+    def _add_files_to_list(self, files):
+        """Ajoute des fichiers à la liste des fichiers sources (sans doublons)"""
+        for file_path in files:
+            if file_path in self.selected_files:
+                continue
+            self.selected_files.append(file_path)
+            try:
+                size = f"{os.path.getsize(file_path) / (1024 * 1024):.1f} Mo"
+            except OSError:
+                size = "?"
+            self.files_store.append([
+                os.path.basename(file_path),
+                self.converter.detect_format(file_path).upper(),
+                size,
+                file_path
+            ])
+        self._update_files_info()
+    
+    def _update_files_info(self):
+        """Met à jour le label d'information des fichiers sources"""
+        count = len(self.selected_files)
+        if count == 0:
+            self.files_info_label.set_text("Aucun fichier sélectionné")
+        else:
+            self.files_info_label.set_text(f"{count} fichier(s) sélectionné(s)")
+    
+    def _add_job_to_queue_display(self, job):
+        """Ajoute une tâche à l'affichage de la queue"""
+        tree_iter = self.queue_store.append([
+            os.path.basename(job.source_path),
+            "→",
+            os.path.basename(job.target_path),
+            job.status.value,
+            f"{job.progress:.0f}%",
+            job
+        ])
+        self._job_rows[id(job)] = Gtk.TreeRowReference.new(self.queue_store, self.queue_store.get_path(tree_iter))
+    
+    def _restore_queue(self):
+        """Affiche les tâches inachevées reprises de la session précédente"""
+        try:
+            jobs = self.converter.restore_queue()
+        except Exception as e:
+            print(f"⚠️ Impossible de reprendre la queue de conversion: {e}")
+            return
+        for job in jobs:
+            self._add_job_to_queue_display(job)
+        pending = sum(1 for job in jobs if job.status == ConversionStatus.PENDING)
+        if pending:
+            self.progress_label.set_text(f"{pending} conversions reprises - Démarrer pour continuer")
+        self._update_stats()
+    
     def _update_job_in_queue(self, job, status, progress):
         """Met à jour un job dans l'affichage de la queue"""
-        iter = self.queue_store.get_iter_first()
-        while iter:
-            if self.queue_store[iter][5] == job:  # Comparer l'objet job
-                self.queue_store[iter][3] = status
-                self.queue_store[iter][4] = progress
-                break
-            iter = self.queue_store.iter_next(iter)
-    
-    def _update_progress_label(self, text):
-        """Met à jour le label de progression"""
-        self.progress_label.set_text(text)
-    
-    def _update_progress_bar(self, fraction):
-        """Met à jour la barre de progression"""
-        self.progress_bar.set_fraction(fraction)
+        row = self._job_rows.get(id(job))
+        if row is None or not row.valid():
+            return False  # Ligne retirée de la queue entre-temps
+        tree_iter = self.queue_store.get_iter(row.get_path())
+        self.queue_store[tree_iter][3] = status
+        self.queue_store[tree_iter][4] = progress
+        return False
+    
+    def _update_stats(self):
+        """Met à jour les statistiques de la queue"""
+        status = self.converter.get_queue_status()
+        text = f"{status['pending_jobs']} tâches en queue"
+        if status['running_jobs']:
+            text += f" • {status['running_jobs']}/{status['workers']} en cours"
+        self.stats_label.set_text(text)
+        
+        if status['running_jobs'] and status['speed']:
+            eta = status['eta_seconds']
+            remaining = f"reste {self._format_time(eta)}" if eta is not None else "temps restant inconnu"
+            self.time_label.set_text(f"{status['speed']:.1f}x temps réel • {remaining}")
+        elif status['completed_jobs'] + status['error_jobs'] + status['skipped_jobs']:
+            self.time_label.set_text(f"{status['completed_jobs']} terminées, {status['error_jobs']} en erreur, "
+                                     f"{status['skipped_jobs']} déjà à jour")
+        else:
+            self.time_label.set_text("")
+    
+    @staticmethod
+    def _format_time(seconds):
+        """Durée lisible (m:ss ou h:mm:ss)"""
+        seconds = int(round(seconds))
+        hours, rest = divmod(seconds, 3600)
+        if hours:
+            return f"{hours}:{rest // 60:02d}:{rest % 60:02d}"
+        return f"{rest // 60}:{rest % 60:02d}"
+    
+    def _refresh_progress(self):
+        """Timer de conversion : progression globale et statistiques"""
+        self._update_overall_progress()
+        if self.converter.is_converting:
+            return True
+        self.progress_timer = None
+        return False
+    
+    def _on_destroy(self, widget):
+        """Arrête le timer de progression avec la fenêtre"""
+        if self.progress_timer is not None:
+            GLib.source_remove(self.progress_timer)
+            self.progress_timer = None
+    
+    def _update_overall_progress(self):
+        """Progression globale pondérée par la durée des fichiers (annulés et à jour exclus)"""
+        jobs = [job for job in self.converter.get_jobs()
+                if job.status not in (ConversionStatus.CANCELLED, ConversionStatus.SKIPPED)]
+        total = sum(job.duration for job in jobs)
+        if total > 0:
+            done = sum(job.duration * job.progress / 100.0 for job in jobs)
+            self.progress_bar.set_fraction(min(1.0, done / total))
+        elif jobs:
+            self.progress_bar.set_fraction(sum(job.progress for job in jobs) / (100.0 * len(jobs)))
+        
+        running = [job for job in jobs if job.status == ConversionStatus.CONVERTING]
+        if len(running) == 1:
+            self.progress_label.set_text(f"Conversion: {os.path.basename(running[0].source_path)}")
+        elif running:
+            self.progress_label.set_text(f"Conversion de {len(running)} fichiers en parallèle")
+        
+        self._update_stats()
+    
+    def _show_message(self, title, message):
+        """Affiche un message d'information"""
+        dialog = Gtk.MessageDialog(
+            transient_for=self,
+            flags=0,
+            message_type=Gtk.MessageType.INFO,
+            buttons=Gtk.ButtonsType.OK,
+            text=title
+        )
+        dialog.format_secondary_text(message)
+        dialog.run()
+        dialog.destroy()
     
     def _conversion_finished(self):
         """Conversion terminée"""
@@ -7,10 +7,9 @@ import gi
 gi.require_version('Gtk', '3.0')
 
 from gi.repository import Gtk, Gdk
-from database.db_manager import DatabaseManager
 from database.models import CaseExceptionModel
-from support.logger import AppLogger
-from support.validator import Validator
+from support.logger import get_logger
+from support.service_container import get_services
 
 class ExceptionsWindow(Gtk.Window):
     """Fenêtre de gestion des exceptions de casse"""
@@ -19,9 +18,10 @@ class ExceptionsWindow(Gtk.Window):
         super().__init__(title="Gestion des exceptions de casse")
         
         self.parent = parent
-        self.logger = AppLogger()
-        self.db_manager = DatabaseManager()
-        self.validator = Validator()
+        self.logger = get_logger()
+        services = get_services()
+        self.db_manager = services.db
+        self.validator = services.validator
         
         # Configuration de la fenêtre
         self.set_default_size(800, 600)
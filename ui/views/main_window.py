@@ -8,15 +8,18 @@ gi.require_version('Gtk', '3.0')
 
 from gi.repository import Gtk, GLib, Gdk
 import os
+import threading
 from typing import List, Dict
 from ui.startup_window import StartupWindow
 from ui.components.album_card import AlbumCard
-from ui.processing_orchestrator import ProcessingOrchestrator, ProcessingState, ProcessingStep
-from ui.views.exceptions_window import ExceptionsWindow
+from ui.components.virtual_album_grid import VirtualAlbumGrid
 from core.refresh_manager import refresh_manager
 from ui.transitions.header_migration import HeaderMigration
-from support.config_manager import ConfigManager
+from support.service_container import get_services
 from ui.managers.persistent_window_manager import persistent_window_manager, WindowType
+from ui.models.album_model import AlbumModel
+from database.library_catalog import get_library_catalog
+from services.album_facts import album_facts
 
 class NonotagsApp:
     """Application Nonotags avec séquence de démarrage"""
@@ -28,12 +31,11 @@ class NonotagsApp:
         self._resize_timeout_id = None
         
         # Configuration et migration HeaderBar
-        self.config_manager = ConfigManager()
+        self.config_manager = get_services().config
         self.header_migration = HeaderMigration(self)
         
-        # Orchestrateur de traitement
-        self.orchestrator = ProcessingOrchestrator()
-        self._setup_orchestrator_callbacks()
+        # Orchestrateur de traitement : créé au premier traitement (voir orchestrator)
+        self._orchestrator = None
         
         # Initialiser les factories pour les fenêtres persistantes
         self._setup_persistent_window_factories()
@@ -43,18 +45,113 @@ class NonotagsApp:
         self.status_label = None
         self.step_label = None
         
-        # Configuration lazy loading
-        self.lazy_loading_batch = 20  # Nombre d'albums à charger par lot
-        self.current_displayed_count = 0
+        # Albums de la grille virtualisée (seules les rangées visibles ont des cartes)
         self.all_albums_data = []  # Tous les albums scannés
-        self.displayed_album_cards = []  # Cards actuellement affichées
+        self.visible_albums_data = []  # Albums affichés (filtrés par la recherche)
+        self.search_text = ""
+        
+        # Recherche de pochettes en lot (None si aucun lot en cours)
+        self.batch_cover_search = None
+        
+        # Catalogue persistant de la bibliothèque (affichage immédiat au démarrage)
+        self.library_catalog = get_library_catalog()
+        
+        # Les faits d'album (plage d'années, pochette...) sont recalculés après modification
+        refresh_manager.add_metadata_listener(album_facts.invalidate)
+    
+    @property
+    def orchestrator(self):
+        """Orchestrateur de traitement, créé à la première utilisation (après la première fenêtre)"""
+        if self._orchestrator is None:
+            from ui.processing_orchestrator import ProcessingOrchestrator
+            self._orchestrator = ProcessingOrchestrator()
+            self._setup_orchestrator_callbacks()
+        return self._orchestrator
     
     def run(self):
-        """Lance l'application avec la fenêtre de démarrage"""
-        self.startup_window = StartupWindow(self)
-        self.startup_window.show_all()
+        """Lance l'application : bibliothèque du catalogue, sinon fenêtre de démarrage"""
+        if self.library_catalog.has_albums():
+            self.create_main_window_from_catalog()
+        else:
+            self.startup_window = StartupWindow(self)
+            self.startup_window.show_all()
         
         Gtk.main()
+    
+    def create_main_window_from_catalog(self):
+        """Crée la fenêtre principale depuis le catalogue puis vérifie les dossiers en arrière-plan"""
+        self.create_main_window()
+        
+        roots = self.library_catalog.get_roots()
+        if roots:
+            self.current_folder = roots[0]
+        
+        self._show_albums(self.library_catalog.load_albums())
+        
+        thread = threading.Thread(target=self._reconcile_library, args=(roots,),
+                                  name="NonotagsLibrarySync")
+        thread.daemon = True
+        thread.start()
+    
+    def _reconcile_library(self, roots):
+        """Réanalyse les dossiers modifiés depuis la dernière session (thread de travail)"""
+        from services.music_scanner import MusicScanner
+        scanner = MusicScanner()
+        
+        all_changed, all_removed = [], []
+        for root in roots:
+            try:
+                changed, removed = scanner.reconcile_directory(
+                    root, self.library_catalog.get_signatures(root)
+                )
+                self.library_catalog.save_albums(changed, root)
+                self.library_catalog.remove_albums(removed)
+                all_changed.extend(changed)
+                all_removed.extend(removed)
+            except Exception as e:
+                print(f"⚠️ Erreur vérification bibliothèque {root}: {e}")
+        
+        print(f"📚 Bibliothèque vérifiée: {len(all_changed)} albums mis à jour, {len(all_removed)} retirés")
+        if all_changed or all_removed:
+            GLib.idle_add(self._on_library_reconciled, all_changed, all_removed)
+    
+    def _on_library_reconciled(self, changed, removed):
+        """Applique le résultat de la vérification à la grille (thread GTK)"""
+        by_path = {album.get('folder_path'): album for album in self.all_albums_data}
+        for path in removed:
+            by_path.pop(path, None)
+        for album in changed:
+            by_path[album.get('folder_path')] = album
+        
+        self.all_albums_data = self._sort_albums_by_year(list(by_path.values()))
+        self._refresh_album_grid(keep_position=True)
+        return False
+    
+    def _show_albums(self, albums):
+        """Remplace le contenu de la grille par une liste d'albums (affichage par lots)"""
+        self.all_albums_data = self._sort_albums_by_year(albums)
+        self._refresh_album_grid()
+    
+    def _filter_albums(self, albums):
+        """Restreint les albums au résultat de la recherche, les plus pertinents en premier"""
+        if not self.search_text:
+            return albums
+        
+        by_path = {album.get('folder_path') or album.get('path', ''): album for album in albums}
+        return [by_path[path] for path in self.library_catalog.search(self.search_text) if path in by_path]
+    
+    def _refresh_album_grid(self, keep_position=False):
+        """Réaffiche la grille selon la recherche en cours (depuis le début par défaut)"""
+        self.visible_albums_data = self._filter_albums(self.all_albums_data)
+        self.albums_grid.set_albums(self.visible_albums_data, keep_position=keep_position)
+    
+    def remove_album_from_list(self, album_data):
+        """Retire un album de la liste affichée (sans toucher aux fichiers)"""
+        album_path = VirtualAlbumGrid.album_path(album_data)
+        self.all_albums_data = [
+            album for album in self.all_albums_data if VirtualAlbumGrid.album_path(album) != album_path
+        ]
+        self._refresh_album_grid(keep_position=True)
         
     def create_main_window_with_scan(self, folder_path):
         """Crée la fenêtre principale et lance le scan du dossier"""
@@ -76,36 +173,21 @@ class NonotagsApp:
 
             albums = scanner.scan_directory(folder_path)
             
-            # ✅ TRI PAR ANNÉE CROISSANTE : Trier les albums avant affichage
-            albums = self._sort_albums_by_year(albums)
-
-            # MODIFICATION: Stocker tous les albums pour lazy loading
-            self.all_albums_data = albums
-            self.current_displayed_count = 0
-            self.displayed_album_cards = []
-
-            # MODIFICATION: Ne plus effacer les albums existants
-            # Initialiser les listes si elles n'existent pas
-            if not hasattr(self, 'loaded_albums') or self.loaded_albums is None:
-                self.loaded_albums = []
-            
-            # Vérifier si on a des albums existants dans la grille
-            existing_albums_count = len(self.albums_grid.get_children()) if self.albums_grid else 0
+            # Mémoriser le scan pour les prochains démarrages
+            try:
+                self.library_catalog.save_albums(albums, folder_path)
+            except Exception as e:
+                print(f"⚠️ Erreur enregistrement catalogue: {e}")
             
-            # Si c'est le premier import ET que la grille contient des albums de démo
-            # (détecté par le fait qu'il n'y a pas encore de loaded_albums réels)
-            if existing_albums_count > 0 and len(self.loaded_albums) == 0:
-                # Effacer seulement les albums de démonstration
-                for child in self.albums_grid.get_children():
-                    child.destroy()
-                # Nettoyer aussi la queue de l'orchestrator pour le premier import
-                self.orchestrator.clear_queue()
+            # Les albums d'un nouvel import s'ajoutent à ceux déjà affichés
+            # (un album rescanné remplace sa version précédente)
+            by_path = {VirtualAlbumGrid.album_path(album): album for album in self.all_albums_data}
+            for album in albums:
+                by_path[VirtualAlbumGrid.album_path(album)] = album
 
-            # MODIFICATION: Afficher le premier lot d'albums avec lazy loading
-            self._display_next_batch()
-
-            self.albums_grid.show_all()
-            # Plus besoin de update_cards_per_line() - FlowBox s'adapte automatiquement
+            # ✅ TRI PAR ANNÉE CROISSANTE : Trier les albums avant affichage
+            self.all_albums_data = self._sort_albums_by_year(list(by_path.values()))
+            self._refresh_album_grid(keep_position=True)
 
             # ✅ TRAITEMENT AUTOMATIQUE : Démarrer immédiatement le traitement
             if self.orchestrator.start_processing():
@@ -120,43 +202,6 @@ class NonotagsApp:
             print(f"Erreur lors du scan: {e}")
             # En cas d'erreur, garder les albums de démo
 
-    def _display_next_batch(self):
-        """Affiche le prochain lot d'albums avec lazy loading"""
-        if self.current_displayed_count >= len(self.all_albums_data):
-            return  # Tous les albums sont déjà affichés
-
-        # Calculer le nombre d'albums à afficher dans ce lot
-        remaining_albums = len(self.all_albums_data) - self.current_displayed_count
-        batch_size = min(self.lazy_loading_batch, remaining_albums)
-        
-        # Obtenir le lot d'albums à afficher
-        start_index = self.current_displayed_count
-        end_index = start_index + batch_size
-        batch_albums = self.all_albums_data[start_index:end_index]
-
-        # Ajouter les albums du lot à l'interface
-        new_albums_added = []
-        for album in batch_albums:
-            # Vérifier si l'album n'est pas déjà dans la liste (éviter les doublons)
-            album_path = album.get('folder_path') or album.get('path', '')
-            already_exists = any(
-                existing.get('folder_path') == album_path or existing.get('path') == album_path 
-                for existing in self.loaded_albums
-            )
-            
-            if not already_exists:
-                card = AlbumCard(album, self)
-                self.albums_grid.add(card)
-                self.loaded_albums.append(album)
-                new_albums_added.append(card)
-
-        # Mettre à jour le compteur
-        self.current_displayed_count += len(new_albums_added)
-        
-        # Afficher les cartes du lot
-        for card in new_albums_added:
-            card.show_all()
-
     def _sort_albums_by_year(self, albums):
         """Trie les albums par année croissante"""
         def get_year(album):
@@ -172,19 +217,6 @@ class NonotagsApp:
         
         return sorted(albums, key=get_year)
 
-    def _on_scroll_value_changed(self, adjustment):
-        """Callback pour lazy loading lors du scroll"""
-        if self.albums_grid is None:
-            return
-
-        # Obtenir la position du scroll
-        scrolled = adjustment.get_page_size() + adjustment.get_value()
-        upper_bound = adjustment.get_upper()
-        
-        # Si on est à 80% du scroll, charger plus d'albums
-        if scrolled >= upper_bound * 0.8:
-            self._display_next_batch()
-
     def create_main_window(self):
         """Crée la fenêtre principale avec la barre d'outils et la grille d'albums"""
         
@@ -215,6 +247,11 @@ class NonotagsApp:
         refresh_btn.connect("clicked", self.on_refresh_clicked)
         toolbar.pack_start(refresh_btn)
         
+        # Bouton Pochettes manquantes (recherche en lot)
+        self.batch_covers_btn = Gtk.Button.new_with_label("Pochettes manquantes")
+        self.batch_covers_btn.connect("clicked", self.on_batch_covers_clicked)
+        toolbar.pack_start(self.batch_covers_btn)
+        
         # Bouton Exceptions
         exceptions_btn = Gtk.Button.new_with_label("Exceptions")
         exceptions_btn.connect("clicked", self.on_exceptions_clicked)
@@ -230,26 +267,23 @@ class NonotagsApp:
         converter_btn.connect("clicked", self.on_converter_clicked)
         toolbar.pack_end(converter_btn)
         
+        # Recherche dans la bibliothèque (artiste, album, titre, genre)
+        self.search_entry = Gtk.SearchEntry()
+        self.search_entry.set_placeholder_text("Rechercher...")
+        self.search_entry.set_width_chars(24)
+        self.search_entry.connect("search-changed", self.on_search_changed)
+        toolbar.pack_end(self.search_entry)
+        
         main_vbox.pack_start(toolbar, False, False, 0)
+        self.toolbar = toolbar
         
         # ===== CONTENU PRINCIPAL =====
-        # Container principal avec scroll
+        # Container principal avec scroll (vertical uniquement, les colonnes suivent la largeur)
         scrolled = Gtk.ScrolledWindow()
-        scrolled.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
-        
-        # Connecter le signal de scroll pour lazy loading
-        scrolled.get_vadjustment().connect("value-changed", self._on_scroll_value_changed)
-        
-        # FlowBox pour affichage en grille
-        self.albums_grid = Gtk.FlowBox()
-        self.albums_grid.set_column_spacing(15)
-        self.albums_grid.set_row_spacing(15)
-        self.albums_grid.set_homogeneous(True)
-        self.albums_grid.set_selection_mode(Gtk.SelectionMode.SINGLE)
-        self.albums_grid.set_margin_left(20)
-        self.albums_grid.set_margin_right(20)
-        self.albums_grid.set_margin_top(20)
-        self.albums_grid.set_margin_bottom(20)
+        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        
+        # Grille virtualisée : cartes créées pour les rangées visibles puis recyclées
+        self.albums_grid = VirtualAlbumGrid(lambda album: AlbumCard(album, self))
         
         scrolled.add(self.albums_grid)
         main_vbox.pack_start(scrolled, True, True, 0)
@@ -262,9 +296,6 @@ class NonotagsApp:
         # Afficher la fenêtre
         self.main_window.show_all()
         
-        # Initialiser loaded_albums
-        self.loaded_albums = []
-        
         # Ajouter un message d'accueil
         self._add_welcome_message()
 
@@ -308,6 +339,71 @@ class NonotagsApp:
         if hasattr(self, 'current_folder'):
             GLib.idle_add(self._scan_folder, self.current_folder)
 
+    def on_search_changed(self, entry):
+        """Filtre la grille d'albums selon la recherche (index plein texte du catalogue)"""
+        search_text = entry.get_text().strip()
+        if search_text == self.search_text:
+            return
+        
+        self.search_text = search_text
+        self._refresh_album_grid()
+    
+    def on_batch_covers_clicked(self, button):
+        """Lance (ou interrompt) la recherche de pochettes pour tous les albums sans pochette"""
+        if self.batch_cover_search is not None:
+            self.batch_cover_search.stop()
+            button.set_label("Arrêt en cours...")
+            button.set_sensitive(False)
+            return
+        
+        albums_without_cover = [
+            album for album in self.all_albums_data
+            if not AlbumModel.find_cover_file(album.get('folder_path') or album.get('path', ''))
+        ]
+        if not albums_without_cover:
+            self.toolbar.set_subtitle("Tous les albums ont une pochette")
+            return
+        
+        from services.batch_cover_search import BatchCoverSearch, STATUS_FOUND
+        self.batch_cover_search = BatchCoverSearch()
+        button.set_label("Arrêter les pochettes")
+        found_paths = []
+        
+        def on_progress(done, total, album_path, status):
+            if status == STATUS_FOUND:
+                found_paths.append(album_path)
+            GLib.idle_add(self.toolbar.set_subtitle, f"Pochettes: {done}/{total}")
+        
+        def run_batch():
+            try:
+                counters = self.batch_cover_search.run(albums_without_cover, on_progress)
+            except Exception as e:
+                print(f"❌ Erreur recherche de pochettes en lot: {e}")
+                counters = None
+            GLib.idle_add(self._on_batch_covers_finished, counters, found_paths)
+        
+        thread = threading.Thread(target=run_batch)
+        thread.daemon = True
+        thread.start()
+    
+    def _on_batch_covers_finished(self, counters, found_paths):
+        """Fin du lot de pochettes : rafraîchit les cartes concernées (thread GTK)"""
+        self.batch_cover_search = None
+        self.batch_covers_btn.set_label("Pochettes manquantes")
+        self.batch_covers_btn.set_sensitive(True)
+        
+        if counters is not None:
+            self.toolbar.set_subtitle(
+                f"Pochettes: {counters.get('found', 0)} trouvées, {counters.get('not_found', 0)} introuvables"
+            )
+        
+        # Les cartes hors de la vue prendront la pochette lors de leur prochaine affectation
+        for album_path in found_paths:
+            card = self.albums_grid.card_for_path(album_path)
+            if card is not None:
+                card.refresh_cover()
+        return False
+    
     def on_exceptions_clicked(self, button):
         """Ouvre la fenêtre des exceptions"""
         window = persistent_window_manager.get_window(WindowType.EXCEPTIONS, self.main_window)
@@ -347,8 +443,21 @@ class NonotagsApp:
 
     def _setup_orchestrator_callbacks(self):
         """Configure les callbacks de l'orchestrateur"""
-        pass
+        # Chaque album traité rafraîchit sa carte ; une rafale de traitement en lot
+        # est regroupée par le RefreshManager en un seul rafraîchissement
+        self.orchestrator.on_album_processed = self._on_album_processed
+
+    def _on_album_processed(self, album, success):
+        """Album traité par l'orchestrateur : rafraîchir sa carte si elle est affichée"""
+        album_path = VirtualAlbumGrid.album_path(album)
+        if success and album_path:
+            refresh_manager.notify_metadata_changed([album_path])
 
     def _setup_persistent_window_factories(self):
-        """Configure les factories pour les fenêtres persistantes"""
-        pass
+        """Configure les factories pour les fenêtres persistantes (modules importés à l'ouverture)"""
+        def create_album_edit_window(album_data, parent_card):
+            # Lecteur, recherche de pochettes et mutagen ne sont chargés qu'à la première édition
+            from ui.views.album_edit_window import AlbumEditWindow
+            return AlbumEditWindow(album_data, parent_card)
+        
+        persistent_window_manager.register_window_factory(WindowType.ALBUM_EDIT, create_album_edit_window)